@@ -1,18 +1,42 @@
+import argparse
+import cProfile
+import difflib
+import hashlib
+import html
 import io
+import json
 import logging
+import marshal
 import os
+import pstats
+import queue
+import re
 import secrets
+import sqlite3
+import struct
+import sys
+import threading
+import time
+import tracemalloc
 import zipfile
+import zlib
+from collections import Counter, OrderedDict
+from contextlib import closing
 from datetime import datetime
 from enum import Enum
 
-from flask import Flask, request, send_file
+import yaml
+from cryptography.fernet import Fernet, InvalidToken
+from flask import Flask, g, make_response, request, send_file
 from flask_cors import CORS
 from flask_restful import Api, Resource
 from flask_swagger_ui import get_swaggerui_blueprint
 
 logging.basicConfig(level=logging.INFO)
 
+# The C loader is much faster on large docker-compose.yml files, when libyaml is available
+YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 app = Flask(__name__)
 api = Api(app)
 
@@ -126,7 +150,7 @@ def get_port(service: str) -> int:
     elif service == "Squid":
         return 80
     elif service == "Postfix":
-        return 25
+        return 587
     elif service == "Dovecot":
         return 143
     elif service == "OpenLDAP":
@@ -151,6 +175,20 @@ def generate_email(site_url: str, service_name: str) -> str:
     return f"{service_name}-{token}@{site_url}"
 
 
+def get_healthcheck(test: list, start_period: str = "10s") -> str:
+    """
+    Get the healthcheck configuration. The start interval probes quickly while the service
+    starts, so the services depending on it start as soon as it is ready.
+    """
+    return f"""test: {json.dumps(test)}
+            interval: 30s
+            timeout: 5s
+            retries: 3
+            start_period: {start_period}
+            start_interval: 2s
+    """
+
+
 def get_logging() -> str:
     """
     Get the logging configuration
@@ -162,6 +200,24 @@ def get_logging() -> str:
     """
 
 
+def get_ports_section(ports) -> str:
+    """
+    Get the ports section of a service, nothing when the service publishes no host port
+    """
+    if not ports:
+        return ""
+    return "\n        ports:" + "".join(f'\n            - "{port}"' for port in ports)
+
+
+def get_labels_section(labels: dict) -> str:
+    """
+    Get the labels section of a service (the proxy routes), nothing without labels
+    """
+    if not labels:
+        return ""
+    return "\n        labels:" + "".join(f'\n            {name}: "{value}"' for name, value in labels.items())
+
+
 class Database:
     """
     Database class: This class is used to create a database for the website
@@ -179,6 +235,12 @@ class Database:
         self.site_title = site_title
         self.site_url = site_url
 
+    def to_my_cnf(self, sizing: dict):
+        """
+        This function returns the my.cnf of the database, tuned for the project sizing
+        """
+        return MariaDbTuning(sizing).to_my_cnf()
+
     # String representation of the class is docker-compose.yml data
     def to_docker_compose(self):
         """
@@ -191,6 +253,7 @@ class Database:
         hostname: {self.database_host}
         volumes:
             - database-vol:/var/lib/mysql
+            - ./mariadb/my.cnf:/etc/mysql/conf.d/woopy.cnf:ro
         environment:
             MARIADB_DATABASE: {self.database_name}
             MARIADB_USER: {self.database_user}
@@ -206,10 +269,7 @@ class Database:
             - "33060:33060"
         restart: unless-stopped
         healthcheck:
-            test: ["CMD", "mysqladmin", "ping", "-h", "localhost"]
-            interval: 10s
-            timeout: 5s
-            retries: 5
+            {get_healthcheck(['CMD', 'healthcheck.sh', '--connect', '--innodb_initialized'], start_period='60s')}
         logging:
             {get_logging()}
         """
@@ -282,6 +342,45 @@ class Cache:
         self.site_title = site_title
         self.site_url = site_url
 
+    def to_redis_conf(self):
+        """
+        This function returns the redis.conf of the cache. Redis is only an object cache here:
+        no persistence, evict the least recently used keys when the memory is full.
+        """
+        profile = get_resource_profile(self.cache_host)
+        # keep a quarter of the container memory for the connections and the fragmentation
+        max_memory = int(profile["memory"] * 0.75)
+        # io threads only help with more than one core
+        io_threads = max(1, min(4, int(profile["cpus"])))
+        return f"""# redis.conf generated by woopy: Redis as the WordPress object cache
+bind 0.0.0.0
+port {self.cache_port}
+protected-mode yes
+tcp-keepalive 60
+timeout 0
+
+# Memory: evict the least recently used keys, the object cache rebuilds them from the database
+maxmemory {max_memory}mb
+maxmemory-policy allkeys-lru
+maxmemory-samples 10
+
+# A pure cache does not need persistence, the snapshots and the append only file only cost disk IO
+save ""
+appendonly no
+
+# Free the evicted and expired keys in the background, the main thread keeps serving requests
+lazyfree-lazy-eviction yes
+lazyfree-lazy-expire yes
+lazyfree-lazy-server-del yes
+lazyfree-lazy-user-flush yes
+
+io-threads {io_threads}
+io-threads-do-reads yes
+
+# The object cache flushes its own database with FLUSHDB, nobody needs FLUSHALL
+rename-command FLUSHALL ""
+"""
+
     def to_docker_compose(self):
         """
         This function returns the docker-compose.yml data for the cache
@@ -291,23 +390,21 @@ class Cache:
         image: redis:latest
         container_name: {self.cache_host}
         hostname: {self.cache_host}
+        # the official image is configured by redis.conf, the password is kept out of the file
+        command: ["redis-server", "/usr/local/etc/redis/redis.conf", "--requirepass", "{self.cache_password}"]
         environment:
-            REDIS_HOST: {self.cache_host}
-            REDIS_PORT_NUMBER: {self.cache_port}
-            REDIS_USERNAME: {self.cache_username}
-            REDIS_PASSWORD: {self.cache_password}
-            REDIS_DATABASE_NUMBER: "0"
-            REDIS_DISABLE_COMMANDS: "FLUSHDB,FLUSHALL"
-            REDIS_APPENDONLY: "yes"
-            REDIS_MAXMEMORY: "256mb"
-            REDIS_MAXMEMORY_POLICY: "allkeys-lru"
+            # used by redis-cli (healthcheck)
+            REDISCLI_AUTH: {self.cache_password}
         volumes:
             - cache-vol:/data
+            - ./redis/redis.conf:/usr/local/etc/redis/redis.conf:ro
         networks:
             - {self.site_title}-network
         ports:
             - "6379:6379"
             - "6380:6380"
+        healthcheck:
+            {get_healthcheck(['CMD-SHELL', 'redis-cli ping | grep -q PONG'])}
         restart: unless-stopped
         logging:
             {get_logging()}
@@ -356,6 +453,11 @@ class Mail:
     Mail class: This class is used to create a mail server for the website
     """
 
+    # route of the web UI through the proxy, the UI port is not published then (see Project.set_routes)
+    proxy_labels = None
+    # SMTP port of Mailhog, mail_port is the port of the web UI
+    smtp_port = 1025
+
     def __init__(self, site_title: str, site_url: str):
         self.mail_host = "mail"
         self.mail_base_url = f"mail.{site_url}"
@@ -367,6 +469,13 @@ class Mail:
         self.site_title = site_title
         self.site_url = site_url
 
+    def get_published_ports(self):
+        """
+        This function returns the host ports of the mail server, SMTP stays published behind the proxy
+        """
+        ports = [f"1025:{self.smtp_port}", "587:587", "465:465"]
+        return ports if self.proxy_labels else ["8025:8025"] + ports
+
     def to_docker_compose(self):
         """
         This function returns the docker-compose.yml data for the mail server
@@ -382,14 +491,11 @@ class Mail:
             - MH_API_BIND_ADDR={self.mail_host}:8025
             - MH_UI_WEB_PATH=/
         volumes:
-            - mail-vol:/data
-        ports:
-            - "8025:8025"
-            - "1025:{self.mail_port}"
-            - "587:587"
-            - "465:465"
+            - mail-vol:/data{get_ports_section(self.get_published_ports())}{get_labels_section(self.proxy_labels)}
         networks:
             - {self.site_title}-network
+        healthcheck:
+            {get_healthcheck(['CMD-SHELL', 'wget -q --spider http://mail:8025/ || exit 1'])}
         restart: unless-stopped
         logging:
             {get_logging()}
@@ -423,11 +529,119 @@ class Mail:
 """
 
 
+class MailRelay:
+    """
+    MailRelay class: This class is used to create a local SMTP relay (Postfix) for the website
+
+    The relay accepts the mails of the project at once, keeps them in its queue (mailrelay-vol) and
+    delivers them to relay_host, the mail server or the SMTP server of a mail provider. When the
+    delivery fails it retries with a growing delay for up to two days. It is part of the project
+    only when it is enabled (see Project.enable_mail_relay).
+    """
+
+    enabled = False
+
+    def __init__(self, site_title: str, site_url: str):
+        self.mail_relay_host = "mailrelay"
+        self.mail_relay_port = get_port("Postfix")
+        # next hop of the mails: the mail server (Mailhog), or [smtp.provider.com]:587 with RELAYHOST_USERNAME and RELAYHOST_PASSWORD
+        self.relay_host = "[mail]:1025"
+        # retries: first after a minute, then up to every 15 minutes, for 2 days
+        self.minimal_backoff = "60s"
+        self.maximal_backoff = "900s"
+        self.queue_lifetime = "2d"
+        self.site_title = site_title
+        self.site_url = site_url
+
+    def to_docker_compose(self):
+        """
+        This function returns the docker-compose.yml data for the mail relay
+        """
+        if not self.enabled:
+            return ""
+        return f"""
+    {self.mail_relay_host}:
+        image: boky/postfix:v4.3.0
+        container_name: {self.mail_relay_host}
+        hostname: {self.mail_relay_host}
+        environment:
+            - RELAYHOST={self.relay_host}
+            - ALLOW_EMPTY_SENDER_DOMAINS=true
+            - POSTFIX_queue_run_delay={self.minimal_backoff}
+            - POSTFIX_minimal_backoff_time={self.minimal_backoff}
+            - POSTFIX_maximal_backoff_time={self.maximal_backoff}
+            - POSTFIX_maximal_queue_lifetime={self.queue_lifetime}
+            - POSTFIX_bounce_queue_lifetime={self.queue_lifetime}
+            - POSTFIX_smtp_tls_security_level=may
+        volumes:
+            - {self.mail_relay_host}-vol:/var/spool/postfix
+        networks:
+            - {self.site_title}-network
+        depends_on:
+            mail:
+                condition: service_healthy
+        healthcheck:
+            {get_healthcheck(['CMD-SHELL', 'postfix status || exit 1'], start_period='30s')}
+        restart: unless-stopped
+        logging:
+            {get_logging()}
+        """
+
+    def get_report(self):
+        """
+        This function returns the mail relay section of the project report
+        """
+        if not self.enabled:
+            return "Mail Relay: disabled (MAIL_RELAY=true adds a Postfix relay that queues and retries the mails)\n"
+        return (
+            f"Mail Relay Hostname: {self.mail_relay_host}\n"
+            f"Mail Relay Port: {self.mail_relay_port}\n"
+            f"Mail Relay Next Hop: {self.relay_host}\n"
+            f"Mail Relay Retries: every {self.minimal_backoff} to {self.maximal_backoff} for {self.queue_lifetime}\n"
+            f"Mail Relay Queue: docker compose exec {self.mail_relay_host} mailq\n"
+        )
+
+    def to_kubernetes(self):
+        """
+        This function returns the kubernetes.yml data for the mail relay
+        """
+        if not self.enabled:
+            return ""
+        return f"""
+            - name: {self.mail_relay_host}
+                image: boky/postfix:v4.3.0
+
+                ports:
+                    - containerPort: {self.mail_relay_port}
+
+                env:
+                    - name: RELAYHOST
+                        value: "{self.relay_host}"
+                    - name: ALLOW_EMPTY_SENDER_DOMAINS
+                        value: "true"
+
+                restartPolicy: Always
+"""
+
+
 class Website:
     """
     Website class: This class is used to create a website for the user
+
+    Variants (website_variant):
+        apache: wordpress:latest, Apache with mod_php
+        nginx-fpm: nginx serves the static files and passes PHP to a wordpress:fpm container (php_host)
     """
 
+    website_variant = "apache"
+    php_host = "php"
+    # host ports and proxy routes, they change with the page cache and the proxy (see Project.set_routes)
+    published_ports = ("80:80", "443:443")
+    proxy_labels = None
+    page_cache_host = None
+    # WooCommerce performance profile, see StorePerformance
+    store_preset = "small"
+
     def __init__(
         self,
         site_title: str,
@@ -453,7 +667,7 @@ class Website:
         self.website_admin_password = generate_password()
         self.website_admin_email = generate_email(self.site_url, "website")
         self.mail_smtp_host = f"{mail_props.mail_host}"
-        self.mail_smtp_port = f"{mail_props.mail_port}"
+        self.mail_smtp_port = f"{mail_props.smtp_port}"
         self.mail_smtp_user = f"{mail_props.mail_username}"
         self.mail_smtp_password = f"{mail_props.mail_password}"
         self.mail_smtp_protocol = f"{mail_props.mail_encryption}"
@@ -461,10 +675,85 @@ class Website:
         self.cache_port = f"{cache_props.cache_port}"
         self.cache_password = f"{cache_props.cache_password}"
 
+    def get_config_extra(self):
+        """
+        This function returns the PHP added to wp-config.php by the wordpress image (WORDPRESS_CONFIG_EXTRA).
+        It connects the Redis object cache drop-in (installed by woosh.sh) to the cache service
+        and Proxy Cache Purge to the page cache, and sets the constants of the store performance profile.
+        WP-Cron runs in the wp-cli worker, not in the visitor requests (DISABLE_WP_CRON).
+        """
+        constants = {
+            "WP_REDIS_HOST": self.cache_host,
+            "WP_REDIS_PORT": self.cache_port,
+            "WP_REDIS_PASSWORD": self.cache_password,
+            "WP_REDIS_DATABASE": "0",
+            "WP_REDIS_PREFIX": f"{self.site_title}_",
+            "WP_REDIS_TIMEOUT": "1",
+            "WP_REDIS_READ_TIMEOUT": "1",
+            "WP_REDIS_MAXTTL": "86400",
+            "DISABLE_WP_CRON": True,
+        }
+        if self.page_cache_host:
+            # Proxy Cache Purge sends its PURGE requests to the page cache service
+            constants["VHP_VARNISH_IP"] = self.page_cache_host
+        constants.update(self.get_store_performance().constants)
+        return " ".join(f"define('{name}', {self.get_php_value(value)});" for name, value in constants.items())
+
+    @staticmethod
+    def get_php_value(value) -> str:
+        """
+        This function returns a constant value as PHP code
+        """
+        if isinstance(value, bool):
+            return "true" if value else "false"
+        if isinstance(value, int):
+            return str(value)
+        # single quoted PHP string: only the backslash and the quote are escaped
+        escaped = str(value).replace("\\", "\\\\").replace("'", "\\'")
+        return f"'{escaped}'"
+
+    def get_store_performance(self):
+        """
+        This function returns the WooCommerce performance profile of the website
+        """
+        return StorePerformance(self.store_preset)
+
+    def get_environment(self):
+        """
+        This function returns the environment of the WordPress container
+        """
+        return [
+            f"WORDPRESS_DB_HOST={self.database_host}",
+            f"WORDPRESS_DB_PORT_NUMBER={self.database_port}",
+            f"WORDPRESS_DB_NAME={self.database_name}",
+            f"WORDPRESS_DB_USER={self.database_user}",
+            f"WORDPRESS_DB_PASSWORD={self.database_password}",
+            f"WORDPRESS_DB_PREFIX={self.database_table_prefix}",
+            f"WORDPRESS_BLOG_NAME={self.site_title}",
+            f"WORDPRESS_USERNAME={self.website_admin_username}",
+            f"WORDPRESS_PASSWORD={self.website_admin_password}",
+            f"WORDPRESS_EMAIL={self.website_admin_email}",
+            f"WORDPRESS_SMTP_HOST={self.mail_smtp_host}",
+            f"WORDPRESS_SMTP_PORT={self.mail_smtp_port}",
+            f"WORDPRESS_SMTP_USER={self.mail_smtp_user}",
+            f"WORDPRESS_SMTP_PASSWORD={self.mail_smtp_password}",
+            f"WORDPRESS_SMTP_PROTOCOL={self.mail_smtp_protocol}",
+            f"WORDPRESS_CONFIG_EXTRA={self.get_config_extra()}",
+            f"WOOPY_STORE_OPTIONS={self.get_store_performance().get_options()}",
+            f"WORDPRESS_SITE_URL={self.site_url}",
+            f"WORDPRESS_SITE_TITLE={self.site_title}",
+            f"WORDPRESS_ADMIN_USER={self.website_admin_username}",
+            f"WORDPRESS_ADMIN_PASSWORD={self.website_admin_password}",
+            f"WORDPRESS_ADMIN_EMAIL={self.website_admin_email}",
+        ]
+
     def to_docker_compose(self):
         """
         This function returns the docker-compose.yml data for the website
         """
+        if self.website_variant == "nginx-fpm":
+            return self.to_docker_compose_nginx_fpm()
+        environment = "".join(f"\n            - {variable}" for variable in self.get_environment())
 
         return f"""
     {self.site_host}:
@@ -474,48 +763,140 @@ class Website:
         volumes:
             - {self.site_host}-vol:/var/www/html
             - ./wp-cli.phar:/usr/local/bin/wp
-        environment:
-            - WORDPRESS_DB_HOST={self.database_host}
-            - WORDPRESS_DB_PORT_NUMBER={self.database_port}
-            - WORDPRESS_DB_NAME={self.database_name}
-            - WORDPRESS_DB_USER={self.database_user}
-            - WORDPRESS_DB_PASSWORD={self.database_password}
-            - WORDPRESS_DB_PREFIX={self.database_table_prefix}
-            - WORDPRESS_BLOG_NAME={self.site_title}
-            - WORDPRESS_USERNAME={self.website_admin_username}
-            - WORDPRESS_PASSWORD={self.website_admin_password}
-            - WORDPRESS_EMAIL={self.website_admin_email}
-            - WORDPRESS_SMTP_HOST={self.mail_smtp_host}
-            - WORDPRESS_SMTP_PORT={self.mail_smtp_port}
-            - WORDPRESS_SMTP_USER={self.mail_smtp_user}
-            - WORDPRESS_SMTP_PASSWORD={self.mail_smtp_password}
-            - WORDPRESS_SMTP_PROTOCOL={self.mail_smtp_protocol}
-            - WORDPRESS_CACHE_ENABLED=true
-            - WORDPRESS_CACHE_DURATION=1440
-            - WORDPRESS_CACHE_TYPE=redis
-            - WORDPRESS_REDIS_HOST={self.cache_host}
-            - WORDPRESS_REDIS_PORT={self.cache_port}
-            - WORDPRESS_REDIS_DATABASE=0
-            - WORDPRESS_REDIS_PASSWORD={self.cache_password}
-            - WORDPRESS_SITE_URL={self.site_url}
-            - WORDPRESS_SITE_TITLE={self.site_title}
-            - WORDPRESS_ADMIN_USER={self.website_admin_username}
-            - WORDPRESS_ADMIN_PASSWORD={self.website_admin_password}
-            - WORDPRESS_ADMIN_EMAIL={self.website_admin_email}
+            - wp-cli-cache:/var/cache/wp-cli
+            - ./wordpress/woopy-performance.php:/var/www/html/wp-content/mu-plugins/woopy-performance.php:ro
+            - ./apache/zz-woopy.conf:/etc/apache2/conf-enabled/zz-woopy.conf:ro
+        environment:{environment}
         networks:
-            - {self.site_title}-network
-        ports:
-            - "80:80"
-            - "443:443"
+            - {self.site_title}-network{get_ports_section(self.published_ports)}{get_labels_section(self.proxy_labels)}
         depends_on:
-            - {self.database_host}
-        links:
-            - {self.database_host}:{self.database_host}
+            {self.database_host}:
+                condition: service_healthy
+        healthcheck:
+            {get_healthcheck(['CMD-SHELL', 'curl -fsS -o /dev/null http://localhost/wp-login.php || exit 1'], start_period='60s')}
         restart: unless-stopped
         logging:
             {get_logging()}
         """
         
+    def to_docker_compose_nginx_fpm(self):
+        """
+        This function returns the docker-compose.yml data for the nginx + PHP-FPM website:
+        nginx keeps the website service name and ports, PHP runs in the php service
+        """
+        environment = "".join(f"\n            - {variable}" for variable in self.get_environment())
+        return f"""
+    {self.site_host}:
+        image: nginx:stable-alpine
+        container_name: {self.site_host}
+        hostname: {self.site_host}
+        volumes:
+            - {self.site_host}-vol:/var/www/html:ro
+            - ./nginx/default.conf:/etc/nginx/conf.d/default.conf:ro
+        networks:
+            - {self.site_title}-network{get_ports_section(self.published_ports)}{get_labels_section(self.proxy_labels)}
+        depends_on:
+            {self.php_host}:
+                condition: service_healthy
+        healthcheck:
+            {get_healthcheck(['CMD-SHELL', 'wget -q -O /dev/null http://localhost/wp-login.php || exit 1'])}
+        restart: unless-stopped
+        logging:
+            {get_logging()}
+
+    {self.php_host}:
+        image: wordpress:fpm
+        container_name: {self.php_host}
+        hostname: {self.php_host}
+        volumes:
+            - {self.site_host}-vol:/var/www/html
+            - ./wp-cli.phar:/usr/local/bin/wp
+            - wp-cli-cache:/var/cache/wp-cli
+            - ./wordpress/woopy-performance.php:/var/www/html/wp-content/mu-plugins/woopy-performance.php:ro
+            - ./php-fpm/zz-woopy.conf:/usr/local/etc/php-fpm.d/zz-woopy.conf:ro
+        environment:{environment}
+        networks:
+            - {self.site_title}-network
+        depends_on:
+            {self.database_host}:
+                condition: service_healthy
+        healthcheck:
+            {get_healthcheck(['CMD-SHELL', 'php-fpm -t 2>/dev/null || exit 1'], start_period='60s')}
+        restart: unless-stopped
+        logging:
+            {get_logging()}
+        """
+
+    def to_nginx_conf(self):
+        """
+        This function returns the nginx site of the nginx + PHP-FPM website: static files are
+        served by nginx with long cache headers, only PHP reaches the FPM pool
+        """
+        return f"""# nginx site generated by woopy
+upstream php {{
+    server {self.php_host}:9000;
+    keepalive 16;
+}}
+
+server {{
+    listen 80 default_server;
+    server_name {self.site_url} www.{self.site_url} _;
+    root /var/www/html;
+    index index.php;
+    client_max_body_size 64m;
+
+    gzip on;
+    gzip_comp_level 5;
+    gzip_min_length 1024;
+    gzip_vary on;
+    gzip_types text/css text/plain text/xml application/javascript application/json application/xml image/svg+xml font/woff2;
+
+    location / {{
+        try_files $uri $uri/ /index.php?$args;
+    }}
+
+    location ~* \\.(?:css|js|mjs|jpe?g|png|gif|webp|avif|ico|svg|woff2?|ttf|eot|mp4)$ {{
+        expires 30d;
+        add_header Cache-Control "public, immutable";
+        access_log off;
+        try_files $uri =404;
+    }}
+
+    location ~ /\\.(?!well-known) {{
+        deny all;
+    }}
+
+    # queued mails, see woopy-performance.php
+    location ^~ /wp-content/woopy-mail/ {{
+        deny all;
+    }}
+
+    location ~ \\.php$ {{
+        try_files $uri =404;
+        fastcgi_pass php;
+        fastcgi_keep_conn on;
+        fastcgi_index index.php;
+        include fastcgi_params;
+        fastcgi_param SCRIPT_FILENAME $document_root$fastcgi_script_name;
+        fastcgi_buffers 16 16k;
+        fastcgi_buffer_size 32k;
+        fastcgi_read_timeout 120s;
+    }}
+}}
+"""
+
+    def to_apache_conf(self, sizing: dict):
+        """
+        This function returns the Apache performance configuration, sized for the project
+        """
+        return ApacheTuning(sizing).to_apache_conf()
+
+    def to_fpm_pool_conf(self, sizing: dict):
+        """
+        This function returns the PHP-FPM pool configuration, sized for the project
+        """
+        return PhpFpmTuning(sizing).to_pool_conf()
+
     def to_kubernetes(self):
         """
         This function returns the kubernetes.yml data for the website
@@ -588,450 +969,1166 @@ class Website:
 """
 
 
-class WpCli:
+class PageCache:
     """
-    WpCli class: This class is used to create a wp-cli for the website
+    PageCache class: This class is used to create a full page cache (Varnish) in front of the website
+
+    The page cache answers on port 80 and passes the misses to the website. Catalogue pages are
+    cached for the anonymous shoppers, the cart, the checkout, the account pages and every shopper
+    with a WooCommerce session or a WordPress login always reach the website. It is part of the
+    project only when it is enabled (see Project.enable_page_cache).
     """
 
-    def __init__(
-        self,
-        site_title: str,
-        site_url: str,
-        site_host: str,
-        database_host: str,
-        database_password: str,
-        cache_host: str,
-    ):
-        self.wpcli_host = "wpcli"
-        self.wpcli_port = get_port("WordPress")
-        self.wpcli_username = generate_username()
-        self.wpcli_email = generate_email(self.wpcli_host, "wpcli")
-        self.wpcli_password = generate_password()
+    enabled = False
+    published_ports = ("80:80",)
+    proxy_labels = None
+
+    def __init__(self, site_title: str, site_url: str):
+        self.page_cache_host = "pagecache"
+        self.page_cache_port = get_port("Varnish")
+        # cache storage in MB
+        self.page_cache_memory = 256
+        # time to live of the cached pages, and how long a stale page may be served (grace)
+        self.page_cache_ttl = "10m"
+        self.page_cache_grace = "6h"
+        self.backend_host = "website"
         self.site_title = site_title
         self.site_url = site_url
-        self.site_host = site_host
-        self.database_host = database_host
-        self.database_password = database_password
-        self.cache_host = cache_host
 
     def to_docker_compose(self):
         """
-        This function returns the docker-compose.yml data for the wp-cli
+        This function returns the docker-compose.yml data for the page cache
         """
+        if not self.enabled:
+            return ""
         return f"""
-    {self.wpcli_host}:
-        image: wordpress:cli
-        container_name: {self.wpcli_host}
-        hostname: {self.wpcli_host}
+    {self.page_cache_host}:
+        image: varnish:7.5
+        container_name: {self.page_cache_host}
+        hostname: {self.page_cache_host}
         volumes:
-            - {self.wpcli_host}-vol:/var/www/html
-        ports:
-            - "8787:80"
-        depends_on:
-            - {self.site_host}
-            - {self.database_host}
-            - {self.cache_host}
+            - ./varnish/default.vcl:/etc/varnish/default.vcl:ro
+        tmpfs:
+            - /var/lib/varnish/varnishd:exec
         environment:
-            WORDPRESS_DB_PASSWORD: {self.database_password}
+            - VARNISH_SIZE={self.page_cache_memory}M
         networks:
-            - {self.site_title}-network
+            - {self.site_title}-network{get_ports_section(self.published_ports)}{get_labels_section(self.proxy_labels)}
+        depends_on:
+            {self.backend_host}:
+                condition: service_healthy
+        healthcheck:
+            {get_healthcheck(['CMD-SHELL', 'varnishadm ping > /dev/null || exit 1'])}
         restart: unless-stopped
         logging:
-            driver: "json-file"
-            options:
-                max-size: "10m"
-                max-file: "5"
+            {get_logging()}
         """
-        
+
+    def to_vcl(self):
+        """
+        This function returns the WooCommerce aware VCL of the page cache
+        """
+        return f"""vcl 4.1;
+# Page cache generated by woopy
+
+import std;
+
+backend default {{
+    .host = "{self.backend_host}";
+    .port = "80";
+    .connect_timeout = 5s;
+    .first_byte_timeout = 120s;
+    .between_bytes_timeout = 60s;
+    .probe = {{
+        .url = "/wp-login.php";
+        .interval = 10s;
+        .timeout = 5s;
+        .window = 5;
+        .threshold = 3;
+    }}
+}}
+
+# Hosts allowed to PURGE and BAN (Proxy Cache Purge runs in the website),
+# a host in parentheses is skipped when it does not resolve
+acl purge {{
+    "localhost";
+    "127.0.0.1";
+    ("{self.backend_host}");
+    ("php");
+    ("wpcli");
+}}
+
+sub vcl_recv {{
+    if (req.method == "PURGE") {{
+        if (!client.ip ~ purge) {{
+            return (synth(405, "Not allowed"));
+        }}
+        if (req.http.X-Purge-Method == "regex") {{
+            ban("obj.http.X-Host == " + req.http.host + " && obj.http.X-Url ~ " + req.url);
+            return (synth(200, "Banned"));
+        }}
+        return (purge);
+    }}
+    if (req.method == "BAN") {{
+        if (!client.ip ~ purge) {{
+            return (synth(405, "Not allowed"));
+        }}
+        ban("obj.http.X-Host == " + req.http.host + " && obj.http.X-Url ~ " + req.url);
+        return (synth(200, "Banned"));
+    }}
+
+    if (req.method != "GET" && req.method != "HEAD") {{
+        return (pass);
+    }}
+    if (req.http.Authorization) {{
+        return (pass);
+    }}
+
+    # WooCommerce and WordPress pages that are personal or change state
+    if (req.url ~ "^/(cart|checkout|my-account|wp-admin|wp-login\\.php|wp-cron\\.php|xmlrpc\\.php|wp-json)" ||
+        req.url ~ "[?&](add-to-cart|wc-ajax|wc-api|remove_item|undo_item|preview)=") {{
+        return (pass);
+    }}
+
+    # Shoppers with items in the cart, a WooCommerce session or a login
+    if (req.http.Cookie ~ "(woocommerce_items_in_cart|woocommerce_cart_hash|wp_woocommerce_session_|wordpress_logged_in_|wordpress_sec_|wp-postpass_|comment_author_)") {{
+        return (pass);
+    }}
+
+    # Tracking parameters do not change the page
+    set req.url = regsuball(req.url, "([?&])(utm_[a-z]+|gclid|fbclid|msclkid)=[^&]*", "\\1");
+    set req.url = regsuball(req.url, "&&+", "&");
+    set req.url = regsub(req.url, "\\?&", "?");
+    set req.url = regsub(req.url, "[?&]+$", "");
+
+    # Analytics and consent cookies do not change the page either
+    unset req.http.Cookie;
+    return (hash);
+}}
+
+sub vcl_backend_response {{
+    # ban lurker friendly headers
+    set beresp.http.X-Host = bereq.http.host;
+    set beresp.http.X-Url = bereq.url;
+
+    if (bereq.url ~ "^/(cart|checkout|my-account)" || beresp.http.Set-Cookie ||
+        beresp.http.Cache-Control ~ "(private|no-cache|no-store)") {{
+        set beresp.uncacheable = true;
+        set beresp.ttl = 120s;
+        return (deliver);
+    }}
+    if (beresp.status >= 500) {{
+        # keep serving the stale page while the website recovers
+        return (abandon);
+    }}
+
+    if (bereq.url ~ "\\.(css|js|mjs|jpe?g|png|gif|webp|avif|ico|svg|woff2?|ttf|eot)(\\?.*)?$") {{
+        set beresp.ttl = 7d;
+    }} elsif (!beresp.http.Cache-Control ~ "max-age") {{
+        set beresp.ttl = {self.page_cache_ttl};
+    }}
+    set beresp.grace = {self.page_cache_grace};
+    set beresp.keep = 1d;
+    return (deliver);
+}}
+
+sub vcl_deliver {{
+    if (obj.hits > 0) {{
+        set resp.http.X-Cache = "HIT";
+    }} else {{
+        set resp.http.X-Cache = "MISS";
+    }}
+    unset resp.http.X-Host;
+    unset resp.http.X-Url;
+    unset resp.http.Via;
+    unset resp.http.X-Varnish;
+}}
+"""
+
+    def get_report(self):
+        """
+        This function returns the page cache section of the project report
+        """
+        if not self.enabled:
+            return "Page Cache: disabled (PAGE_CACHE=true adds a Varnish page cache in front of the website)\n"
+        return (
+            f"Page Cache Hostname: {self.page_cache_host}\n"
+            f"Page Cache Port: {self.page_cache_port}\n"
+            f"Page Cache Memory: {self.page_cache_memory}M\n"
+            f"Page Cache TTL: {self.page_cache_ttl}, grace {self.page_cache_grace}\n"
+            "Page Cache Configuration: varnish/default.vcl (cart, checkout, my-account and WooCommerce sessions bypass the cache)\n"
+            f"Page Cache Purge: PURGE http://{self.page_cache_host}/<path> from the website (Proxy Cache Purge)\n"
+        )
+
     def to_kubernetes(self):
         """
-        This function returns the kubernetes.yml data for the wp-cli
+        This function returns the kubernetes.yml data for the page cache
         """
+        if not self.enabled:
+            return ""
         return f"""
-            - name: {self.wpcli_host}
-                image: wordpress:cli
-                
+            - name: {self.page_cache_host}
+                image: varnish:7.5
+
                 ports:
-                    - containerPort: 80
-                    - containerPort: 443
-                    
+                    - containerPort: {self.page_cache_port}
+
                 env:
-                    - name: WORDPRESS_DB_PASSWORD
-                        value: {self.database_password}
-                    - name: WORDPRESS_DB_HOST
-                        value: {self.database_host}
-                        
+                    - name: VARNISH_SIZE
+                        value: {self.page_cache_memory}M
+
                 restartPolicy: Always
 """
 
 
-class Admin:
+class Proxy:
     """
-    Admin class: This class is used to create an admin panel for the website
+    Proxy class: This class is used to create the reverse proxy (Traefik) in front of the project
+
+    The proxy is the only service with host ports for HTTP: it terminates TLS (Let's Encrypt),
+    speaks HTTP/2 and HTTP/3 to the browsers and keeps pooled keep-alive connections to the
+    services. The services are routed by the labels from get_labels, the shared middlewares
+    and transports are in traefik/dynamic.yml (see to_dynamic_conf).
     """
 
-    def __init__(self, site_title: str, site_url: str, database_props: Database):
-        self.admin_host = "admin"
-        self.database_host = f"{database_props.database_host}"
-        self.database_port = f"{database_props.database_port}"
-        self.database_user = f"{database_props.database_user}"
-        self.database_password = f"{database_props.database_password}"
-        self.admin_username = generate_username()
-        self.admin_password = generate_password()
+    enabled = False
+    # Prometheus metrics (request latency per route) on the internal entrypoint, see Observability
+    metrics = False
+    # Let's Encrypt account (expiry and revocation notices), ACME_EMAIL of the request, see proxy_email
+    acme_email = None
+
+    def __init__(self, site_title: str, site_url: str):
+        self.proxy_host = "proxy"
+        # internal entrypoint of the ping (healthcheck), not published
+        self.proxy_port = get_port("Traefik")
+        self.certificate_resolver = "letsencrypt"
         self.site_title = site_title
         self.site_url = site_url
 
+    @property
+    def proxy_email(self) -> str:
+        """
+        The Let's Encrypt account email: ACME_EMAIL, or admin@ the site url
+        """
+        return self.acme_email or f"admin@{self.site_url}"
+
+    @proxy_email.setter
+    def proxy_email(self, value: str):
+        self.acme_email = value
+
+    def get_labels(self, router: str, rule: str, port: int, middlewares: tuple = ("compress", "buffering")) -> dict:
+        """
+        This function returns the labels that route a service through the proxy
+        """
+        return {
+            "traefik.enable": "true",
+            f"traefik.http.routers.{router}.rule": rule,
+            f"traefik.http.routers.{router}.entrypoints": "websecure",
+            f"traefik.http.routers.{router}.tls.certresolver": self.certificate_resolver,
+            f"traefik.http.routers.{router}.middlewares": ",".join(
+                f"{middleware}@file" for middleware in ("secure-headers",) + tuple(middlewares)
+            ),
+            f"traefik.http.services.{router}.loadbalancer.server.port": str(port),
+            f"traefik.http.services.{router}.loadbalancer.serverstransport": "keepalive@file",
+        }
+
     def to_docker_compose(self):
         """
-        This function returns the docker-compose.yml data for the admin panel
+        This function returns the docker-compose.yml data for the proxy
         """
+        if not self.enabled:
+            return ""
+        metrics = ""
+        if self.metrics:
+            metrics = """
+            - --metrics.prometheus=true
+            - --metrics.prometheus.entrypoint=traefik
+            - --metrics.prometheus.buckets=0.05,0.1,0.25,0.5,1,2.5,5,10"""
         return f"""
-    {self.admin_host}:
-        image: phpmyadmin:latest
-        container_name: {self.admin_host}
-        hostname: {self.admin_host}
-        environment:
-            PMA_HOST: {self.database_host}
-            PMA_PORT: {self.database_port}
-            PMA_USER: {self.database_user}
-            PMA_PASSWORD: {self.database_password}
-            PMA_ARBITRARY: 1
+    {self.proxy_host}:
+        image: traefik:v3.1
+        container_name: {self.proxy_host}
+        hostname: {self.proxy_host}
+        command:
+            - --providers.docker=true
+            - --providers.docker.exposedbydefault=false
+            - --providers.file.filename=/etc/traefik/dynamic.yml
+            - --entrypoints.web.address=:80
+            - --entrypoints.web.http.redirections.entrypoint.to=websecure
+            - --entrypoints.web.http.redirections.entrypoint.scheme=https
+            - --entrypoints.websecure.address=:443
+            - --entrypoints.websecure.http2.maxConcurrentStreams=250
+            - --entrypoints.websecure.http3=true
+            - --entrypoints.websecure.http3.advertisedport=443
+            - --entrypoints.websecure.transport.keepAliveMaxRequests=1000
+            - --entrypoints.websecure.transport.keepAliveMaxTime=120s
+            - --entrypoints.websecure.transport.respondingTimeouts.readTimeout=60s
+            - --entrypoints.websecure.transport.respondingTimeouts.idleTimeout=180s
+            - --entrypoints.traefik.address=:{self.proxy_port}
+            - --certificatesresolvers.{self.certificate_resolver}.acme.email={self.proxy_email}
+            - --certificatesresolvers.{self.certificate_resolver}.acme.storage=/letsencrypt/acme.json
+            - --certificatesresolvers.{self.certificate_resolver}.acme.tlschallenge=true
+            - --ping=true
+            - --log.level=WARN{metrics}
+        volumes:
+            - /var/run/docker.sock:/var/run/docker.sock:ro
+            - {self.proxy_host}-vol:/letsencrypt
+            - ./traefik/dynamic.yml:/etc/traefik/dynamic.yml:ro
         networks:
             - {self.site_title}-network
         ports:
-            - "3307:80"
-        depends_on:
-            - {self.database_host}
+            - "80:80"
+            - "443:443"
+            - "443:443/udp"
+        healthcheck:
+            {get_healthcheck(['CMD', 'traefik', 'healthcheck', '--ping'])}
         restart: unless-stopped
         logging:
             {get_logging()}
         """
-        
+
+    def to_dynamic_conf(self):
+        """
+        This function returns the middlewares, the transport and the TLS options shared by the routes
+        """
+        return """# Traefik dynamic configuration generated by woopy
+http:
+  middlewares:
+    # gzip/brotli for the text responses, streams are not compressed
+    compress:
+      compress:
+        minResponseBodyBytes: 1024
+        excludedContentTypes:
+          - text/event-stream
+    # slow clients upload to the proxy, not to a PHP worker; a failed connection is retried once
+    buffering:
+      buffering:
+        maxRequestBodyBytes: 67108864
+        memRequestBodyBytes: 2097152
+        maxResponseBodyBytes: 0
+        memResponseBodyBytes: 2097152
+        retryExpression: "IsNetworkError() && Attempts() < 2"
+    secure-headers:
+      headers:
+        stsSeconds: 31536000
+        stsIncludeSubdomains: true
+        contentTypeNosniff: true
+        referrerPolicy: strict-origin-when-cross-origin
+
+  serversTransports:
+    # pooled keep-alive connections to the services
+    keepalive:
+      maxIdleConnsPerHost: 64
+      forwardingTimeouts:
+        dialTimeout: 5s
+        responseHeaderTimeout: 120s
+        idleConnTimeout: 90s
+
+tls:
+  options:
+    default:
+      minVersion: VersionTLS12
+      alpnProtocols:
+        - h2
+        - http/1.1
+"""
+
+    def get_report(self):
+        """
+        This function returns the proxy section of the project report
+        """
+        if not self.enabled:
+            return "Proxy: disabled (the services publish their own host ports)\n"
+        return (
+            f"Proxy Hostname: {self.proxy_host}\n"
+            "Proxy Ports: 80 (redirects to HTTPS), 443/tcp (HTTP/1.1, HTTP/2), 443/udp (HTTP/3)\n"
+            f"Proxy Certificates: Let's Encrypt ({self.proxy_email})\n"
+            f"Proxy Routes: {self.site_url}, admin.{self.site_url}, mail.{self.site_url}, code.{self.site_url}\n"
+            "Proxy Configuration: traefik/dynamic.yml (compression, buffering, keep-alive connections)\n"
+        )
+
     def to_kubernetes(self):
         """
-        This function returns the kubernetes.yml data for the admin panel
+        This function returns the kubernetes.yml data for the proxy
         """
+        if not self.enabled:
+            return ""
         return f"""
-apiVersion: apps/v1
+            - name: {self.proxy_host}
+                image: traefik:v3.1
 
-kind: Deployment
+                ports:
+                    - containerPort: 80
+                    - containerPort: 443
 
-metadata:
-    name: {self.admin_host}
-    labels:
-        app: {self.admin_host}
-        
-spec:
-    replicas: 1
-    selector:
-        matchLabels:
-            app: {self.admin_host}
-    template:
-        metadata:
-            labels:
-                app: {self.admin_host}
-        spec:
-            containers:
-            - name: {self.admin_host}
-              image: phpmyadmin:latest
-              ports:
-              - containerPort: 80
-              env:
-              - name: PMA_HOST
-                value: {self.database_host}
-              - name: PMA_PORT
-                value: {self.database_port}
-              - name: PMA_USER
-                value: {self.database_user}
-              - name: PMA_PASSWORD
-                value: {self.database_password}
-              - name: PMA_ARBITRARY
-                value: 1
-            restartPolicy: Always
+                restartPolicy: Always
 """
 
 
-class Monitoring:
+class Observability:
     """
-    Monitoring class: This class is used to create a monitoring system for the host
+    Observability class: This class is used to create the metrics stack of the project
+
+        - prometheus: scrapes the exporters, the proxy and cAdvisor (monitoring), evaluates the alerts
+        - alertmanager: sends the alerts to the mail server
+        - grafana: the WooCommerce dashboard (request latency, cache hit ratios, slow queries,
+          InnoDB buffer pool, PHP workers), provisioned from grafana/
+        - exporters: mysqld, redis, php-fpm (nginx-fpm variant) or apache, blackbox (probes of the storefront),
+          postfix (queue of the mail relay, when it is enabled)
+
+    It is part of the project only when it is enabled (see Project.enable_observability).
     """
 
-    def __init__(self, site_title: str, site_url: str):
-        self.monitoring_host = "monitoring"
-        self.monitoring_port = get_port("Cadvisor")
-        self.monitoring_username = generate_username()
-        self.montiroing_email = generate_email(self.monitoring_host, "monitoring")
-        self.monitoring_password = generate_password()
+    enabled = False
+    # route of Grafana through the proxy, the Grafana port is not published then (see Project.set_routes)
+    proxy_labels = None
+    # set by Project.enable_observability
+    website_variant = "apache"
+    front_host = "website"
+    proxy_host = None
+    mail_relay_host = None
+    # cAdvisor of the project, None when it runs once per host (see configure_project)
+    cadvisor_host = "monitoring"
+
+    def __init__(self, site_title: str, site_url: str, database_props: Database, cache_props: Cache):
+        self.prometheus_host = "prometheus"
+        self.prometheus_port = get_port("Prometheus")
+        self.prometheus_retention = "15d"
+        self.grafana_host = "grafana"
+        self.grafana_port = get_port("Grafana")
+        self.grafana_username = generate_username()
+        self.grafana_password = generate_password()
+        self.alertmanager_host = "alertmanager"
+        self.alertmanager_port = get_port("Alertmanager")
+        self.alert_email = generate_email(site_url, "alerts")
+        self.database_host = f"{database_props.database_host}"
+        self.database_port = f"{database_props.database_port}"
+        self.database_root_password = f"{database_props.database_root_password}"
+        self.cache_host = f"{cache_props.cache_host}"
+        self.cache_port = f"{cache_props.cache_port}"
+        self.cache_password = f"{cache_props.cache_password}"
+        self.mail_host = "mail"
         self.site_title = site_title
         self.site_url = site_url
 
+    def get_exporters(self):
+        """
+        This function returns the exporters of the project: service name, image, port
+        """
+        php_exporter = (
+            ("php-fpm-exporter", "hipages/php-fpm_exporter:2.2.0", 9253)
+            if self.website_variant == "nginx-fpm"
+            else ("apache-exporter", "lusitaniae/apache_exporter:v1.0.8", 9117)
+        )
+        exporters = [
+            ("mysqld-exporter", "prom/mysqld-exporter:v0.15.1", 9104),
+            ("redis-exporter", "oliver006/redis_exporter:v1.62.0", 9121),
+            php_exporter,
+            ("blackbox-exporter", "prom/blackbox-exporter:v0.25.0", 9115),
+        ]
+        if self.mail_relay_host:
+            exporters.append(("postfix-exporter", "ghcr.io/hsn723/postfix_exporter:v0.5.0", 9154))
+        return exporters
+
     def to_docker_compose(self):
         """
-        This function returns the docker-compose.yml data for the monitoring system
+        This function returns the docker-compose.yml data for the metrics stack
         """
-        return f"""
-    {self.monitoring_host}:
-        image: gcr.io/cadvisor/cadvisor:v0.39.0
-        container_name: {self.monitoring_host}
-        hostname: {self.monitoring_host}
-        privileged: true
-        volumes:
-            - /var/run:/var/run:ro
-            - /sys:/sys:ro
-            - /var/lib/docker/:/var/lib/docker:ro
-            - /var/run/docker.sock:/var/run/docker.sock:ro
-            - /etc/machine-id:/etc/machine-id:ro
-            - /var/lib/dbus/machine-id:/var/lib/dbus/machine-id:ro
+        if not self.enabled:
+            return ""
+        grafana_ports = get_ports_section(() if self.proxy_labels else (f"3000:{self.grafana_port}",))
+        if self.website_variant == "nginx-fpm":
+            php_exporter = f"""
+    php-fpm-exporter:
+        image: hipages/php-fpm_exporter:2.2.0
+        container_name: php-fpm-exporter
         environment:
-            - TZ=Europe/Brussels
+            - PHP_FPM_SCRAPE_URI=tcp://php:9000/status
+            - PHP_FPM_FIX_PROCESS_COUNT=true
         networks:
             - {self.site_title}-network
-        ports:
-            - "8888:8080"
+        # the exporter image has no http client, nothing depends on it
+        healthcheck:
+            disable: true
         restart: unless-stopped
         logging:
             {get_logging()}
         """
-        
-    def to_kubernetes(self):
+        else:
+            php_exporter = f"""
+    apache-exporter:
+        image: lusitaniae/apache_exporter:v1.0.8
+        container_name: apache-exporter
+        command:
+            - --scrape_uri=http://website/server-status?auto
+        networks:
+            - {self.site_title}-network
+        healthcheck:
+            {get_healthcheck(['CMD-SHELL', 'wget -q --spider http://localhost:9117/ || exit 1'])}
+        restart: unless-stopped
+        logging:
+            {get_logging()}
         """
-        This function returns the kubernetes.yml data for the monitoring system
+        mail_relay_exporter = ""
+        if self.mail_relay_host:
+            # the queue is read through the showq socket of the relay, the relay logs to stdout
+            mail_relay_exporter = f"""
+    postfix-exporter:
+        image: ghcr.io/hsn723/postfix_exporter:v0.5.0
+        container_name: postfix-exporter
+        command:
+            - --postfix.showq_path=/var/spool/postfix/public/showq
+            - --postfix.logfile_path=/dev/null
+        volumes:
+            - {self.mail_relay_host}-vol:/var/spool/postfix:ro
+        networks:
+            - {self.site_title}-network
+        depends_on:
+            {self.mail_relay_host}:
+                condition: service_healthy
+        # the exporter image has no shell or http client, nothing depends on it
+        healthcheck:
+            disable: true
+        restart: unless-stopped
+        logging:
+            {get_logging()}
         """
         return f"""
-apiVersion: apps/v1
-
-kind: Deployment
-
-metadata:
-    name: {self.monitoring_host}
-    labels:
-        app: {self.monitoring_host}
-        
-spec:
-    replicas: 1
-    selector:
-        matchLabels:
-            app: {self.monitoring_host}
-    template:
-        metadata:
-            labels:
-                app: {self.monitoring_host}
-        spec:
-            containers:
-            - name: {self.monitoring_host}
-              image: gcr.io/cadvisor/cadvisor:v0.39.0
-              ports:
-              - containerPort: 8080
-              env:
-              - name: TZ
-                value: Europe/Brussels
-              volumeMounts:
-              - mountPath: /var/run
-                readOnly: true
-              - mountPath: /sys
-                readOnly: true
-              - mountPath: /var/lib/docker/
-                readOnly: true
-              - mountPath: /var/run/docker.sock
-                readOnly: true
-              - mountPath: /etc/machine-id
-                readOnly: true
-              - mountPath: /var/lib/dbus/machine-id
-                readOnly: true
-            restartPolicy: Always
-"""
-
+    {self.prometheus_host}:
+        image: prom/prometheus:v2.54.1
+        container_name: {self.prometheus_host}
+        hostname: {self.prometheus_host}
+        command:
+            - --config.file=/etc/prometheus/prometheus.yml
+            - --storage.tsdb.path=/prometheus
+            - --storage.tsdb.retention.time={self.prometheus_retention}
+            - --web.enable-lifecycle
+        volumes:
+            - {self.prometheus_host}-vol:/prometheus
+            - ./prometheus:/etc/prometheus:ro
+        networks:
+            - {self.site_title}-network
+        healthcheck:
+            {get_healthcheck(['CMD-SHELL', 'wget -q --spider http://localhost:9090/-/ready || exit 1'], start_period='30s')}
+        restart: unless-stopped
+        logging:
+            {get_logging()}
 
-class Management:
-    """
-    Management class: This class is used to create a management system for the website
-    """
+    {self.alertmanager_host}:
+        image: prom/alertmanager:v0.27.0
+        container_name: {self.alertmanager_host}
+        hostname: {self.alertmanager_host}
+        command:
+            - --config.file=/etc/alertmanager/alertmanager.yml
+            - --storage.path=/alertmanager
+        volumes:
+            - ./alertmanager:/etc/alertmanager:ro
+        networks:
+            - {self.site_title}-network
+        healthcheck:
+            {get_healthcheck(['CMD-SHELL', 'wget -q --spider http://localhost:9093/-/ready || exit 1'])}
+        restart: unless-stopped
+        logging:
+            {get_logging()}
 
-    def __init__(self, site_title: str, site_url: str):
-        self.management_host = "management"
-        self.management_port = get_port("Portainer")
-        self.management_username = generate_username()
-        self.management_email = generate_email(self.management_host, "management")
-        self.management_password = generate_password()
-        self.site_title = site_title
-        self.site_url = site_url
+    {self.grafana_host}:
+        image: grafana/grafana:11.2.0
+        container_name: {self.grafana_host}
+        hostname: {self.grafana_host}
+        environment:
+            - GF_SECURITY_ADMIN_USER={self.grafana_username}
+            - GF_SECURITY_ADMIN_PASSWORD={self.grafana_password}
+            - GF_USERS_ALLOW_SIGN_UP=false
+            - GF_ANALYTICS_REPORTING_ENABLED=false
+        volumes:
+            - {self.grafana_host}-vol:/var/lib/grafana
+            - ./grafana/provisioning:/etc/grafana/provisioning:ro
+            - ./grafana/dashboards:/var/lib/grafana/dashboards:ro
+        networks:
+            - {self.site_title}-network{grafana_ports}{get_labels_section(self.proxy_labels)}
+        depends_on:
+            {self.prometheus_host}:
+                condition: service_healthy
+        healthcheck:
+            {get_healthcheck(['CMD-SHELL', 'wget -q --spider http://localhost:3000/api/health || exit 1'], start_period='30s')}
+        restart: unless-stopped
+        logging:
+            {get_logging()}
 
-    def to_docker_compose(self):
-        """
-        This function returns the docker-compose.yml data for the management system
-        """
-        return f"""
-    {self.management_host}:
-        image: portainer/portainer-ce:latest
-        container_name: {self.management_host}
-        hostname: {self.management_host}
+    mysqld-exporter:
+        image: prom/mysqld-exporter:v0.15.1
+        container_name: mysqld-exporter
         command:
-            -H unix:///var/run/docker.sock
-            --admin-password '{self.management_password}'
+            - --mysqld.address={self.database_host}:{self.database_port}
+            - --mysqld.username=root
+            - --collect.global_status
+            - --collect.global_variables
+            - --collect.info_schema.innodb_metrics
+            - --collect.info_schema.processlist
+        environment:
+            - MYSQLD_EXPORTER_PASSWORD={self.database_root_password}
+        networks:
+            - {self.site_title}-network
+        depends_on:
+            {self.database_host}:
+                condition: service_healthy
+        healthcheck:
+            {get_healthcheck(['CMD-SHELL', 'wget -q --spider http://localhost:9104/ || exit 1'])}
+        restart: unless-stopped
+        logging:
+            {get_logging()}
+
+    redis-exporter:
+        image: oliver006/redis_exporter:v1.62.0
+        container_name: redis-exporter
+        environment:
+            - REDIS_ADDR=redis://{self.cache_host}:{self.cache_port}
+            - REDIS_PASSWORD={self.cache_password}
+        networks:
+            - {self.site_title}-network
+        # the exporter image is built from scratch (no shell), nothing depends on it
+        healthcheck:
+            disable: true
+        restart: unless-stopped
+        logging:
+            {get_logging()}
+{php_exporter}{mail_relay_exporter}
+    blackbox-exporter:
+        image: prom/blackbox-exporter:v0.25.0
+        container_name: blackbox-exporter
         volumes:
-            - /var/run/docker.sock:/var/run/docker.sock
-            - {self.management_host}-vol:/data
+            - ./blackbox/blackbox.yml:/etc/blackbox_exporter/config.yml:ro
         networks:
             - {self.site_title}-network
-        ports:
-            - "9000:9000"
+        healthcheck:
+            {get_healthcheck(['CMD-SHELL', 'wget -q --spider http://localhost:9115/-/healthy || exit 1'])}
         restart: unless-stopped
         logging:
             {get_logging()}
         """
-        
-        
-    def to_kubernetes(self):
+
+    def to_prometheus_conf(self):
         """
-        This function returns the kubernetes.yml data for the management system
+        This function returns prometheus/prometheus.yml
         """
-        return f"""
-apiVersion: apps/v1
+        scrape_configs = [
+            {"job_name": "prometheus", "static_configs": [{"targets": [f"localhost:{self.prometheus_port}"]}]},
+        ]
+        if self.cadvisor_host:
+            scrape_configs.append({"job_name": "cadvisor", "static_configs": [{"targets": [f"{self.cadvisor_host}:8080"]}]})
+        if self.proxy_host:
+            scrape_configs.append({"job_name": "traefik", "static_configs": [{"targets": [f"{self.proxy_host}:8080"]}]})
+        scrape_configs.extend(
+            {"job_name": name.replace("-exporter", ""), "static_configs": [{"targets": [f"{name}:{port}"]}]}
+            for name, _, port in self.get_exporters()
+            if name != "blackbox-exporter"
+        )
+        # the storefront as a shopper sees it: home page, shop, a login page that always reaches PHP
+        scrape_configs.append(
+            {
+                "job_name": "blackbox",
+                "metrics_path": "/probe",
+                "params": {"module": ["storefront"]},
+                "static_configs": [
+                    {
+                        "targets": [
+                            f"http://{self.front_host}/",
+                            f"http://{self.front_host}/shop/",
+                            "http://website/wp-login.php",
+                        ]
+                    }
+                ],
+                "relabel_configs": [
+                    {"source_labels": ["__address__"], "target_label": "__param_target"},
+                    {"source_labels": ["__param_target"], "target_label": "instance"},
+                    {"target_label": "__address__", "replacement": "blackbox-exporter:9115"},
+                ],
+            }
+        )
+        configuration = {
+            "global": {"scrape_interval": "15s", "evaluation_interval": "15s"},
+            "rule_files": ["/etc/prometheus/alerts.yml"],
+            "alerting": {
+                "alertmanagers": [{"static_configs": [{"targets": [f"{self.alertmanager_host}:{self.alertmanager_port}"]}]}]
+            },
+            "scrape_configs": scrape_configs,
+        }
+        return "# Prometheus configuration generated by woopy\n" + yaml.safe_dump(configuration, sort_keys=False)
+
+    def to_blackbox_conf(self):
+        """
+        This function returns blackbox/blackbox.yml: the probes ask for the site as the proxy does,
+        so WordPress answers instead of redirecting to the canonical https URL
+        """
+        return f"""# Blackbox exporter modules generated by woopy
+modules:
+  storefront:
+    prober: http
+    timeout: 10s
+    http:
+      method: GET
+      headers:
+        Host: {self.site_url}
+        X-Forwarded-Proto: https
+      follow_redirects: false
+      valid_status_codes: [200]
+      preferred_ip_protocol: ip4
+"""
 
-kind: Deployment
+    def to_alert_rules(self):
+        """
+        This function returns prometheus/alerts.yml
+        """
+        rules = [
+            ("StorefrontDown", 'probe_success{job="blackbox"} == 0', "2m", "critical", "{{ $labels.instance }} does not answer"),
+            (
+                "StorefrontSlow",
+                'probe_duration_seconds{job="blackbox"} > 2',
+                "5m",
+                "warning",
+                "{{ $labels.instance }} takes more than 2 seconds",
+            ),
+            (
+                "ObjectCacheHitRatioLow",
+                "rate(redis_keyspace_hits_total[10m]) / (rate(redis_keyspace_hits_total[10m]) + rate(redis_keyspace_misses_total[10m])) < 0.8",
+                "15m",
+                "warning",
+                "less than 80% of the object cache lookups hit Redis",
+            ),
+            ("SlowQueries", "rate(mysql_global_status_slow_queries[5m]) > 0.1", "10m", "warning", "more than 6 slow queries per minute"),
+            (
+                "BufferPoolFull",
+                'sum(mysql_global_status_buffer_pool_pages{state="data"}) / sum(mysql_global_status_buffer_pool_pages{state="total"}) > 0.95',
+                "30m",
+                "warning",
+                "the InnoDB buffer pool is full, the data set no longer fits in memory",
+            ),
+        ]
+        if self.mail_relay_host:
+            rules.append(
+                (
+                    "MailQueueBacklog",
+                    'sum(postfix_showq_message_size_bytes_count{queue=~"active|deferred"}) > 25',
+                    "15m",
+                    "warning",
+                    "more than 25 mails wait in the queue of the mail relay",
+                )
+            )
+        if self.website_variant == "nginx-fpm":
+            rules.append(
+                ("PhpWorkersExhausted", "increase(phpfpm_max_children_reached[10m]) > 0", "0m", "warning", "pm.max_children was reached")
+            )
+        else:
+            rules.append(
+                (
+                    "PhpWorkersExhausted",
+                    'apache_workers{state="idle"} == 0',
+                    "5m",
+                    "warning",
+                    "all the Apache workers (MaxRequestWorkers) are busy",
+                )
+            )
+        configuration = {
+            "groups": [
+                {
+                    "name": "woopy",
+                    "rules": [
+                        {
+                            "alert": name,
+                            "expr": expression,
+                            "for": duration,
+                            "labels": {"severity": severity},
+                            "annotations": {"summary": summary},
+                        }
+                        for name, expression, duration, severity, summary in rules
+                    ],
+                }
+            ]
+        }
+        return "# Prometheus alerts generated by woopy\n" + yaml.safe_dump(configuration, sort_keys=False, width=1000)
+
+    def to_alertmanager_conf(self):
+        """
+        This function returns alertmanager/alertmanager.yml, the alerts are sent to the mail server
+        """
+        return f"""# Alertmanager configuration generated by woopy
+global:
+  smtp_smarthost: {self.mail_host}:1025
+  smtp_from: {self.alert_email}
+  smtp_require_tls: false
+
+route:
+  receiver: mail
+  group_by: [alertname]
+  group_wait: 30s
+  group_interval: 5m
+  repeat_interval: 4h
+
+receivers:
+  - name: mail
+    email_configs:
+      - to: {self.alert_email}
+        send_resolved: true
+"""
 
-metadata:
-    name: {self.management_host}
-    labels:
-        app: {self.management_host}
-        
-spec:
-    replicas: 1
-    selector:
-        matchLabels:
-            app: {self.management_host}
-    template:
-        metadata:
-            labels:
-                app: {self.management_host}
-        spec:
-            containers:
-            - name: {self.management_host}
-              image: portainer/portainer-ce:latest
-              command:
-              - -H
-              - unix:///var/run/docker.sock
-              - --admin-password
-              - "{self.management_password}"
-              volumeMounts:
-              - mountPath: /var/run/docker.sock
-                name: docker-socket
-              - mountPath: /data
-                name: portainer-data
-            restartPolicy: Always
+    def to_grafana_datasource(self):
+        """
+        This function returns grafana/provisioning/datasources/prometheus.yml
+        """
+        return f"""apiVersion: 1
+datasources:
+  - name: Prometheus
+    uid: prometheus
+    type: prometheus
+    access: proxy
+    url: http://{self.prometheus_host}:{self.prometheus_port}
+    isDefault: true
 """
 
+    def to_grafana_dashboard_provider(self):
+        """
+        This function returns grafana/provisioning/dashboards/woopy.yml
+        """
+        return """apiVersion: 1
+providers:
+  - name: woopy
+    folder: woopy
+    type: file
+    allowUiUpdates: false
+    options:
+      path: /var/lib/grafana/dashboards
+"""
 
-class Vault:
+    def to_grafana_dashboard(self):
+        """
+        This function returns grafana/dashboards/woopy.json: where the shop spends its time
+        """
+        panels = []
+        if self.proxy_host:
+            panels.append(
+                (
+                    "Request latency (proxy, p50 / p95)",
+                    "s",
+                    [
+                        ('histogram_quantile(0.5, sum by (le) (rate(traefik_service_request_duration_seconds_bucket{service=~"website.*"}[5m])))', "p50"),
+                        ('histogram_quantile(0.95, sum by (le) (rate(traefik_service_request_duration_seconds_bucket{service=~"website.*"}[5m])))', "p95"),
+                    ],
+                )
+            )
+            panels.append(
+                ("Requests per second", "reqps", [("sum by (code) (rate(traefik_service_requests_total[5m]))", "{{code}}")])
+            )
+        panels.append(("Storefront response time (probes)", "s", [('probe_duration_seconds{job="blackbox"}', "{{instance}}")]))
+        panels.append(("Storefront up", "none", [('probe_success{job="blackbox"}', "{{instance}}")]))
+        panels.append(
+            (
+                "Cache hit ratio",
+                "percentunit",
+                [
+                    (
+                        "rate(redis_keyspace_hits_total[5m]) / (rate(redis_keyspace_hits_total[5m]) + rate(redis_keyspace_misses_total[5m]))",
+                        "object cache (Redis)",
+                    ),
+                    (
+                        "1 - rate(mysql_global_status_innodb_buffer_pool_reads[5m]) / rate(mysql_global_status_innodb_buffer_pool_read_requests[5m])",
+                        "InnoDB buffer pool",
+                    ),
+                ],
+            )
+        )
+        panels.append(
+            (
+                "Slow queries",
+                "ops",
+                [
+                    ("rate(mysql_global_status_slow_queries[5m])", "slow queries"),
+                    ("rate(mysql_global_status_questions[5m])", "queries"),
+                ],
+            )
+        )
+        panels.append(
+            (
+                "InnoDB buffer pool usage",
+                "percentunit",
+                [
+                    (
+                        'sum(mysql_global_status_buffer_pool_pages{state="data"}) / sum(mysql_global_status_buffer_pool_pages{state="total"})',
+                        "data pages",
+                    ),
+                    (
+                        'sum(mysql_global_status_buffer_pool_pages{state="dirty"}) / sum(mysql_global_status_buffer_pool_pages{state="total"})',
+                        "dirty pages",
+                    ),
+                ],
+            )
+        )
+        if self.website_variant == "nginx-fpm":
+            panels.append(
+                (
+                    "PHP-FPM workers",
+                    "none",
+                    [
+                        ("sum(phpfpm_active_processes)", "active"),
+                        ("sum(phpfpm_idle_processes)", "idle"),
+                        ("sum(phpfpm_listen_queue)", "listen queue"),
+                    ],
+                )
+            )
+        else:
+            panels.append(
+                (
+                    "Apache workers",
+                    "none",
+                    [('apache_workers{state="busy"}', "busy"), ('apache_workers{state="idle"}', "idle")],
+                )
+            )
+        if self.mail_relay_host:
+            panels.append(
+                (
+                    "Mail relay queue",
+                    "none",
+                    [("sum by (queue) (postfix_showq_message_size_bytes_count)", "{{queue}}")],
+                )
+            )
+        panels.append(
+            (
+                "Container CPU",
+                "percentunit",
+                [('sum by (name) (rate(container_cpu_usage_seconds_total{name!=""}[5m]))', "{{name}}")],
+            )
+        )
+
+        dashboard = {
+            "uid": "woopy",
+            "title": f"{self.site_title} - WooCommerce performance",
+            "tags": ["woopy", "woocommerce"],
+            "timezone": "browser",
+            "refresh": "30s",
+            "time": {"from": "now-3h", "to": "now"},
+            "schemaVersion": 39,
+            "panels": [
+                {
+                    "id": index + 1,
+                    "type": "timeseries",
+                    "title": title,
+                    "datasource": {"type": "prometheus", "uid": "prometheus"},
+                    "gridPos": {"h": 8, "w": 12, "x": (index % 2) * 12, "y": (index // 2) * 8},
+                    "fieldConfig": {"defaults": {"unit": unit}, "overrides": []},
+                    "targets": [
+                        {"refId": chr(ord("A") + target), "expr": expression, "legendFormat": legend}
+                        for target, (expression, legend) in enumerate(targets)
+                    ],
+                }
+                for index, (title, unit, targets) in enumerate(panels)
+            ],
+        }
+        return json.dumps(dashboard, indent=2)
+
+    def get_files(self):
+        """
+        This function returns the configuration files of the metrics stack: (file name, content)
+        """
+        return [
+            ("prometheus/prometheus.yml", self.to_prometheus_conf()),
+            ("prometheus/alerts.yml", self.to_alert_rules()),
+            ("alertmanager/alertmanager.yml", self.to_alertmanager_conf()),
+            ("blackbox/blackbox.yml", self.to_blackbox_conf()),
+            ("grafana/provisioning/datasources/prometheus.yml", self.to_grafana_datasource()),
+            ("grafana/provisioning/dashboards/woopy.yml", self.to_grafana_dashboard_provider()),
+            ("grafana/dashboards/woopy.json", self.to_grafana_dashboard()),
+        ]
+
+    def get_report(self):
+        """
+        This function returns the metrics section of the project report
+        """
+        if not self.enabled:
+            return "Observability: disabled (OBSERVABILITY=true adds Prometheus, Grafana, Alertmanager and the exporters)\n"
+        grafana_url = f"https://grafana.{self.site_url}" if self.proxy_labels else "http://localhost:3000"
+        return (
+            f"Grafana URL: {grafana_url}\n"
+            f"Grafana Username: {self.grafana_username}\n"
+            f"Grafana Password: {self.grafana_password}\n"
+            f"Prometheus Hostname: {self.prometheus_host} (retention {self.prometheus_retention})\n"
+            f"Alertmanager Hostname: {self.alertmanager_host} (alerts are mailed to {self.alert_email})\n"
+            f"Exporters: {', '.join(name for name, _, _ in self.get_exporters())}\n"
+        )
+
+    def to_kubernetes(self):
+        """
+        This function returns the kubernetes.yml data for the metrics stack
+        """
+        if not self.enabled:
+            return ""
+        return f"""
+            - name: {self.prometheus_host}
+                image: prom/prometheus:v2.54.1
+
+                ports:
+                    - containerPort: {self.prometheus_port}
+
+                restartPolicy: Always
+
+            - name: {self.grafana_host}
+                image: grafana/grafana:11.2.0
+
+                ports:
+                    - containerPort: {self.grafana_port}
+
+                env:
+                    - name: GF_SECURITY_ADMIN_USER
+                        value: {self.grafana_username}
+                    - name: GF_SECURITY_ADMIN_PASSWORD
+                        value: {self.grafana_password}
+
+                restartPolicy: Always
+"""
+
+
+class WpCli:
     """
-    Vault class: This class is used to create a vault for the website
+    WpCli class: This class is used to create a wp-cli for the website
+
+    The wp-cli container is the background worker of the website (worker.sh): every worker_interval
+    seconds it runs the due WP-Cron events and worker_concurrency Action Scheduler runners of
+    worker_batch_size actions. The website sets DISABLE_WP_CRON, so no visitor request runs them.
     """
 
-    def __init__(self, site_title: str, site_url: str):
-        self.vault_host = "vault"
-        self.vault_port = get_port("Vault")
-        self.vault_username = generate_username()
-        self.vault_email = generate_email(self.vault_host, "vault")
-        self.vault_password = generate_password()
+    worker_concurrency = 2
+    worker_interval = 60
+    worker_batch_size = 25
+
+    def __init__(
+        self,
+        site_title: str,
+        site_url: str,
+        site_host: str,
+        database_host: str,
+        database_password: str,
+        cache_host: str,
+    ):
+        self.wpcli_host = "wpcli"
+        self.wpcli_port = get_port("WordPress")
+        self.wpcli_username = generate_username()
+        self.wpcli_email = generate_email(self.wpcli_host, "wpcli")
+        self.wpcli_password = generate_password()
         self.site_title = site_title
         self.site_url = site_url
+        self.site_host = site_host
+        self.database_host = database_host
+        self.database_password = database_password
+        self.cache_host = cache_host
 
-    def to_docker_compose(self):
+    def to_docker_compose(self, website_environment: list = ()):
         """
-        This function returns the docker-compose.yml data for the vault
+        This function returns the docker-compose.yml data for the wp-cli: the worker shares the
+        files and the environment (wp-config.php) of the website
         """
+        environment = "".join(
+            f"\n            - {variable}"
+            for variable in list(website_environment)
+            + [
+                f"WORKER_CONCURRENCY={self.worker_concurrency}",
+                f"WORKER_INTERVAL={self.worker_interval}",
+                f"WORKER_BATCH_SIZE={self.worker_batch_size}",
+            ]
+        )
+        # the worker touches /tmp/woopy-worker at every run, three missed runs make it unhealthy
+        stale_minutes = max(5, self.worker_interval * 3 // 60 + 1)
         return f"""
-    {self.vault_host}:
-        image: alpine:latest
-        container_name: {self.vault_host}
-        hostname: {self.vault_host}
+    {self.wpcli_host}:
+        image: wordpress:cli
+        container_name: {self.wpcli_host}
+        hostname: {self.wpcli_host}
+        # www-data of the wordpress image, the owner of the website files
+        user: "33:33"
+        command: ["sh", "/usr/local/bin/woopy-worker"]
         volumes:
-            - {self.vault_host}-vol:/vault
-        command: >
-            /bin/sh -c "echo Vault username (encrypted): && echo -n '{self.vault_username}' | sha256sum && echo Vault password (encrypted): && echo -n '{self.vault_password}' | sha256sum"
-            /bin/sh -c "while true; do sleep 3000; done;"
+            - {self.site_host}-vol:/var/www/html
+            - ./worker.sh:/usr/local/bin/woopy-worker:ro
+        depends_on:
+            {self.site_host}:
+                condition: service_healthy
+            {self.database_host}:
+                condition: service_healthy
+            {self.cache_host}:
+                condition: service_healthy
+        environment:{environment}
         networks:
             - {self.site_title}-network
-        ports:
-            - "8200:8200"
+        healthcheck:
+            {get_healthcheck(['CMD-SHELL', f'find /tmp/woopy-worker -mmin -{stale_minutes} | grep -q .'], start_period='60s')}
         restart: unless-stopped
         logging:
-            {get_logging()}
+            driver: "json-file"
+            options:
+                max-size: "10m"
+                max-file: "5"
         """
         
     def to_kubernetes(self):
         """
-        This function returns the kubernetes.yml data for the vault
+        This function returns the kubernetes.yml data for the wp-cli
         """
         return f"""
-apiVersion: apps/v1
-
-kind: Deployment
-
-metadata:
-    name: {self.vault_host}
-    labels:
-        app: {self.vault_host}
-        
-spec:
-    replicas: 1
-    selector:
-        matchLabels:
-            app: {self.vault_host}
-    template:
-        metadata:
-            labels:
-                app: {self.vault_host}
-        spec:
-            containers:
-            - name: {self.vault_host}
-              image: alpine:latest
-              command:
-              - /bin/sh
-              - -c
-              - echo Vault username (encrypted): && echo -n '{self.vault_username}' | sha256sum && echo Vault password (encrypted): && echo -n '{self.vault_password}' | sha256sum
-              - /bin/sh
-              - -c
-              - while true; do sleep 3000; done;
-              volumeMounts:
-              - mountPath: /vault
-                name: vault-data
-            restartPolicy: Always
+            - name: {self.wpcli_host}
+                image: wordpress:cli
+                
+                ports:
+                    - containerPort: 80
+                    - containerPort: 443
+                    
+                env:
+                    - name: WORDPRESS_DB_PASSWORD
+                        value: {self.database_password}
+                    - name: WORDPRESS_DB_HOST
+                        value: {self.database_host}
+                        
+                restartPolicy: Always
 """
 
 
-class Certbot:
+class Admin:
     """
-    Certbot class: This class is used to create a certbot for the website
+    Admin class: This class is used to create an admin panel for the website
     """
 
-    def __init__(self, site_title: str, site_url: str):
-        self.certbot_host = "certbot"
-        self.certbot_port = get_port("Certbot")
-        self.certbot_username = generate_username()
-        self.certbot_email = generate_email(self.certbot_host, "certbot")
-        self.certbot_password = generate_password()
+    # route through the proxy, the host port is not published then (see Project.set_routes)
+    proxy_labels = None
+
+    def __init__(self, site_title: str, site_url: str, database_props: Database):
+        self.admin_host = "admin"
+        self.database_host = f"{database_props.database_host}"
+        self.database_port = f"{database_props.database_port}"
+        self.database_user = f"{database_props.database_user}"
+        self.database_password = f"{database_props.database_password}"
+        self.admin_username = generate_username()
+        self.admin_password = generate_password()
         self.site_title = site_title
         self.site_url = site_url
 
     def to_docker_compose(self):
         """
-        This function returns the docker-compose.yml data for the certbot
+        This function returns the docker-compose.yml data for the admin panel
         """
         return f"""
-    {self.certbot_host}:
-        image: certbot/certbot
-        container_name: {self.certbot_host}
-        hostname: {self.certbot_host}
-        volumes:
-            - {self.certbot_host}-vol:/etc/letsencrypt
-        command: >
-            /bin/sh -c "while true; do sleep 3000; done;"
+    {self.admin_host}:
+        image: phpmyadmin:latest
+        container_name: {self.admin_host}
+        hostname: {self.admin_host}
+        environment:
+            PMA_HOST: {self.database_host}
+            PMA_PORT: {self.database_port}
+            PMA_USER: {self.database_user}
+            PMA_PASSWORD: {self.database_password}
+            PMA_ARBITRARY: 1
         networks:
-            - {self.site_title}-network
-        ports:
-            - "8686:80"
-            - "8643:443"
+            - {self.site_title}-network{get_ports_section(() if self.proxy_labels else ("3307:80",))}{get_labels_section(self.proxy_labels)}
+        depends_on:
+            {self.database_host}:
+                condition: service_healthy
+        healthcheck:
+            {get_healthcheck(['CMD-SHELL', 'curl -fsS -o /dev/null http://localhost/ || exit 1'])}
         restart: unless-stopped
         logging:
             {get_logging()}
@@ -1039,7 +2136,7 @@ class Certbot:
         
     def to_kubernetes(self):
         """
-        This function returns the kubernetes.yml data for the certbot
+        This function returns the kubernetes.yml data for the admin panel
         """
         return f"""
 apiVersion: apps/v1
@@ -1047,67 +2144,95 @@ apiVersion: apps/v1
 kind: Deployment
 
 metadata:
-    name: {self.certbot_host}
+    name: {self.admin_host}
     labels:
-        app: {self.certbot_host}
+        app: {self.admin_host}
         
 spec:
     replicas: 1
     selector:
         matchLabels:
-            app: {self.certbot_host}
+            app: {self.admin_host}
     template:
         metadata:
             labels:
-                app: {self.certbot_host}
+                app: {self.admin_host}
         spec:
             containers:
-            - name: {self.certbot_host}
-              image: certbot/certbot
-              command:
-              - /bin/sh
-              - -c
-              - while true; do sleep 3000; done;
-              volumeMounts:
-              - mountPath: /etc/letsencrypt
-                name: certbot-data
+            - name: {self.admin_host}
+              image: phpmyadmin:latest
+              ports:
+              - containerPort: 80
+              env:
+              - name: PMA_HOST
+                value: {self.database_host}
+              - name: PMA_PORT
+                value: {self.database_port}
+              - name: PMA_USER
+                value: {self.database_user}
+              - name: PMA_PASSWORD
+                value: {self.database_password}
+              - name: PMA_ARBITRARY
+                value: 1
             restartPolicy: Always
 """
 
 
-class Code:
+class Monitoring:
     """
-    Code class: This class is used to create a code server for the website
+    Monitoring class: This class is used to create a monitoring system for the host
+
+    cAdvisor is tuned for an overhead budget (see MonitoringTuning): monitoring_preset standard or
+    low-overhead (production), monitoring_cpu_budget overrides the CPU budget of the preset.
     """
 
-    def __init__(self, site_title: str, site_url: str):
-        self.code_host = "code"
-        self.code_port = get_port("Code")
-        self.code_username = generate_username()
-        self.code_email = generate_email(self.code_host, "code")
-        self.code_password = generate_password()
-        self.site_title = site_title
-        self.site_url = site_url
+    monitoring_preset = "standard"
+    monitoring_cpu_budget = None
+    # containers on the host, the overhead of cAdvisor grows with them
+    monitoring_containers = 25
 
-    def to_docker_compose(self):
+    def __init__(self, site_title: str, site_url: str):
+        self.monitoring_host = "monitoring"
+        self.monitoring_port = get_port("Cadvisor")
+        self.monitoring_username = generate_username()
+        self.montiroing_email = generate_email(self.monitoring_host, "monitoring")
+        self.monitoring_password = generate_password()
+        self.site_title = site_title
+        self.site_url = site_url
+
+    def get_tuning(self):
         """
-        This function returns the docker-compose.yml data for the code server
+        This function returns the cAdvisor tuning for the overhead budget
+        """
+        return MonitoringTuning(self.monitoring_preset, self.monitoring_cpu_budget, self.monitoring_containers)
+
+    def to_docker_compose(self):
+        """
+        This function returns the docker-compose.yml data for the monitoring system
         """
+        command = "".join(f"\n            - {argument}" for argument in self.get_tuning().get_arguments())
         return f"""
-    {self.code_host}:
-        image: codercom/code-server
-        container_name: {self.code_host}
-        hostname: {self.code_host}
-        environment:
-            PASSWORD: {self.code_password}
-            SUDO_PASSWORD: {self.code_password}
-            TZ: Europe/Brussels
+    {self.monitoring_host}:
+        image: gcr.io/cadvisor/cadvisor:v0.49.1
+        container_name: {self.monitoring_host}
+        hostname: {self.monitoring_host}
+        privileged: true
+        command:{command}
         volumes:
-            - {self.code_host}-vol:/home/coder/project
+            - /var/run:/var/run:ro
+            - /sys:/sys:ro
+            - /var/lib/docker/:/var/lib/docker:ro
+            - /var/run/docker.sock:/var/run/docker.sock:ro
+            - /etc/machine-id:/etc/machine-id:ro
+            - /var/lib/dbus/machine-id:/var/lib/dbus/machine-id:ro
+        environment:
+            - TZ=Europe/Brussels
         networks:
             - {self.site_title}-network
         ports:
-            - "9999:8080"
+            - "8888:8080"
+        healthcheck:
+            {get_healthcheck(['CMD-SHELL', 'wget -q --spider http://localhost:8080/healthz || exit 1'])}
         restart: unless-stopped
         logging:
             {get_logging()}
@@ -1115,7 +2240,7 @@ class Code:
         
     def to_kubernetes(self):
         """
-        This function returns the kubernetes.yml data for the code server
+        This function returns the kubernetes.yml data for the monitoring system
         """
         return f"""
 apiVersion: apps/v1
@@ -1123,172 +2248,162 @@ apiVersion: apps/v1
 kind: Deployment
 
 metadata:
-    name: {self.code_host}
+    name: {self.monitoring_host}
     labels:
-        app: {self.code_host}
+        app: {self.monitoring_host}
         
 spec:
     replicas: 1
     selector:
         matchLabels:
-            app: {self.code_host}
+            app: {self.monitoring_host}
     template:
         metadata:
             labels:
-                app: {self.code_host}
+                app: {self.monitoring_host}
         spec:
             containers:
-            - name: {self.code_host}
-              image: codercom/code-server
+            - name: {self.monitoring_host}
+              image: gcr.io/cadvisor/cadvisor:v0.39.0
               ports:
               - containerPort: 8080
               env:
-              - name: PASSWORD
-                value: {self.code_password}
-              - name: SUDO_PASSWORD
-                value: {self.code_password}
               - name: TZ
                 value: Europe/Brussels
               volumeMounts:
-              - mountPath: /home/coder/project
-                name: code-data
+              - mountPath: /var/run
+                readOnly: true
+              - mountPath: /sys
+                readOnly: true
+              - mountPath: /var/lib/docker/
+                readOnly: true
+              - mountPath: /var/run/docker.sock
+                readOnly: true
+              - mountPath: /etc/machine-id
+                readOnly: true
+              - mountPath: /var/lib/dbus/machine-id
+                readOnly: true
             restartPolicy: Always
 """
 
 
-class Application:
+class Management:
     """
-    Represents an application associated with a website.
-
-    Attributes:
-        website (Website): The website object associated with the application.
-        version (str): The version of the application (default is "1.0").
+    Management class: This class is used to create a management system for the website
     """
 
-    def __init__(self, site_title: str, site_url: str, version: str = "1.0"):
-        """
-        Initializes a new instance of the Application class.
-
-        Args:
-            website (Website): The website object associated with the application.
-            version (str, optional): The version of the application (default is "1.0").
-        """
-        self.app_host = "app"
-        self.project_name = self.app_host
-        self.app_name = self.app_host
-        # reverse the host name. for example if the host url is "example.xyz" then the bundle will be "xyz.example"
-        self.bundle = ".".join(site_url.split(".")[::-1])
-        self.version = version
-        self.url = site_url
-        self.license = "MIT license"
-        self.author = generate_username()
-        self.author_email = generate_email(self.app_host, "app")
-        self.formal_name = self.app_host
-        self.description = (
-            f"{self.app_name} is a native application for {self.app_host}."
-        )
-        self.long_description = f"{self.app_name} is designed to provide a user-friendly interface for {self.app_host}. It can be installed on Linux, macOS, Windows, Android, iOS. It is written in Python using Toga and Briefcase frameworks."
+    def __init__(self, site_title: str, site_url: str):
+        self.management_host = "management"
+        self.management_port = get_port("Portainer")
+        self.management_username = generate_username()
+        self.management_email = generate_email(self.management_host, "management")
+        self.management_password = generate_password()
         self.site_title = site_title
+        self.site_url = site_url
 
     def to_docker_compose(self):
         """
-        Converts the Application object to a docker-compose.yml data string.
-
-        Returns:
-            str: The docker-compose.yml data string representing the Application object.
+        This function returns the docker-compose.yml data for the management system
         """
-
         return f"""
-    {self.app_host}:
-        image: docker.io/yilmazchef/woopy:latest
-        container_name: {self.app_host}
-        hostname: {self.app_host}
+    {self.management_host}:
+        image: portainer/portainer-ce:latest
+        container_name: {self.management_host}
+        hostname: {self.management_host}
+        command:
+            -H unix:///var/run/docker.sock
+            --admin-password '{self.management_password}'
         volumes:
-            - {self.app_host}-vol:/app
-        command: >
-            /bin/bash -c "/app/entrypoint.sh"
-            /bin/bash -c "while true; do sleep 30000; done;"
+            - /var/run/docker.sock:/var/run/docker.sock
+            - {self.management_host}-vol:/data
         networks:
             - {self.site_title}-network
-        restart: always
+        ports:
+            - "9000:9000"
+        # the portainer image has no shell or http client, nothing depends on it
+        healthcheck:
+            disable: true
+        restart: unless-stopped
         logging:
             {get_logging()}
         """
         
+        
     def to_kubernetes(self):
         """
-        Converts the Application object to a kubernetes.yml data string.
-
-        Returns:
-            str: The kubernetes.yml data string representing the Application object.
+        This function returns the kubernetes.yml data for the management system
         """
-
         return f"""
 apiVersion: apps/v1
 
 kind: Deployment
 
 metadata:
-    name: {self.app_host}
+    name: {self.management_host}
     labels:
-        app: {self.app_host}
+        app: {self.management_host}
         
 spec:
     replicas: 1
     selector:
         matchLabels:
-            app: {self.app_host}
+            app: {self.management_host}
     template:
         metadata:
             labels:
-                app: {self.app_host}
+                app: {self.management_host}
         spec:
             containers:
-            - name: {self.app_host}
-              image: docker.io/yilmazchef/woopy:latest
+            - name: {self.management_host}
+              image: portainer/portainer-ce:latest
               command:
-              - /bin/bash
-              - -c
-              - /app/entrypoint.sh
-              - /bin/bash
-              - -c
-              - while true; do sleep 30000; done;
+              - -H
+              - unix:///var/run/docker.sock
+              - --admin-password
+              - "{self.management_password}"
               volumeMounts:
-              - mountPath: /app
-                name: app-data
+              - mountPath: /var/run/docker.sock
+                name: docker-socket
+              - mountPath: /data
+                name: portainer-data
             restartPolicy: Always
 """
 
 
-class GraphViz:
+class Vault:
     """
-    GraphViz class: This class is used to create a graph for the website deployment file: docker-compose.yml
+    Vault class: This class is used to create a vault for the website
     """
 
     def __init__(self, site_title: str, site_url: str):
+        self.vault_host = "vault"
+        self.vault_port = get_port("Vault")
+        self.vault_username = generate_username()
+        self.vault_email = generate_email(self.vault_host, "vault")
+        self.vault_password = generate_password()
         self.site_title = site_title
         self.site_url = site_url
-        self.graphviz_host = "graphviz"
-        self.graphviz_port = get_port("Graphviz")
 
     def to_docker_compose(self):
         """
-        This function returns the docker-compose.yml data for the graphviz
+        This function returns the docker-compose.yml data for the vault
         """
         return f"""
-    {self.graphviz_host}:
-        image: pmsipilot/docker-compose-viz
-        container_name: {self.graphviz_host}
-        hostname: {self.graphviz_host}
+    {self.vault_host}:
+        image: alpine:latest
+        container_name: {self.vault_host}
+        hostname: {self.vault_host}
         volumes:
-            - ./docker-compose.yml:/input/docker-compose.yml
-            - {self.graphviz_host}-vol:/output
+            - {self.vault_host}-vol:/vault
         command: >
-            render -m image /input/docker-compose.yml
+            /bin/sh -c "echo Vault username (encrypted): && echo -n '{self.vault_username}' | sha256sum && echo Vault password (encrypted): && echo -n '{self.vault_password}' | sha256sum"
+            /bin/sh -c "while true; do sleep 3000; done;"
         networks:
             - {self.site_title}-network
         ports:
-            - "{self.graphviz_port}:8088"
+            - "8200:8200"
+        healthcheck:
+            {get_healthcheck(['CMD-SHELL', 'test -d /vault'])}
         restart: unless-stopped
         logging:
             {get_logging()}
@@ -1296,7 +2411,7 @@ class GraphViz:
         
     def to_kubernetes(self):
         """
-        This function returns the kubernetes.yml data for the graphviz
+        This function returns the kubernetes.yml data for the vault
         """
         return f"""
 apiVersion: apps/v1
@@ -1304,1428 +2419,5843 @@ apiVersion: apps/v1
 kind: Deployment
 
 metadata:
-    name: {self.graphviz_host}
+    name: {self.vault_host}
     labels:
-        app: {self.graphviz_host}
+        app: {self.vault_host}
         
 spec:
     replicas: 1
     selector:
         matchLabels:
-            app: {self.graphviz_host}
+            app: {self.vault_host}
     template:
         metadata:
             labels:
-                app: {self.graphviz_host}
+                app: {self.vault_host}
         spec:
             containers:
-            - name: {self.graphviz_host}
-              image: pmsipilot/docker-compose-viz
+            - name: {self.vault_host}
+              image: alpine:latest
               command:
-              - render
-              - -m
-              - image
-              - /input/docker-compose.yml
+              - /bin/sh
+              - -c
+              - echo Vault username (encrypted): && echo -n '{self.vault_username}' | sha256sum && echo Vault password (encrypted): && echo -n '{self.vault_password}' | sha256sum
+              - /bin/sh
+              - -c
+              - while true; do sleep 3000; done;
               volumeMounts:
-              - mountPath: /input
-                name: graphviz-data
-              - mountPath: /output
-                name: graphviz-output
+              - mountPath: /vault
+                name: vault-data
             restartPolicy: Always
 """
 
 
-class ReadMe:
+class Certbot:
     """
-    ReadMe class: This class is to provide ReadMe.md document for the project.
-    It must explain all the services and how to use them.
-
-    It must provide documentation to 3 different level of users:
-    - Beginner
-    - Intermediate
-    - Advanced
+    Certbot class: This class is used to create a certbot for the website
     """
 
-    def __init__(self, project_name: str):
-        self.project_name = project_name
-        self.readme_content = f"""
-# {self.project_name}
-
-## Introduction
-
-This project is a collection of services that can be used to create a website, database, cache, admin, monitoring, management, vault, code, and application.
-
-## Services
-
-### Website
-
-This services is based on WordPress and WooCommerce. It is used to create a website for the project.
-
-#### WordPress
-
-WordPress is a free and open-source content management system written in PHP and paired with a MySQL or MariaDB database. Features include a plugin architecture and a template system, referred to within WordPress as Themes. For further information, please visit [WordPress](https://wordpress.org/).
-
-#### WooCommerce
-
-WooCommerce is an open-source e-commerce plugin for WordPress. It is designed for small to large-sized online merchants using WordPress. For further information, please visit [WooCommerce](https://woocommerce.com/).
-
-
-### Database
-
-This service is based on MySQL. It is used to store the data for the website. For further information, please visit [MySQL](https://www.mysql.com/).
-
-### Cache
-
-This service is based on Redis. It is used to cache the data for the website. For further information, please visit [Redis](https://redis.io/).
-
-### Admin
+    def __init__(self, site_title: str, site_url: str):
+        self.certbot_host = "certbot"
+        self.certbot_port = get_port("Certbot")
+        self.certbot_username = generate_username()
+        self.certbot_email = generate_email(self.certbot_host, "certbot")
+        self.certbot_password = generate_password()
+        self.site_title = site_title
+        self.site_url = site_url
+
+    def to_docker_compose(self):
+        """
+        This function returns the docker-compose.yml data for the certbot
+        """
+        return f"""
+    {self.certbot_host}:
+        image: certbot/certbot
+        container_name: {self.certbot_host}
+        hostname: {self.certbot_host}
+        volumes:
+            - {self.certbot_host}-vol:/etc/letsencrypt
+        command: >
+            /bin/sh -c "while true; do sleep 3000; done;"
+        networks:
+            - {self.site_title}-network
+        ports:
+            - "8686:80"
+            - "8643:443"
+        healthcheck:
+            {get_healthcheck(['CMD-SHELL', 'test -d /etc/letsencrypt'])}
+        restart: unless-stopped
+        logging:
+            {get_logging()}
+        """
+        
+    def to_kubernetes(self):
+        """
+        This function returns the kubernetes.yml data for the certbot
+        """
+        return f"""
+apiVersion: apps/v1
+
+kind: Deployment
+
+metadata:
+    name: {self.certbot_host}
+    labels:
+        app: {self.certbot_host}
+        
+spec:
+    replicas: 1
+    selector:
+        matchLabels:
+            app: {self.certbot_host}
+    template:
+        metadata:
+            labels:
+                app: {self.certbot_host}
+        spec:
+            containers:
+            - name: {self.certbot_host}
+              image: certbot/certbot
+              command:
+              - /bin/sh
+              - -c
+              - while true; do sleep 3000; done;
+              volumeMounts:
+              - mountPath: /etc/letsencrypt
+                name: certbot-data
+            restartPolicy: Always
+"""
+
+
+class Code:
+    """
+    Code class: This class is used to create a code server for the website
+    """
+
+    # route through the proxy, the host port is not published then (see Project.set_routes)
+    proxy_labels = None
+
+    def __init__(self, site_title: str, site_url: str):
+        self.code_host = "code"
+        self.code_port = get_port("Code")
+        self.code_username = generate_username()
+        self.code_email = generate_email(self.code_host, "code")
+        self.code_password = generate_password()
+        self.site_title = site_title
+        self.site_url = site_url
+
+    def to_docker_compose(self):
+        """
+        This function returns the docker-compose.yml data for the code server
+        """
+        return f"""
+    {self.code_host}:
+        image: codercom/code-server
+        container_name: {self.code_host}
+        hostname: {self.code_host}
+        environment:
+            PASSWORD: {self.code_password}
+            SUDO_PASSWORD: {self.code_password}
+            TZ: Europe/Brussels
+        volumes:
+            - {self.code_host}-vol:/home/coder/project
+        networks:
+            - {self.site_title}-network{get_ports_section(() if self.proxy_labels else ("9999:8080",))}{get_labels_section(self.proxy_labels)}
+        healthcheck:
+            {get_healthcheck(['CMD-SHELL', 'curl -fsS -o /dev/null http://localhost:8080/healthz || exit 1'], start_period='30s')}
+        restart: unless-stopped
+        logging:
+            {get_logging()}
+        """
+        
+    def to_kubernetes(self):
+        """
+        This function returns the kubernetes.yml data for the code server
+        """
+        return f"""
+apiVersion: apps/v1
+
+kind: Deployment
+
+metadata:
+    name: {self.code_host}
+    labels:
+        app: {self.code_host}
+        
+spec:
+    replicas: 1
+    selector:
+        matchLabels:
+            app: {self.code_host}
+    template:
+        metadata:
+            labels:
+                app: {self.code_host}
+        spec:
+            containers:
+            - name: {self.code_host}
+              image: codercom/code-server
+              ports:
+              - containerPort: 8080
+              env:
+              - name: PASSWORD
+                value: {self.code_password}
+              - name: SUDO_PASSWORD
+                value: {self.code_password}
+              - name: TZ
+                value: Europe/Brussels
+              volumeMounts:
+              - mountPath: /home/coder/project
+                name: code-data
+            restartPolicy: Always
+"""
+
+
+class Application:
+    """
+    Represents an application associated with a website.
+
+    Attributes:
+        website (Website): The website object associated with the application.
+        version (str): The version of the application (default is "1.0").
+    """
+
+    def __init__(self, site_title: str, site_url: str, version: str = "1.0"):
+        """
+        Initializes a new instance of the Application class.
+
+        Args:
+            website (Website): The website object associated with the application.
+            version (str, optional): The version of the application (default is "1.0").
+        """
+        self.app_host = "app"
+        self.project_name = self.app_host
+        self.app_name = self.app_host
+        # reverse the host name. for example if the host url is "example.xyz" then the bundle will be "xyz.example"
+        self.bundle = ".".join(site_url.split(".")[::-1])
+        self.version = version
+        self.url = site_url
+        self.license = "MIT license"
+        self.author = generate_username()
+        self.author_email = generate_email(self.app_host, "app")
+        self.formal_name = self.app_host
+        self.description = (
+            f"{self.app_name} is a native application for {self.app_host}."
+        )
+        self.long_description = f"{self.app_name} is designed to provide a user-friendly interface for {self.app_host}. It can be installed on Linux, macOS, Windows, Android, iOS. It is written in Python using Toga and Briefcase frameworks."
+        self.site_title = site_title
+
+    def to_docker_compose(self):
+        """
+        Converts the Application object to a docker-compose.yml data string.
+
+        Returns:
+            str: The docker-compose.yml data string representing the Application object.
+        """
+
+        return f"""
+    {self.app_host}:
+        image: docker.io/yilmazchef/woopy:latest
+        container_name: {self.app_host}
+        hostname: {self.app_host}
+        volumes:
+            - {self.app_host}-vol:/app
+        command: >
+            /bin/bash -c "/app/entrypoint.sh"
+            /bin/bash -c "while true; do sleep 30000; done;"
+        networks:
+            - {self.site_title}-network
+        healthcheck:
+            {get_healthcheck(['CMD-SHELL', 'test -d /app'])}
+        restart: always
+        logging:
+            {get_logging()}
+        """
+        
+    def to_kubernetes(self):
+        """
+        Converts the Application object to a kubernetes.yml data string.
+
+        Returns:
+            str: The kubernetes.yml data string representing the Application object.
+        """
+
+        return f"""
+apiVersion: apps/v1
+
+kind: Deployment
+
+metadata:
+    name: {self.app_host}
+    labels:
+        app: {self.app_host}
+        
+spec:
+    replicas: 1
+    selector:
+        matchLabels:
+            app: {self.app_host}
+    template:
+        metadata:
+            labels:
+                app: {self.app_host}
+        spec:
+            containers:
+            - name: {self.app_host}
+              image: docker.io/yilmazchef/woopy:latest
+              command:
+              - /bin/bash
+              - -c
+              - /app/entrypoint.sh
+              - /bin/bash
+              - -c
+              - while true; do sleep 30000; done;
+              volumeMounts:
+              - mountPath: /app
+                name: app-data
+            restartPolicy: Always
+"""
+
+
+class GraphViz:
+    """
+    GraphViz class: This class draws the topology graph of the website deployment file: docker-compose.yml
+
+    The graph is built in process from the services, their depends_on, networks and named volumes,
+    so no graph container runs next to the website. Output formats: DOT (Graphviz), SVG and Mermaid.
+    """
+
+    node_width = 180
+    node_height = 44
+    horizontal_gap = 24
+    vertical_gap = 56
+    margin = 32
+
+    def __init__(self, site_title: str, site_url: str):
+        self.site_title = site_title
+        self.site_url = site_url
+        self.graphviz_host = "graphviz"
+
+    def to_docker_compose(self):
+        """
+        The graph is rendered by woopy, there is no graphviz service in docker-compose.yml
+        """
+        return ""
+
+    def to_kubernetes(self):
+        """
+        The graph is rendered by woopy, there is no graphviz deployment
+        """
+        return ""
+
+    def get_graph(self, docker_compose_data: str) -> dict:
+        """
+        Returns the topology of a docker-compose.yml:
+            services: service name -> {"image", "networks", "level"}
+            dependencies: (service, dependency) pairs
+            volumes: (service, named volume, mount path) triples
+        The level of a service is the length of its longest dependency chain.
+        Raises ValueError when the file does not have the shape of a docker-compose.yml.
+        """
+        compose = yaml.load(docker_compose_data, Loader=YamlLoader) or {}
+        ComposeDoctor.check_shape(compose)
+        named_volumes = set(compose.get("volumes") or {})
+        services = {}
+        dependencies = []
+        volumes = []
+        for name, service in (compose.get("services") or {}).items():
+            service = service or {}
+            networks = service.get("networks") or []
+            services[name] = {"image": str(service.get("image", "")), "networks": list(networks), "level": 0}
+            depends_on = service.get("depends_on") or []
+            for dependency in [depends_on] if isinstance(depends_on, str) else depends_on:
+                dependencies.append((name, dependency))
+            for volume in service.get("volumes") or []:
+                if isinstance(volume, dict):
+                    # long syntax
+                    source, target = str(volume.get("source", "")), str(volume.get("target", ""))
+                else:
+                    source, _, target = str(volume).partition(":")
+                if source in named_volumes:
+                    volumes.append((name, source, target.split(":")[0]))
+        dependencies = [(name, dependency) for name, dependency in dependencies if dependency in services]
+
+        # longest dependency chain, the services depending on nothing are level 0
+        for _ in range(len(services)):
+            changed = False
+            for name, dependency in dependencies:
+                if services[name]["level"] <= services[dependency]["level"]:
+                    services[name]["level"] = services[dependency]["level"] + 1
+                    changed = True
+            if not changed:
+                break
+        return {"services": services, "dependencies": dependencies, "volumes": volumes}
+
+    def to_dot(self, docker_compose_data: str) -> str:
+        """
+        Returns the graph in the DOT language: dot -Tpng topology.dot -o topology.png
+        """
+        graph = self.get_graph(docker_compose_data)
+        lines = [f'digraph "{self.site_title}" {{', "    rankdir=BT;", '    node [shape=box, style=rounded, fontname="Helvetica"];']
+        networks = {}
+        for name, service in graph["services"].items():
+            for network in service["networks"] or ["default"]:
+                networks.setdefault(network, []).append(name)
+        for index, (network, names) in enumerate(networks.items()):
+            lines.append(f'    subgraph "cluster_{index}" {{')
+            lines.append(f'        label="{network}";')
+            for name in names:
+                lines.append(f'        "{name}" [label="{name}\\n{graph["services"][name]["image"]}"];')
+            lines.append("    }")
+        for name, dependency in graph["dependencies"]:
+            lines.append(f'    "{name}" -> "{dependency}";')
+        for name, volume, target in graph["volumes"]:
+            lines.append(f'    "volume:{volume}" [label="{volume}", shape=cylinder];')
+            lines.append(f'    "{name}" -> "volume:{volume}" [style=dashed, arrowhead=none, label="{target}"];')
+        lines.append("}")
+        return "\n".join(lines) + "\n"
+
+    def to_mermaid(self, docker_compose_data: str) -> str:
+        """
+        Returns the graph as a Mermaid flowchart (rendered by GitHub and GitLab in Markdown)
+        """
+        graph = self.get_graph(docker_compose_data)
+
+        def node_id(name):
+            return re.sub(r"\W", "_", name)
+
+        lines = ["flowchart BT"]
+        networks = {}
+        for name, service in graph["services"].items():
+            for network in service["networks"] or ["default"]:
+                networks.setdefault(network, []).append(name)
+        for network, names in networks.items():
+            lines.append(f'    subgraph {node_id("network_" + network)}["{network}"]')
+            for name in names:
+                lines.append(f'        {node_id(name)}["{name}<br/>{graph["services"][name]["image"]}"]')
+            lines.append("    end")
+        for name, dependency in graph["dependencies"]:
+            lines.append(f"    {node_id(name)} --> {node_id(dependency)}")
+        for name, volume, target in graph["volumes"]:
+            lines.append(f'    {node_id("volume_" + volume)}[("{volume}")]')
+            lines.append(f'    {node_id(name)} -.-|"{target}"| {node_id("volume_" + volume)}')
+        return "\n".join(lines) + "\n"
+
+    def to_svg(self, docker_compose_data: str) -> str:
+        """
+        Returns the graph as an SVG image. The services are drawn in rows by dependency level
+        (the services depending on nothing at the bottom), the named volumes below them.
+        """
+        graph = self.get_graph(docker_compose_data)
+        rows = {}
+        for name, service in graph["services"].items():
+            rows.setdefault(service["level"], []).append(name)
+        volume_names = list(dict.fromkeys(volume for _, volume, _ in graph["volumes"]))
+        levels = sorted(rows, reverse=True)
+        columns = max([len(names) for names in rows.values()] + [len(volume_names), 1])
+        width = 2 * self.margin + columns * (self.node_width + self.horizontal_gap) - self.horizontal_gap
+        height = 2 * self.margin + (len(levels) + 1) * (self.node_height + self.vertical_gap)
+
+        positions = {}
+        for row, level in enumerate(levels):
+            for column, name in enumerate(rows[level]):
+                positions[name] = self._get_position(row, column, len(rows[level]), width)
+        for column, volume in enumerate(volume_names):
+            positions[f"volume:{volume}"] = self._get_position(len(levels), column, len(volume_names), width)
+
+        elements = [
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" viewBox="0 0 {width} {height}" font-family="Helvetica, Arial, sans-serif" font-size="12">',
+            '<defs><marker id="arrow" viewBox="0 0 10 10" refX="10" refY="5" markerWidth="8" markerHeight="8" orient="auto"><path d="M0,0 L10,5 L0,10 z" fill="#555"/></marker></defs>',
+            f'<rect x="4" y="4" width="{width - 8}" height="{height - 8}" rx="12" fill="#f7f9fc" stroke="#c5cfdc"/>',
+            f'<text x="16" y="22" fill="#556">{html.escape(", ".join(self._get_networks(graph)))}</text>',
+        ]
+        for name, volume, _ in graph["volumes"]:
+            (x1, y1), (x2, y2) = positions[name], positions[f"volume:{volume}"]
+            elements.append(
+                f'<line x1="{x1 + self.node_width / 2}" y1="{y1 + self.node_height}" x2="{x2 + self.node_width / 2}" y2="{y2}" stroke="#999" stroke-dasharray="4 3"/>'
+            )
+        for name, dependency in graph["dependencies"]:
+            (x1, y1), (x2, y2) = positions[name], positions[dependency]
+            elements.append(
+                f'<line x1="{x1 + self.node_width / 2}" y1="{y1 + self.node_height}" x2="{x2 + self.node_width / 2}" y2="{y2}" stroke="#555" marker-end="url(#arrow)"/>'
+            )
+        for name, service in graph["services"].items():
+            x, y = positions[name]
+            elements.append(
+                f'<rect x="{x}" y="{y}" width="{self.node_width}" height="{self.node_height}" rx="8" fill="#ffffff" stroke="#3b6ea8"/>'
+                f'<text x="{x + self.node_width / 2}" y="{y + 18}" text-anchor="middle" font-weight="bold">{html.escape(name)}</text>'
+                f'<text x="{x + self.node_width / 2}" y="{y + 34}" text-anchor="middle" fill="#667" font-size="10">{html.escape(service["image"][:32])}</text>'
+            )
+        for volume in volume_names:
+            x, y = positions[f"volume:{volume}"]
+            elements.append(
+                f'<ellipse cx="{x + self.node_width / 2}" cy="{y + self.node_height / 2}" rx="{self.node_width / 2}" ry="{self.node_height / 2}" fill="#fff8e6" stroke="#c79a2e"/>'
+                f'<text x="{x + self.node_width / 2}" y="{y + self.node_height / 2 + 4}" text-anchor="middle">{html.escape(volume)}</text>'
+            )
+        elements.append("</svg>")
+        return "\n".join(elements) + "\n"
+
+    def _get_position(self, row: int, column: int, count: int, width: int) -> tuple:
+        """
+        Returns the top left corner of a node, the rows are centered.
+        """
+        row_width = count * (self.node_width + self.horizontal_gap) - self.horizontal_gap
+        x = (width - row_width) / 2 + column * (self.node_width + self.horizontal_gap)
+        y = self.margin + row * (self.node_height + self.vertical_gap)
+        return x, y
+
+    @staticmethod
+    def _get_networks(graph: dict) -> list:
+        return list(dict.fromkeys(network for service in graph["services"].values() for network in service["networks"]))
+
+
+class ReadMe:
+    """
+    ReadMe class: This class is to provide ReadMe.md document for the project.
+    It must explain all the services and how to use them.
+
+    It must provide documentation to 3 different level of users:
+    - Beginner
+    - Intermediate
+    - Advanced
+    """
+
+    def __init__(self, project_name: str):
+        self.project_name = project_name
+        self.readme_content = f"""
+# {self.project_name}
+
+## Introduction
+
+This project is a collection of services that can be used to create a website, database, cache, admin, monitoring, management, vault, code, and application.
+
+## Services
+
+### Website
+
+This services is based on WordPress and WooCommerce. It is used to create a website for the project.
+
+#### WordPress
+
+WordPress is a free and open-source content management system written in PHP and paired with a MySQL or MariaDB database. Features include a plugin architecture and a template system, referred to within WordPress as Themes. For further information, please visit [WordPress](https://wordpress.org/).
+
+#### WooCommerce
+
+WooCommerce is an open-source e-commerce plugin for WordPress. It is designed for small to large-sized online merchants using WordPress. For further information, please visit [WooCommerce](https://woocommerce.com/).
+
+
+### Database
+
+This service is based on MySQL. It is used to store the data for the website. For further information, please visit [MySQL](https://www.mysql.com/).
+
+### Cache
+
+This service is based on Redis. It is used to cache the data for the website. For further information, please visit [Redis](https://redis.io/).
+
+### Admin
 
 This service is based on phpMyAdmin. It is used to manage the database for the website. For further information, please visit [phpMyAdmin](
     
-### Proxy
+### Proxy
+
+This service is based on Traefik. It is used to route the traffic for the website. For further information, please visit [Traefik](https://traefik.io/).
+
+### Monitoring
+
+This service is based on Cadvisor. It is used to monitor the containers for the website. For further information, please visit [Cadvisor](
+    
+### Management
+
+This service is based on Portainer. It is used to manage the containers for the website. For further information, please visit [Portainer](https://www.portainer.io/).
+
+### Vault
+
+This service is based on Vault. It is used to store the secrets for the website. For further information, please visit [Vault](https://www.vaultproject.io/).
+
+### Code
+
+This service is based on Code Server. It is used to write the code for the website. For further information, please visit [Code Server](https://coder.com/).
+
+### Application
+
+This service is based on Toga and Briefcase. It is used to create a native application for the website. For further information, please visit [Toga](https://beeware.org/project/projects/libraries/toga/) and [Briefcase](https://beeware.org/project/projects/tools/briefcase/).
+
+## How to Use
+
+### Beginner
+
+To use this project, you need to have Docker and Docker Compose installed on your machine. Then, you can run the following command:
+    
+    ```bash
+    docker-compose up -d
+    ```
+    
+This will start all the services for the project.
+
+### Intermediate
+
+To use this project, you need to have Kubernetes installed on your machine. Then, you can run the following command:
+    
+    ```bash
+    kubectl apply -f kubernetes.yml
+    ```
+        
+This will start all the services for the project.
+
+### Advanced
+
+To use this project, you need to have Vagrant installed on your machine. Then, you can run the following command:
+
+    ```bash
+    vagrant up
+    ```
+        
+This will start all the services for the project.
+
+## Conclusion
+
+This project is a collection of services that can be used to create a website, database, cache, admin, monitoring, management, vault, code, and application. It is designed to be easy to use for beginners, intermediate users, and advanced users.
+
+For further information, please visit [GitHub](https://github.com/atiilla/woopy).
+
+"""
+
+    def to_readme(self):
+        """
+        This function returns the ReadMe.md content
+        """
+        return self.readme_content
+
+
+class PreequisitesSetup:
+    """
+    This class generates a shell script to install the required software on the host machine.
+
+    The script should install the following software:
+    - Docker
+    - Docker Compose
+    - Kubernetes
+    - Vagrant
+
+    The script should be able to run on the following operating systems:
+    - Ubuntu
+    - CentOS
+    - Fedora
+    - Red Hat Enterprise Linux
+    - Debian
+    - openSUSE
+    - SUSE Linux Enterprise Server
+    - Arch Linux
+    - Alpine Linux
+    - FreeBSD
+    - macOS
+    - Rocky Linux
+    - Oracle Linux
+    - AlmaLinux
+
+    The script must be able to detect the operating system and install the required software accordingly.
+
+    """
+
+    def __init__(self):
+        self.prerequisites_setup_content = """
+#!/bin/bash
+
+# Check if the script is running as root
+if [ "$EUID" -ne 0 ]; then
+    echo "Please run this script as root"
+    exit
+fi
+
+# Check the operating system
+if [ -f /etc/os-release ]; then
+    . /etc/os-release
+    OS=$NAME
+elif type lsb_release > /dev/null 2>&1; then
+    OS=$(lsb_release -si)
+else
+    OS=$(uname -s)
+fi
+
+# Install Docker
+
+if [ "$OS" == "Ubuntu" ] || [ "$OS" == "Debian" ]; then
+    apt-get update
+    apt-get install -y docker.io
+    systemctl enable docker
+    systemctl start docker
+elif [ "$OS" == "CentOS Linux" ] || [ "$OS" == "Fedora" ] || [ "$OS" == "Red Hat Enterprise Linux" ]; then
+    yum install -y docker
+    systemctl enable docker
+    systemctl start docker
+elif [ "$OS" == "openSUSE Leap" ] || [ "$OS" == "SUSE Linux Enterprise Server" ]; then
+    zypper install -y docker
+    systemctl enable docker
+    systemctl start docker
+elif [ "$OS" == "Arch Linux" ]; then
+    pacman -S --noconfirm docker
+    systemctl enable docker
+    systemctl start docker
+elif [ "$OS" == "Alpine Linux" ]; then
+    apk add docker
+    rc-update add docker boot
+    service docker start
+elif [ "$OS" == "FreeBSD" ]; then
+    pkg install -y docker
+    sysrc docker_enable=YES
+    service docker start
+elif [ "$OS" == "macOS" ]; then
+    brew install docker
+    brew services start docker
+elif [ "$OS" == "Rocky Linux" ] || [ "$OS" == "Oracle Linux" ] || [ "$OS" == "AlmaLinux" ]; then
+    dnf install -y docker
+    systemctl enable docker
+    systemctl start docker
+else
+    echo "Unsupported operating system"
+    exit
+fi
+
+# Install Docker Compose
+
+if [ "$OS" == "Ubuntu" ] || [ "$OS" == "Debian" ]; then
+    apt-get install -y docker-compose
+elif [ "$OS" == "CentOS Linux" ] || [ "$OS" == "Fedora" ] || [ "$OS" == "Red Hat Enterprise Linux" ]; then
+    yum install -y docker-compose
+elif [ "$OS" == "openSUSE Leap" ] || [ "$OS" == "SUSE Linux Enterprise Server" ]; then
+    zypper install -y docker-compose
+elif [ "$OS" == "Arch Linux" ]; then
+    pacman -S --noconfirm docker-compose
+elif [ "$OS" == "Alpine Linux" ]; then
+    apk add docker-compose
+elif [ "$OS" == "FreeBSD" ]; then
+    pkg install -y docker-compose
+elif [ "$OS" == "macOS" ]; then
+    brew install docker-compose
+elif [ "$OS" == "Rocky Linux" ] || [ "$OS" == "Oracle Linux" ] || [ "$OS" == "AlmaLinux" ]; then
+    dnf install -y docker-compose
+else
+    echo "Unsupported operating system"
+    exit
+fi
+
+# Install Kubernetes
+
+if [ "$OS" == "Ubuntu" ] || [ "$OS" == "Debian" ]; then
+    apt-get update
+    apt-get install -y apt-transport-https ca-certificates curl software-properties-common
+    curl -fsSL https://download.docker.com/linux/ubuntu/gpg | apt-key add -
+    add-apt-repository "deb [arch=amd64] https://download.docker.com/linux/ubuntu $(lsb_release -cs) stable"
+    apt-get update
+    apt-get install -y kubectl
+elif [ "$OS" == "CentOS Linux" ] || [ "$OS" == "Fedora" ] || [ "$OS" == "Red Hat Enterprise Linux" ]; then
+    yum install -y kubectl
+elif [ "$OS" == "openSUSE Leap" ] || [ "$OS" == "SUSE Linux Enterprise Server" ]; then
+    zypper install -y kubectl
+elif [ "$OS" == "Arch Linux" ]; then
+    pacman -S --noconfirm kubectl
+elif [ "$OS" == "Alpine Linux" ]; then
+    apk add kubectl
+elif [ "$OS" == "FreeBSD" ]; then
+    pkg install -y kubectl
+elif [ "$OS" == "macOS" ]; then
+    brew install kubectl
+elif [ "$OS" == "Rocky Linux" ] || [ "$OS" == "Oracle Linux" ] || [ "$OS" == "AlmaLinux" ]; then
+    dnf install -y kubectl
+else
+    echo "Unsupported operating system"
+    exit
+fi
+
+# Install Vagrant
+
+if [ "$OS" == "Ubuntu" ] || [ "$OS" == "Debian" ]; then
+    apt-get update
+    apt-get install -y vagrant
+elif [ "$OS" == "CentOS Linux" ] || [ "$OS" == "Fedora" ] || [ "$OS" == "Red Hat Enterprise Linux" ]; then
+    yum install -y vagrant
+elif [ "$OS" == "openSUSE Leap" ] || [ "$OS" == "SUSE Linux Enterprise Server" ]; then
+    zypper install -y vagrant
+elif [ "$OS" == "Arch Linux" ]; then
+    pacman -S --noconfirm vagrant
+elif [ "$OS" == "Alpine Linux" ]; then
+    apk add vagrant
+elif [ "$OS" == "FreeBSD" ]; then
+    pkg install -y vagrant
+elif [ "$OS" == "macOS" ]; then
+    brew install vagrant
+elif [ "$OS" == "Rocky Linux" ] || [ "$OS" == "Oracle Linux" ] || [ "$OS" == "AlmaLinux" ]; then
+    dnf install -y vagrant
+else
+    echo "Unsupported operating system"
+    exit
+fi
+
+echo "Prerequisites setup completed"
+
+"""
+
+    def get_script(self):
+        """
+        Returns the prerequisites setup content.
+        """
+        return self.prerequisites_setup_content
+
+
+class WooSh:
+    """
+    A set of shell commands that will complete the setup of the website service.
+    The plugins are installed in parallel from the download cache shared by the projects of the host.
+    """
+
+    def __init__(self):
+        self.woo_sh_content = """#!/bin/bash
+
+echo "Woo.sh started"
+echo "##################################################################################################"
+
+# Change directory to /var/www/html to be able to run WP-CLI commands
+cd /var/www/html || exit
+
+# Plugin and theme archives are cached in the wp-cli-cache volume, shared by every project on the
+# host: a version is downloaded once per host. WOOSH_JOBS plugins are installed at the same time.
+export WP_CLI_CACHE_DIR="${WP_CLI_CACHE_DIR:-/var/cache/wp-cli}"
+mkdir -p "$WP_CLI_CACHE_DIR"
+JOBS="${WOOSH_JOBS:-4}"
+TIMINGS=$(mktemp)
+export TIMINGS
+started=$(date +%s.%N)
+
+wp core install --url=${WORDPRESS_SITE_URL} --title=${WORDPRESS_SITE_TITLE} --admin_user=${WORDPRESS_ADMIN_USER} --admin_password=${WORDPRESS_ADMIN_PASSWORD} --admin_email=${WORDPRESS_ADMIN_EMAIL} --skip-email --allow-root
+
+# Server plugins: really-simple-ssl, redis-cache (persistent object cache, WP_REDIS_* in wp-config.php)
+# WooCommerce plugins: woocommerce, woocommerce-pdf-invoices-packing-slips, woocommerce-multilingual
+# Payment plugins: woocommerce-payments, woocommerce-gateway-stripe
+ACTIVATE="really-simple-ssl redis-cache woocommerce woocommerce-pdf-invoices-packing-slips woocommerce-multilingual woocommerce-payments woocommerce-gateway-stripe"
+# Social media, marketing, payment and content delivery plugins, installed but not activated
+INSTALL="facebook-for-woocommerce pinterest-for-woocommerce mailpoet woocommerce-paypal-payments mailchimp-for-woocommerce klarna-payments-for-woocommerce coinbase-commerce vimeo"
+# Page cache purge: only when the project has a page cache (PAGE_CACHE=true)
+if getent hosts pagecache > /dev/null; then
+    ACTIVATE="$ACTIVATE varnish-http-purge"
+fi
+
+# Remove the plugins that are not part of the shop (the plugins of the shop are kept when they are intact)
+for plugin in $(wp plugin list --field=name --allow-root); do
+    case " $ACTIVATE $INSTALL " in
+        *" $plugin "*) ;;
+        *) wp plugin uninstall "$plugin" --deactivate --allow-root ;;
+    esac
+done
+
+# Installs a plugin or a theme unless the installed version is intact (plugin checksums from
+# wordpress.org), and records how long it took
+install_package() {
+    local type=$1 name=$2 start end status
+    start=$(date +%s.%N)
+    if wp "$type" is-installed "$name" --allow-root && { [ "$type" = theme ] || wp plugin verify-checksums "$name" --allow-root > /dev/null 2>&1; }; then
+        status=skipped
+    elif wp "$type" install "$name" --force --allow-root > /dev/null 2>&1; then
+        status=installed
+    else
+        status=failed
+    fi
+    end=$(date +%s.%N)
+    echo "$type $name $status $(awk -v start="$start" -v end="$end" 'BEGIN { printf "%.1f", end - start }')" >> "$TIMINGS"
+}
+export -f install_package
+
+# The installs run in parallel, the activation runs once: activating in parallel would race on the active plugins option
+printf '%s\\n' $ACTIVATE $INSTALL | xargs -P "$JOBS" -I {} bash -c 'install_package plugin "$1"' _ {}
+install_package theme storefront
+
+wp plugin activate $ACTIVATE --allow-root
+wp redis enable --force --allow-root
+wp redis status --allow-root
+
+# WooCommerce performance profile (STORE_PRESET): options from WOOPY_STORE_OPTIONS, the request hooks
+# are the woopy-performance must-use plugin and the wp-config.php constants are in WORDPRESS_CONFIG_EXTRA
+for option in ${WOOPY_STORE_OPTIONS}; do
+    wp option update "${option%%=*}" "${option#*=}" --allow-root
+done
+# High-Performance Order Storage: the orders are copied to the custom order tables, which become
+# authoritative, then the sync between the two storages is disabled: every order is written once
+wp option update woocommerce_custom_orders_table_data_sync_enabled yes --allow-root
+if ! { wp wc hpos sync --allow-root && wp wc hpos enable --allow-root; }; then
+    echo "High-Performance Order Storage is not enabled, the orders stay in the posts table"
+fi
+wp option update woocommerce_custom_orders_table_data_sync_enabled no --allow-root
+# WooCommerce themes
+wp theme activate storefront --allow-root
+
+echo "##################################################################################################"
+echo "Install timings (seconds, slowest first):"
+sort -k4 -rn "$TIMINGS" | awk '{ printf "%-6s %-45s %-10s %6s\\n", $1, $2, $3, $4 }'
+if grep -q " failed " "$TIMINGS"; then
+    echo "Some packages failed to install, run woosh.sh again to retry them"
+fi
+rm -f "$TIMINGS"
+awk -v start="$started" -v end="$(date +%s.%N)" 'BEGIN { printf "Woo.sh took %.1f seconds\\n", end - start }'
+echo "Woo.sh completed"
+
+"""
+
+    def get_script(self):
+        """
+        Returns the woo.sh content.
+        """
+        return self.woo_sh_content
+
+
+class FixWp():
+    """
+    A set of shell commands that will fix the WordPress installation.
+    """
+
+    def __init__(self):
+        self.fix_wp_content = """#!/bin/bash
+        
+echo "##################################################################################################"
+echo "FixWP.sh started"
+echo "Fixing permissions for WordPress"
+chown -R www-data:www-data /var/www/html
+echo "FixWP.sh completed"
+echo "##################################################################################################"
+
+"""
+
+    def get_script(self):
+        """
+        Returns the fixwp.sh content.
+        """
+        return self.fix_wp_content
+
+
+class CertSh:
+    """
+    A set of shell commands that will complete the setup of the website service.
+    """
+
+    def __init__(self):
+
+        self.cert_sh_content = """#!/bin/bash
+
+echo "Cert.sh started"
+echo "##################################################################################################"
+
+# Change directory to /var/www/html to be able to run WP-CLI commands
+cd /var/www/html || exit
+
+# Generate local certificate for HTTPS
+openssl req -x509 -nodes -days 365 -newkey rsa:2048 -keyout /etc/ssl/private/${WORDPRESS_SITE_URL}.key -out /etc/ssl/certs/${WORDPRESS_SITE_URL}.crt -subj "/C=BE/ST=Brussels/L=Brussels/O=${WORDPRESS_SITE_TITLE}/OU=Org/CN=${WORDPRESS_SITE_URL}"
+
+echo "# Redirect HTTP to HTTPS
+# Activate this if you want to redirect HTTP to HTTPS, but make sure that you activate this after publishing the certificate
+# <VirtualHost *:80>
+#     ServerName {WORDPRESS_SITE_URL}
+#     Redirect permanent / https://{WORDPRESS_SITE_URL}
+# </VirtualHost>
+
+# Add SSL configuration to Wordpress Apache configuration
+<VirtualHost *:443>
+    ServerAdmin webmaster@${WORDPRESS_SITE_URL}
+    DocumentRoot /var/www/html
+    ServerName ${WORDPRESS_SITE_URL}
+    ServerAlias www.${WORDPRESS_SITE_URL}
+    ErrorLog ${APACHE_LOG_DIR}/error.log
+    CustomLog ${APACHE_LOG_DIR}/access.log combined
+    SSLEngine on
+    SSLCertificateFile /etc/ssl/certs/${WORDPRESS_SITE_URL}.crt
+    SSLCertificateKeyFile /etc/ssl/private/${WORDPRESS_SITE_URL}.key
+</VirtualHost>" > /etc/apache2/sites-available/000-default-ssl.conf
+
+# Enable SSL module, compression and cache headers (apache/zz-woopy.conf configures them)
+a2enmod ssl deflate expires headers
+
+# Enable SSL configuration
+a2ensite 000-default-ssl.conf
+
+# Reload Apache gracefully: the running requests finish, the tuned configuration is kept
+apachectl configtest && apachectl -k graceful
+
+echo "##################################################################################################"
+echo "Cert.sh completed"
+
+# If you'd like to register this certificate to the product domain, run this command in the Wordpress container.
+# certbot certonly --agree-tos --email info@${WORDPRESS_SITE_URL} --expand --domains ${WORDPRESS_SITE_URL},www.${WORDPRESS_SITE_URL} --cert-path /etc/ssl/certs/h2oheating.xyz.crt --webroot-path /var/www/html --dry-run
+
+"""
+
+    def get_script(self):
+        """
+        Returns the cert.sh content.
+        """
+        return self.cert_sh_content
+
+
+class BootSh:
+    """
+    A set of shell commands that will start the stack and measure the cold boot time.
+    """
+
+    def __init__(self):
+        self.boot_sh_content = """#!/bin/bash
+
+echo "Boot.sh started"
+echo "##################################################################################################"
+
+# Start every service and wait until all of them are healthy. The services without dependencies
+# start in parallel, the others as soon as the services they depend on are healthy.
+start=$(date +%s.%N)
+docker compose up -d --wait --wait-timeout "${WAIT_TIMEOUT:-600}"
+status=$?
+end=$(date +%s.%N)
+
+# Time from the start of every container to its first successful healthcheck
+for container in $(docker compose ps -q); do
+    docker inspect -f '{{.Name}} started {{.State.StartedAt}} health {{if .State.Health}}{{.State.Health.Status}}{{else}}none{{end}}' "$container"
+done
+
+echo "##################################################################################################"
+awk -v start="$start" -v end="$end" 'BEGIN { printf "Cold boot: %.1f seconds\\n", end - start }'
+echo "Boot.sh completed"
+
+exit $status
+"""
+
+    def get_script(self):
+        """
+        Returns the boot.sh content.
+        """
+        return self.boot_sh_content
+
+
+class WorkerSh:
+    """
+    The background worker of the website, run by the wp-cli container: WP-Cron events and
+    Action Scheduler actions run here instead of in the visitor requests.
+    """
+
+    def __init__(self):
+        self.worker_sh_content = """#!/bin/sh
+
+# WP-Cron and Action Scheduler worker, the website has DISABLE_WP_CRON.
+# WORKER_INTERVAL: seconds between two runs, WORKER_CONCURRENCY: parallel Action Scheduler runners,
+# WORKER_BATCH_SIZE: actions claimed by a runner at a time. /tmp/woopy-worker is the healthcheck heartbeat.
+INTERVAL="${WORKER_INTERVAL:-60}"
+CONCURRENCY="${WORKER_CONCURRENCY:-2}"
+BATCH_SIZE="${WORKER_BATCH_SIZE:-25}"
+
+cd /var/www/html || exit 1
+
+# The website installs WordPress (woosh.sh)
+until wp core is-installed > /dev/null 2>&1; do
+    touch /tmp/woopy-worker
+    sleep "$INTERVAL"
+done
+echo "Worker started: every ${INTERVAL}s, ${CONCURRENCY} Action Scheduler runners of ${BATCH_SIZE} actions"
+
+while true; do
+    touch /tmp/woopy-worker
+    started=$(date +%s)
+    # Action Scheduler has its own runners below, its WP-Cron event is skipped
+    wp cron event run --due-now --exclude=action_scheduler_run_queue --quiet
+    if wp plugin is-active woocommerce > /dev/null 2>&1; then
+        # The runners claim different actions, they run in parallel until the due actions are done
+        runner=0
+        while [ "$runner" -lt "$CONCURRENCY" ]; do
+            wp action-scheduler run --batch-size="$BATCH_SIZE" --quiet &
+            runner=$((runner + 1))
+        done
+        wait
+    fi
+    elapsed=$(($(date +%s) - started))
+    if [ "$elapsed" -lt "$INTERVAL" ]; then
+        sleep $((INTERVAL - elapsed))
+    fi
+done
+"""
+
+    def get_script(self):
+        """
+        Returns the worker.sh content.
+        """
+        return self.worker_sh_content
+
+
+# create an enum to choose deployment options: docker-compose, kubernetes, vagrant
+class DeploymentOptions(Enum):
+    """
+    Represents the deployment options for the project.
+    """
+    DOCKER_COMPOSE = "docker-compose"
+    KUBERNETES = "kubernetes"
+    VAGRANT = "vagrant"
+    SWARM = "swarm"
+    
+
+class Project:
+    """
+    Represents a project with multiple services: website, database, cache, admin, monitoring, management, vault, code, application, networks, volumes and more.
+    """
+
+    def __init__(
+        self,
+        website: Website = None,
+        wpcli: WpCli = None,
+        database: Database = None,
+        cache: Cache = None,
+        admin: Admin = None,
+        monitoring: Monitoring = None,
+        management: Management = None,
+        vault: Vault = None,
+        code: Code = None,
+        certbot: Certbot = None,
+        mail: Mail = None,
+        application: Application = None,
+        graphviz: GraphViz = None,
+        page_cache: PageCache = None,
+        proxy: Proxy = None,
+        observability: Observability = None,
+        mail_relay: MailRelay = None,
+        deployment: DeploymentOptions = DeploymentOptions.DOCKER_COMPOSE,
+        extra_services: list = None,
+        sizing: dict = None,
+    ):
+        """
+        Initializes a new instance of the Project class.
+        Create a temp directory in the user profile on the project name. For example: $HOME/.woopy/{project_name}
+        """
+        self.project_name = website.site_title
+        self.project_description = f"Project {self.project_name} contains multiple services such as a website, database, cache, admin, monitoring, management, vault, code, and application."
+        self.project_author = "woopy"
+        self.project_email = "woopy@katawoo.com"
+        self.database = database
+        self.website = website
+        self.wpcli = wpcli
+        self.admin = admin
+        self.cache = cache
+        self.monitoring = monitoring
+        self.management = management
+        self.vault = vault
+        self.certbot = certbot
+        self.code = code
+        self.application = application
+        self.mail = mail
+        self.graphviz = graphviz
+        # projects stored before the page cache existed get a disabled one
+        self.page_cache = page_cache or PageCache(site_title=website.site_title, site_url=website.site_url)
+        self.proxy = proxy or Proxy(site_title=website.site_title, site_url=website.site_url)
+        self.observability = observability or Observability(
+            site_title=website.site_title, site_url=website.site_url, database_props=database, cache_props=cache
+        )
+        self.mail_relay = mail_relay or MailRelay(site_title=website.site_title, site_url=website.site_url)
+        self.deployment = deployment
+        # services from the service catalogue
+        self.extra_services = extra_services or []
+        # host memory, catalogue size and concurrency, see parse_sizing
+        self.sizing = sizing or dict(DEFAULT_SIZING)
+
+    def get_services(self):
+        """
+        Returns the service objects of the project in docker-compose.yml order.
+        """
+        return [
+            self.database,
+            self.website,
+            self.wpcli,
+            self.admin,
+            self.cache,
+            self.monitoring,
+            self.management,
+            self.vault,
+            self.certbot,
+            self.code,
+            self.application,
+            self.mail,
+            self.graphviz,
+            self.page_cache,
+            self.proxy,
+            self.observability,
+            self.mail_relay,
+        ]
+
+    def enable_page_cache(self):
+        """
+        Puts the page cache in front of the website, the website sends its purge requests to it.
+        """
+        self.page_cache.enabled = True
+        self.page_cache.backend_host = self.website.site_host
+        self.website.page_cache_host = self.page_cache.page_cache_host
+        self.set_routes()
+
+    def enable_proxy(self):
+        """
+        Puts the proxy in front of the project: it routes the website, admin, mail UI and code
+        server by host name, their HTTP ports are no longer published.
+        """
+        self.proxy.enabled = True
+        self.set_routes()
+
+    def enable_observability(self):
+        """
+        Adds the metrics stack: Prometheus, Alertmanager, Grafana and the exporters of the
+        database, the cache, PHP and the storefront. Call it after choosing the website variant.
+        """
+        self.observability.enabled = True
+        self.observability.website_variant = self.website.website_variant
+        self.set_routes()
+
+    def enable_mail_relay(self):
+        """
+        Adds the mail relay between the website and the mail server: WordPress hands its mails
+        to the relay, which queues them and retries the delivery.
+        """
+        self.mail_relay.enabled = True
+        self.website.mail_smtp_host = self.mail_relay.mail_relay_host
+        self.website.mail_smtp_port = f"{self.mail_relay.mail_relay_port}"
+        self.set_routes()
+
+    def set_routes(self):
+        """
+        Sets the host ports and the proxy routes of the services that serve HTTP.
+        The front of the website is the page cache when it is enabled:
+            proxy -> page cache -> website, or proxy -> website
+            page cache (port 80) -> website (port 443), or website (ports 80 and 443)
+        """
+        front = self.page_cache if self.page_cache.enabled else self.website
+        self.observability.front_host = self.page_cache.page_cache_host if self.page_cache.enabled else self.website.site_host
+        self.observability.proxy_host = self.proxy.proxy_host if self.proxy.enabled else None
+        self.observability.mail_relay_host = self.mail_relay.mail_relay_host if self.mail_relay.enabled else None
+        self.proxy.metrics = self.observability.enabled
+        if not self.proxy.enabled:
+            self.page_cache.published_ports = ("80:80",)
+            self.website.published_ports = ("443:443",) if self.page_cache.enabled else ("80:80", "443:443")
+            for service in (self.website, self.page_cache, self.admin, self.mail, self.code, self.observability):
+                service.proxy_labels = None
+            return
+
+        site_url = self.website.site_url
+        self.page_cache.published_ports = ()
+        self.website.published_ports = ()
+        self.website.proxy_labels = None
+        front.proxy_labels = self.proxy.get_labels("website", f"Host(`{site_url}`) || Host(`www.{site_url}`)", 80)
+        self.admin.proxy_labels = self.proxy.get_labels("admin", f"Host(`admin.{site_url}`)", 80)
+        # the mail UI and the code server use websockets, their requests are not buffered
+        self.mail.proxy_labels = self.proxy.get_labels("mail", f"Host(`mail.{site_url}`)", 8025, ("compress",))
+        self.code.proxy_labels = self.proxy.get_labels("code", f"Host(`code.{site_url}`)", 8080, ("compress",))
+        self.observability.proxy_labels = (
+            self.proxy.get_labels("grafana", f"Host(`grafana.{site_url}`)", 3000, ("compress",))
+            if self.observability.enabled
+            else None
+        )
+
+    def get_docker_compose_data(self):
+        """
+        Converts the Project object to a docker-compose.yml data string.
+        """
+        # volumes of the optional services and of the catalogue services
+        volumes = []
+        if self.proxy.enabled:
+            volumes.append(f"{self.proxy.proxy_host}-vol")
+        if self.observability.enabled:
+            volumes += [f"{self.observability.prometheus_host}-vol", f"{self.observability.grafana_host}-vol"]
+        if self.mail_relay.enabled:
+            volumes.append(f"{self.mail_relay.mail_relay_host}-vol")
+        volumes += [volume for service in self.extra_services for volume in service.get_volumes()]
+        extra_volumes = "".join(f"    {volume}: {{}}\n" for volume in volumes)
+        docker_compose_yaml = f"""
+networks:
+    {self.website.site_title}-network: {{
+        driver: bridge
+    }}
+
+volumes:
+    {self.website.site_host}-vol: {{}}
+    {self.wpcli.wpcli_host}-vol: {{}}
+    {self.database.database_host}-vol: {{}}
+    {self.admin.admin_host}-vol: {{}}
+    {self.cache.cache_host}-vol: {{}}
+    {self.monitoring.monitoring_host}-vol: {{}}
+    {self.management.management_host}-vol: {{}}
+    {self.vault.vault_host}-vol: {{}}
+    {self.certbot.certbot_host}-vol: {{}}
+    {self.code.code_host}-vol: {{}}
+    {self.application.app_host}-vol: {{}}
+    {self.mail.mail_host}-vol: {{}}
+    wp-cli-cache:
+        # plugin and theme downloads, shared by the projects of the host (see woosh.sh)
+        name: woopy-wp-cli-cache
+{extra_volumes}
+services:
+    {self.database.to_docker_compose()}
+    {self.website.to_docker_compose()}
+    {self.wpcli.to_docker_compose(self.website.get_environment())}
+    {self.admin.to_docker_compose()}
+    {self.cache.to_docker_compose()}
+    {self.monitoring.to_docker_compose()}
+    {self.management.to_docker_compose()}
+    {self.vault.to_docker_compose()}
+    {self.certbot.to_docker_compose()}
+    {self.code.to_docker_compose()}
+    {self.application.to_docker_compose()}
+    {self.mail.to_docker_compose()}
+    {self.page_cache.to_docker_compose()}
+    {self.proxy.to_docker_compose()}
+    {self.observability.to_docker_compose()}
+    {self.mail_relay.to_docker_compose()}
+{"".join(service.to_docker_compose() for service in self.extra_services)}"""
+
+        return docker_compose_yaml
+    
+
+    def get_kubernetes_data(self):
+        """
+        Converts the Project object to a kubernetes.yml data string.
+        Returns multiple kubernetes.yml data strings.
+        """
+        
+        database_kubernetes = self.database.to_kubernetes()
+        website_kubernetes = self.website.to_kubernetes()
+        wpcli_kubernetes = self.wpcli.to_kubernetes()
+        admin_kubernetes = self.admin.to_kubernetes()
+        cache_kubernetes = self.cache.to_kubernetes()
+        monitoring_kubernetes = self.monitoring.to_kubernetes()
+        management_kubernetes = self.management.to_kubernetes()
+        vault_kubernetes = self.vault.to_kubernetes()
+        certbot_kubernetes = self.certbot.to_kubernetes()
+        code_kubernetes = self.code.to_kubernetes()
+        application_kubernetes = self.application.to_kubernetes()
+        mail_kubernetes = self.mail.to_kubernetes()
+        graphviz_kubernetes = self.graphviz.to_kubernetes()
+        
+        
+        
+
+    def get_project_report(self):
+        """
+        Generates a report for the project.
+        """
+        report = f"""
+NOTE: This report is generated by woopy. It contains sensitive information. Please keep it secure.       
+-------------------------------------------------------------
+Project: {self.project_name}
+Description: {self.project_description}
+Author: {self.project_author}
+Email: {self.project_email}
+-------------------------------------------------------------
+Database Hostname: {self.database.database_host}
+Database Port: {self.database.database_port}
+Database Username: {self.database.database_user}
+Database Password: {self.database.database_password}
+-------------------------------------------------------------
+Website Hostname: {self.website.site_url}
+Website Email: {self.website.website_admin_email}
+Website Username: {self.website.website_admin_username}
+Website Password: {self.website.website_admin_password}
+-------------------------------------------------------------
+WP-CLI Hostname: {self.wpcli.wpcli_host}
+WP-CLI Port: {self.wpcli.wpcli_port}
+WP-CLI Username: {self.wpcli.wpcli_username}
+WP-CLI Password: {self.wpcli.wpcli_password}
+WP-CLI Worker: WP-Cron and {self.wpcli.worker_concurrency} Action Scheduler runners of {self.wpcli.worker_batch_size} actions every {self.wpcli.worker_interval}s (DISABLE_WP_CRON on the website)
+-------------------------------------------------------------
+Cache Hostname: {self.cache.cache_host}
+Cache Port: {self.cache.cache_port}
+Cache Password: {self.cache.cache_password}
+Cache Configuration: redis/redis.conf (object cache, no persistence)
+-------------------------------------------------------------
+Monitoring Hostname: {self.monitoring.monitoring_host}
+Monitoring Port: {self.monitoring.monitoring_port}
+Monitoring Username: {self.monitoring.monitoring_username}
+Monitoring Password: {self.monitoring.monitoring_password}
+{self.monitoring.get_tuning().get_report()}-------------------------------------------------------------
+Management Hostname: {self.management.management_host}
+Management Port: {self.management.management_port}
+Management Username: {self.management.management_username}
+Management Password: {self.management.management_password}
+-------------------------------------------------------------
+Vault Hostname: {self.vault.vault_host}
+Vault Port: {self.vault.vault_port}
+Vault Username: {self.vault.vault_username}
+Vault Password: {self.vault.vault_password}
+-------------------------------------------------------------
+Certbot Hostname: {self.certbot.certbot_host}
+Certbot Port: {self.certbot.certbot_port}
+Certbot Username: {self.certbot.certbot_username}
+Certbot Password: {self.certbot.certbot_password}
+-------------------------------------------------------------
+Code Hostname: {self.code.code_host}
+Code Port: {self.code.code_port}
+Code Username: {self.code.code_username}
+Code Password: {self.code.code_password}
+-------------------------------------------------------------
+Application Name: {self.application.app_name}
+Application Version: {self.application.version}
+Application URL: {self.application.url}
+Application License: {self.application.license}
+Application Author: {self.application.author}
+Application Author Email: {self.application.author_email}
+Application Formal Name: {self.application.formal_name}
+Application Description: {self.application.description}
+Application Long Description: {self.application.long_description}'
+-------------------------------------------------------------
+Mail Hostname: {self.mail.mail_host}
+Mail Port: {self.mail.mail_port}
+Mail Username: {self.mail.mail_username}
+Mail Password: {self.mail.mail_password}
+-------------------------------------------------------------
+{self.mail_relay.get_report()}-------------------------------------------------------------
+{self.page_cache.get_report()}-------------------------------------------------------------
+{self.proxy.get_report()}-------------------------------------------------------------
+{self.observability.get_report()}-------------------------------------------------------------
+Topology Graph: topology.svg, topology.dot and topology.mmd in the project bundle
+-------------------------------------------------------------
+networks:
+{self.website.site_title}-network
+-------------------------------------------------------------
+volumes:
+{self.website.site_title}-vol
+{self.database.database_host}-vol
+{self.wpcli.wpcli_host}-vol
+{self.admin.admin_host}-vol
+{self.cache.cache_host}-vol
+{self.monitoring.monitoring_host}-vol
+{self.management.management_host}-vol
+{self.vault.vault_host}-vol
+{self.code.code_host}-vol
+{self.application.app_host}-vol
+{self.mail.mail_host}-vol
+{self.certbot.certbot_host}-vol
+-------------------------------------------------------------
+"""
+        for service in self.extra_services:
+            report += f"{service.name.capitalize()} Hostname: {service.name}\n"
+            for value_name in service.definition.generate:
+                report += f"{service.name.capitalize()} {value_name.capitalize()}: {service.values[value_name]}\n"
+            report += "-------------------------------------------------------------\n"
+
+        report += MariaDbTuning(self.sizing).get_report()
+        report += "-------------------------------------------------------------\n"
+        if self.website.website_variant == "nginx-fpm":
+            report += PhpFpmTuning(self.sizing).get_report()
+        else:
+            report += ApacheTuning(self.sizing).get_report()
+        report += "-------------------------------------------------------------\n"
+        report += self.website.get_store_performance().get_report()
+        if self.website.store_preset == "small" and self.sizing["products"] > 10000:
+            report += f"- {self.sizing['products']} products: the large preset (STORE_PRESET=large) suits this catalogue\n"
+        report += "-------------------------------------------------------------\n"
+
+        report += "Startup groups (the services of a group start in parallel, each one as soon as its dependencies are healthy):\n"
+        for index, group in enumerate(self.get_startup_groups(), start=1):
+            report += f"{index}: {', '.join(group)}\n"
+        report += "-------------------------------------------------------------\n"
+
+        return report
+
+    def get_startup_groups(self):
+        """
+        Groups the services by the length of their dependency chain. The services of a group do
+        not depend on each other, docker compose starts them in parallel.
+        """
+        graph = self.graphviz.get_graph(self.get_docker_compose_data())
+        groups = {}
+        for name, service in graph["services"].items():
+            groups.setdefault(service["level"], []).append(name)
+        return [groups[level] for level in sorted(groups)]
+
+
+SERVICE_CLASSES = {
+    service_class.__name__: service_class
+    for service_class in (
+        Database,
+        Cache,
+        Mail,
+        Website,
+        WpCli,
+        Admin,
+        Monitoring,
+        Management,
+        Vault,
+        Certbot,
+        Code,
+        Application,
+        GraphViz,
+        PageCache,
+        Proxy,
+        Observability,
+        MailRelay,
+    )
+}
+
+# Resource profile of every service (docker-compose.yml service name):
+#   cpus: CPU cores, memory: MB, disk: GB of volumes
+#   stateful: the service keeps data in a volume that must survive a restart
+#   global: the service runs on every host (host level agents)
+#   affinity: optional, the service runs on the host of that service (see PlacementPlanner)
+SERVICE_RESOURCE_PROFILES = {
+    "database": {"cpus": 1.0, "memory": 1024, "disk": 20, "stateful": True, "global": False},
+    "website": {"cpus": 1.0, "memory": 512, "disk": 5, "stateful": True, "global": False},
+    "php": {"cpus": 1.0, "memory": 512, "disk": 0, "stateful": False, "global": False},
+    "wpcli": {"cpus": 0.5, "memory": 512, "disk": 1, "stateful": False, "global": False},
+    "admin": {"cpus": 0.25, "memory": 128, "disk": 0, "stateful": False, "global": False},
+    "cache": {"cpus": 0.5, "memory": 256, "disk": 1, "stateful": True, "global": False},
+    "monitoring": {"cpus": 0.25, "memory": 128, "disk": 0, "stateful": False, "global": True},
+    "management": {"cpus": 0.25, "memory": 128, "disk": 1, "stateful": True, "global": False},
+    "vault": {"cpus": 0.1, "memory": 32, "disk": 1, "stateful": True, "global": False},
+    "certbot": {"cpus": 0.1, "memory": 64, "disk": 1, "stateful": True, "global": False},
+    "code": {"cpus": 0.5, "memory": 512, "disk": 5, "stateful": True, "global": False},
+    "app": {"cpus": 0.25, "memory": 256, "disk": 1, "stateful": False, "global": False},
+    "mail": {"cpus": 0.1, "memory": 64, "disk": 1, "stateful": False, "global": False},
+    "pagecache": {"cpus": 0.5, "memory": 384, "disk": 0, "stateful": False, "global": False, "affinity": "website"},
+    # the proxy routes the containers of its own host (docker provider), it runs next to the website
+    "proxy": {"cpus": 0.5, "memory": 256, "disk": 1, "stateful": False, "global": False, "affinity": "website"},
+    "prometheus": {"cpus": 0.5, "memory": 512, "disk": 10, "stateful": True, "global": False},
+    "alertmanager": {"cpus": 0.1, "memory": 64, "disk": 0, "stateful": False, "global": False},
+    "grafana": {"cpus": 0.25, "memory": 256, "disk": 1, "stateful": True, "global": False},
+    "mysqld-exporter": {"cpus": 0.1, "memory": 32, "disk": 0, "stateful": False, "global": False},
+    "redis-exporter": {"cpus": 0.1, "memory": 32, "disk": 0, "stateful": False, "global": False},
+    "php-fpm-exporter": {"cpus": 0.1, "memory": 32, "disk": 0, "stateful": False, "global": False},
+    "apache-exporter": {"cpus": 0.1, "memory": 32, "disk": 0, "stateful": False, "global": False},
+    "blackbox-exporter": {"cpus": 0.1, "memory": 32, "disk": 0, "stateful": False, "global": False},
+    "mailrelay": {"cpus": 0.1, "memory": 64, "disk": 1, "stateful": True, "global": False},
+    "postfix-exporter": {"cpus": 0.1, "memory": 32, "disk": 0, "stateful": False, "global": False},
+}
+
+# Profile used for services that are not listed above
+DEFAULT_RESOURCE_PROFILE = {"cpus": 0.25, "memory": 256, "disk": 1, "stateful": False, "global": False}
+
+
+def get_resource_profile(service_name: str) -> dict:
+    """
+    Get the resource profile of a docker-compose.yml service
+    """
+    return SERVICE_RESOURCE_PROFILES.get(service_name, DEFAULT_RESOURCE_PROFILE)
+
+
+# Sizing of a project (request body): host memory in MB, host CPU cores, catalogue size, concurrent shoppers
+# and the average memory of a PHP worker in MB
+DEFAULT_SIZING = {
+    "host_memory": 4096,
+    "host_cpus": 2,
+    "products": 1000,
+    "orders": 10000,
+    "concurrency": 20,
+    "php_worker_memory": 64,
+}
+
+SIZING_VARIABLES = {
+    "HOST_MEMORY": "host_memory",
+    "HOST_CPUS": "host_cpus",
+    "PRODUCTS": "products",
+    "ORDERS": "orders",
+    "CONCURRENCY": "concurrency",
+    "PHP_WORKER_MEMORY": "php_worker_memory",
+}
+
+# Website variants, see Website
+WEBSITE_VARIANTS = ("apache", "nginx-fpm")
+
+# cAdvisor presets, see MonitoringTuning: CPU budget in percent of one core, metric families that are
+# not collected, docker-only mode and storage duration in seconds. low-overhead is meant for production.
+MONITORING_PRESETS = {
+    "standard": {
+        "cpu_budget": 3.0,
+        "disable_metrics": (
+            "advtcp", "cpu_topology", "cpuset", "hugetlb", "memory_numa", "process",
+            "referenced_memory", "resctrl", "sched", "tcp", "udp",
+        ),
+        "docker_only": False,
+        "storage_duration": 120,
+    },
+    "low-overhead": {
+        "cpu_budget": 1.0,
+        "disable_metrics": (
+            "accelerator", "advtcp", "app", "cpu_topology", "cpuset", "disk", "hugetlb", "memory_numa",
+            "percpu", "process", "referenced_memory", "resctrl", "sched", "tcp", "udp",
+        ),
+        "docker_only": True,
+        "storage_duration": 60,
+    },
+}
+
+# WooCommerce performance presets, see StorePerformance: PHP memory limits, revisions and autosave of the
+# wp-config.php constants, and the background work that is kept. large is meant for catalogues of more
+# than about 10000 products.
+STORE_PRESETS = {
+    "small": {
+        "memory_limit": "256M",
+        "max_memory_limit": "512M",
+        "post_revisions": 5,
+        "autosave_interval": 120,
+        "empty_trash_days": 30,
+        "analytics": True,
+        "attribute_lookup_direct_updates": True,
+        "background_image_regeneration": True,
+    },
+    "large": {
+        "memory_limit": "512M",
+        "max_memory_limit": "1024M",
+        "post_revisions": 3,
+        "autosave_interval": 300,
+        "empty_trash_days": 7,
+        "analytics": False,
+        "attribute_lookup_direct_updates": False,
+        "background_image_regeneration": False,
+    },
+}
+
+
+def parse_sizing(env: dict) -> dict:
+    """
+    Parse the sizing of a project from the request options, missing values get the defaults.
+    Raises ValueError for values that are not positive numbers.
+    """
+    sizing = dict(DEFAULT_SIZING)
+    for variable, key in SIZING_VARIABLES.items():
+        if env.get(variable):
+            if not env[variable].isdigit() or int(env[variable]) < 1:
+                raise ValueError(f"{variable} must be a positive number")
+            sizing[key] = int(env[variable])
+    return sizing
+
+
+class MariaDbTuning:
+    """
+    MariaDbTuning class: This class computes the MariaDB settings (my.cnf) of a project from its sizing.
+
+    The database gets a quarter of the host memory (at least 512 MB). The InnoDB buffer pool holds
+    the estimated data set with room to grow, without starving the per connection buffers, and the
+    connection limit follows the number of PHP workers. Every decision is kept in reasons for the report.
+    """
+
+    # Estimated InnoDB size in MB: WordPress itself, a product with its meta data, an order with its items and notes
+    base_data_size = 200
+    product_size = 0.05
+    order_size = 0.03
+
+    # Memory of one connection in MB: sort, join and read buffers, thread stack
+    connection_memory = 3
+
+    # WordPress and WooCommerce tables, with room for the plugins
+    table_count = 120
+
+    def __init__(self, sizing: dict):
+        self.sizing = sizing
+        self.reasons = []
+        self.settings = self._compute()
+
+    def _compute(self) -> dict:
+        sizing = self.sizing
+        memory = self.memory = max(512, sizing["host_memory"] // 4)
+        self.reasons.append(f"Database memory: {memory} MB, a quarter of the {sizing['host_memory']} MB host memory (at least 512 MB)")
+
+        data_size = int(self.base_data_size + sizing["products"] * self.product_size + sizing["orders"] * self.order_size)
+        self.reasons.append(
+            f"Estimated data size: {data_size} MB for {sizing['products']} products and {sizing['orders']} orders"
+        )
+
+        # every PHP worker holds one connection, plus WP-CLI, cron and the admin
+        max_connections = sizing["concurrency"] * 2 + 20
+        self.reasons.append(
+            f"max_connections = {max_connections}: two connections per concurrent shopper ({sizing['concurrency']}) plus 20 for WP-CLI, cron and the admin"
+        )
+
+        connections_memory = max_connections * self.connection_memory
+        available = int(memory * 0.9) - connections_memory - 64
+        # the buffer pool grows in chunks of 128 MB
+        buffer_pool = max(128, min(int(data_size * 1.25), available) // 128 * 128)
+        if data_size * 1.25 > available:
+            self.reasons.append(
+                f"innodb_buffer_pool_size = {buffer_pool}M: limited by the memory left after {max_connections} connections ({connections_memory} MB), "
+                f"the data set is larger, more host memory keeps more of it in memory"
+            )
+        else:
+            self.reasons.append(f"innodb_buffer_pool_size = {buffer_pool}M: the whole data set with 25% room to grow")
+
+        log_file_size = min(2048, max(64, buffer_pool // 4))
+        self.reasons.append(
+            f"innodb_log_file_size = {log_file_size}M: a quarter of the buffer pool, fewer checkpoints during order peaks"
+        )
+
+        thread_pool_size = sizing["host_cpus"]
+        self.reasons.append(
+            f"thread_handling = pool-of-threads, thread_pool_size = {thread_pool_size}: one thread group per CPU core of the host, "
+            "peaks of connections queue instead of thrashing"
+        )
+
+        table_open_cache = min(4000, max(400, max_connections * 10))
+        self.reasons.append(
+            f"table_open_cache = {table_open_cache}: about ten tables per connection, table_definition_cache = {self.table_count * 4} for the WooCommerce and plugin tables"
+        )
+
+        self.reasons.append(
+            "innodb_flush_log_at_trx_commit = 1: orders must survive a crash; innodb_flush_method = O_DIRECT: no double buffering in the page cache"
+        )
+        self.reasons.append(
+            "long_query_time = 1: queries slower than a second are logged and counted (Slow_queries, see the observability dashboard)"
+        )
+        temporary_tables = 64 if memory >= 1024 else 32
+        return {
+            "character-set-server": "utf8mb4",
+            "collation-server": "utf8mb4_unicode_ci",
+            "skip-name-resolve": "ON",
+            "max_connections": max_connections,
+            "thread_handling": "pool-of-threads",
+            "thread_pool_size": thread_pool_size,
+            "innodb_buffer_pool_size": f"{buffer_pool}M",
+            "innodb_log_file_size": f"{log_file_size}M",
+            "innodb_log_buffer_size": "32M" if sizing["orders"] > 100000 else "16M",
+            "innodb_flush_log_at_trx_commit": 1,
+            "innodb_flush_method": "O_DIRECT",
+            "innodb_io_capacity": 1000,
+            "innodb_file_per_table": "ON",
+            "table_open_cache": table_open_cache,
+            "table_definition_cache": self.table_count * 4,
+            "tmp_table_size": f"{temporary_tables}M",
+            "max_heap_table_size": f"{temporary_tables}M",
+            "query_cache_type": 0,
+            "query_cache_size": 0,
+            "slow_query_log": "ON",
+            "long_query_time": 1,
+        }
+
+    def to_my_cnf(self) -> str:
+        """
+        Returns the my.cnf with the settings and the reasoning as comments.
+        """
+        lines = ["# my.cnf generated by woopy from the project sizing"]
+        lines.extend(f"# {reason}" for reason in self.reasons)
+        lines.append("[mariadbd]")
+        lines.extend(f"{name} = {value}" for name, value in self.settings.items())
+        return "\n".join(lines) + "\n"
+
+    def get_report(self) -> str:
+        """
+        Returns the tuning section of the project report.
+        """
+        return "Database Tuning (mariadb/my.cnf):\n" + "".join(f"- {reason}\n" for reason in self.reasons)
+
+
+class PhpFpmTuning:
+    """
+    PhpFpmTuning class: This class sizes the PHP-FPM pool of the nginx + PHP-FPM website from the project sizing.
+
+    The website tier gets 35% of the host memory (at least 256 MB). After the FPM master and the
+    OPcache, the rest is divided by the average worker size, so the pool never swaps. The pool is
+    capped by the database connections reserved for the PHP workers (see MariaDbTuning).
+    """
+
+    # Memory in MB of the FPM master process and the shared OPcache
+    reserved_memory = 160
+    reserved_for = "the FPM master and OPcache"
+
+    # Memory in MB a worker uses on top of PHP itself
+    worker_overhead = 0
+    workers_setting = "pm.max_children"
+
+    def __init__(self, sizing: dict):
+        self.sizing = sizing
+        self.reasons = []
+        self.settings = self._compute()
+
+    def _get_workers(self) -> int:
+        """
+        Returns the number of workers that fit in the memory of the website tier.
+        """
+        sizing = self.sizing
+        memory = max(256, int(sizing["host_memory"] * 0.35))
+        worker_memory = sizing["php_worker_memory"] + self.worker_overhead
+        self.reasons.append(f"PHP memory: {memory} MB, 35% of the {sizing['host_memory']} MB host memory (at least 256 MB)")
+
+        workers = max(2, (memory - self.reserved_memory) // worker_memory)
+        self.reasons.append(
+            f"{self.workers_setting} = {workers}: ({memory} MB - {self.reserved_memory} MB for {self.reserved_for}) / {worker_memory} MB per worker"
+        )
+        connections = sizing["concurrency"] * 2
+        if workers > connections:
+            workers = connections
+            self.reasons.append(
+                f"{self.workers_setting} = {workers}: limited to the database connections reserved for PHP (two per concurrent shopper)"
+            )
+        elif workers < sizing["concurrency"]:
+            self.reasons.append(
+                f"{sizing['concurrency']} concurrent shoppers share {workers} workers, the other requests wait in the listen queue"
+            )
+        return workers
+
+    def _compute(self) -> dict:
+        max_children = self._get_workers()
+        self.reasons.append(
+            "pm.max_requests = 500: workers are recycled before the memory leaks of plugins add up"
+        )
+        return {
+            "pm": "dynamic",
+            "pm.max_children": max_children,
+            "pm.start_servers": max(1, max_children // 4),
+            "pm.min_spare_servers": max(1, max_children // 8),
+            "pm.max_spare_servers": max(2, max_children // 2),
+            "pm.max_requests": 500,
+            "pm.process_idle_timeout": "10s",
+            "listen.backlog": 511,
+            "request_terminate_timeout": "120s",
+            "php_admin_value[memory_limit]": f"{max(128, self.sizing['php_worker_memory'] * 2)}M",
+            # read by the php-fpm exporter over FastCGI, nginx only passes .php files to the pool
+            "pm.status_path": "/status",
+        }
+
+    def to_pool_conf(self) -> str:
+        """
+        Returns the pool configuration with the reasoning as comments.
+        """
+        lines = ["; PHP-FPM pool generated by woopy from the project sizing"]
+        lines.extend(f"; {reason}" for reason in self.reasons)
+        lines.append("[www]")
+        lines.extend(f"{name} = {value}" for name, value in self.settings.items())
+        return "\n".join(lines) + "\n"
+
+    def get_report(self) -> str:
+        """
+        Returns the tuning section of the project report.
+        """
+        return "PHP-FPM Tuning (php-fpm/zz-woopy.conf):\n" + "".join(f"- {reason}\n" for reason in self.reasons)
+
+
+class ApacheTuning(PhpFpmTuning):
+    """
+    ApacheTuning class: This class sizes the prefork MPM of the Apache website (wordpress:latest) from the project sizing.
+
+    With mod_php every Apache process holds a PHP interpreter, so the processes are sized like the
+    PHP-FPM workers plus the Apache overhead. Short keep-alive connections keep the processes free
+    for new shoppers, mod_deflate and mod_expires make the browsers download and revalidate less.
+    """
+
+    reserved_memory = 128
+    reserved_for = "the Apache parent process and OPcache"
+    worker_overhead = 16
+    workers_setting = "MaxRequestWorkers"
+
+    def _compute(self) -> dict:
+        workers = self._get_workers()
+        self.reasons.append(
+            "KeepAliveTimeout 2: a prefork process waits for the next request of an idle browser, keep that short"
+        )
+        self.reasons.append("MaxConnectionsPerChild 500: processes are recycled before the memory leaks of plugins add up")
+        self.reasons.append(
+            "HTTP/2 needs the event MPM, mod_php needs prefork: the Protocols line only applies without prefork, "
+            "use the nginx-fpm variant or terminate HTTP/2 at a proxy"
+        )
+        return {
+            "StartServers": max(2, workers // 4),
+            "MinSpareServers": max(2, workers // 8),
+            "MaxSpareServers": max(4, workers // 2),
+            "ServerLimit": workers,
+            "MaxRequestWorkers": workers,
+            "MaxConnectionsPerChild": 500,
+        }
+
+    def to_apache_conf(self) -> str:
+        """
+        Returns the Apache configuration with the reasoning as comments.
+        """
+        reasons = "\n".join(f"# {reason}" for reason in self.reasons)
+        prefork = "\n".join(f"    {name} {value}" for name, value in self.settings.items())
+        return f"""# Apache configuration generated by woopy from the project sizing
+{reasons}
+
+<IfModule mpm_prefork_module>
+{prefork}
+</IfModule>
+
+KeepAlive On
+KeepAliveTimeout 2
+MaxKeepAliveRequests 100
+Timeout 60
+ServerTokens Prod
+ServerSignature Off
+
+<IfModule http2_module>
+    <IfModule !mpm_prefork_module>
+        Protocols h2 h2c http/1.1
+    </IfModule>
+</IfModule>
+
+<IfModule mod_deflate.c>
+    AddOutputFilterByType DEFLATE text/html text/plain text/xml text/css text/javascript
+    AddOutputFilterByType DEFLATE application/javascript application/json application/xml application/rss+xml image/svg+xml
+</IfModule>
+
+# Scoreboard for the apache exporter: only direct requests from the project network, the page
+# cache and the proxy add X-Forwarded-For. RewriteEngine Off keeps the WordPress rewrite away.
+<IfModule mod_status.c>
+    ExtendedStatus On
+    <Location "/server-status">
+        SetHandler server-status
+        RewriteEngine Off
+        <RequireAll>
+            Require ip 10.0.0.0/8 172.16.0.0/12 192.168.0.0/16
+            Require expr -z %{{HTTP:X-Forwarded-For}}
+        </RequireAll>
+    </Location>
+</IfModule>
+
+<IfModule mod_expires.c>
+    ExpiresActive On
+    ExpiresDefault "access plus 0 seconds"
+    ExpiresByType text/css "access plus 30 days"
+    ExpiresByType application/javascript "access plus 30 days"
+    ExpiresByType text/javascript "access plus 30 days"
+    ExpiresByType image/jpeg "access plus 30 days"
+    ExpiresByType image/png "access plus 30 days"
+    ExpiresByType image/gif "access plus 30 days"
+    ExpiresByType image/webp "access plus 30 days"
+    ExpiresByType image/avif "access plus 30 days"
+    ExpiresByType image/svg+xml "access plus 30 days"
+    ExpiresByType image/x-icon "access plus 30 days"
+    ExpiresByType font/woff2 "access plus 1 year"
+</IfModule>
+"""
+
+    def get_report(self) -> str:
+        """
+        Returns the tuning section of the project report.
+        """
+        return "Apache Tuning (apache/zz-woopy.conf):\n" + "".join(f"- {reason}\n" for reason in self.reasons)
+
+
+class MonitoringTuning:
+    """
+    MonitoringTuning class: This class tunes cAdvisor (monitoring) for a CPU overhead budget.
+
+    cAdvisor reads the cgroup files of every container at every housekeeping, its CPU cost grows
+    with the number of containers and the metric families it collects. The preset decides the metric
+    families, docker-only mode and the storage duration, the housekeeping interval is the shortest one
+    that keeps the estimated overhead within the budget (percent of one CPU core).
+    """
+
+    # Estimated cost in CPU milliseconds to collect a metric family of one container
+    collection_cost = {
+        "cpu": 0.3,
+        "memory": 0.3,
+        "network": 0.5,
+        "diskIO": 0.4,
+        "disk": 1.5,
+        "percpu": 0.4,
+        "accelerator": 0.1,
+        "app": 0.1,
+        "oom_event": 0.05,
+        "sched": 0.3,
+        "process": 1.0,
+        "tcp": 2.0,
+        "udp": 1.5,
+        "advtcp": 2.0,
+        "hugetlb": 0.1,
+        "referenced_memory": 3.0,
+        "cpu_topology": 0.3,
+        "cpuset": 0.1,
+        "memory_numa": 0.3,
+        "resctrl": 0.3,
+    }
+
+    # Overhead of cAdvisor itself (HTTP server, Prometheus scrapes) in percent of one core, and its memory in MB
+    base_cpu = 0.2
+    base_memory = 30
+
+    # Cgroups of the host outside Docker (system services), only watched without docker-only mode
+    system_cgroups = 15
+
+    housekeeping_intervals = (1, 2, 5, 10, 15, 30, 60)
+
+    def __init__(self, preset: str, cpu_budget: float = None, containers: int = 25):
+        self.preset = preset
+        self.preset_settings = MONITORING_PRESETS[preset]
+        self.cpu_budget = cpu_budget or self.preset_settings["cpu_budget"]
+        self.containers = containers
+        self.reasons = []
+        self.settings = self._compute()
+
+    def _estimate_cpu(self, cgroups: int, interval: int) -> float:
+        """
+        Returns the estimated CPU overhead in percent of one core.
+        """
+        cost = sum(self.collection_cost[name] for name in self.enabled_metrics)
+        return self.base_cpu + cgroups * cost / (interval * 1000) * 100
+
+    def _compute(self) -> dict:
+        preset = self.preset_settings
+        self.enabled_metrics = [name for name in self.collection_cost if name not in preset["disable_metrics"]]
+        self.reasons.append(
+            f"Preset {self.preset}: collects {', '.join(self.enabled_metrics)}; "
+            f"disables {', '.join(preset['disable_metrics'])}"
+        )
+
+        cgroups = self.containers if preset["docker_only"] else self.containers + self.system_cgroups
+        if preset["docker_only"]:
+            self.reasons.append("docker_only = true: only the containers are watched, not the cgroups of the host services")
+        else:
+            self.reasons.append(f"docker_only = false: the containers and about {self.system_cgroups} host cgroups are watched")
+
+        interval = self.housekeeping_intervals[-1]
+        for candidate in self.housekeeping_intervals:
+            if self._estimate_cpu(cgroups, candidate) <= self.cpu_budget:
+                interval = candidate
+                break
+        self.cpu = round(self._estimate_cpu(cgroups, interval), 2)
+        self.reasons.append(
+            f"housekeeping_interval = {interval}s: the shortest interval within the {self.cpu_budget:g}% CPU budget "
+            f"for {cgroups} cgroups (the cAdvisor default of 1s would cost {self._estimate_cpu(cgroups, 1):.1f}%)"
+        )
+
+        storage_seconds = preset["storage_duration"]
+        samples = max(1, storage_seconds // interval)
+        self.memory = int(self.base_memory + cgroups * len(self.enabled_metrics) * samples * 0.02)
+        self.reasons.append(
+            f"storage_duration = {storage_seconds}s: Prometheus keeps the history, cAdvisor keeps {samples} samples per container"
+        )
+        self.reasons.append("store_container_labels = false: fewer series, only the container names are exported")
+        return {
+            "housekeeping_interval": f"{interval}s",
+            "max_housekeeping_interval": f"{interval * 2}s",
+            "allow_dynamic_housekeeping": "true",
+            "docker_only": "true" if preset["docker_only"] else "false",
+            "storage_duration": f"{storage_seconds}s",
+            "disable_metrics": ",".join(preset["disable_metrics"]),
+            "store_container_labels": "false",
+        }
+
+    def get_arguments(self) -> list:
+        """
+        Returns the cAdvisor command line arguments.
+        """
+        return [f"--{name}={value}" for name, value in self.settings.items()]
+
+    def get_report(self) -> str:
+        """
+        Returns the monitoring section of the project report.
+        """
+        return (
+            f"Monitoring Overhead: about {self.cpu:g}% of one CPU core and {self.memory} MB "
+            f"for {self.containers} containers (preset {self.preset}, budget {self.cpu_budget:g}%)\n"
+            + "".join(f"- {reason}\n" for reason in self.reasons)
+        )
+
+
+class StorePerformance:
+    """
+    StorePerformance class: This class is the WooCommerce performance profile of the website.
+
+    The wp-config.php constants go to WORDPRESS_CONFIG_EXTRA, the WooCommerce options are applied by
+    woosh.sh (WOOPY_STORE_OPTIONS) with High-Performance Order Storage, and the request hooks are a
+    must-use plugin (wordpress/woopy-performance.php): cart fragments only on the cart and checkout
+    pages, no marketing suggestions and no remote WooCommerce Admin jobs, and the WooCommerce emails
+    of the visitor requests are queued for the wp-cli worker instead of being sent during the checkout.
+    """
+
+    # WooCommerce Admin features that only fetch marketing and remote content in the background
+    marketing_features = (
+        "marketing",
+        "remote-inbox-notifications",
+        "remote-free-extensions",
+        "payment-gateway-suggestions",
+        "shipping-label-banner",
+        "wc-pay-promotion",
+    )
+
+    # wp_mail uses the SMTP service of the website (WORDPRESS_SMTP_HOST), the WooCommerce emails of the
+    # visitor requests are spooled in wp-content/woopy-mail (Action Scheduler arguments are limited in
+    # size) and sent by the worker (woopy_send_mail actions)
+    mail_hooks = """
+// wp_mail sends through the SMTP service of the project: the mail relay or the mail server
+add_action('phpmailer_init', function ($phpmailer) {
+    if (getenv('WORDPRESS_SMTP_HOST')) {
+        $phpmailer->isSMTP();
+        $phpmailer->Host = getenv('WORDPRESS_SMTP_HOST');
+        $phpmailer->Port = (int) getenv('WORDPRESS_SMTP_PORT');
+        $phpmailer->SMTPAuth = false;
+        $phpmailer->SMTPAutoTLS = false;
+        $phpmailer->Timeout = 10;
+    }
+});
+
+// The WooCommerce emails of the visitor requests (the order confirmations of the checkout) are queued,
+// the wp-cli worker sends them: the checkout does not wait for the SMTP server
+add_filter('woocommerce_mail_callback', function ($callback) {
+    if ((defined('WP_CLI') && WP_CLI) || wp_doing_cron() || !function_exists('as_enqueue_async_action')) {
+        return $callback;
+    }
+    return 'woopy_queue_mail';
+});
+
+function woopy_queue_mail($to, $subject, $message, $headers = '', $attachments = array())
+{
+    $spool = WP_CONTENT_DIR . '/woopy-mail';
+    $id = wp_generate_password(32, false);
+    if (!wp_mkdir_p("$spool/$id")) {
+        return wp_mail($to, $subject, $message, $headers, $attachments);
+    }
+    if (!file_exists("$spool/.htaccess")) {
+        file_put_contents("$spool/.htaccess", "Require all denied\\n");
+    }
+    // the attachments are copied, the plugins that create them may delete them after the request
+    $files = array();
+    foreach ((array) $attachments as $attachment) {
+        $file = "$spool/$id/" . basename($attachment);
+        if (copy($attachment, $file)) {
+            $files[] = $file;
+        }
+    }
+    $mail = array('to' => $to, 'subject' => $subject, 'message' => $message, 'headers' => $headers, 'attachments' => $files);
+    file_put_contents("$spool/$id.php", '<?php exit; ?>' . wp_json_encode($mail));
+    as_enqueue_async_action('woopy_send_mail', array($id, 1), 'woopy-mail');
+    return true;
+}
+
+// Sends a queued mail, a failed delivery is retried 5 times with a growing delay
+add_action('woopy_send_mail', function ($id, $attempt = 1) {
+    $spool = WP_CONTENT_DIR . '/woopy-mail';
+    $id = basename($id);
+    if (!is_file("$spool/$id.php")) {
+        return;
+    }
+    $mail = json_decode(substr(file_get_contents("$spool/$id.php"), strlen('<?php exit; ?>')), true);
+    if (wp_mail($mail['to'], $mail['subject'], $mail['message'], $mail['headers'], $mail['attachments'])) {
+        array_map('unlink', $mail['attachments']);
+        rmdir("$spool/$id");
+        unlink("$spool/$id.php");
+    } elseif ($attempt < 5) {
+        as_schedule_single_action(time() + 60 * $attempt * $attempt, 'woopy_send_mail', array($id, $attempt + 1), 'woopy-mail');
+    } else {
+        throw new RuntimeException("mail $id could not be sent after $attempt attempts, it is kept in $spool");
+    }
+}, 10, 2);
+"""
+
+    def __init__(self, preset: str):
+        self.preset = preset
+        self.preset_settings = STORE_PRESETS[preset]
+        self.reasons = []
+        self.constants = self._compute_constants()
+        self.options = self._compute_options()
+
+    def _compute_constants(self) -> dict:
+        preset = self.preset_settings
+        self.reasons.append(
+            f"WP_MEMORY_LIMIT = {preset['memory_limit']}, WP_MAX_MEMORY_LIMIT = {preset['max_memory_limit']}: "
+            "room for WooCommerce requests, the admin and the imports get the larger limit"
+        )
+        self.reasons.append(
+            f"WP_POST_REVISIONS = {preset['post_revisions']}, AUTOSAVE_INTERVAL = {preset['autosave_interval']}s: "
+            "products and pages keep a few revisions, the posts table does not grow with every edit"
+        )
+        return {
+            "WP_MEMORY_LIMIT": preset["memory_limit"],
+            "WP_MAX_MEMORY_LIMIT": preset["max_memory_limit"],
+            "WP_POST_REVISIONS": preset["post_revisions"],
+            "AUTOSAVE_INTERVAL": preset["autosave_interval"],
+            "EMPTY_TRASH_DAYS": preset["empty_trash_days"],
+        }
+
+    def _compute_options(self) -> dict:
+        preset = self.preset_settings
+        self.reasons.append(
+            "High-Performance Order Storage: the orders live in the custom order tables, "
+            "the sync with the posts table is disabled once they are migrated"
+        )
+        self.reasons.append("Cart fragments: the mini cart AJAX request only runs on the cart and checkout pages")
+        self.reasons.append(
+            "Marketing: no usage tracking, marketplace suggestions, merchant emails, order attribution "
+            f"or remote WooCommerce Admin content ({', '.join(self.marketing_features)})"
+        )
+        if preset["analytics"]:
+            self.reasons.append("Analytics: enabled, the order import is small for this catalogue")
+        else:
+            self.reasons.append("Analytics: disabled, its import jobs would process every order in the background")
+        if preset["attribute_lookup_direct_updates"]:
+            self.reasons.append("Attribute lookup table: updated when a product is saved")
+        else:
+            self.reasons.append("Attribute lookup table: updated by Action Scheduler jobs, saving a product stays fast")
+        if not preset["background_image_regeneration"]:
+            self.reasons.append("Thumbnails: no background regeneration of the whole catalogue when the image sizes change")
+        self.reasons.append(
+            "Emails: the WooCommerce emails of the checkout and the other visitor requests are queued (Action Scheduler), "
+            "the wp-cli worker sends them, failed deliveries are retried 5 times"
+        )
+        return {
+            "woocommerce_allow_tracking": "no",
+            "woocommerce_show_marketplace_suggestions": "no",
+            "woocommerce_merchant_email_notifications": "no",
+            "woocommerce_feature_order_attribution_enabled": "no",
+            "woocommerce_analytics_enabled": "yes" if preset["analytics"] else "no",
+            "woocommerce_attribute_lookup_direct_updates": "yes" if preset["attribute_lookup_direct_updates"] else "no",
+        }
+
+    def get_options(self) -> str:
+        """
+        Returns the WooCommerce options applied by woosh.sh (WOOPY_STORE_OPTIONS): name=value separated by spaces.
+        """
+        return " ".join(f"{name}={value}" for name, value in self.options.items())
+
+    def to_mu_plugin(self) -> str:
+        """
+        Returns the must-use plugin with the request hooks of the profile.
+        """
+        features = self.marketing_features + (() if self.preset_settings["analytics"] else ("analytics",))
+        features = ", ".join(f"'{feature}'" for feature in features)
+        image_regeneration = (
+            ""
+            if self.preset_settings["background_image_regeneration"]
+            else """
+// The thumbnails of a large catalogue are not regenerated in the background when the image sizes change
+add_filter('woocommerce_background_image_regeneration', '__return_false');
+"""
+        )
+        return f"""<?php
+/**
+ * Plugin Name: Woopy performance profile
+ * Description: WooCommerce performance profile generated by woopy (preset {self.preset}).
+ */
+
+// The cart fragments AJAX request runs on every page view, only the cart and checkout pages need it
+add_action('wp_enqueue_scripts', function () {{
+    if (function_exists('is_cart') && !is_cart() && !is_checkout()) {{
+        wp_dequeue_script('wc-cart-fragments');
+    }}
+}}, 99);
+
+// Action Scheduler runs in the wp-cli worker, the admin requests do not start its async runner
+add_filter('action_scheduler_allow_async_request_runner', '__return_false');
+
+// No marketing suggestions and no remote content fetched by WooCommerce Admin
+add_filter('woocommerce_allow_marketplace_suggestions', '__return_false');
+add_filter('woocommerce_admin_features', function ($features) {{
+    return array_values(array_diff($features, [{features}]));
+}});
+{image_regeneration}{self.mail_hooks}"""
+
+    def get_report(self) -> str:
+        """
+        Returns the store performance section of the project report.
+        """
+        return f"Store Performance: preset {self.preset}\n" + "".join(f"- {reason}\n" for reason in self.reasons)
+
+
+class CompiledTemplate:
+    """
+    CompiledTemplate class: a text with {{name}} placeholders, split once into literal parts
+    and placeholder names, so rendering is a single join.
+    """
+
+    placeholder = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+    def __init__(self, text: str):
+        self.parts = self.placeholder.split(text)
+
+    def render(self, values: dict) -> str:
+        parts = self.parts[:]
+        # the odd parts are the placeholder names
+        for index in range(1, len(parts), 2):
+            parts[index] = str(values[parts[index]])
+        return "".join(parts)
+
+
+class CatalogueService:
+    """
+    CatalogueService class: a service of the service catalogue in a project.
+    It has the same renderers as the service classes: to_docker_compose, to_kubernetes, to_vagrant.
+    """
+
+    def __init__(self, definition: "ServiceDefinition", values: dict):
+        self.definition = definition
+        self.name = definition.name
+        self.values = values
+
+    def to_docker_compose(self):
+        """
+        This function returns the docker-compose.yml data for the service
+        """
+        return self.definition.docker_compose.render(self.values)
+
+    def to_kubernetes(self):
+        """
+        This function returns the kubernetes.yml data for the service
+        """
+        return self.definition.kubernetes.render(self.values)
+
+    def to_vagrant(self):
+        """
+        This function returns the Vagrantfile data for the service
+        """
+        return self.definition.vagrant.render(self.values)
+
+    def get_volumes(self):
+        """
+        This function returns the named volumes of the service
+        """
+        return [volume.render(self.values) for volume in self.definition.named_volumes]
+
+
+class ServiceDefinition:
+    """
+    ServiceDefinition class: a declarative service definition (YAML), compiled into a
+    renderer per output format.
+
+    Definition keys:
+        name, image (required), ports, environment, volumes, command, healthcheck, depends_on,
+        resources (cpus, memory, disk, stateful, global) and generate (value name -> password,
+        username or email).
+    The strings can use {{site_title}}, {{site_url}}, {{network}}, {{name}}, the generated values and
+    the generated values of the catalogue services in depends_on as {{<service>_<value>}}.
+    """
+
+    generators = {
+        "password": lambda values: generate_password(),
+        "username": lambda values: generate_username(),
+        "email": lambda values: generate_email(values["site_url"], values["name"]),
+    }
+
+    def __init__(self, definition: dict):
+        self.name = definition["name"]
+        self.definition = definition
+        self.generate = definition.get("generate", {})
+        for value_name, generator in self.generate.items():
+            if generator not in self.generators:
+                raise ValueError(f"{self.name}: unknown generator {generator} for {value_name}")
+        self.resources = {**DEFAULT_RESOURCE_PROFILE, **definition.get("resources", {})}
+        self.named_volumes = [
+            CompiledTemplate(volume.split(":", 1)[0])
+            for volume in definition.get("volumes", [])
+            if not volume.startswith((".", "/", "~"))
+        ]
+        self.docker_compose = CompiledTemplate(self._compile_docker_compose())
+        self.kubernetes = CompiledTemplate(self._compile_kubernetes())
+        self.vagrant = CompiledTemplate(self._compile_vagrant())
+
+    def _compile_docker_compose(self) -> str:
+        service = {"image": self.definition["image"], "container_name": "{{name}}", "hostname": "{{name}}"}
+        for key in ("command", "environment", "volumes", "ports", "depends_on", "healthcheck"):
+            if key in self.definition:
+                service[key] = self.definition[key]
+        if isinstance(service.get("depends_on"), list):
+            # the dependencies are health gated, like the services of the service classes
+            service["depends_on"] = {name: {"condition": "service_healthy"} for name in service["depends_on"]}
+        service["networks"] = ["{{network}}"]
+        service["restart"] = "unless-stopped"
+        # same logging configuration as get_logging()
+        service["logging"] = {"driver": "json-file", "options": {"max-size": "10m", "max-file": "5"}}
+        if not self.resources["global"]:
+            service["deploy"] = {
+                "resources": {
+                    "limits": {"cpus": str(self.resources["cpus"]), "memory": f"{self.resources['memory']}M"}
+                }
+            }
+        body = yaml.safe_dump({"{{name}}": service}, sort_keys=False, indent=4, width=1000)
+        body = body.replace("'{{name}}':", "{{name}}:", 1)
+        return "\n" + "".join(f"    {line}\n" for line in body.splitlines())
+
+    def _compile_kubernetes(self) -> str:
+        container = {"name": "{{name}}", "image": self.definition["image"]}
+        if "command" in self.definition:
+            command = self.definition["command"]
+            container["command"] = command if isinstance(command, list) else ["/bin/sh", "-c", command]
+        ports = [str(port).rsplit(":", 1)[-1].split("/")[0] for port in self.definition.get("ports", [])]
+        if ports:
+            container["ports"] = [{"containerPort": int(port)} for port in ports]
+        environment = self.definition.get("environment", {})
+        if isinstance(environment, list):
+            environment = dict(item.split("=", 1) for item in environment)
+        if environment:
+            container["env"] = [{"name": name, "value": str(value)} for name, value in environment.items()]
+        deployment = {
+            "apiVersion": "apps/v1",
+            "kind": "Deployment",
+            "metadata": {"name": "{{name}}", "labels": {"app": "{{name}}"}},
+            "spec": {
+                "replicas": 1,
+                "selector": {"matchLabels": {"app": "{{name}}"}},
+                "template": {
+                    "metadata": {"labels": {"app": "{{name}}"}},
+                    "spec": {"containers": [container], "restartPolicy": "Always"},
+                },
+            },
+        }
+        return "\n" + yaml.safe_dump(deployment, sort_keys=False, width=1000)
+
+    def _compile_vagrant(self) -> str:
+        arguments = " ".join(f"-p {port}" for port in self.definition.get("ports", []))
+        environment = self.definition.get("environment", {})
+        if isinstance(environment, dict):
+            environment = [f"{name}={value}" for name, value in environment.items()]
+        arguments += "".join(f" -e '{item}'" for item in environment)
+        return f"""
+    config.vm.define "{{{{name}}}}" do |service|
+        service.vm.box = "bento/ubuntu-20.04"
+        service.vm.hostname = "{{{{name}}}}"
+        service.vm.provision "docker" do |docker|
+            docker.run "{{{{name}}}}", image: "{self.definition['image']}", args: "{arguments.strip()}"
+        end
+    end
+"""
+
+    def get_dependencies(self) -> list:
+        """
+        Returns the names of the services in depends_on
+        """
+        depends_on = self.definition.get("depends_on") or []
+        return [depends_on] if isinstance(depends_on, str) else list(depends_on)
+
+    def create(self, site_title: str, site_url: str, values: dict = None, dependencies: list = ()) -> CatalogueService:
+        """
+        Creates the service for a project. The values are generated unless they are given
+        (a project restored from the registry). The generated values of the catalogue services
+        it depends on are added as <service>_<value>.
+        """
+        if values is None:
+            values = {
+                "name": self.name,
+                "site_title": site_title,
+                "site_url": site_url,
+                "network": f"{site_title}-network",
+            }
+            for value_name, generator in self.generate.items():
+                values[value_name] = self.generators[generator](values)
+            for dependency in dependencies:
+                for value_name in dependency.definition.generate:
+                    values[f"{dependency.name}_{value_name}"] = dependency.values[value_name]
+        return CatalogueService(self, values)
+
+
+class ServiceCatalogue:
+    """
+    ServiceCatalogue class: This class loads the declarative service definitions
+    (one YAML file per service) and keeps them compiled.
+
+    The directory is checked for changes at most every reload_interval seconds, changed
+    definitions are compiled again without restarting the application.
+
+    Configuration (environment variables):
+        WOOPY_CATALOGUE_PATH: directory of the definitions (default res/services)
+        WOOPY_CATALOGUE_RELOAD: seconds between two checks for changes (default 2)
+    """
+
+    def __init__(self, path: str, reload_interval: float = 2.0):
+        self.path = path
+        self.reload_interval = reload_interval
+        self.definitions = {}
+        self.signature = None
+        self.checked = 0.0
+        self.lock = threading.Lock()
+
+    def _get_signature(self):
+        try:
+            return tuple(
+                sorted(
+                    (entry.name, entry.stat().st_mtime_ns)
+                    for entry in os.scandir(self.path)
+                    if entry.name.endswith((".yml", ".yaml"))
+                )
+            )
+        except FileNotFoundError:
+            return ()
+
+    def get_definitions(self) -> dict:
+        """
+        Returns the compiled definitions, reloaded when the directory changed.
+        """
+        now = time.monotonic()
+        if now - self.checked < self.reload_interval:
+            return self.definitions
+        with self.lock:
+            self.checked = now
+            signature = self._get_signature()
+            if signature != self.signature:
+                self.reload(signature)
+        return self.definitions
+
+    def reload(self, signature=None):
+        """
+        Loads and compiles every definition. A definition that fails to compile is logged and
+        its previous version is kept.
+        """
+        definitions = {}
+        for file_name, _ in signature if signature is not None else self._get_signature():
+            try:
+                with open(os.path.join(self.path, file_name)) as definition_file:
+                    definition = ServiceDefinition(yaml.load(definition_file, Loader=YamlLoader))
+            except (OSError, KeyError, ValueError, yaml.YAMLError) as error:
+                logging.error("Service definition %s is invalid: %s", file_name, error)
+                name = os.path.splitext(file_name)[0]
+                if name in self.definitions:
+                    definitions[name] = self.definitions[name]
+                continue
+            definitions[definition.name] = definition
+            SERVICE_RESOURCE_PROFILES[definition.name] = definition.resources
+        self.definitions = definitions
+        self.signature = signature if signature is not None else self._get_signature()
+        logging.info("Service catalogue loaded: %s", ", ".join(sorted(definitions)) or "empty")
+
+    def create_services(self, names: list, site_title: str, site_url: str) -> list:
+        """
+        Creates the catalogue services for a project, with the catalogue services they depend on
+        (created before them). Raises ValueError for unknown services and dependency cycles.
+        """
+        definitions = self.get_definitions()
+        unknown = [name for name in names if name not in definitions]
+        if unknown:
+            raise ValueError(f"unknown services: {', '.join(unknown)}")
+
+        services = {}
+
+        def create(name, chain):
+            if name in chain:
+                raise ValueError(f"dependency cycle: {' -> '.join(chain + [name])}")
+            if name in services:
+                return
+            # depends_on can also name the services of the project (website, database, ...)
+            dependencies = [dependency for dependency in definitions[name].get_dependencies() if dependency in definitions]
+            for dependency in dependencies:
+                create(dependency, chain + [name])
+            services[name] = definitions[name].create(
+                site_title, site_url, dependencies=[services[dependency] for dependency in dependencies]
+            )
+
+        for name in names:
+            create(name, [])
+        return list(services.values())
+
+    def restore_service(self, name: str, values: dict) -> CatalogueService:
+        """
+        Creates a catalogue service with stored values.
+        """
+        return self.get_definitions()[name].create(values["site_title"], values["site_url"], values)
+
+
+service_catalogue = ServiceCatalogue(
+    path=os.getenv(
+        "WOOPY_CATALOGUE_PATH",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "res", "services"),
+    ),
+    reload_interval=float(os.getenv("WOOPY_CATALOGUE_RELOAD", "2")),
+)
+
+
+
+class ProjectLicense:
+    """
+    ProjectLicense class: This class is used to create a LICENSE file for the project
+    """
+
+    def __init__(self):
+        self.license_content = """
+    Fully open-source & libre software. You can use, modify, and distribute it.
+
+                                     Apache License
+                           Version 2.0, January 2004
+                        http://www.apache.org/licenses/
+
+   TERMS AND CONDITIONS FOR USE, REPRODUCTION, AND DISTRIBUTION
+
+   1. Definitions.
+
+      "License" shall mean the terms and conditions for use, reproduction,
+      and distribution as defined by Sections 1 through 9 of this document.
+
+      "Licensor" shall mean the copyright owner or entity authorized by
+      the copyright owner that is granting the License.
+
+      "Legal Entity" shall mean the union of the acting entity and all
+      other entities that control, are controlled by, or are under common
+      control with that entity. For the purposes of this definition,
+      "control" means (i) the power, direct or indirect, to cause the
+      direction or management of such entity, whether by contract or
+      otherwise, or (ii) ownership of fifty percent (50%) or more of the
+      outstanding shares, or (iii) beneficial ownership of such entity.
+
+      "You" (or "Your") shall mean an individual or Legal Entity
+      exercising permissions granted by this License.
+
+      "Source" form shall mean the preferred form for making modifications,
+      including but not limited to software source code, documentation
+      source, and configuration files.
+
+      "Object" form shall mean any form resulting from mechanical
+      transformation or translation of a Source form, including but
+      not limited to compiled object code, generated documentation,
+      and conversions to other media types.
+
+      "Work" shall mean the work of authorship, whether in Source or
+      Object form, made available under the License, as indicated by a
+      copyright notice that is included in or attached to the work
+      (an example is provided in the Appendix below).
+
+      "Derivative Works" shall mean any work, whether in Source or Object
+      form, that is based on (or derived from) the Work and for which the
+      editorial revisions, annotations, elaborations, or other modifications
+      represent, as a whole, an original work of authorship. For the purposes
+      of this License, Derivative Works shall not include works that remain
+      separable from, or merely link (or bind by name) to the interfaces of,
+      the Work and Derivative Works thereof.
+
+      "Contribution" shall mean any work of authorship, including
+      the original version of the Work and any modifications or additions
+      to that Work or Derivative Works thereof, that is intentionally
+      submitted to Licensor for inclusion in the Work by the copyright owner
+      or by an individual or Legal Entity authorized to submit on behalf of
+      the copyright owner. For the purposes of this definition, "submitted"
+      means any form of electronic, verbal, or written communication sent
+      to the Licensor or its representatives, including but not limited to
+      communication on electronic mailing lists, source code control systems,
+      and issue tracking systems that are managed by, or on behalf of, the
+      Licensor for the purpose of discussing and improving the Work, but
+      excluding communication that is conspicuously marked or otherwise
+      designated in writing by the copyright owner as "Not a Contribution."
+
+      "Contributor" shall mean Licensor and any individual or Legal Entity
+      on behalf of whom a Contribution has been received by Licensor and
+      subsequently incorporated within the Work.
+
+   2. Grant of Copyright License. Subject to the terms and conditions of
+      this License, each Contributor hereby grants to You a perpetual,
+      worldwide, non-exclusive, no-charge, royalty-free, irrevocable
+      copyright license to reproduce, prepare Derivative Works of,
+      publicly display, publicly perform, sublicense, and distribute the
+      Work and such Derivative Works in Source or Object form.
+
+   3. Grant of Patent License. Subject to the terms and conditions of
+      this License, each Contributor hereby grants to You a perpetual,
+      worldwide, non-exclusive, no-charge, royalty-free, irrevocable
+      (except as stated in this section) patent license to make, have made,
+      use, offer to sell, sell, import, and otherwise transfer the Work,
+      where such license applies only to those patent claims licensable
+      by such Contributor that are necessarily infringed by their
+      Contribution(s) alone or by combination of their Contribution(s)
+      with the Work to which such Contribution(s) was submitted. If You
+      institute patent litigation against any entity (including a
+      cross-claim or counterclaim in a lawsuit) alleging that the Work
+      or a Contribution incorporated within the Work constitutes direct
+      or contributory patent infringement, then any patent licenses
+      granted to You under this License for that Work shall terminate
+      as of the date such litigation is filed.
+
+   4. Redistribution. You may reproduce and distribute copies of the
+      Work or Derivative Works thereof in any medium, with or without
+      modifications, and in Source or Object form, provided that You
+      meet the following conditions:
+
+      (a) You must give any other recipients of the Work or
+          Derivative Works a copy of this License; and
+
+      (b) You must cause any modified files to carry prominent notices
+          stating that You changed the files; and
+
+      (c) You must retain, in the Source form of any Derivative Works
+          that You distribute, all copyright, patent, trademark, and
+          attribution notices from the Source form of the Work,
+          excluding those notices that do not pertain to any part of
+          the Derivative Works; and
+
+      (d) If the Work includes a "NOTICE" text file as part of its
+          distribution, then any Derivative Works that You distribute must
+          include a readable copy of the attribution notices contained
+          within such NOTICE file, excluding those notices that do not
+          pertain to any part of the Derivative Works, in at least one
+          of the following places: within a NOTICE text file distributed
+          as part of the Derivative Works; within the Source form or
+          documentation, if provided along with the Derivative Works; or,
+          within a display generated by the Derivative Works, if and
+          wherever such third-party notices normally appear. The contents
+          of the NOTICE file are for informational purposes only and
+          do not modify the License. You may add Your own attribution
+          notices within Derivative Works that You distribute, alongside
+          or as an addendum to the NOTICE text from the Work, provided
+          that such additional attribution notices cannot be construed
+          as modifying the License.
+
+      You may add Your own copyright statement to Your modifications and
+      may provide additional or different license terms and conditions
+      for use, reproduction, or distribution of Your modifications, or
+      for any such Derivative Works as a whole, provided Your use,
+      reproduction, and distribution of the Work otherwise complies with
+      the conditions stated in this License.
+
+   5. Submission of Contributions. Unless You explicitly state otherwise,
+      any Contribution intentionally submitted for inclusion in the Work
+      by You to the Licensor shall be under the terms and conditions of
+      this License, without any additional terms or conditions.
+      Notwithstanding the above, nothing herein shall supersede or modify
+      the terms of any separate license agreement you may have executed
+      with Licensor regarding such Contributions.
+
+   6. Trademarks. This License does not grant permission to use the trade
+      names, trademarks, service marks, or product names of the Licensor,
+      except as required for reasonable and customary use in describing the
+      origin of the Work and reproducing the content of the NOTICE file.
+
+   7. Disclaimer of Warranty. Unless required by applicable law or
+      agreed to in writing, Licensor provides the Work (and each
+      Contributor provides its Contributions) on an "AS IS" BASIS,
+      WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+      implied, including, without limitation, any warranties or conditions
+      of TITLE, NON-INFRINGEMENT, MERCHANTABILITY, or FITNESS FOR A
+      PARTICULAR PURPOSE. You are solely responsible for determining the
+      appropriateness of using or redistributing the Work and assume any
+      risks associated with Your exercise of permissions under this License.
+
+   8. Limitation of Liability. In no event and under no legal theory,
+      whether in tort (including negligence), contract, or otherwise,
+      unless required by applicable law (such as deliberate and grossly
+      negligent acts) or agreed to in writing, shall any Contributor be
+      liable to You for damages, including any direct, indirect, special,
+      incidental, or consequential damages of any character arising as a
+      result of this License or out of the use or inability to use the
+      Work (including but not limited to damages for loss of goodwill,
+      work stoppage, computer failure or malfunction, or any and all
+      other commercial damages or losses), even if such Contributor
+      has been advised of the possibility of such damages.
+
+   9. Accepting Warranty or Additional Liability. While redistributing
+      the Work or Derivative Works thereof, You may choose to offer,
+      and charge a fee for, acceptance of support, warranty, indemnity,
+      or other liability obligations and/or rights consistent with this
+      License. However, in accepting such obligations, You may act only
+      on Your own behalf and on Your sole responsibility, not on behalf
+      of any other Contributor, and only if You agree to indemnify,
+      defend, and hold each Contributor harmless for any liability
+      incurred by, or claims asserted against, such Contributor by reason
+      of your accepting any such warranty or additional liability.
+
+   END OF TERMS AND CONDITIONS
+
+   APPENDIX: How to apply the Apache License to your work.
+
+      To apply the Apache License to your work, attach the following
+      boilerplate notice, with the fields enclosed by brackets "[]"
+      replaced with your own identifying information. (Don't include
+      the brackets!)  The text should be enclosed in the appropriate
+      comment syntax for the file format. We also recommend that a
+      file or class name and description of purpose be included on the
+      same "printed page" as the copyright notice for easier
+      identification within third-party archives.
+
+   Copyright [yyyy] [name of copyright owner]
+
+   Licensed under the Apache License, Version 2.0 (the "License");
+   you may not use this file except in compliance with the License.
+   You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+   Unless required by applicable law or agreed to in writing, software
+   distributed under the License is distributed on an "AS IS" BASIS,
+   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+   See the License for the specific language governing permissions and
+   limitations under the License.
+
+
+    """
+
+    def get_license(self):
+        """
+        Returns the license content.
+        """
+        return self.license_content
+
+
+class Contributing:
+    """
+    Contributing class: This class is used to create a CONTRIBUTING.md file for the project
+    """
+
+    def __init__(self):
+        self.contributing_content = """
+    # Contributing
+
+    We welcome contributions to the project. To contribute, please follow these steps:
+
+    1. Fork the repository
+    2. Create a new branch
+    3. Make your changes
+    4. Submit a pull request
+
+    """
+
+    def get_contributing(self):
+        """
+        Returns the contributing content.
+        """
+        return self.contributing_content
+
+
+class CodeOfConduct:
+    """
+    CodeOfConduct class: This class is used to create a CODE_OF_CONDUCT.md file for the project
+    """
+
+    def __init__(self):
+        self.code_of_conduct_content = """
+    # Code of Conduct
+
+    We are committed to providing a friendly, safe, and welcoming environment for everyone, regardless of level of experience
+    
+    """
 
-This service is based on Traefik. It is used to route the traffic for the website. For further information, please visit [Traefik](https://traefik.io/).
+    def get_code_of_conduct(self):
+        """
+        Returns the code of conduct content.
+        """
+        return self.code_of_conduct_content
 
-### Monitoring
 
-This service is based on Cadvisor. It is used to monitor the containers for the website. For further information, please visit [Cadvisor](
+class SecurityPolicy:
+    """
+    SecurityPolicy class: This class is used to create a SECURITY.md file for the project
+    """
+
+    def __init__(self):
+        self.security_policy_content = """
+    # Security Policy
+
+    We take the security of our users seriously. If you have discovered a security vulnerability, please report it to the security team at KataWoo by emailing
     
-### Management
+    """
 
-This service is based on Portainer. It is used to manage the containers for the website. For further information, please visit [Portainer](https://www.portainer.io/).
+    def get_security_policy(self):
+        """
+        Returns the security policy content.
+        """
+        return self.security_policy_content
 
-### Vault
 
-This service is based on Vault. It is used to store the secrets for the website. For further information, please visit [Vault](https://www.vaultproject.io/).
+class RoadMap:
+    """
+    RoadMap class: This class is used to create a ROADMAP.md file for the project
 
-### Code
+    The roadmap should contain the following sections:
+    - Introduction
+    - Current Features
+    - Future Features
+    - Conclusion
+    """
 
-This service is based on Code Server. It is used to write the code for the website. For further information, please visit [Code Server](https://coder.com/).
+    def __init__(self):
+        self.roadmap_content = """
+    # Roadmap
 
-### Application
+    ## Introduction
+
+    This roadmap outlines the current features and future features of the project.
+
+    ## Current Features
+
+    - Feature 1
+    - Feature 2
+    - Feature 3
+
+    ## Future Features
+
+    - Feature 4
+    - Feature 5
+    - Feature 6
+
+    ## Conclusion
+
+    The project is continuously evolving with new features and improvements.
+
+    """
+
+    def get_roadmap(self):
+        """
+        Returns the roadmap content.
+        """
+        return self.roadmap_content
+
+
+class Changelog:
+    """
+    Changelog class: This class is used to create a CHANGELOG.md file for the project
+
+    The changelog should contain the following sections:
+    - Introduction
+    - Version History
+    - Conclusion
+    """
+
+    def __init__(self):
+        self.changelog_content = """
+    # Changelog
+
+    ## Introduction
+
+    This changelog outlines the version history of the project.
+
+    ## Version History
+
+    ### Version 1.0.0
+
+    - Feature 1
+    - Feature 2
+    - Feature 3
+
+    ### Version 1.1.0
+
+    - Feature 4
+    - Feature 5
+    - Feature 6
+
+    ### Version 1.2.0
+
+    - Feature 7
+    - Feature 8
+    - Feature 9
+
+    ## Conclusion
+
+    The project is continuously evolving with new features and improvements.
+
+    """
+
+    def get_changelog(self):
+        """
+        Returns the changelog content.
+        """
+        return self.changelog_content
+
+
+class GitIgnore:
+    """
+    GitIgnore class: This class is used to create a .gitignore file for the project
+    Ignored files:
+        - Windows Thumbs.db file
+        - macOS .DS_Store file
+        - Linux .DS_Store file
+        - Python __pycache__ directory
+        - Java .class files
+        - Node.js node_modules directory
+        - Visual Studio Code .vscode directory
+        - JetBrains IntelliJ IDEA .idea directory
+        - Eclipse .metadata directory
+        - Docker .docker directory
+        - Git .git directory
+        - GitHub .github directory
+        - Travis CI .travis.yml file
+        - Jenkinsfile file
+        - CircleCI .circleci directory
+        - Dockerfile file
+    """
+
+    def __init__(self):
+        self.gitignore_content = """
+# Windows Thumbs.db file
+Thumbs.db
+
+# macOS .DS_Store file
+.DS_Store
+
+# Linux .DS_Store file
+.DS_Store
+
+# Python __pycache__ directory
+__pycache__
+
+# Java .class files
+*.class
+
+# Node.js node_modules directory
+node_modules
+
+# Visual Studio Code .vscode directory
+.vscode
+
+# JetBrains IntelliJ IDEA .idea directory
+.idea
+
+# Eclipse .metadata directory
+.metadata
+
+# Docker .docker directory
+.docker
+
+# Git .git directory
+.git
+
+# GitHub .github directory
+.github
+
+# Travis CI .travis.yml file
+.travis.yml
+
+# Jenkinsfile file
+Jenkinsfile
+
+# CircleCI .circleci directory
+.circleci
+
+# Dockerfile file
+Dockerfile
+
+"""
+
+    def get_gitignore(self):
+        """
+        Returns the gitignore content.
+        """
+        return self.gitignore_content
+
+
+class DockerIgnore:
+    """
+    DockerIgnore class: This class is used to create a .dockerignore file for the project
+    Ignored files:
+        - Windows Thumbs.db file
+        - macOS .DS_Store file
+        - Linux .DS_Store file
+        - Common files
+    """
+
+    def __init__(self):
+        self.dockerignore_content = """
+# Windows Thumbs.db file
+Thumbs.db
+
+# macOS .DS_Store file
+.DS_Store
 
-This service is based on Toga and Briefcase. It is used to create a native application for the website. For further information, please visit [Toga](https://beeware.org/project/projects/libraries/toga/) and [Briefcase](https://beeware.org/project/projects/tools/briefcase/).
+# Linux .DS_Store file
+.DS_Store
 
-## How to Use
+# Common auto-generated files
+*.log
+/tmp
+*.tmp
+*.bak
+*.swp
 
-### Beginner
+"""
 
-To use this project, you need to have Docker and Docker Compose installed on your machine. Then, you can run the following command:
-    
-    ```bash
-    docker-compose up -d
-    ```
-    
-This will start all the services for the project.
+    def get_dockerignore(self):
+        """
+        Returns the dockerignore content.
+        """
+        return self.dockerignore_content
 
-### Intermediate
 
-To use this project, you need to have Kubernetes installed on your machine. Then, you can run the following command:
-    
-    ```bash
-    kubectl apply -f kubernetes.yml
-    ```
-        
-This will start all the services for the project.
+def parse_env(data: bytes) -> dict:
+    """
+    Create a dictionary from the .env formatted request body
+    """
+    env = {}
+    env_data = data.decode().split("\n")
+    for line in env_data:
+        if line:
+            # if there are multipe = in the line, split only the first one
+            key, value = line.split("=", 1)
+            env[key] = value
+    return env
 
-### Advanced
 
-To use this project, you need to have Vagrant installed on your machine. Then, you can run the following command:
+def create_project(site_title: str, site_url: str) -> "Project":
+    """
+    Create a project with all the services for the given site title and url
+    """
+    database = Database(site_title=site_title, site_url=site_url)
+    mail = Mail(site_title=site_title, site_url=site_url)
+    cache = Cache(site_title=site_title, site_url=site_url)
+    website = Website(
+        site_title=site_title,
+        site_url=site_url,
+        database_props=database,
+        mail_props=mail,
+        cache_props=cache,
+    )
+    wpcli = WpCli(
+        site_title=site_title,
+        site_url=site_url,
+        site_host=website.site_host,
+        database_host=database.database_host,
+        database_password=database.database_password,
+        cache_host=cache.cache_host,
+    )
+    admin = Admin(site_title=site_title, site_url=site_url, database_props=database)
+    monitoring = Monitoring(site_title=site_title, site_url=site_url)
+    management = Management(site_title=site_title, site_url=site_url)
+    vault = Vault(site_title=site_title, site_url=site_url)
+    certbot = Certbot(site_title=site_title, site_url=site_url)
+    code = Code(site_title=site_title, site_url=site_url)
+    application = Application(site_title=site_title, site_url=site_url)
+    graphviz = GraphViz(site_title=site_title, site_url=site_url)
+    page_cache = PageCache(site_title=site_title, site_url=site_url)
+    proxy = Proxy(site_title=site_title, site_url=site_url)
+    observability = Observability(site_title=site_title, site_url=site_url, database_props=database, cache_props=cache)
+    mail_relay = MailRelay(site_title=site_title, site_url=site_url)
+
+    return Project(
+        website=website,
+        wpcli=wpcli,
+        database=database,
+        cache=cache,
+        admin=admin,
+        monitoring=monitoring,
+        management=management,
+        vault=vault,
+        certbot=certbot,
+        code=code,
+        application=application,
+        mail=mail,
+        graphviz=graphviz,
+        page_cache=page_cache,
+        proxy=proxy,
+        observability=observability,
+        mail_relay=mail_relay,
+    )
 
-    ```bash
-    vagrant up
-    ```
-        
-This will start all the services for the project.
 
-## Conclusion
+class CacheBackend:
+    """
+    CacheBackend class: This is the base class of the generator caches.
 
-This project is a collection of services that can be used to create a website, database, cache, admin, monitoring, management, vault, code, and application. It is designed to be easy to use for beginners, intermediate users, and advanced users.
+    The backends only store bytes. Compression, expiry, LRU eviction and the hit/miss
+    metrics are implemented here, so they behave the same for every backend:
+        - values larger than compress_min_size are zlib compressed
+        - entries expire after their ttl (seconds, 0 means never)
+        - the least recently used entries are evicted above max_entries
+    """
 
-For further information, please visit [GitHub](https://github.com/atiilla/woopy).
+    def __init__(self, max_entries: int = 1024, default_ttl: int = 0, compress_min_size: int = 1024):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.compress_min_size = compress_min_size
+        self.metrics = Counter()
+        self.metrics_lock = threading.Lock()
 
-"""
+    def _read(self, key: str):
+        raise NotImplementedError
 
-    def to_readme(self):
+    def _write(self, key: str, data: bytes, ttl: int) -> int:
         """
-        This function returns the ReadMe.md content
+        Stores the data and returns the number of evicted entries.
         """
-        return self.readme_content
+        raise NotImplementedError
 
+    def _remove(self, key: str):
+        raise NotImplementedError
 
-class PreequisitesSetup:
-    """
-    This class generates a shell script to install the required software on the host machine.
+    def _count(self, **metrics):
+        with self.metrics_lock:
+            self.metrics.update(metrics)
 
-    The script should install the following software:
-    - Docker
-    - Docker Compose
-    - Kubernetes
-    - Vagrant
+    def get(self, key: str):
+        """
+        Returns the cached value or None.
+        """
+        data = self._read(key)
+        if data is not None:
+            expires = struct.unpack(">d", data[1:9])[0]
+            if expires and expires < time.time():
+                self._remove(key)
+                self._count(expired=1)
+                data = None
+        if data is None:
+            self._count(misses=1)
+            return None
+        self._count(hits=1)
+        value = data[9:]
+        return zlib.decompress(value) if data[:1] == b"z" else value
+
+    def set(self, key: str, value: bytes, ttl: int = None):
+        """
+        Stores the value, compressed when it is large enough.
+        """
+        ttl = self.default_ttl if ttl is None else ttl
+        expires = time.time() + ttl if ttl else 0
+        if len(value) >= self.compress_min_size:
+            stored = b"z" + struct.pack(">d", expires) + zlib.compress(value)
+        else:
+            stored = b"r" + struct.pack(">d", expires) + value
+        evictions = self._write(key, stored, ttl)
+        self._count(sets=1, evictions=evictions, bytes_in=len(value), bytes_stored=len(stored))
+
+    def delete(self, key: str):
+        self._remove(key)
+
+    def get_or_set(self, key: str, render, ttl: int = None) -> bytes:
+        """
+        Returns the cached value, or renders, stores and returns it.
+        """
+        value = self.get(key)
+        if value is None:
+            value = render()
+            self.set(key, value, ttl)
+        return value
 
-    The script should be able to run on the following operating systems:
-    - Ubuntu
-    - CentOS
-    - Fedora
-    - Red Hat Enterprise Linux
-    - Debian
-    - openSUSE
-    - SUSE Linux Enterprise Server
-    - Arch Linux
-    - Alpine Linux
-    - FreeBSD
-    - macOS
-    - Rocky Linux
-    - Oracle Linux
-    - AlmaLinux
+    def get_stats(self) -> dict:
+        """
+        Returns the cache metrics of this instance.
+        """
+        with self.metrics_lock:
+            metrics = dict(self.metrics)
+        lookups = metrics.get("hits", 0) + metrics.get("misses", 0)
+        return {
+            "backend": type(self).__name__,
+            "max_entries": self.max_entries,
+            "hits": metrics.get("hits", 0),
+            "misses": metrics.get("misses", 0),
+            "hit_ratio": round(metrics.get("hits", 0) / lookups, 4) if lookups else 0.0,
+            "sets": metrics.get("sets", 0),
+            "evictions": metrics.get("evictions", 0),
+            "expired": metrics.get("expired", 0),
+            "bytes_in": metrics.get("bytes_in", 0),
+            "bytes_stored": metrics.get("bytes_stored", 0),
+        }
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    MemoryCacheBackend class: in-process cache, not shared between instances.
+    """
 
-    The script must be able to detect the operating system and install the required software accordingly.
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def _read(self, key: str):
+        with self.lock:
+            data = self.entries.get(key)
+            if data is not None:
+                self.entries.move_to_end(key)
+            return data
+
+    def _write(self, key: str, data: bytes, ttl: int) -> int:
+        evictions = 0
+        with self.lock:
+            self.entries[key] = data
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                evictions += 1
+        return evictions
+
+    def _remove(self, key: str):
+        with self.lock:
+            self.entries.pop(key, None)
+
+
+class DiskCacheBackend(CacheBackend):
+    """
+    DiskCacheBackend class: one file per entry, shared by the instances that mount the same
+    directory. The modification time of the files is the LRU order.
+    """
 
+    def __init__(self, directory: str, **kwargs):
+        super().__init__(**kwargs)
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(key.encode()).hexdigest())
+
+    def _read(self, key: str):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as cache_file:
+                data = cache_file.read()
+            os.utime(path)
+            return data
+        except FileNotFoundError:
+            return None
+
+    def _write(self, key: str, data: bytes, ttl: int) -> int:
+        path = self._path(key)
+        # write to a temporary file first, so other instances never read a partial entry
+        temporary_path = f"{path}.{secrets.token_hex(4)}.tmp"
+        with open(temporary_path, "wb") as cache_file:
+            cache_file.write(data)
+        os.replace(temporary_path, path)
+
+        entries = [entry for entry in os.scandir(self.directory) if not entry.name.endswith(".tmp")]
+        evictions = 0
+        if len(entries) > self.max_entries:
+            entries.sort(key=lambda entry: entry.stat().st_mtime)
+            for entry in entries[: len(entries) - self.max_entries]:
+                try:
+                    os.remove(entry.path)
+                    evictions += 1
+                except FileNotFoundError:
+                    pass
+        return evictions
+
+    def _remove(self, key: str):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    RedisCacheBackend class: cache shared by every instance connected to the same Redis
+    (or Redis protocol compatible) server. The LRU order is kept in a sorted set, so the
+    eviction does not depend on the maxmemory policy of the server.
     """
 
-    def __init__(self):
-        self.prerequisites_setup_content = """
-#!/bin/bash
+    def __init__(self, url: str, prefix: str = "woopy:cache:", **kwargs):
+        super().__init__(**kwargs)
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self.lru_key = f"{prefix}lru"
+
+    def _read(self, key: str):
+        data = self.client.get(self.prefix + key)
+        if data is not None:
+            self.client.zadd(self.lru_key, {key: time.time()})
+        return data
+
+    def _write(self, key: str, data: bytes, ttl: int) -> int:
+        pipeline = self.client.pipeline()
+        pipeline.set(self.prefix + key, data, ex=ttl or None)
+        pipeline.zadd(self.lru_key, {key: time.time()})
+        pipeline.zcard(self.lru_key)
+        entries = pipeline.execute()[-1]
+        if entries <= self.max_entries:
+            return 0
+        evicted = self.client.zpopmin(self.lru_key, entries - self.max_entries)
+        if evicted:
+            self.client.delete(*[self.prefix + member.decode() for member, _ in evicted])
+        return len(evicted)
+
+    def _remove(self, key: str):
+        pipeline = self.client.pipeline()
+        pipeline.delete(self.prefix + key)
+        pipeline.zrem(self.lru_key, key)
+        pipeline.execute()
+
+
+def create_cache(url: str, **kwargs) -> CacheBackend:
+    """
+    Create the cache backend for the url:
+        memory:// (default), file:///path/to/directory, redis://host:6379/0
+    """
+    if url.startswith("redis://") or url.startswith("rediss://"):
+        return RedisCacheBackend(url, **kwargs)
+    if url.startswith("file://"):
+        return DiskCacheBackend(url[len("file://"):], **kwargs)
+    return MemoryCacheBackend(**kwargs)
 
-# Check if the script is running as root
-if [ "$EUID" -ne 0 ]; then
-    echo "Please run this script as root"
-    exit
-fi
 
-# Check the operating system
-if [ -f /etc/os-release ]; then
-    . /etc/os-release
-    OS=$NAME
-elif type lsb_release > /dev/null 2>&1; then
-    OS=$(lsb_release -si)
-else
-    OS=$(uname -s)
-fi
+cache = create_cache(
+    os.getenv("WOOPY_CACHE_URL", "memory://"),
+    max_entries=int(os.getenv("WOOPY_CACHE_MAX_ENTRIES", "1024")),
+    default_ttl=int(os.getenv("WOOPY_CACHE_TTL", "0")),
+)
 
-# Install Docker
+# Idempotency results contain credentials, they are kept for one day by default
+IDEMPOTENCY_TTL = int(os.getenv("WOOPY_IDEMPOTENCY_TTL", "86400"))
 
-if [ "$OS" == "Ubuntu" ] || [ "$OS" == "Debian" ]; then
-    apt-get update
-    apt-get install -y docker.io
-    systemctl enable docker
-    systemctl start docker
-elif [ "$OS" == "CentOS Linux" ] || [ "$OS" == "Fedora" ] || [ "$OS" == "Red Hat Enterprise Linux" ]; then
-    yum install -y docker
-    systemctl enable docker
-    systemctl start docker
-elif [ "$OS" == "openSUSE Leap" ] || [ "$OS" == "SUSE Linux Enterprise Server" ]; then
-    zypper install -y docker
-    systemctl enable docker
-    systemctl start docker
-elif [ "$OS" == "Arch Linux" ]; then
-    pacman -S --noconfirm docker
-    systemctl enable docker
-    systemctl start docker
-elif [ "$OS" == "Alpine Linux" ]; then
-    apk add docker
-    rc-update add docker boot
-    service docker start
-elif [ "$OS" == "FreeBSD" ]; then
-    pkg install -y docker
-    sysrc docker_enable=YES
-    service docker start
-elif [ "$OS" == "macOS" ]; then
-    brew install docker
-    brew services start docker
-elif [ "$OS" == "Rocky Linux" ] || [ "$OS" == "Oracle Linux" ] || [ "$OS" == "AlmaLinux" ]; then
-    dnf install -y docker
-    systemctl enable docker
-    systemctl start docker
-else
-    echo "Unsupported operating system"
-    exit
-fi
+# Cached renders depend on the generator code, instances running another version of this
+# file must not share them.
+with open(__file__, "rb") as source_file:
+    CACHE_NAMESPACE = hashlib.sha256(source_file.read()).hexdigest()[:12]
 
-# Install Docker Compose
 
-if [ "$OS" == "Ubuntu" ] || [ "$OS" == "Debian" ]; then
-    apt-get install -y docker-compose
-elif [ "$OS" == "CentOS Linux" ] || [ "$OS" == "Fedora" ] || [ "$OS" == "Red Hat Enterprise Linux" ]; then
-    yum install -y docker-compose
-elif [ "$OS" == "openSUSE Leap" ] || [ "$OS" == "SUSE Linux Enterprise Server" ]; then
-    zypper install -y docker-compose
-elif [ "$OS" == "Arch Linux" ]; then
-    pacman -S --noconfirm docker-compose
-elif [ "$OS" == "Alpine Linux" ]; then
-    apk add docker-compose
-elif [ "$OS" == "FreeBSD" ]; then
-    pkg install -y docker-compose
-elif [ "$OS" == "macOS" ]; then
-    brew install docker-compose
-elif [ "$OS" == "Rocky Linux" ] || [ "$OS" == "Oracle Linux" ] || [ "$OS" == "AlmaLinux" ]; then
-    dnf install -y docker-compose
-else
-    echo "Unsupported operating system"
-    exit
-fi
+class ProjectPool:
+    """
+    ProjectPool class: This class keeps a pool of pre-generated projects, so the credentials
+    and service objects are not created on the request path.
 
-# Install Kubernetes
+    The projects are generated for a placeholder site by a background thread, a request only
+    binds its SITE_TITLE and SITE_URL into a ready project. When the pool is empty the project
+    is generated on the request path (a miss).
 
-if [ "$OS" == "Ubuntu" ] || [ "$OS" == "Debian" ]; then
-    apt-get update
-    apt-get install -y apt-transport-https ca-certificates curl software-properties-common
-    curl -fsSL https://download.docker.com/linux/ubuntu/gpg | apt-key add -
-    add-apt-repository "deb [arch=amd64] https://download.docker.com/linux/ubuntu $(lsb_release -cs) stable"
-    apt-get update
-    apt-get install -y kubectl
-elif [ "$OS" == "CentOS Linux" ] || [ "$OS" == "Fedora" ] || [ "$OS" == "Red Hat Enterprise Linux" ]; then
-    yum install -y kubectl
-elif [ "$OS" == "openSUSE Leap" ] || [ "$OS" == "SUSE Linux Enterprise Server" ]; then
-    zypper install -y kubectl
-elif [ "$OS" == "Arch Linux" ]; then
-    pacman -S --noconfirm kubectl
-elif [ "$OS" == "Alpine Linux" ]; then
-    apk add kubectl
-elif [ "$OS" == "FreeBSD" ]; then
-    pkg install -y kubectl
-elif [ "$OS" == "macOS" ]; then
-    brew install kubectl
-elif [ "$OS" == "Rocky Linux" ] || [ "$OS" == "Oracle Linux" ] || [ "$OS" == "AlmaLinux" ]; then
-    dnf install -y kubectl
-else
-    echo "Unsupported operating system"
-    exit
-fi
+    Configuration (environment variables):
+        WOOPY_POOL_SIZE: number of ready projects to keep, 0 disables the pool (default 0)
+        WOOPY_POOL_REFILL_RATE: maximum number of projects generated per second (default 10)
+    """
 
-# Install Vagrant
+    placeholder_title = "woopy-pool"
+    placeholder_url = "pool.woopy.invalid"
 
-if [ "$OS" == "Ubuntu" ] || [ "$OS" == "Debian" ]; then
-    apt-get update
-    apt-get install -y vagrant
-elif [ "$OS" == "CentOS Linux" ] || [ "$OS" == "Fedora" ] || [ "$OS" == "Red Hat Enterprise Linux" ]; then
-    yum install -y vagrant
-elif [ "$OS" == "openSUSE Leap" ] || [ "$OS" == "SUSE Linux Enterprise Server" ]; then
-    zypper install -y vagrant
-elif [ "$OS" == "Arch Linux" ]; then
-    pacman -S --noconfirm vagrant
-elif [ "$OS" == "Alpine Linux" ]; then
-    apk add vagrant
-elif [ "$OS" == "FreeBSD" ]; then
-    pkg install -y vagrant
-elif [ "$OS" == "macOS" ]; then
-    brew install vagrant
-elif [ "$OS" == "Rocky Linux" ] || [ "$OS" == "Oracle Linux" ] || [ "$OS" == "AlmaLinux" ]; then
-    dnf install -y vagrant
-else
-    echo "Unsupported operating system"
-    exit
-fi
+    def __init__(self, size: int = 0, refill_rate: float = 10.0):
+        self.size = size
+        self.refill_rate = refill_rate
+        self.projects = queue.Queue(maxsize=max(size, 1))
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.filler = None
 
-echo "Prerequisites setup completed"
+    def start(self):
+        """
+        Starts the background filler thread once.
+        """
+        with self.lock:
+            if self.size <= 0 or self.filler is not None:
+                return
+            self.filler = threading.Thread(target=self._fill, name="project-pool", daemon=True)
+            self.filler.start()
 
-"""
+    def _fill(self):
+        """
+        Keeps the pool filled, generating at most refill_rate projects per second.
+        """
+        interval = 1.0 / self.refill_rate if self.refill_rate > 0 else 0
+        while True:
+            if self.projects.qsize() >= self.size:
+                self.wakeup.wait(timeout=1)
+                self.wakeup.clear()
+                continue
+            self.projects.put(
+                create_project(site_title=self.placeholder_title, site_url=self.placeholder_url)
+            )
+            time.sleep(interval)
+
+    def get_project(self, site_title: str, site_url: str) -> "Project":
+        """
+        Returns a project for the site, taken from the pool when one is ready.
+        """
+        self.start()
+        try:
+            project = self.projects.get_nowait()
+        except queue.Empty:
+            with self.lock:
+                self.misses += 1
+            return create_project(site_title=site_title, site_url=site_url)
+
+        with self.lock:
+            self.hits += 1
+        self.wakeup.set()
+        return self.bind(project, site_title, site_url)
+
+    def bind(self, project: "Project", site_title: str, site_url: str) -> "Project":
+        """
+        Replaces the placeholder site title and url of a pooled project.
+        """
+        for service in project.get_services():
+            service.site_title = site_title
+            if hasattr(service, "site_url"):
+                service.site_url = site_url
+
+        # the generated names keep their random part, only the site specific part changes
+        database_name = f"{site_title}{project.database.database_name[len(self.placeholder_title):]}"
+        project.database.database_name = database_name
+        project.website.database_name = database_name
+        project.website.website_admin_email = project.website.website_admin_email.replace(
+            f"@{self.placeholder_url}", f"@{site_url}"
+        )
+        project.website.website_description = f"Add description here for {site_title}: {datetime.now()}"
+        project.mail.mail_base_url = f"mail.{site_url}"
+        project.observability.alert_email = project.observability.alert_email.replace(
+            f"@{self.placeholder_url}", f"@{site_url}"
+        )
+        project.application.bundle = ".".join(site_url.split(".")[::-1])
+        project.application.url = site_url
+        project.project_name = site_title
+        project.project_description = f"Project {site_title} contains multiple services such as a website, database, cache, admin, monitoring, management, vault, code, and application."
+        return project
 
-    def get_script(self):
+    def get_stats(self) -> dict:
         """
-        Returns the prerequisites setup content.
+        Returns the pool configuration and hit/miss counters.
         """
-        return self.prerequisites_setup_content
+        with self.lock:
+            requests_count = self.hits + self.misses
+            return {
+                "size": self.size,
+                "ready": self.projects.qsize(),
+                "refill_rate": self.refill_rate,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / requests_count, 4) if requests_count else 0.0,
+            }
+
+
+project_pool = ProjectPool(
+    size=int(os.getenv("WOOPY_POOL_SIZE", "0")),
+    refill_rate=float(os.getenv("WOOPY_POOL_REFILL_RATE", "10")),
+)
 
 
-class WooSh:
+def get_static_bundle_files() -> list:
     """
-    A set of shell commands that will complete the setup of the website service.
+    Returns the files of the project bundle that are the same for every project.
+    They are rendered once and shared by every request through the cache.
     """
+    files = cache.get_or_set(
+        f"{CACHE_NAMESPACE}:static-bundle-files",
+        lambda: json.dumps(render_static_bundle_files()).encode(),
+    )
+    return json.loads(files)
 
-    def __init__(self):
-        self.woo_sh_content = """#!/bin/bash
 
-echo "Woo.sh started"
-echo "##################################################################################################"
+def render_static_bundle_files() -> tuple:
+    """
+    Renders the files of the project bundle that are the same for every project.
+    """
+    return (
+        ("prerequisites.sh", PreequisitesSetup().get_script()),
+        ("LICENSE", ProjectLicense().get_license()),
+        ("CONTRIBUTING.md", Contributing().get_contributing()),
+        ("CODE_OF_CONDUCT.md", CodeOfConduct().get_code_of_conduct()),
+        ("SECURITY.md", SecurityPolicy().get_security_policy()),
+        ("ROADMAP.md", RoadMap().get_roadmap()),
+        (".gitignore", GitIgnore().get_gitignore()),
+        (".dockerignore", DockerIgnore().get_dockerignore()),
+        ("woosh.sh", WooSh().get_script()),
+        ("worker.sh", WorkerSh().get_script()),
+        ("cert.sh", CertSh().get_script()),
+        ("boot.sh", BootSh().get_script()),
+        ("CHANGELOG.md", Changelog().get_changelog()),
+    )
 
-# Change directory to /var/www/html to be able to run WP-CLI commands
-cd /var/www/html || exit
 
-wp core install --url=${WORDPRESS_SITE_URL} --title=${WORDPRESS_SITE_TITLE} --admin_user=${WORDPRESS_ADMIN_USER} --admin_password=${WORDPRESS_ADMIN_PASSWORD} --admin_email=${WORDPRESS_ADMIN_EMAIL} --skip-email --allow-root
+class ProjectRegistry:
+    """
+    ProjectRegistry class: This class stores the generated projects in an SQLite database,
+    so every artifact can be downloaded again without generating new credentials.
 
-# Disable all plugins
-wp plugin deactivate --all --allow-root
-
-# Remove all plugins
-wp plugin uninstall --all --allow-root
-
-# Server plugins
-wp plugin install really-simple-ssl --activate --allow-root
-# WooCommerce plugins
-wp plugin install woocommerce --activate --allow-root
-wp plugin install woocommerce-pdf-invoices-packing-slips --activate --allow-root
-wp plugin install woocommerce-multilingual --activate --allow-root
-# Social media plugins
-wp plugin install facebook-for-woocommerce --allow-root
-wp plugin install pinterest-for-woocommerce --allow-root
-wp plugin install mailpoet --allow-root
-# Payment plugins
-wp plugin install woocommerce-payments --activate --allow-root
-wp plugin install woocommerce-gateway-stripe --activate --allow-root
-wp plugin install woocommerce-paypal-payments --allow-root
-wp plugin install mailchimp-for-woocommerce --allow-root
-wp plugin install klarna-payments-for-woocommerce --allow-root
-wp plugin install coinbase-commerce --allow-root
-# Content delivery plugins
-wp plugin install vimeo --allow-root
-# WooCommerce themes
-wp theme install storefront --activate --allow-root
+    The site title, site url and creation time are stored in indexed columns for listing and
+    searching. The service objects (with all the credentials) are stored as JSON, encrypted
+    with Fernet.
+
+    Configuration (environment variables):
+        WOOPY_REGISTRY_KEY: Fernet key, the registry is disabled when it is not set
+        WOOPY_REGISTRY_PATH: path of the database file (default $HOME/.woopy/registry.db)
+    """
+
+    def __init__(self, path: str, key: str = None):
+        self.path = path
+        self.fernet = Fernet(key) if key else None
+        self.initialized = False
+        self.lock = threading.Lock()
 
-echo "##################################################################################################"
-echo "Woo.sh completed"
+    @property
+    def enabled(self) -> bool:
+        return self.fernet is not None
 
-"""
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Opens a connection and creates the schema on first use.
+        """
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.row_factory = sqlite3.Row
+        with self.lock:
+            if not self.initialized:
+                connection.executescript(
+                    """
+                    PRAGMA journal_mode = WAL;
+                    CREATE TABLE IF NOT EXISTS projects (
+                        id TEXT PRIMARY KEY,
+                        site_title TEXT NOT NULL COLLATE NOCASE,
+                        site_url TEXT NOT NULL COLLATE NOCASE,
+                        created TEXT NOT NULL,
+                        options TEXT NOT NULL,
+                        model BLOB NOT NULL
+                    );
+                    CREATE INDEX IF NOT EXISTS projects_site_title ON projects (site_title);
+                    CREATE INDEX IF NOT EXISTS projects_site_url ON projects (site_url);
+                    CREATE INDEX IF NOT EXISTS projects_created ON projects (created);
+                    """
+                )
+                self.initialized = True
+        return connection
+
+    def save(self, project: "Project", env: dict) -> str:
+        """
+        Stores the project and the request options. Returns the project id.
+        """
+        services = {
+            name: {"class": type(value).__name__, "attributes": vars(value)}
+            for name, value in vars(project).items()
+            if type(value).__name__ in SERVICE_CLASSES
+        }
+        extra_services = [{"name": service.name, "values": service.values} for service in project.extra_services]
+        model = json.dumps(
+            {"services": services, "extra_services": extra_services, "deployment": project.deployment.value},
+            default=str,
+        )
+        options = {key: value for key, value in env.items() if key not in ("SITE_TITLE", "SITE_URL")}
+        project_id = secrets.token_hex(16)
+
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                "INSERT INTO projects (id, site_title, site_url, created, options, model) VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    project_id,
+                    project.website.site_title,
+                    project.website.site_url,
+                    datetime.now().isoformat(),
+                    json.dumps(options),
+                    self.fernet.encrypt(model.encode()),
+                ),
+            )
+        return project_id
+
+    def load(self, project_id: str):
+        """
+        Returns the stored project and the request options, or None if it does not exist.
+        """
+        with closing(self._connect()) as connection:
+            row = connection.execute(
+                "SELECT site_title, site_url, options, model FROM projects WHERE id = ?",
+                (project_id,),
+            ).fetchone()
+        if row is None:
+            return None
+
+        model = json.loads(self.fernet.decrypt(row["model"]))
+        services = {}
+        for name, service in model["services"].items():
+            instance = SERVICE_CLASSES[service["class"]].__new__(SERVICE_CLASSES[service["class"]])
+            instance.__dict__.update(service["attributes"])
+            services[name] = instance
+
+        extra_services = [
+            service_catalogue.restore_service(service["name"], service["values"])
+            for service in model.get("extra_services", [])
+        ]
+        env = {"SITE_TITLE": row["site_title"], "SITE_URL": row["site_url"], **json.loads(row["options"])}
+        project = Project(
+            deployment=DeploymentOptions(model["deployment"]),
+            extra_services=extra_services,
+            sizing=parse_sizing(env),
+            **services,
+        )
+        return project, env
 
-    def get_script(self):
+    def search(self, query: str = "", site_url: str = None, limit: int = 50, offset: int = 0):
         """
-        Returns the woo.sh content.
+        Lists the projects, newest first. The query matches the beginning of the site title or
+        site url, which keeps the lookup on the indexes.
         """
-        return self.woo_sh_content
+        conditions, parameters = [], []
+        if query:
+            conditions.append("(site_title LIKE ? ESCAPE '\\' OR site_url LIKE ? ESCAPE '\\')")
+            prefix = re.sub(r"([%_\\])", r"\\\1", query) + "%"
+            parameters += [prefix, prefix]
+        if site_url:
+            conditions.append("site_url = ?")
+            parameters.append(site_url)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        with closing(self._connect()) as connection:
+            rows = connection.execute(
+                f"SELECT id, site_title, site_url, created FROM projects {where} ORDER BY created DESC LIMIT ? OFFSET ?",
+                (*parameters, limit, offset),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+
+project_registry = ProjectRegistry(
+    path=os.getenv("WOOPY_REGISTRY_PATH", os.path.join(os.path.expanduser("~"), ".woopy", "registry.db")),
+    key=os.getenv("WOOPY_REGISTRY_KEY"),
+)
+if project_registry.enabled:
+    os.makedirs(os.path.dirname(os.path.abspath(project_registry.path)), exist_ok=True)
+
+# The idempotency results (project.zip with every credential) are encrypted in the cache with the
+# registry key. Without it the key of this process is used and only this process replays them.
+idempotency_fernet = project_registry.fernet or Fernet(Fernet.generate_key())
+
+
+# Variables of the parameterised docker-compose.yml template. The first (service, attribute)
+# pair is the source of the value in the .env file, the others are copies of that value in
+# dependent services.
+COMPOSE_TEMPLATE_VARIABLES = {
+    "DATABASE_NAME": [("database", "database_name"), ("website", "database_name")],
+    "DATABASE_USER": [
+        ("database", "database_user"),
+        ("website", "database_user"),
+        ("admin", "database_user"),
+    ],
+    "DATABASE_PASSWORD": [
+        ("database", "database_password"),
+        ("website", "database_password"),
+        ("wpcli", "database_password"),
+        ("admin", "database_password"),
+    ],
+    "DATABASE_ROOT_PASSWORD": [("database", "database_root_password"), ("observability", "database_root_password")],
+    "CACHE_PASSWORD": [("cache", "cache_password"), ("website", "cache_password"), ("observability", "cache_password")],
+    "MAIL_USERNAME": [("mail", "mail_username"), ("website", "mail_smtp_user")],
+    "MAIL_PASSWORD": [("mail", "mail_password"), ("website", "mail_smtp_password")],
+    "WEBSITE_ADMIN_USERNAME": [("website", "website_admin_username")],
+    "WEBSITE_ADMIN_PASSWORD": [("website", "website_admin_password")],
+    "WEBSITE_ADMIN_EMAIL": [("website", "website_admin_email")],
+    "MANAGEMENT_PASSWORD": [("management", "management_password")],
+    "VAULT_USERNAME": [("vault", "vault_username")],
+    "VAULT_PASSWORD": [("vault", "vault_password")],
+    "CODE_PASSWORD": [("code", "code_password")],
+    "ACME_EMAIL": [("proxy", "proxy_email")],
+    "GRAFANA_USERNAME": [("observability", "grafana_username")],
+    "GRAFANA_PASSWORD": [("observability", "grafana_password")],
+}
+
+# Compose only interpolates values, so the network key can not contain ${SITE_TITLE}.
+# The network is namespaced by COMPOSE_PROJECT_NAME instead.
+COMPOSE_TEMPLATE_NETWORK = "woopy-network"
+
+
+def get_compose_project_name(site_title: str) -> str:
+    """
+    Get a valid COMPOSE_PROJECT_NAME from the site title
+    """
+    return re.sub(r"[^a-z0-9_-]", "-", site_title.lower()).strip("-_") or "woopy"
 
 
-class FixWp():
+def get_env_data(project: "Project") -> str:
     """
-    A set of shell commands that will fix the WordPress installation.
+    Get the .env file with the values of the parameterised docker-compose.yml template
+    """
+    lines = [
+        f"COMPOSE_PROJECT_NAME={get_compose_project_name(project.project_name)}",
+        f"SITE_TITLE={project.website.site_title}",
+        f"SITE_URL={project.website.site_url}",
+    ]
+    for variable, targets in COMPOSE_TEMPLATE_VARIABLES.items():
+        service, attribute = targets[0]
+        lines.append(f"{variable}={getattr(getattr(project, service), attribute)}")
+    return "\n".join(lines) + "\n"
+
+
+# Request variables that change the layout of docker-compose.yml (see configure_project):
+# query parameter of /dc/template -> request variable
+COMPOSE_LAYOUT_VARIABLES = {
+    "variant": "WEBSITE_VARIANT",
+    "page_cache": "PAGE_CACHE",
+    "proxy": "PROXY",
+    "observability": "OBSERVABILITY",
+    "mail_relay": "MAIL_RELAY",
+    "monitoring_preset": "MONITORING_PRESET",
+    "monitoring_cpu_budget": "MONITORING_CPU_BUDGET",
+    "store_preset": "STORE_PRESET",
+    "worker_concurrency": "WORKER_CONCURRENCY",
+    "worker_interval": "WORKER_INTERVAL",
+}
+
+
+def get_compose_layout(env: dict) -> dict:
+    """
+    Get the layout variables of a request
     """
+    return {variable: env[variable] for variable in COMPOSE_LAYOUT_VARIABLES.values() if variable in env}
 
-    def __init__(self):
-        self.fix_wp_content = """#!/bin/bash
-        
-echo "##################################################################################################"
-echo "FixWP.sh started"
-echo "Fixing permissions for WordPress"
-chown -R www-data:www-data /var/www/html
-echo "FixWP.sh completed"
-echo "##################################################################################################"
 
-"""
+def get_docker_compose_template(layout: dict = None) -> str:
+    """
+    Get the parameterised docker-compose.yml template. All the project specific values
+    are ${VAR} references to the .env file, so the template is rendered only once per layout
+    (website variant, optional services and monitoring preset, see get_compose_layout).
+    """
+    layout = layout or {}
+    key = ",".join(f"{name}={value}" for name, value in sorted(layout.items()))
+    return cache.get_or_set(
+        f"{CACHE_NAMESPACE}:compose-template:{key}",
+        lambda: render_docker_compose_template(layout).encode(),
+    ).decode()
 
-    def get_script(self):
-        """
-        Returns the fixwp.sh content.
-        """
-        return self.fix_wp_content
+
+def render_docker_compose_template(layout: dict = None) -> str:
+    """
+    Renders the parameterised docker-compose.yml template.
+    Raises ValueError for invalid layout variables.
+    """
+    project = create_project(site_title="${SITE_TITLE}", site_url="${SITE_URL}")
+    configure_project(project, layout or {})
+    for variable, targets in COMPOSE_TEMPLATE_VARIABLES.items():
+        for service, attribute in targets:
+            setattr(getattr(project, service), attribute, f"${{{variable}}}")
+    return project.get_docker_compose_data().replace(
+        "${SITE_TITLE}-network", COMPOSE_TEMPLATE_NETWORK
+    )
 
 
-class CertSh:
+def get_docker_compose_template_etag(layout: dict = None) -> str:
     """
-    A set of shell commands that will complete the setup of the website service.
+    Get the ETag of the docker-compose.yml template
     """
+    layout = layout or {}
+    key = ",".join(f"{name}={value}" for name, value in sorted(layout.items()))
+    return cache.get_or_set(
+        f"{CACHE_NAMESPACE}:compose-template-etag:{key}",
+        lambda: hashlib.sha256(get_docker_compose_template(layout).encode()).hexdigest().encode(),
+    ).decode()
 
-    def __init__(self):
 
-        self.cert_sh_content = """#!/bin/bash
+def configure_project(project: "Project", env: dict) -> "Project":
+    """
+    Applies the layout variables of a request to a project: the website variant WEBSITE_VARIANT
+    (default apache), the page cache in front of the website when PAGE_CACHE is true, the proxy in
+    front of the project unless PROXY is false, the metrics stack when OBSERVABILITY is true and
+    the mail relay between the website and the mail server when MAIL_RELAY is true,
+    the cAdvisor preset MONITORING_PRESET (default standard) with its MONITORING_CPU_BUDGET (percent of one core)
+    the Let's Encrypt account ACME_EMAIL of the proxy (default admin@SITE_URL),
+    and the WooCommerce performance preset STORE_PRESET (default small), and the background worker:
+    WORKER_CONCURRENCY Action Scheduler runners (default 2) every WORKER_INTERVAL seconds (default 60).
+    With DENSITY_MODE true, Prometheus does not scrape the host level cAdvisor and proxy (see DensityMode).
+    Raises ValueError for unknown variants and presets and invalid budgets, worker settings and emails.
+    """
+    website_variant = env.get("WEBSITE_VARIANT", "apache")
+    if website_variant not in WEBSITE_VARIANTS:
+        raise ValueError(f"WEBSITE_VARIANT must be one of {', '.join(WEBSITE_VARIANTS)}")
+    project.website.website_variant = website_variant
+    monitoring_preset = env.get("MONITORING_PRESET", "standard")
+    if monitoring_preset not in MONITORING_PRESETS:
+        raise ValueError(f"MONITORING_PRESET must be one of {', '.join(MONITORING_PRESETS)}")
+    project.monitoring.monitoring_preset = monitoring_preset
+    if env.get("MONITORING_CPU_BUDGET"):
+        try:
+            cpu_budget = float(env["MONITORING_CPU_BUDGET"])
+        except ValueError:
+            cpu_budget = 0
+        if not 0 < cpu_budget < float("inf"):
+            raise ValueError("MONITORING_CPU_BUDGET must be a positive number")
+        project.monitoring.monitoring_cpu_budget = cpu_budget
+    store_preset = env.get("STORE_PRESET", "small")
+    if store_preset not in STORE_PRESETS:
+        raise ValueError(f"STORE_PRESET must be one of {', '.join(STORE_PRESETS)}")
+    project.website.store_preset = store_preset
+    for variable, attribute in (("WORKER_CONCURRENCY", "worker_concurrency"), ("WORKER_INTERVAL", "worker_interval")):
+        if env.get(variable):
+            if not env[variable].isdigit() or int(env[variable]) < 1:
+                raise ValueError(f"{variable} must be a positive number")
+            setattr(project.wpcli, attribute, int(env[variable]))
+    if env.get("PAGE_CACHE") == "true":
+        project.enable_page_cache()
+    if env.get("ACME_EMAIL"):
+        if not re.fullmatch(r"[^@\s]+@[^@\s]+\.[^@\s]+", env["ACME_EMAIL"]):
+            raise ValueError("ACME_EMAIL must be an email address")
+        project.proxy.proxy_email = env["ACME_EMAIL"]
+    if env.get("PROXY", "true") == "true":
+        project.enable_proxy()
+    if env.get("OBSERVABILITY") == "true":
+        project.enable_observability()
+    if env.get("MAIL_RELAY") == "true":
+        project.enable_mail_relay()
+    if env.get("DENSITY_MODE") == "true":
+        # DensityMode removes them from the project, they are not on the project network
+        project.observability.cadvisor_host = None
+        project.observability.proxy_host = None
+    return project
+
+
+# YAML indicators that can not start a plain scalar
+YAML_INDICATORS = "-?:,[]{}#&*!|>'\"%@`"
+
+
+def check_site_title(site_title: str) -> str:
+    """
+    SITE_TITLE is written unquoted in docker-compose.yml, so it can not start with a YAML
+    indicator nor contain ': ' or ' #'. Raises ValueError.
+    """
+    if not site_title.strip() or site_title[0] in YAML_INDICATORS or ": " in site_title or " #" in site_title:
+        raise ValueError("SITE_TITLE can not be empty, start with a YAML indicator or contain ': ' or ' #'")
+    return site_title
 
-echo "Cert.sh started"
-echo "##################################################################################################"
 
-# Change directory to /var/www/html to be able to run WP-CLI commands
-cd /var/www/html || exit
+def create_request_project(env: dict) -> "Project":
+    """
+    Create the project for a request: a project from the pool plus the catalogue services
+    listed in SERVICES (comma separated), deployed with DEPLOYMENT (default docker-compose),
+    sized by HOST_MEMORY, HOST_CPUS, PRODUCTS, ORDERS, CONCURRENCY and PHP_WORKER_MEMORY and
+    laid out by the layout variables (see configure_project).
+    Raises ValueError for unknown services, deployment options, invalid site titles, sizes and layouts.
+    """
+    deployment = DeploymentOptions(env.get("DEPLOYMENT", DeploymentOptions.DOCKER_COMPOSE.value))
+    # the shared ingress of the density mode routes docker compose containers, not swarm services
+    if deployment == DeploymentOptions.SWARM and env.get("DENSITY_MODE") == "true":
+        raise ValueError("DENSITY_MODE can not be combined with DEPLOYMENT=swarm")
+    if not env.get("SWARM_REPLICAS", "2").isdigit() or int(env.get("SWARM_REPLICAS", "2")) < 1:
+        raise ValueError("SWARM_REPLICAS must be a positive number")
+    # the template is the same for every project, it has no catalogue services
+    if env.get("COMPOSE_MODE") == "template" and env.get("SERVICES"):
+        raise ValueError("SERVICES can not be combined with COMPOSE_MODE=template")
+    project = project_pool.get_project(site_title=check_site_title(env["SITE_TITLE"]), site_url=env["SITE_URL"])
+    project.deployment = deployment
+    project.sizing = parse_sizing(env)
+    configure_project(project, env)
+    if env.get("SERVICES"):
+        project.extra_services = service_catalogue.create_services(
+            [name.strip() for name in env["SERVICES"].split(",") if name.strip()],
+            site_title=env["SITE_TITLE"],
+            site_url=env["SITE_URL"],
+        )
+    return project
 
-# Generate local certificate for HTTPS
-openssl req -x509 -nodes -days 365 -newkey rsa:2048 -keyout /etc/ssl/private/${WORDPRESS_SITE_URL}.key -out /etc/ssl/certs/${WORDPRESS_SITE_URL}.crt -subj "/C=BE/ST=Brussels/L=Brussels/O=${WORDPRESS_SITE_TITLE}/OU=Org/CN=${WORDPRESS_SITE_URL}"
 
-echo "# Redirect HTTP to HTTPS
-# Activate this if you want to redirect HTTP to HTTPS, but make sure that you activate this after publishing the certificate
-# <VirtualHost *:80>
-#     ServerName {WORDPRESS_SITE_URL}
-#     Redirect permanent / https://{WORDPRESS_SITE_URL}
-# </VirtualHost>
+def get_project_config_files(project: "Project", env: dict) -> list:
+    """
+    Get the configuration files that the docker-compose.yml of the project bind mounts: (file name, content)
+    """
+    files = [
+        ("redis/redis.conf", project.cache.to_redis_conf()),
+        ("mariadb/my.cnf", project.database.to_my_cnf(project.sizing)),
+        ("wordpress/woopy-performance.php", project.website.get_store_performance().to_mu_plugin()),
+    ]
+    if project.website.website_variant == "nginx-fpm":
+        files.append(("nginx/default.conf", project.website.to_nginx_conf()))
+        files.append(("php-fpm/zz-woopy.conf", project.website.to_fpm_pool_conf(project.sizing)))
+    else:
+        files.append(("apache/zz-woopy.conf", project.website.to_apache_conf(project.sizing)))
+    if project.page_cache.enabled:
+        files.append(("varnish/default.vcl", project.page_cache.to_vcl()))
+    if project.proxy.enabled and env.get("DENSITY_MODE") != "true":
+        files.append(("traefik/dynamic.yml", project.proxy.to_dynamic_conf()))
+    if project.observability.enabled:
+        files.extend(project.observability.get_files())
+    return files
 
-# Add SSL configuration to Wordpress Apache configuration
-<VirtualHost *:443>
-    ServerAdmin webmaster@${WORDPRESS_SITE_URL}
-    DocumentRoot /var/www/html
-    ServerName ${WORDPRESS_SITE_URL}
-    ServerAlias www.${WORDPRESS_SITE_URL}
-    ErrorLog ${APACHE_LOG_DIR}/error.log
-    CustomLog ${APACHE_LOG_DIR}/access.log combined
-    SSLEngine on
-    SSLCertificateFile /etc/ssl/certs/${WORDPRESS_SITE_URL}.crt
-    SSLCertificateKeyFile /etc/ssl/private/${WORDPRESS_SITE_URL}.key
-</VirtualHost>" > /etc/apache2/sites-available/000-default-ssl.conf
 
-# Enable SSL module
-a2enmod ssl
+def get_base_docker_compose_data(project: "Project", env: dict) -> str:
+    """
+    Get the docker-compose.yml of the project before the density rewrite: the parameterised
+    template with COMPOSE_MODE=template, the generated file otherwise
+    """
+    if env.get("COMPOSE_MODE") == "template":
+        return get_docker_compose_template(get_compose_layout(env))
+    return project.get_docker_compose_data()
 
-# Enable SSL configuration
-a2ensite 000-default-ssl.conf
 
-# Restart Apache
-service apache2 restart
+def get_project_docker_compose_data(project: "Project", env: dict, docker_compose_data: str = None) -> str:
+    """
+    Get the docker-compose.yml of project.zip, rewritten for the density mode when DENSITY_MODE is true
+    """
+    if docker_compose_data is None:
+        docker_compose_data = get_base_docker_compose_data(project, env)
+    if env.get("DENSITY_MODE") == "true":
+        density = DensityMode(project_name=project.project_name, site_url=project.website.site_url)
+        docker_compose_data = density.apply(docker_compose_data, template_mode=env.get("COMPOSE_MODE") == "template")
+    return docker_compose_data
 
-echo "##################################################################################################"
-echo "Cert.sh completed"
 
-# If you'd like to register this certificate to the product domain, run this command in the Wordpress container.
-# certbot certonly --agree-tos --email info@${WORDPRESS_SITE_URL} --expand --domains ${WORDPRESS_SITE_URL},www.${WORDPRESS_SITE_URL} --cert-path /etc/ssl/certs/h2oheating.xyz.crt --webroot-path /var/www/html --dry-run
+def create_project_bundle(project: "Project", env: dict) -> io.BytesIO:
+    """
+    Create the project.zip bundle for the project and the request options
+    """
+    readme = ReadMe(project_name=project.project_name)
+
+    buffer = io.BytesIO()
+
+    with zipfile.ZipFile(buffer, "w") as zip_file:
+        if env.get("COMPOSE_MODE") == "template":
+            zip_file.writestr(".env", get_env_data(project))
+        docker_compose_data = get_base_docker_compose_data(project, env)
+
+        if project.deployment == DeploymentOptions.SWARM:
+            stack = SwarmStack(
+                project.project_name,
+                website_replicas=int(env.get("SWARM_REPLICAS", "2")),
+                memory={"database": MariaDbTuning(project.sizing).memory},
+            )
+            zip_file.writestr("docker-stack.yml", stack.render(docker_compose_data))
+            zip_file.writestr("SWARM.md", stack.get_report(docker_compose_data))
+
+        if env.get("DENSITY_MODE") == "true":
+            density = DensityMode(project_name=project.project_name, site_url=project.website.site_url)
+            capacity = DensityMode.get_capacity(
+                parse_host(env.get("DENSITY_HOST", "4:8192:160"), "DENSITY_HOST"),
+                list(yaml.load(docker_compose_data, Loader=YamlLoader)["services"]),
+                parse_cpu_overcommit(env.get("DENSITY_CPU_OVERCOMMIT", "4"), "DENSITY_CPU_OVERCOMMIT"),
+            )
+            zip_file.writestr("ingress/docker-compose.yml", DensityMode.get_ingress_compose())
+            zip_file.writestr("DENSITY.md", density.get_report(capacity))
+
+        docker_compose_data = get_project_docker_compose_data(project, env, docker_compose_data)
+        zip_file.writestr("docker-compose.yml", docker_compose_data)
+        for file_name, content in get_project_config_files(project, env):
+            zip_file.writestr(file_name, content)
+        zip_file.writestr("topology.svg", project.graphviz.to_svg(docker_compose_data))
+        zip_file.writestr("topology.dot", project.graphviz.to_dot(docker_compose_data))
+        zip_file.writestr("topology.mmd", project.graphviz.to_mermaid(docker_compose_data))
+        zip_file.writestr("README.md", readme.to_readme())
+        zip_file.writestr("report.txt", project.get_project_report())
+        for file_name, content in get_static_bundle_files():
+            zip_file.writestr(file_name, content)
+
+    buffer.seek(0)
+    return buffer
 
-"""
 
-    def get_script(self):
+class ProjectApi(Resource):
+    """
+    Class to generate a docker-compose.yml file
+    Args:
+        Resource (_type_): _description_
+    """
+
+    def post(self):
         """
-        Returns the cert.sh content.
+        Get the docker-compose.yml file
+        ---
+        tags:
+          - Docker Compose
+        responses:
+            200:
+                description: docker-compose.yml file
+                content:
+                application/json:
+                    schema:
+                    type: object
+                    properties:
+                        status:
+                        type: string
+                        example: ok
+                        message:
+                        type: string
+                        example: docker-compose.yml file created
+                        version:
+                        type: string
+                        example: 1.0.0
+                        file:
+                        type: string
+                        example: docker-compose.yml file
         """
-        return self.cert_sh_content
+        # a retried request with the same Idempotency-Key gets the same project back,
+        # from any instance sharing the cache and the registry key
+        idempotency_key = request.headers.get("Idempotency-Key")
+        if idempotency_key:
+            cache_key = "idempotency:" + hashlib.sha256(
+                idempotency_key.encode() + b"\0" + request.data
+            ).hexdigest()
+            cached = cache.get(cache_key)
+            bundle = None
+            if cached is not None:
+                result = json.loads(cached)
+                try:
+                    bundle = idempotency_fernet.decrypt(result["bundle"].encode())
+                except InvalidToken:
+                    # encrypted by an instance with another key, see idempotency_fernet
+                    logging.warning("Idempotency result %s can not be decrypted", cache_key)
+            if bundle is not None:
+                response = send_file(
+                    io.BytesIO(bundle),
+                    as_attachment=True,
+                    download_name="project.zip",
+                    mimetype="application/zip",
+                )
+                if result["project_id"]:
+                    response.headers["X-Woopy-Project-Id"] = result["project_id"]
+                return response
+
+        env = parse_env(request.data)
+        try:
+            project = create_request_project(env)
+            buffer = create_project_bundle(project, env)
+        except ValueError as error:
+            return {"status": "error", "message": str(error)}, 400
+
+        project_id = project_registry.save(project, env) if project_registry.enabled else None
+
+        if idempotency_key:
+            result = {"bundle": idempotency_fernet.encrypt(buffer.getvalue()).decode(), "project_id": project_id}
+            cache.set(cache_key, json.dumps(result).encode(), ttl=IDEMPOTENCY_TTL)
+
+        response = send_file(
+            buffer,
+            as_attachment=True,
+            download_name="project.zip",
+            mimetype="application/zip",
+        )
+        if project_id:
+            response.headers["X-Woopy-Project-Id"] = project_id
+        return response
 
 
-# create an enum to choose deployment options: docker-compose, kubernetes, vagrant
-class DeploymentOptions(Enum):
-    """
-    Represents the deployment options for the project.
-    """
-    DOCKER_COMPOSE = "docker-compose"
-    KUBERNETES = "kubernetes"
-    VAGRANT = "vagrant"
-    
+api.add_resource(ProjectApi, "/")
 
-class Project:
+
+class DockerComposeYamlSource(Resource):
     """
-    Represents a project with multiple services: website, database, cache, admin, monitoring, management, vault, code, application, networks, volumes and more.
+    Class to get the docker-compose.yml file
+    Args:
+        Resource (_type_): _description_
     """
 
-    def __init__(
-        self,
-        website: Website = None,
-        wpcli: WpCli = None,
-        database: Database = None,
-        cache: Cache = None,
-        admin: Admin = None,
-        monitoring: Monitoring = None,
-        management: Management = None,
-        vault: Vault = None,
-        code: Code = None,
-        certbot: Certbot = None,
-        mail: Mail = None,
-        application: Application = None,
-        graphviz: GraphViz = None,
-        deployment: DeploymentOptions = DeploymentOptions.DOCKER_COMPOSE,
-    ):
+    def post(self):
         """
-        Initializes a new instance of the Project class.
-        Create a temp directory in the user profile on the project name. For example: $HOME/.woopy/{project_name}
+        Get the docker-compose.yml file
+        ---
+        tags:
+          - Docker Compose
+        responses:
+            200:
+                description: docker-compose.yml file
+                content:
+                application/json:
+                    schema:
+                    type: object
+                    properties:
+                        status:
+                        type: string
+                        example: ok
+                        message:
+                        type: string
+                        example: docker-compose.yml file created
+                        version:
+                        type: string
+                        example: 1.0.0
+                        file:
+                        type: string
+                        example: docker-compose.yml file
         """
-        self.project_name = website.site_title
-        self.project_description = f"Project {self.project_name} contains multiple services such as a website, database, cache, admin, monitoring, management, vault, code, and application."
-        self.project_author = "woopy"
-        self.project_email = "woopy@katawoo.com"
-        self.database = database
-        self.website = website
-        self.wpcli = wpcli
-        self.admin = admin
-        self.cache = cache
-        self.monitoring = monitoring
-        self.management = management
-        self.vault = vault
-        self.certbot = certbot
-        self.code = code
-        self.application = application
-        self.mail = mail
-        self.graphviz = graphviz
-        self.deployment = deployment
+        env = parse_env(request.data)
+        try:
+            project = create_request_project(env)
+        except ValueError as error:
+            return {"status": "error", "message": str(error)}, 400
 
-    def get_docker_compose_data(self):
-        """
-        Converts the Project object to a docker-compose.yml data string.
-        """
-        docker_compose_yaml = f"""
-networks:
-    {self.website.site_title}-network: {{
-        driver: bridge
-    }}
+        buffer = io.BytesIO()
+        buffer.write(project.get_docker_compose_data().encode())
+        buffer.seek(0)
+        
+        return send_file(
+            buffer,
+            as_attachment=True,
+            download_name="docker-compose.yml",
+            mimetype="application/yaml",
+        )
 
-volumes:
-    {self.website.site_host}-vol: {{}}
-    {self.wpcli.wpcli_host}-vol: {{}}
-    {self.database.database_host}-vol: {{}}
-    {self.admin.admin_host}-vol: {{}}
-    {self.cache.cache_host}-vol: {{}}
-    {self.monitoring.monitoring_host}-vol: {{}}
-    {self.management.management_host}-vol: {{}}
-    {self.vault.vault_host}-vol: {{}}
-    {self.certbot.certbot_host}-vol: {{}}
-    {self.code.code_host}-vol: {{}}
-    {self.application.app_host}-vol: {{}}
-    {self.mail.mail_host}-vol: {{}}
-    {self.graphviz.graphviz_host}-vol: {{}}
 
-services:
-    {self.database.to_docker_compose()}
-    {self.website.to_docker_compose()}
-    {self.wpcli.to_docker_compose()}
-    {self.admin.to_docker_compose()}
-    {self.cache.to_docker_compose()}
-    {self.monitoring.to_docker_compose()}
-    {self.management.to_docker_compose()}
-    {self.vault.to_docker_compose()}
-    {self.certbot.to_docker_compose()}
-    {self.code.to_docker_compose()}
-    {self.application.to_docker_compose()}
-    {self.mail.to_docker_compose()}
-    {self.graphviz.to_docker_compose()}
-"""
+api.add_resource(DockerComposeYamlSource, "/dc")
+
+
+class DockerComposeTemplateSource(Resource):
+    """
+    Class to get the parameterised docker-compose.yml template.
+    The template is the same for every project, so it is served with an ETag.
+    Query parameters:
+        variant: website variant, apache (default) or nginx-fpm
+        page_cache: true puts the page cache in front of the website
+        proxy: false publishes the host ports of the services instead of the proxy
+        observability: true adds Prometheus, Alertmanager, Grafana and the exporters
+        mail_relay: true adds the mail relay between the website and the mail server
+        monitoring_preset: cAdvisor preset, standard (default) or low-overhead
+        monitoring_cpu_budget: CPU budget of cAdvisor in percent of one core
+        store_preset: WooCommerce performance preset, small (default) or large
+        worker_concurrency: Action Scheduler runners of the wp-cli worker (default 2)
+        worker_interval: seconds between two runs of the wp-cli worker (default 60)
+    Args:
+        Resource (_type_): _description_
+    """
+
+    def get(self):
+        layout = {
+            variable: request.args[parameter]
+            for parameter, variable in COMPOSE_LAYOUT_VARIABLES.items()
+            if parameter in request.args
+        }
+        try:
+            docker_compose_data = get_docker_compose_template(layout)
+        except ValueError as error:
+            return {"status": "error", "message": str(error)}, 400
+        response = make_response(docker_compose_data)
+        response.mimetype = "application/yaml"
+        response.headers["Content-Disposition"] = "attachment; filename=docker-compose.yml"
+        response.headers["Cache-Control"] = "public, max-age=86400"
+        response.set_etag(get_docker_compose_template_etag(layout))
+        return response.make_conditional(request)
+
+
+class DockerComposeEnvSource(Resource):
+    """
+    Class to get the .env file for the parameterised docker-compose.yml template
+    Args:
+        Resource (_type_): _description_
+    """
+
+    def post(self):
+        env = parse_env(request.data)
+        try:
+            # same project as POST / with COMPOSE_MODE=template (ACME_EMAIL, sizing, layout)
+            project = create_request_project(env)
+        except ValueError as error:
+            return {"status": "error", "message": str(error)}, 400
 
-        return docker_compose_yaml
-    
+        buffer = io.BytesIO()
+        buffer.write(get_env_data(project).encode())
+        buffer.seek(0)
 
-    def get_kubernetes_data(self):
-        """
-        Converts the Project object to a kubernetes.yml data string.
-        Returns multiple kubernetes.yml data strings.
-        """
-        
-        database_kubernetes = self.database.to_kubernetes()
-        website_kubernetes = self.website.to_kubernetes()
-        wpcli_kubernetes = self.wpcli.to_kubernetes()
-        admin_kubernetes = self.admin.to_kubernetes()
-        cache_kubernetes = self.cache.to_kubernetes()
-        monitoring_kubernetes = self.monitoring.to_kubernetes()
-        management_kubernetes = self.management.to_kubernetes()
-        vault_kubernetes = self.vault.to_kubernetes()
-        certbot_kubernetes = self.certbot.to_kubernetes()
-        code_kubernetes = self.code.to_kubernetes()
-        application_kubernetes = self.application.to_kubernetes()
-        mail_kubernetes = self.mail.to_kubernetes()
-        graphviz_kubernetes = self.graphviz.to_kubernetes()
-        
-        
-        
+        return send_file(
+            buffer,
+            as_attachment=True,
+            download_name=".env",
+            mimetype="text/plain",
+        )
 
-    def get_project_report(self):
-        """
-        Generates a report for the project.
-        """
-        report = f"""
-NOTE: This report is generated by woopy. It contains sensitive information. Please keep it secure.       
--------------------------------------------------------------
-Project: {self.project_name}
-Description: {self.project_description}
-Author: {self.project_author}
-Email: {self.project_email}
--------------------------------------------------------------
-Database Hostname: {self.database.database_host}
-Database Port: {self.database.database_port}
-Database Username: {self.database.database_user}
-Database Password: {self.database.database_password}
--------------------------------------------------------------
-Website Hostname: {self.website.site_url}
-Website Email: {self.website.website_admin_email}
-Website Username: {self.website.website_admin_username}
-Website Password: {self.website.website_admin_password}
--------------------------------------------------------------
-WP-CLI Hostname: {self.wpcli.wpcli_host}
-WP-CLI Port: {self.wpcli.wpcli_port}
-WP-CLI Username: {self.wpcli.wpcli_username}
-WP-CLI Password: {self.wpcli.wpcli_password}
--------------------------------------------------------------
-Cache Hostname: {self.cache.cache_host}
-Cache Port: {self.cache.cache_port}
--------------------------------------------------------------
-Monitoring Hostname: {self.monitoring.monitoring_host}
-Monitoring Port: {self.monitoring.monitoring_port}
-Monitoring Username: {self.monitoring.monitoring_username}
-Monitoring Password: {self.monitoring.monitoring_password}
--------------------------------------------------------------
-Management Hostname: {self.management.management_host}
-Management Port: {self.management.management_port}
-Management Username: {self.management.management_username}
-Management Password: {self.management.management_password}
--------------------------------------------------------------
-Vault Hostname: {self.vault.vault_host}
-Vault Port: {self.vault.vault_port}
-Vault Username: {self.vault.vault_username}
-Vault Password: {self.vault.vault_password}
--------------------------------------------------------------
-Certbot Hostname: {self.certbot.certbot_host}
-Certbot Port: {self.certbot.certbot_port}
-Certbot Username: {self.certbot.certbot_username}
-Certbot Password: {self.certbot.certbot_password}
--------------------------------------------------------------
-Code Hostname: {self.code.code_host}
-Code Port: {self.code.code_port}
-Code Username: {self.code.code_username}
-Code Password: {self.code.code_password}
--------------------------------------------------------------
-Application Name: {self.application.app_name}
-Application Version: {self.application.version}
-Application URL: {self.application.url}
-Application License: {self.application.license}
-Application Author: {self.application.author}
-Application Author Email: {self.application.author_email}
-Application Formal Name: {self.application.formal_name}
-Application Description: {self.application.description}
-Application Long Description: {self.application.long_description}'
--------------------------------------------------------------
-Mail Hostname: {self.mail.mail_host}
-Mail Port: {self.mail.mail_port}
-Mail Username: {self.mail.mail_username}
-Mail Password: {self.mail.mail_password}
--------------------------------------------------------------
-Graph Hostname: {self.graphviz.graphviz_host}
-Graph Port: {self.graphviz.graphviz_port}
-Graph Image Url: self.website.site_url/docker-compose.png
--------------------------------------------------------------
-networks:
-{self.website.site_title}-network
--------------------------------------------------------------
-volumes:
-{self.website.site_title}-vol
-{self.database.database_host}-vol
-{self.wpcli.wpcli_host}-vol
-{self.admin.admin_host}-vol
-{self.cache.cache_host}-vol
-{self.monitoring.monitoring_host}-vol
-{self.management.management_host}-vol
-{self.vault.vault_host}-vol
-{self.code.code_host}-vol
-{self.application.app_host}-vol
-{self.mail.mail_host}-vol
-{self.certbot.certbot_host}-vol
-{self.graphviz.graphviz_host}-vol
--------------------------------------------------------------
-"""
 
-        return report
+api.add_resource(DockerComposeTemplateSource, "/dc/template")
+api.add_resource(DockerComposeEnvSource, "/dc/env")
 
 
-class ProjectLicense:
+class ComposeDumper(yaml.SafeDumper):
     """
-    ProjectLicense class: This class is used to create a LICENSE file for the project
+    ComposeDumper class: a YAML dumper that indents lists like the generated docker-compose.yml.
     """
 
-    def __init__(self):
-        self.license_content = """
-    Fully open-source & libre software. You can use, modify, and distribute it.
+    def increase_indent(self, flow=False, indentless=False):
+        return super().increase_indent(flow, False)
 
-                                     Apache License
-                           Version 2.0, January 2004
-                        http://www.apache.org/licenses/
 
-   TERMS AND CONDITIONS FOR USE, REPRODUCTION, AND DISTRIBUTION
+class ComposePatcher:
+    """
+    ComposePatcher class: This class applies changes to an existing docker-compose.yml.
+
+    Only the lines touched by a change are rewritten, every other line (and so every
+    credential and volume) is kept byte for byte. docker compose up then recreates only the
+    changed containers.
+
+    Changes are dictionaries with an "op":
+        set_image: {"service", "image"}
+        set_environment: {"service", "name", "value"}
+        remove_environment: {"service", "name"}
+        set: {"service", "key", "value"} for any other key of the service
+        remove_service: {"service"} (the volumes are kept)
+        add_service: {"name"} a service of the service catalogue, with the catalogue services it depends on
+    """
 
-   1. Definitions.
+    key_line = re.compile(r"^(\s*)['\"]?([\w.-]+)['\"]?:(.*)$")
 
-      "License" shall mean the terms and conditions for use, reproduction,
-      and distribution as defined by Sections 1 through 9 of this document.
+    def __init__(self, docker_compose_data: str):
+        self.original = docker_compose_data
+        self.lines = docker_compose_data.splitlines(keepends=True)
+        self.compose = yaml.load(docker_compose_data, Loader=YamlLoader) or {}
+        if not isinstance(self.compose, dict):
+            raise ValueError("docker-compose.yml must be a mapping")
+        self.changed = []
 
-      "Licensor" shall mean the copyright owner or entity authorized by
-      the copyright owner that is granting the License.
+    @staticmethod
+    def _indentation(line: str) -> int:
+        return len(line) - len(line.lstrip(" "))
 
-      "Legal Entity" shall mean the union of the acting entity and all
-      other entities that control, are controlled by, or are under common
-      control with that entity. For the purposes of this definition,
-      "control" means (i) the power, direct or indirect, to cause the
-      direction or management of such entity, whether by contract or
-      otherwise, or (ii) ownership of fifty percent (50%) or more of the
-      outstanding shares, or (iii) beneficial ownership of such entity.
+    def _find_section(self, section: str):
+        """
+        Returns the (start, end) line numbers of the content of a top level section.
+        """
+        start = next(
+            (index for index, line in enumerate(self.lines) if re.match(rf"^{section}:\s*$", line)),
+            None,
+        )
+        if start is None:
+            raise ValueError(f"docker-compose.yml has no {section} section")
+        end = start + 1
+        while end < len(self.lines) and (not self.lines[end].strip() or self.lines[end][0].isspace()):
+            end += 1
+        return start + 1, end
+
+    def _find_children(self, start: int, end: int) -> dict:
+        """
+        Returns the (start, end, indentation) line numbers of the keys one level below start.
+        The end of a block does not include its trailing blank lines.
+        """
+        indentation = None
+        starts = []
+        for index in range(start, end):
+            match = self.key_line.match(self.lines[index])
+            if match is None or self.lines[index].lstrip().startswith("-"):
+                continue
+            if indentation is None:
+                indentation = len(match.group(1))
+            if len(match.group(1)) == indentation:
+                starts.append((index, match.group(2)))
+        children = {}
+        for position, (child_start, name) in enumerate(starts):
+            child_end = starts[position + 1][0] if position + 1 < len(starts) else end
+            while child_end > child_start + 1 and not self.lines[child_end - 1].strip():
+                child_end -= 1
+            children[name] = (child_start, child_end, indentation)
+        return children
+
+    def _find_service(self, name: str):
+        services = self._find_children(*self._find_section("services"))
+        if name not in services:
+            raise ValueError(f"unknown service {name}")
+        return services[name]
+
+    def _dump(self, data: dict, indentation: int) -> list:
+        body = yaml.dump(data, Dumper=ComposeDumper, sort_keys=False, indent=4, width=1000)
+        return [f"{' ' * indentation}{line}\n" for line in body.splitlines()]
+
+    def apply(self, changes: list) -> str:
+        """
+        Applies the changes and returns the patched docker-compose.yml.
+        """
+        operations = {
+            "set_image": lambda change: self._set(change["service"], "image", change["image"]),
+            "set_environment": lambda change: self._set_environment(change["service"], change["name"], change["value"]),
+            "remove_environment": lambda change: self._set_environment(change["service"], change["name"], None),
+            "set": lambda change: self._set(change["service"], change["key"], change["value"]),
+            "remove_service": lambda change: self._remove_service(change["service"]),
+            "add_service": lambda change: self._add_service(change["name"]),
+        }
+        for change in changes:
+            operation = operations.get(change.get("op"))
+            if operation is None:
+                raise ValueError(f"unknown change {change.get('op')}")
+            operation(change)
+            service = change.get("service", change.get("name"))
+            if service not in self.changed:
+                self.changed.append(service)
+        patched = "".join(self.lines)
+        yaml.load(patched, Loader=YamlLoader)
+        return patched
+
+    def _set(self, service: str, key: str, value):
+        """
+        Replaces (or appends) one key of a service.
+        """
+        start, end, _ = self._find_service(service)
+        keys = self._find_children(start + 1, end)
+        indentation = self._indentation(self.lines[start + 1]) if start + 1 < end else 8
+        replacement = self._dump({key: value}, indentation)
+        if key in keys:
+            key_start, key_end, _ = keys[key]
+            self.lines[key_start:key_end] = replacement
+        else:
+            self.lines[end:end] = replacement
+
+    def _set_environment(self, service: str, name: str, value):
+        """
+        Sets (or removes, value None) one environment variable of a service, keeping the
+        list or mapping syntax of the file.
+        """
+        start, end, _ = self._find_service(service)
+        keys = self._find_children(start + 1, end)
+        if "environment" not in keys:
+            if value is not None:
+                self._set(service, "environment", {name: value})
+            return
+        key_start, key_end, indentation = keys["environment"]
+        items = [index for index in range(key_start + 1, key_end) if self.lines[index].strip()]
+        is_list = bool(items) and self.lines[items[0]].lstrip().startswith("-")
+        item_indentation = self._indentation(self.lines[items[0]]) if items else indentation + 4
+        pattern = re.compile(
+            rf"^\s*-\s*['\"]?{re.escape(name)}(=|['\"]?$)" if is_list else rf"^\s*['\"]?{re.escape(name)}['\"]?:"
+        )
+        existing = next((index for index in items if pattern.match(self.lines[index])), None)
+        if value is None:
+            if existing is not None:
+                del self.lines[existing]
+            return
+        if is_list:
+            line = f"{' ' * item_indentation}- {name}={value}\n"
+        else:
+            line = self._dump({name: value}, item_indentation)[0]
+        if existing is not None:
+            self.lines[existing] = line
+        else:
+            self.lines.insert(items[-1] + 1 if items else key_start + 1, line)
+
+    def _remove_service(self, service: str):
+        """
+        Removes a service block with its trailing blank lines, the volumes are kept.
+        """
+        start, end, _ = self._find_service(service)
+        while end < len(self.lines) and not self.lines[end].strip():
+            end += 1
+        del self.lines[start:end]
+        self.compose = yaml.load("".join(self.lines), Loader=YamlLoader) or {}
 
-      "You" (or "Your") shall mean an individual or Legal Entity
-      exercising permissions granted by this License.
+    def _add_service(self, name: str):
+        """
+        Appends a catalogue service to the services section and its volumes to the volumes section.
+        """
+        if name in (self.compose.get("services") or {}):
+            raise ValueError(f"service {name} already exists")
+        networks = list(self.compose.get("networks") or {})
+        network = networks[0] if networks else "default"
+        site_title = network[: -len("-network")] if network.endswith("-network") else network
+        environment = ((self.compose.get("services") or {}).get("website") or {}).get("environment") or {}
+        if isinstance(environment, list):
+            environment = dict(item.split("=", 1) for item in environment if "=" in item)
+        site_url = environment.get("WORDPRESS_SITE_URL", "localhost")
+
+        existing = self.compose.get("services") or {}
+        services = []
+        for service in service_catalogue.create_services([name], site_title=site_title, site_url=site_url):
+            if service.name not in existing:
+                services.append(service)
+            elif service.definition.generate:
+                # the values of the service in the file (passwords) are not known
+                raise ValueError(f"service {name} depends on {service.name}, which is already in the file")
+
+        for service in services:
+            service.values["network"] = network
+            _, end = self._find_section("services")
+            while end > 0 and not self.lines[end - 1].strip():
+                end -= 1
+            # one line per element, so later changes of the same request find the service
+            block = service.to_docker_compose().strip("\n") + "\n"
+            self.lines[end:end] = ["\n", *block.splitlines(keepends=True)]
+            volumes = service.get_volumes()
+            if volumes:
+                _, volumes_end = self._find_section("volumes")
+                while volumes_end > 0 and not self.lines[volumes_end - 1].strip():
+                    volumes_end -= 1
+                self.lines[volumes_end:volumes_end] = [f"    {volume}: {{}}\n" for volume in volumes]
+            if service.name != name and service.name not in self.changed:
+                self.changed.append(service.name)
+        self.compose = yaml.load("".join(self.lines), Loader=YamlLoader)
+
+    def get_diff(self, patched: str) -> str:
+        """
+        Returns the unified diff between the original and the patched docker-compose.yml.
+        """
+        return "".join(
+            difflib.unified_diff(
+                self.original.splitlines(keepends=True),
+                patched.splitlines(keepends=True),
+                fromfile="docker-compose.yml",
+                tofile="docker-compose.yml",
+            )
+        )
 
-      "Source" form shall mean the preferred form for making modifications,
-      including but not limited to software source code, documentation
-      source, and configuration files.
 
-      "Object" form shall mean any form resulting from mechanical
-      transformation or translation of a Source form, including but
-      not limited to compiled object code, generated documentation,
-      and conversions to other media types.
+class DockerComposePatchApi(Resource):
+    """
+    Class to patch an existing docker-compose.yml without regenerating the credentials
+    Request body (JSON):
+        compose: the docker-compose.yml, or
+        project_id: a project of the project registry (admin token required)
+        changes: list of ComposePatcher changes
+        format: yaml (default, the patched file) or diff
+    The endpoint is read-only: the patched file is returned, the project registry keeps the
+    project as it was generated.
+    """
 
-      "Work" shall mean the work of authorship, whether in Source or
-      Object form, made available under the License, as indicated by a
-      copyright notice that is included in or attached to the work
-      (an example is provided in the Appendix below).
+    def post(self):
+        body = request.get_json(force=True, silent=True) or {}
+        if not isinstance(body, dict):
+            return {"status": "error", "message": "the request body must be a JSON object"}, 400
+        changes = body.get("changes", [])
+        if not isinstance(changes, list) or not all(isinstance(change, dict) for change in changes):
+            return {"status": "error", "message": "changes must be a list of objects"}, 400
+        if "project_id" in body:
+            if not project_registry.enabled:
+                return {"status": "error", "message": "project registry is disabled"}, 404
+            if not is_admin_request():
+                return {"status": "error", "message": "admin token required"}, 403
+            stored = project_registry.load(body["project_id"])
+            if stored is None:
+                return {"status": "error", "message": "project not found"}, 404
+            docker_compose_data = get_project_docker_compose_data(*stored)
+        elif "compose" in body:
+            if not isinstance(body["compose"], str):
+                return {"status": "error", "message": "compose must be a string"}, 400
+            docker_compose_data = body["compose"]
+        else:
+            return {"status": "error", "message": "compose or project_id is required"}, 400
+
+        try:
+            patcher = ComposePatcher(docker_compose_data)
+            patched = patcher.apply(changes)
+        except (KeyError, TypeError, ValueError, yaml.YAMLError) as error:
+            return {"status": "error", "message": f"invalid change: {error}"}, 400
+
+        if body.get("format") == "diff":
+            content, download_name, mimetype = patcher.get_diff(patched), "docker-compose.yml.diff", "text/x-diff"
+        else:
+            content, download_name, mimetype = patched, "docker-compose.yml", "application/yaml"
+
+        response = send_file(
+            io.BytesIO(content.encode()),
+            as_attachment=True,
+            download_name=download_name,
+            mimetype=mimetype,
+        )
+        response.headers["X-Woopy-Changed-Services"] = ",".join(patcher.changed)
+        return response
 
-      "Derivative Works" shall mean any work, whether in Source or Object
-      form, that is based on (or derived from) the Work and for which the
-      editorial revisions, annotations, elaborations, or other modifications
-      represent, as a whole, an original work of authorship. For the purposes
-      of this License, Derivative Works shall not include works that remain
-      separable from, or merely link (or bind by name) to the interfaces of,
-      the Work and Derivative Works thereof.
 
-      "Contribution" shall mean any work of authorship, including
-      the original version of the Work and any modifications or additions
-      to that Work or Derivative Works thereof, that is intentionally
-      submitted to Licensor for inclusion in the Work by the copyright owner
-      or by an individual or Legal Entity authorized to submit on behalf of
-      the copyright owner. For the purposes of this definition, "submitted"
-      means any form of electronic, verbal, or written communication sent
-      to the Licensor or its representatives, including but not limited to
-      communication on electronic mailing lists, source code control systems,
-      and issue tracking systems that are managed by, or on behalf of, the
-      Licensor for the purpose of discussing and improving the Work, but
-      excluding communication that is conspicuously marked or otherwise
-      designated in writing by the copyright owner as "Not a Contribution."
+api.add_resource(DockerComposePatchApi, "/dc/patch")
 
-      "Contributor" shall mean Licensor and any individual or Legal Entity
-      on behalf of whom a Contribution has been received by Licensor and
-      subsequently incorporated within the Work.
 
-   2. Grant of Copyright License. Subject to the terms and conditions of
-      this License, each Contributor hereby grants to You a perpetual,
-      worldwide, non-exclusive, no-charge, royalty-free, irrevocable
-      copyright license to reproduce, prepare Derivative Works of,
-      publicly display, publicly perform, sublicense, and distribute the
-      Work and such Derivative Works in Source or Object form.
+class ProjectListApi(Resource):
+    """
+    Class to list and search the projects in the registry
+    Query parameters:
+        q: beginning of the site title or site url
+        site_url: exact site url
+        limit: number of projects to return (default 50, max 500)
+        offset: number of projects to skip
+    """
 
-   3. Grant of Patent License. Subject to the terms and conditions of
-      this License, each Contributor hereby grants to You a perpetual,
-      worldwide, non-exclusive, no-charge, royalty-free, irrevocable
-      (except as stated in this section) patent license to make, have made,
-      use, offer to sell, sell, import, and otherwise transfer the Work,
-      where such license applies only to those patent claims licensable
-      by such Contributor that are necessarily infringed by their
-      Contribution(s) alone or by combination of their Contribution(s)
-      with the Work to which such Contribution(s) was submitted. If You
-      institute patent litigation against any entity (including a
-      cross-claim or counterclaim in a lawsuit) alleging that the Work
-      or a Contribution incorporated within the Work constitutes direct
-      or contributory patent infringement, then any patent licenses
-      granted to You under this License for that Work shall terminate
-      as of the date such litigation is filed.
+    def get(self):
+        if not project_registry.enabled:
+            return {"status": "error", "message": "project registry is disabled"}, 404
+        if not is_admin_request():
+            return {"status": "error", "message": "admin token required"}, 403
+        try:
+            limit = int(request.args.get("limit", "50"))
+            offset = int(request.args.get("offset", "0"))
+        except ValueError:
+            limit = offset = -1
+        if limit < 0 or offset < 0:
+            return {"status": "error", "message": "limit and offset must be non-negative integers"}, 400
+        projects = project_registry.search(
+            query=request.args.get("q", ""),
+            site_url=request.args.get("site_url"),
+            limit=min(limit, 500),
+            offset=offset,
+        )
+        return {"status": "ok", "projects": projects}
 
-   4. Redistribution. You may reproduce and distribute copies of the
-      Work or Derivative Works thereof in any medium, with or without
-      modifications, and in Source or Object form, provided that You
-      meet the following conditions:
 
-      (a) You must give any other recipients of the Work or
-          Derivative Works a copy of this License; and
+class ProjectArtifactApi(Resource):
+    """
+    Class to download an artifact of a project in the registry again
+    Artifacts: project.zip, docker-compose.yml, .env, report.txt
+    """
+
+    def get(self, project_id, artifact):
+        if not project_registry.enabled:
+            return {"status": "error", "message": "project registry is disabled"}, 404
+        if not is_admin_request():
+            return {"status": "error", "message": "admin token required"}, 403
+        stored = project_registry.load(project_id)
+        if stored is None:
+            return {"status": "error", "message": "project not found"}, 404
+        project, env = stored
+
+        if artifact == "project.zip":
+            buffer = create_project_bundle(project, env)
+            mimetype = "application/zip"
+        elif artifact in ("docker-compose.yml", ".env", "report.txt"):
+            if artifact == "docker-compose.yml":
+                content = get_project_docker_compose_data(project, env)
+                mimetype = "application/yaml"
+            elif artifact == ".env":
+                content = get_env_data(project)
+                mimetype = "text/plain"
+            else:
+                content = project.get_project_report()
+                mimetype = "text/plain"
+            buffer = io.BytesIO(content.encode())
+        else:
+            return {"status": "error", "message": f"unknown artifact {artifact}"}, 404
+
+        return send_file(
+            buffer,
+            as_attachment=True,
+            download_name=artifact,
+            mimetype=mimetype,
+        )
+
 
-      (b) You must cause any modified files to carry prominent notices
-          stating that You changed the files; and
+class ServiceCatalogueApi(Resource):
+    """
+    Class to list the services of the service catalogue, they can be added to a project with
+    SERVICES=name,name in the request body
+    """
 
-      (c) You must retain, in the Source form of any Derivative Works
-          that You distribute, all copyright, patent, trademark, and
-          attribution notices from the Source form of the Work,
-          excluding those notices that do not pertain to any part of
-          the Derivative Works; and
+    def get(self):
+        definitions = service_catalogue.get_definitions()
+        return {
+            "status": "ok",
+            "services": [
+                {"name": name, "image": definition.definition["image"], "resources": definition.resources}
+                for name, definition in sorted(definitions.items())
+            ],
+        }
 
-      (d) If the Work includes a "NOTICE" text file as part of its
-          distribution, then any Derivative Works that You distribute must
-          include a readable copy of the attribution notices contained
-          within such NOTICE file, excluding those notices that do not
-          pertain to any part of the Derivative Works, in at least one
-          of the following places: within a NOTICE text file distributed
-          as part of the Derivative Works; within the Source form or
-          documentation, if provided along with the Derivative Works; or,
-          within a display generated by the Derivative Works, if and
-          wherever such third-party notices normally appear. The contents
-          of the NOTICE file are for informational purposes only and
-          do not modify the License. You may add Your own attribution
-          notices within Derivative Works that You distribute, alongside
-          or as an addendum to the NOTICE text from the Work, provided
-          that such additional attribution notices cannot be construed
-          as modifying the License.
 
-      You may add Your own copyright statement to Your modifications and
-      may provide additional or different license terms and conditions
-      for use, reproduction, or distribution of Your modifications, or
-      for any such Derivative Works as a whole, provided Your use,
-      reproduction, and distribution of the Work otherwise complies with
-      the conditions stated in this License.
+api.add_resource(ServiceCatalogueApi, "/catalogue")
+api.add_resource(ProjectListApi, "/projects")
+api.add_resource(ProjectArtifactApi, "/projects/<string:project_id>/<string:artifact>")
 
-   5. Submission of Contributions. Unless You explicitly state otherwise,
-      any Contribution intentionally submitted for inclusion in the Work
-      by You to the Licensor shall be under the terms and conditions of
-      this License, without any additional terms or conditions.
-      Notwithstanding the above, nothing herein shall supersede or modify
-      the terms of any separate license agreement you may have executed
-      with Licensor regarding such Contributions.
 
-   6. Trademarks. This License does not grant permission to use the trade
-      names, trademarks, service marks, or product names of the Licensor,
-      except as required for reasonable and customary use in describing the
-      origin of the Work and reproducing the content of the NOTICE file.
+class ComposeRule:
+    """
+    ComposeRule class: This is the base class of the compose doctor rules.
+    A rule checks one service of a docker-compose.yml file and returns its findings.
+    """
 
-   7. Disclaimer of Warranty. Unless required by applicable law or
-      agreed to in writing, Licensor provides the Work (and each
-      Contributor provides its Contributions) on an "AS IS" BASIS,
-      WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
-      implied, including, without limitation, any warranties or conditions
-      of TITLE, NON-INFRINGEMENT, MERCHANTABILITY, or FITNESS FOR A
-      PARTICULAR PURPOSE. You are solely responsible for determining the
-      appropriateness of using or redistributing the Work and assume any
-      risks associated with Your exercise of permissions under this License.
+    rule_id = ""
+    severity = "info"
 
-   8. Limitation of Liability. In no event and under no legal theory,
-      whether in tort (including negligence), contract, or otherwise,
-      unless required by applicable law (such as deliberate and grossly
-      negligent acts) or agreed to in writing, shall any Contributor be
-      liable to You for damages, including any direct, indirect, special,
-      incidental, or consequential damages of any character arising as a
-      result of this License or out of the use or inability to use the
-      Work (including but not limited to damages for loss of goodwill,
-      work stoppage, computer failure or malfunction, or any and all
-      other commercial damages or losses), even if such Contributor
-      has been advised of the possibility of such damages.
+    def check(self, service_name: str, service: dict, compose: dict) -> list:
+        raise NotImplementedError
 
-   9. Accepting Warranty or Additional Liability. While redistributing
-      the Work or Derivative Works thereof, You may choose to offer,
-      and charge a fee for, acceptance of support, warranty, indemnity,
-      or other liability obligations and/or rights consistent with this
-      License. However, in accepting such obligations, You may act only
-      on Your own behalf and on Your sole responsibility, not on behalf
-      of any other Contributor, and only if You agree to indemnify,
-      defend, and hold each Contributor harmless for any liability
-      incurred by, or claims asserted against, such Contributor by reason
-      of your accepting any such warranty or additional liability.
+    def finding(self, service_name: str, message: str, fix: str) -> dict:
+        return {
+            "rule": self.rule_id,
+            "severity": self.severity,
+            "service": service_name,
+            "message": message,
+            "fix": fix,
+        }
 
-   END OF TERMS AND CONDITIONS
 
-   APPENDIX: How to apply the Apache License to your work.
+class LatestTagRule(ComposeRule):
+    """
+    Images without a tag or with the latest tag are pulled again on every deployment.
+    """
 
-      To apply the Apache License to your work, attach the following
-      boilerplate notice, with the fields enclosed by brackets "[]"
-      replaced with your own identifying information. (Don't include
-      the brackets!)  The text should be enclosed in the appropriate
-      comment syntax for the file format. We also recommend that a
-      file or class name and description of purpose be included on the
-      same "printed page" as the copyright notice for easier
-      identification within third-party archives.
+    rule_id = "latest-tag"
+    severity = "warning"
+
+    def check(self, service_name, service, compose):
+        image = str(service.get("image", ""))
+        if not image or "@" in image:
+            return []
+        tag = image.rsplit(":", 1)[1] if ":" in image.rsplit("/", 1)[-1] else "latest"
+        if tag != "latest":
+            return []
+        return [
+            self.finding(
+                service_name,
+                f"image {image} is not pinned to a version",
+                "pin a version tag or digest, so the image is pulled once and cached on the host",
+            )
+        ]
+
+
+class ResourceLimitsRule(ComposeRule):
+    """
+    Services without CPU and memory limits can starve the other services of the host.
+    """
 
-   Copyright [yyyy] [name of copyright owner]
+    rule_id = "no-resource-limits"
+    severity = "warning"
+
+    def check(self, service_name, service, compose):
+        limits = (((service.get("deploy") or {}).get("resources") or {}).get("limits")) or {}
+        has_memory = "memory" in limits or "mem_limit" in service
+        has_cpus = "cpus" in limits or "cpus" in service
+        if has_memory and has_cpus:
+            return []
+        missing = " and ".join(
+            name for name, present in (("memory", has_memory), ("cpu", has_cpus)) if not present
+        )
+        return [
+            self.finding(
+                service_name,
+                f"no {missing} limit",
+                "set deploy.resources.limits.cpus and deploy.resources.limits.memory",
+            )
+        ]
 
-   Licensed under the Apache License, Version 2.0 (the "License");
-   you may not use this file except in compliance with the License.
-   You may obtain a copy of the License at
 
-       http://www.apache.org/licenses/LICENSE-2.0
+class JsonFileLoggingRule(ComposeRule):
+    """
+    The json-file logging driver writes uncompressed JSON for every log line.
+    """
 
-   Unless required by applicable law or agreed to in writing, software
-   distributed under the License is distributed on an "AS IS" BASIS,
-   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
-   See the License for the specific language governing permissions and
-   limitations under the License.
+    rule_id = "json-file-logging"
+    severity = "info"
+
+    def check(self, service_name, service, compose):
+        driver = (service.get("logging") or {}).get("driver", "json-file")
+        if driver != "json-file":
+            return []
+        return [
+            self.finding(
+                service_name,
+                "uses the json-file logging driver",
+                'use the "local" logging driver, it is faster and compresses rotated files',
+            )
+        ]
 
 
+class PrivilegedRule(ComposeRule):
+    """
+    Privileged containers get every device and capability of the host.
     """
 
-    def get_license(self):
-        """
-        Returns the license content.
-        """
-        return self.license_content
+    rule_id = "privileged"
+    severity = "error"
 
+    def check(self, service_name, service, compose):
+        if not service.get("privileged"):
+            return []
+        return [
+            self.finding(
+                service_name,
+                "runs privileged",
+                "remove privileged and add only the needed devices and cap_add entries",
+            )
+        ]
 
-class Contributing:
+
+class SleepLoopRule(ComposeRule):
     """
-    Contributing class: This class is used to create a CONTRIBUTING.md file for the project
+    Containers that only run a sleep loop hold memory and a restart policy for nothing.
     """
 
-    def __init__(self):
-        self.contributing_content = """
-    # Contributing
+    rule_id = "sleep-loop"
+    severity = "warning"
+
+    def check(self, service_name, service, compose):
+        command = service.get("command", "")
+        if isinstance(command, list):
+            command = " ".join(str(part) for part in command)
+        if not re.search(r"while\s+(true|:)\s*;\s*do\s+sleep", str(command)):
+            return []
+        return [
+            self.finding(
+                service_name,
+                "runs an endless sleep loop",
+                "run the real process in the foreground, or run the task once with restart: \"no\"",
+            )
+        ]
+
+
+class LinksRule(ComposeRule):
+    """
+    Legacy links do not wait for readiness and duplicate the network DNS.
+    """
 
-    We welcome contributions to the project. To contribute, please follow these steps:
+    rule_id = "legacy-links"
+    severity = "info"
+
+    def check(self, service_name, service, compose):
+        if not service.get("links"):
+            return []
+        return [
+            self.finding(
+                service_name,
+                "uses legacy links",
+                "remove links, services on the same network resolve each other by name",
+            )
+        ]
 
-    1. Fork the repository
-    2. Create a new branch
-    3. Make your changes
-    4. Submit a pull request
 
+class DependencyHealthRule(ComposeRule):
+    """
+    Dependencies without a healthcheck only wait for the container to start, not to be ready.
     """
 
-    def get_contributing(self):
+    rule_id = "unhealthy-dependency"
+    severity = "warning"
+
+    def check(self, service_name, service, compose):
+        depends_on = service.get("depends_on") or []
+        if isinstance(depends_on, str):
+            depends_on = [depends_on]
+        if isinstance(depends_on, dict):
+            dependencies = [
+                name for name, options in depends_on.items()
+                if (options or {}).get("condition") != "service_healthy"
+            ]
+        else:
+            dependencies = list(depends_on)
+        services = compose.get("services") or {}
+        findings = []
+        for dependency in dependencies:
+            if "healthcheck" not in (services.get(dependency) or {}):
+                fix = f"add a healthcheck to {dependency} and depend on it with condition: service_healthy"
+            else:
+                fix = f"depend on {dependency} with condition: service_healthy"
+            findings.append(
+                self.finding(service_name, f"starts before {dependency} is ready", fix)
+            )
+        return findings
+
+
+COMPOSE_RULES = [
+    LatestTagRule(),
+    ResourceLimitsRule(),
+    JsonFileLoggingRule(),
+    PrivilegedRule(),
+    SleepLoopRule(),
+    LinksRule(),
+    DependencyHealthRule(),
+]
+
+SEVERITY_ORDER = {"error": 0, "warning": 1, "info": 2}
+
+
+class ComposeDoctor:
+    """
+    ComposeDoctor class: This class reports the performance anti-patterns of a
+    docker-compose.yml file, generated by Project.get_docker_compose_data() or edited by hand.
+
+    Rules are ComposeRule instances. Add a rule to COMPOSE_RULES to enable it everywhere, or
+    pass the rules to use to a ComposeDoctor.
+    """
+
+    def __init__(self, rules: list = None):
+        self.rules = COMPOSE_RULES if rules is None else rules
+
+    def analyse(self, compose) -> list:
         """
-        Returns the contributing content.
+        Returns the findings for a docker-compose.yml string or an already parsed dictionary,
+        the most severe first.
+        Raises ValueError when the file does not have the shape of a docker-compose.yml.
         """
-        return self.contributing_content
+        if isinstance(compose, str):
+            compose = yaml.load(compose, Loader=YamlLoader) or {}
+        self.check_shape(compose)
+        findings = []
+        for service_name, service in (compose.get("services") or {}).items():
+            for rule in self.rules:
+                findings.extend(rule.check(service_name, service or {}, compose))
+        findings.sort(key=lambda finding: SEVERITY_ORDER.get(finding["severity"], 3))
+        return findings
+
+    @staticmethod
+    def check_shape(compose):
+        """
+        Checks the parts of a docker-compose.yml the rules and the topology graph read: the file,
+        services, volumes, networks, every service, deploy, deploy.resources, deploy.resources.limits
+        and logging are mappings (or empty), depends_on is a service name, a list of service names or
+        a mapping, the volumes of a service a list and its networks a list of names or a mapping.
+        Raises ValueError for the first part that has another shape.
+        """
+        if not isinstance(compose, dict):
+            raise ValueError("the top level must be a mapping")
+        for section in ("volumes", "networks"):
+            if not isinstance(compose.get(section) or {}, dict):
+                raise ValueError(f"{section} must be a mapping")
+        services = compose.get("services") or {}
+        if not isinstance(services, dict):
+            raise ValueError("services must be a mapping of service names to services")
+        for service_name, service in services.items():
+            if service is None:
+                continue
+            if not isinstance(service, dict):
+                raise ValueError(f"service {service_name} must be a mapping")
+            for path in (("deploy",), ("deploy", "resources"), ("deploy", "resources", "limits"), ("logging",)):
+                value = service
+                for key in path:
+                    value = (value or {}).get(key)
+                if value is not None and not isinstance(value, dict):
+                    raise ValueError(f"{'.'.join(path)} of service {service_name} must be a mapping")
+            depends_on = service.get("depends_on")
+            if isinstance(depends_on, list):
+                if not all(isinstance(name, str) for name in depends_on):
+                    raise ValueError(f"depends_on of service {service_name} must list service names")
+            elif depends_on is not None and not isinstance(depends_on, (str, dict)):
+                raise ValueError(f"depends_on of service {service_name} must be a service name, a list or a mapping")
+            if not isinstance(service.get("volumes") or [], list):
+                raise ValueError(f"volumes of service {service_name} must be a list")
+            networks = service.get("networks") or []
+            if not isinstance(networks, (list, dict)) or (
+                isinstance(networks, list) and not all(isinstance(name, str) for name in networks)
+            ):
+                raise ValueError(f"networks of service {service_name} must be a list of names or a mapping")
+
+
+class ComposeDoctorApi(Resource):
+    """
+    Class to analyse a docker-compose.yml file (request body) for performance anti-patterns
+    Args:
+        Resource (_type_): _description_
+    """
+
+    def post(self):
+        started = time.perf_counter()
+        try:
+            findings = ComposeDoctor().analyse(request.data.decode())
+        except (ValueError, yaml.YAMLError) as error:
+            return {"status": "error", "message": f"invalid docker-compose.yml: {error}"}, 400
+        return {
+            "status": "ok",
+            "findings": findings,
+            "summary": dict(Counter(finding["severity"] for finding in findings)),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+        }
 
 
-class CodeOfConduct:
+api.add_resource(ComposeDoctorApi, "/doctor")
+
+
+class TopologyGraphApi(Resource):
     """
-    CodeOfConduct class: This class is used to create a CODE_OF_CONDUCT.md file for the project
+    Class to draw the topology graph of a docker-compose.yml file (request body)
+    Query parameters:
+        format: svg (default), dot or mermaid
     """
 
-    def __init__(self):
-        self.code_of_conduct_content = """
-    # Code of Conduct
+    formats = {
+        "svg": ("to_svg", "image/svg+xml"),
+        "dot": ("to_dot", "text/vnd.graphviz"),
+        "mermaid": ("to_mermaid", "text/plain"),
+    }
 
-    We are committed to providing a friendly, safe, and welcoming environment for everyone, regardless of level of experience
-    
+    def post(self):
+        output_format = request.args.get("format", "svg")
+        if output_format not in self.formats:
+            return {"status": "error", "message": f"format must be one of {', '.join(self.formats)}"}, 400
+        renderer, mimetype = self.formats[output_format]
+        graph = GraphViz(site_title="woopy", site_url="")
+        try:
+            content = getattr(graph, renderer)(request.data.decode())
+        except (ValueError, yaml.YAMLError) as error:
+            return {"status": "error", "message": f"invalid docker-compose.yml: {error}"}, 400
+        response = make_response(content)
+        response.headers["Content-Type"] = mimetype
+        return response
+
+
+api.add_resource(TopologyGraphApi, "/graph")
+
+
+class PlacementPlanner:
     """
+    PlacementPlanner class: This class splits the services of a project over multiple Docker hosts.
 
-    def get_code_of_conduct(self):
+    The services are bin-packed (best fit decreasing) on the hosts by their resource profile,
+    stateful services are kept on different hosts where possible (anti-affinity), services with
+    an affinity run on the host of that service (the proxy and the page cache next to the
+    website) and global services run on every host. Every host gets its own docker-compose.yml, connected to the
+    others by an attachable overlay network, so the services keep resolving each other by name.
+
+    Hosts are dictionaries: {"name": "node-1", "cpus": 4, "memory": 8192, "disk": 100}
+    with the memory in MB and the disk in GB.
+    """
+
+    resources = ("cpus", "memory", "disk")
+
+    def __init__(self, hosts: list):
+        if not hosts:
+            raise ValueError("at least one host is required")
+        self.hosts = hosts
+
+    def plan(self, service_names: list) -> dict:
         """
-        Returns the code of conduct content.
+        Returns the placement as a dictionary: host name -> list of service names.
+        Raises ValueError when a service does not fit on any host, or not on the host of its affinity.
         """
-        return self.code_of_conduct_content
+        placement = {host["name"]: [] for host in self.hosts}
+        remaining = {host["name"]: {resource: float(host[resource]) for resource in self.resources} for host in self.hosts}
+        stateful_count = {host["name"]: 0 for host in self.hosts}
+        total = {resource: sum(float(host[resource]) for host in self.hosts) or 1.0 for resource in self.resources}
+
+        def reserve(host_name, service_name):
+            profile = get_resource_profile(service_name)
+            for resource in self.resources:
+                remaining[host_name][resource] -= profile[resource]
+            placement[host_name].append(service_name)
+            if profile["stateful"]:
+                stateful_count[host_name] += 1
+
+        def fits(host_name, service_name):
+            profile = get_resource_profile(service_name)
+            return all(remaining[host_name][resource] >= profile[resource] for resource in self.resources)
+
+        for service_name in service_names:
+            if get_resource_profile(service_name)["global"]:
+                for host_name in placement:
+                    if not fits(host_name, service_name):
+                        raise ValueError(f"global service {service_name} does not fit on host {host_name}")
+                    reserve(host_name, service_name)
+
+        def affinity_host(service_name):
+            target = get_resource_profile(service_name).get("affinity")
+            return next((host_name for host_name, names in placement.items() if target and target in names), None)
+
+        # the stateful services first, then the largest share of the scarcest resource;
+        # the services with an affinity last, once the service they follow is placed
+        services = sorted(
+            (name for name in service_names if not get_resource_profile(name)["global"]),
+            key=lambda name: (
+                get_resource_profile(name).get("affinity") in service_names,
+                not get_resource_profile(name)["stateful"],
+                -max(get_resource_profile(name)[resource] / total[resource] for resource in self.resources),
+            ),
+        )
+        for service_name in services:
+            host_name = affinity_host(service_name)
+            if host_name is not None:
+                if not fits(host_name, service_name):
+                    raise ValueError(
+                        f"service {service_name} does not fit next to {get_resource_profile(service_name)['affinity']} on host {host_name}"
+                    )
+                reserve(host_name, service_name)
+                continue
+            candidates = [host_name for host_name in placement if fits(host_name, service_name)]
+            if not candidates:
+                raise ValueError(f"service {service_name} does not fit on any host")
+            if get_resource_profile(service_name)["stateful"]:
+                fewest = min(stateful_count[host_name] for host_name in candidates)
+                candidates = [host_name for host_name in candidates if stateful_count[host_name] == fewest]
+            # best fit: the host with the least memory left after the placement
+            host_name = min(candidates, key=lambda name: (remaining[name]["memory"], remaining[name]["cpus"]))
+            reserve(host_name, service_name)
+
+        return placement
+
+    def render(self, docker_compose_data: str) -> dict:
+        """
+        Splits a docker-compose.yml over the hosts.
+        Returns a dictionary: file name -> content, with a docker-compose.<host>.yml per host and placement.md.
+        """
+        compose = yaml.load(docker_compose_data, Loader=YamlLoader)
+        services = compose.get("services", {})
+        placement = self.plan(list(services))
+        overlay_network = f"{next(iter(compose.get('networks', {'woopy': None})))}-overlay"
+
+        files = {}
+        for host_name, service_names in placement.items():
+            host_services = {}
+            for service_name in service_names:
+                service = dict(services[service_name])
+                # the other hosts are reached through the overlay network
+                service["networks"] = [overlay_network]
+                depends_on = service.get("depends_on")
+                if isinstance(depends_on, dict):
+                    depends_on = {name: options for name, options in depends_on.items() if name in service_names}
+                elif depends_on:
+                    depends_on = [name for name in depends_on if name in service_names]
+                if depends_on:
+                    service["depends_on"] = depends_on
+                else:
+                    service.pop("depends_on", None)
+                service.pop("links", None)
+                host_services[service_name] = service
+
+            used_volumes = {
+                str(volume).split(":", 1)[0]
+                for service in host_services.values()
+                for volume in service.get("volumes", [])
+            }
+            host_compose = {
+                "networks": {overlay_network: {"external": True}},
+                "volumes": {name: options for name, options in (compose.get("volumes") or {}).items() if name in used_volumes},
+                "services": host_services,
+            }
+            files[f"docker-compose.{host_name}.yml"] = yaml.safe_dump(host_compose, sort_keys=False)
+
+        # the proxy only sees the containers of its host, the routed services of the other hosts need their ports
+        proxy_host = next((host_name for host_name, names in placement.items() if "proxy" in names), None)
+        unrouted = [
+            name
+            for host_name, names in placement.items()
+            if proxy_host and host_name != proxy_host
+            for name in names
+            # labels are a mapping or a list of key=value
+            if any(str(label).startswith("traefik.enable") for label in services[name].get("labels") or ())
+        ]
+        files["placement.md"] = self.get_report(placement, overlay_network, unrouted)
+        return files
+
+    def get_report(self, placement: dict, overlay_network: str, unrouted: list = ()) -> str:
+        """
+        Returns the placement report with the usage of every host, the services the proxy can
+        not route and the setup commands.
+        """
+        lines = ["# Placement", ""]
+        for host in self.hosts:
+            service_names = placement[host["name"]]
+            usage = {
+                resource: sum(get_resource_profile(name)[resource] for name in service_names)
+                for resource in self.resources
+            }
+            lines.append(f"## {host['name']}")
+            lines.append("")
+            lines.append(
+                f"CPU {usage['cpus']:g}/{host['cpus']} cores, memory {usage['memory']:g}/{host['memory']} MB, disk {usage['disk']:g}/{host['disk']} GB"
+            )
+            lines.append("")
+            lines.extend(f"- {name}" for name in service_names)
+            lines.append("")
+        if unrouted:
+            lines.extend(
+                [
+                    "## Proxy routes",
+                    "",
+                    "The proxy runs next to the website and routes the containers of its own host only. "
+                    "These services run on other hosts, publish their ports (or run a second proxy there) to reach them:",
+                    "",
+                ]
+            )
+            lines.extend(f"- {name}" for name in unrouted)
+            lines.append("")
+        first_host = self.hosts[0]["name"]
+        lines.extend(
+            [
+                "## Setup",
+                "",
+                f"1. On {first_host}: `docker swarm init`, then run the printed `docker swarm join` command on the other hosts",
+                f"2. On {first_host}: `docker network create --driver overlay --attachable {overlay_network}`",
+                "3. Copy the whole placement bundle to every host: the services bind mount its configuration files and scripts",
+                "4. On every host: `docker compose -f docker-compose.<host>.yml up -d`",
+                "",
+            ]
+        )
+        return "\n".join(lines)
 
 
-class SecurityPolicy:
+def parse_hosts(hosts: str) -> list:
     """
-    SecurityPolicy class: This class is used to create a SECURITY.md file for the project
+    Parse hosts from "name:cpus:memory:disk,name:cpus:memory:disk" (memory in MB, disk in GB)
     """
+    parsed = []
+    for host in hosts.split(","):
+        name, cpus, memory, disk = host.strip().split(":")
+        parsed.append({"name": name, "cpus": float(cpus), "memory": int(memory), "disk": int(disk)})
+    return parsed
 
-    def __init__(self):
-        self.security_policy_content = """
-    # Security Policy
 
-    We take the security of our users seriously. If you have discovered a security vulnerability, please report it to the security team at KataWoo by emailing
-    
+class PlacementApi(Resource):
+    """
+    Class to split a new project over multiple hosts
+    Request body (.env format): SITE_TITLE, SITE_URL and HOSTS=name:cpus:memory:disk,...
+    Returns a zip file with a docker-compose.<host>.yml per host, placement.md, report.txt and the
+    files the services bind mount (configuration files and scripts)
     """
 
-    def get_security_policy(self):
-        """
-        Returns the security policy content.
-        """
-        return self.security_policy_content
+    def post(self):
+        env = parse_env(request.data)
+        try:
+            planner = PlacementPlanner(parse_hosts(env.get("HOSTS", "")))
+        except ValueError:
+            return {"status": "error", "message": "HOSTS must be name:cpus:memory:disk,..."}, 400
+        try:
+            project = create_request_project(env)
+            files = planner.render(project.get_docker_compose_data())
+        except ValueError as error:
+            return {"status": "error", "message": str(error)}, 400
 
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as zip_file:
+            for file_name, content in files.items():
+                zip_file.writestr(file_name, content)
+            for file_name, content in get_project_config_files(project, env) + get_static_bundle_files():
+                zip_file.writestr(file_name, content)
+            zip_file.writestr("report.txt", project.get_project_report())
+        buffer.seek(0)
 
-class RoadMap:
+        return send_file(
+            buffer,
+            as_attachment=True,
+            download_name="placement.zip",
+            mimetype="application/zip",
+        )
+
+
+api.add_resource(PlacementApi, "/plan")
+
+
+class DensityMode:
     """
-    RoadMap class: This class is used to create a ROADMAP.md file for the project
+    DensityMode class: This class rewrites a docker-compose.yml so many projects can run on one host.
 
-    The roadmap should contain the following sections:
-    - Introduction
-    - Current Features
-    - Future Features
-    - Conclusion
+        - the compose project name namespaces the volumes and networks, the container names
+          get the same prefix
+        - host port bindings are removed, the website is published through the shared ingress
+          (one Traefik per host, see get_ingress_compose) by its host name
+        - host level services (monitoring, the project proxy) are removed, they run once per host
     """
 
-    def __init__(self):
-        self.roadmap_content = """
-    # Roadmap
+    ingress_network = "woopy-ingress"
 
-    ## Introduction
+    # project services replaced by the shared ingress
+    ingress_services = ("proxy",)
 
-    This roadmap outlines the current features and future features of the project.
+    # Resources kept free for the operating system, Docker and the shared ingress
+    host_reserve = {"cpus": 0.5, "memory": 768, "disk": 10}
 
-    ## Current Features
+    def __init__(self, project_name: str, site_url: str):
+        self.project_name = project_name
+        self.site_url = site_url
+        self.compose_project_name = get_compose_project_name(project_name)
 
-    - Feature 1
-    - Feature 2
-    - Feature 3
+    def apply(self, docker_compose_data: str, template_mode: bool = False) -> str:
+        """
+        Returns the rewritten docker-compose.yml. In template mode the project name and the
+        site url are ${VAR} references to the .env file.
+        """
+        compose_project_name = "${COMPOSE_PROJECT_NAME}" if template_mode else self.compose_project_name
+        site_url = "${SITE_URL}" if template_mode else self.site_url
+        compose = yaml.load(docker_compose_data, Loader=YamlLoader)
+        services = {}
+        for service_name, service in compose.get("services", {}).items():
+            if get_resource_profile(service_name)["global"] or service_name in self.ingress_services:
+                continue
+            service = dict(service)
+            service["container_name"] = f"{compose_project_name}-{service_name}"
+            service.pop("ports", None)
+            # the routes of the project proxy, the shared ingress routes the website only
+            service.pop("labels", None)
+            services[service_name] = service
+
+        # the ingress sends the requests to the page cache when the project has one
+        website = services.get("pagecache") or services.get("website")
+        if website is not None:
+            router = re.sub(r"[^a-z0-9-]", "-", self.compose_project_name.lower())
+            website["networks"] = list(website.get("networks", [])) + [self.ingress_network]
+            website["labels"] = {
+                "traefik.enable": "true",
+                "traefik.docker.network": self.ingress_network,
+                f"traefik.http.routers.{router}.rule": f"Host(`{site_url}`) || Host(`www.{site_url}`)",
+                f"traefik.http.routers.{router}.entrypoints": "web",
+                f"traefik.http.services.{router}.loadbalancer.server.port": "80",
+            }
+
+        networks = dict(compose.get("networks") or {})
+        networks[self.ingress_network] = {"external": True}
+
+        used_volumes = {
+            str(volume).split(":", 1)[0] for service in services.values() for volume in service.get("volumes", [])
+        }
+        dense_compose = {}
+        if not template_mode:
+            # in template mode the name comes from COMPOSE_PROJECT_NAME in the .env file
+            dense_compose["name"] = self.compose_project_name
+        dense_compose["networks"] = networks
+        dense_compose["volumes"] = {
+            name: options for name, options in (compose.get("volumes") or {}).items() if name in used_volumes
+        }
+        dense_compose["services"] = services
+        return yaml.safe_dump(dense_compose, sort_keys=False)
+
+    @classmethod
+    def get_capacity(cls, host: dict, service_names: list, cpu_overcommit: float = 4.0) -> dict:
+        """
+        Returns how many projects fit on a host (cpus, memory in MB, disk in GB) and which
+        resource is the limit. Host level services are counted once in the host reserve.
+        Small shops are idle most of the time, so the CPU is overcommitted; memory and disk are not.
+        """
+        per_project = {
+            resource: sum(
+                get_resource_profile(name)[resource]
+                for name in service_names
+                if not get_resource_profile(name)["global"] and name not in cls.ingress_services
+            )
+            for resource in ("cpus", "memory", "disk")
+        }
+        available = {
+            resource: max(float(host[resource]) - cls.host_reserve[resource], 0)
+            for resource in ("cpus", "memory", "disk")
+        }
+        available["cpus"] *= cpu_overcommit
+        fits = {
+            resource: int(available[resource] // per_project[resource]) if per_project[resource] else None
+            for resource in ("cpus", "memory", "disk")
+        }
+        limiting = min((resource for resource in fits if fits[resource] is not None), key=lambda resource: fits[resource])
+        return {
+            "host": host,
+            "per_project": per_project,
+            "cpu_overcommit": cpu_overcommit,
+            "projects": fits[limiting],
+            "limited_by": limiting,
+            "fits_by_resource": fits,
+        }
+
+    def get_report(self, capacity: dict) -> str:
+        """
+        Returns the DENSITY.md report.
+        """
+        host, per_project = capacity["host"], capacity["per_project"]
+        return f"""# High-density mode
 
-    ## Future Features
+This project ({self.compose_project_name}) does not bind host ports. The website is published by the shared ingress on http://{self.site_url}.
 
-    - Feature 4
-    - Feature 5
-    - Feature 6
+Start the shared ingress once per host:
 
-    ## Conclusion
+    docker compose -f ingress/docker-compose.yml up -d
 
-    The project is continuously evolving with new features and improvements.
+## Capacity
 
-    """
+Per project: {per_project['cpus']:g} CPU cores, {per_project['memory']:g} MB memory, {per_project['disk']:g} GB disk
+Host: {host['cpus']:g} CPU cores, {host['memory']:g} MB memory, {host['disk']:g} GB disk (CPU overcommit x{capacity['cpu_overcommit']:g})
+Reserved for the host and the ingress: {self.host_reserve['cpus']:g} CPU cores, {self.host_reserve['memory']:g} MB memory, {self.host_reserve['disk']:g} GB disk
 
-    def get_roadmap(self):
+Projects per host: {capacity['projects']} (limited by {capacity['limited_by']})
+"""
+
+    @classmethod
+    def get_ingress_compose(cls) -> str:
         """
-        Returns the roadmap content.
+        Returns the docker-compose.yml of the shared ingress, one per host.
         """
-        return self.roadmap_content
+        return f"""
+name: woopy-ingress
 
+networks:
+    {cls.ingress_network}:
+        name: {cls.ingress_network}
+        driver: bridge
 
-class Changelog:
-    """
-    Changelog class: This class is used to create a CHANGELOG.md file for the project
+services:
+    ingress:
+        image: traefik:v3.1
+        container_name: woopy-ingress
+        command:
+            - --providers.docker=true
+            - --providers.docker.exposedbydefault=false
+            - --providers.docker.network={cls.ingress_network}
+            - --entrypoints.web.address=:80
+            - --entrypoints.websecure.address=:443
+        volumes:
+            - /var/run/docker.sock:/var/run/docker.sock:ro
+        networks:
+            - {cls.ingress_network}
+        ports:
+            - "80:80"
+            - "443:443"
+        restart: unless-stopped
+        logging:
+            {get_logging()}
+        """
 
-    The changelog should contain the following sections:
-    - Introduction
-    - Version History
-    - Conclusion
-    """
 
-    def __init__(self):
-        self.changelog_content = """
-    # Changelog
+def parse_host(host: str, variable: str = "host") -> dict:
+    """
+    Parse a host size from "cpus:memory:disk" (memory in MB, disk in GB).
+    Raises ValueError unless the three values are positive numbers.
+    """
+    try:
+        cpus, memory, disk = host.split(":")
+        parsed = {"cpus": float(cpus), "memory": int(memory), "disk": int(disk)}
+    except ValueError:
+        parsed = None
+    if parsed is None or not all(0 < value < float("inf") for value in parsed.values()):
+        raise ValueError(f"{variable} must be cpus:memory:disk (memory in MB, disk in GB) with positive numbers")
+    return parsed
 
-    ## Introduction
 
-    This changelog outlines the version history of the project.
+def parse_cpu_overcommit(value: str, variable: str = "cpu_overcommit") -> float:
+    """
+    Parse a CPU overcommit factor. Raises ValueError unless it is a positive number.
+    """
+    try:
+        cpu_overcommit = float(value)
+    except ValueError:
+        cpu_overcommit = 0
+    if not 0 < cpu_overcommit < float("inf"):
+        raise ValueError(f"{variable} must be a positive number")
+    return cpu_overcommit
 
-    ## Version History
 
-    ### Version 1.0.0
+class DensityCapacityApi(Resource):
+    """
+    Class to get how many projects fit on a host in high-density mode, for a default project
+    Query parameters:
+        host: cpus:memory:disk (memory in MB, disk in GB, default 4:8192:160)
+        cpu_overcommit: CPU overcommit factor (default 4)
+    """
 
-    - Feature 1
-    - Feature 2
-    - Feature 3
+    def get(self):
+        try:
+            host = parse_host(request.args.get("host", "4:8192:160"))
+            cpu_overcommit = parse_cpu_overcommit(request.args.get("cpu_overcommit", "4"))
+        except ValueError as error:
+            return {"status": "error", "message": str(error)}, 400
+        # the services of a default project, the parameterised template has the same layout
+        service_names = list(yaml.load(get_docker_compose_template(), Loader=YamlLoader)["services"])
+        capacity = DensityMode.get_capacity(host, service_names, cpu_overcommit)
+        return {"status": "ok", **capacity}
 
-    ### Version 1.1.0
 
-    - Feature 4
-    - Feature 5
-    - Feature 6
+api.add_resource(DensityCapacityApi, "/density")
 
-    ### Version 1.2.0
 
-    - Feature 7
-    - Feature 8
-    - Feature 9
+class SwarmStack:
+    """
+    SwarmStack class: This class renders a project as a Docker Swarm stack (docker stack deploy).
+
+    The stack is built from the docker-compose.yml of the service classes:
+        - deploy.replicas: website_replicas for the website, one replica for the other services,
+          host level services (monitoring) run in global mode
+        - deploy.resources: the limits and half of them as reservations, from the resource profiles
+        - deploy.placement: stateful services are pinned to the node labelled for them, so their
+          volume stays on that node
+        - deploy.update_config: rolling updates of the website (start first, rollback on failure)
+        - deploy.labels: the proxy routes, the proxy runs on the manager nodes with the swarm provider
+        - the project network is an attachable overlay network
+    """
 
-    ## Conclusion
+    # Options of the compose file that docker stack deploy does not support
+    unsupported = ("container_name", "links", "depends_on", "restart")
 
-    The project is continuously evolving with new features and improvements.
+    def __init__(self, project_name: str, website_replicas: int = 2, memory: dict = None):
+        if website_replicas < 1:
+            raise ValueError("website replicas must be at least 1")
+        self.project_name = project_name
+        self.stack_name = get_compose_project_name(project_name)
+        self.website_replicas = website_replicas
+        # memory in MB of the services sized for the project, instead of their resource profile
+        self.memory = memory or {}
 
-    """
+    def get_placement_label(self, service_name: str) -> str:
+        """
+        Returns the node label that pins a stateful service to a node.
+        """
+        return f"woopy.{self.stack_name}.{service_name}"
 
-    def get_changelog(self):
+    def get_deploy(self, service_name: str) -> dict:
         """
-        Returns the changelog content.
+        Returns the deploy section of a service.
         """
-        return self.changelog_content
+        profile = dict(get_resource_profile(service_name))
+        profile["memory"] = self.memory.get(service_name, profile["memory"])
+        deploy = {}
+        if profile["global"]:
+            deploy["mode"] = "global"
+        else:
+            deploy["replicas"] = self.website_replicas if service_name in ("website", "php") else 1
+        if service_name == "proxy":
+            # the proxy reads the services from the swarm API of a manager
+            deploy["placement"] = {"constraints": ["node.role == manager"]}
+        deploy["resources"] = {
+            "limits": {"cpus": f"{profile['cpus']:g}", "memory": f"{profile['memory']}M"},
+            "reservations": {"cpus": f"{profile['cpus'] / 2:g}", "memory": f"{profile['memory'] // 2}M"},
+        }
+        if service_name in ("website", "php"):
+            # the website volume is shared by the replicas, the replicas are spread over the nodes
+            deploy["placement"] = {"preferences": [{"spread": "node.id"}]}
+            deploy["update_config"] = {
+                "parallelism": 1,
+                "delay": "10s",
+                "order": "start-first",
+                "failure_action": "rollback",
+                "monitor": "30s",
+            }
+            deploy["rollback_config"] = {"parallelism": 1, "order": "start-first"}
+        elif profile["stateful"]:
+            deploy["placement"] = {"constraints": [f"node.labels.{self.get_placement_label(service_name)} == true"]}
+            # a single replica with a local volume cannot run twice during an update
+            deploy["update_config"] = {"parallelism": 1, "order": "stop-first", "failure_action": "rollback"}
+        deploy["restart_policy"] = {"condition": "any", "delay": "5s", "window": "60s"}
+        return deploy
+
+    def render(self, docker_compose_data: str) -> str:
+        """
+        Returns the docker-stack.yml for the docker-compose.yml of the project.
+        """
+        compose = yaml.load(docker_compose_data, Loader=YamlLoader)
+        services = {}
+        for service_name, service in compose.get("services", {}).items():
+            service = {key: value for key, value in service.items() if key not in self.unsupported}
+            if isinstance(service.get("healthcheck"), dict):
+                # start_interval is not part of the compose file format 3.8 of docker stack deploy
+                service["healthcheck"] = {
+                    key: value for key, value in service["healthcheck"].items() if key != "start_interval"
+                }
+            deploy = self.get_deploy(service_name)
+            # resources declared by the service itself (catalogue services) win
+            resources = (service.get("deploy") or {}).get("resources", {})
+            deploy["resources"].update(resources)
+            if "labels" in service:
+                # the proxy reads the routes from the service labels, not the container labels
+                deploy["labels"] = service.pop("labels")
+            if service_name == "proxy":
+                service["command"] = [
+                    argument.replace("--providers.docker", "--providers.swarm") for argument in service["command"]
+                ]
+            service["deploy"] = deploy
+            services[service_name] = service
+
+        networks = {
+            name: {"driver": "overlay", "attachable": True}
+            for name in (compose.get("networks") or {})
+        }
+        stack = {
+            # docker stack deploy still expects a version
+            "version": "3.8",
+            "networks": networks,
+            "volumes": compose.get("volumes") or {},
+            "services": services,
+        }
+        return yaml.safe_dump(stack, sort_keys=False, width=1000)
+
+    def get_report(self, docker_compose_data: str) -> str:
+        """
+        Returns the SWARM.md report with the node labels and the deploy commands.
+        """
+        service_names = list(yaml.load(docker_compose_data, Loader=YamlLoader).get("services", {}))
+        stateful = [
+            name
+            for name in service_names
+            if name != "website" and get_resource_profile(name)["stateful"] and not get_resource_profile(name)["global"]
+        ]
+        labels = "\n".join(
+            f"    docker node update --label-add {self.get_placement_label(name)}=true <node>" for name in stateful
+        )
+        return f"""# Docker Swarm stack
 
+Website replicas: {self.website_replicas}, rolling updates start the new container before the old one is stopped and roll back on failure.
 
-class GitIgnore:
-    """
-    GitIgnore class: This class is used to create a .gitignore file for the project
-    Ignored files:
-        - Windows Thumbs.db file
-        - macOS .DS_Store file
-        - Linux .DS_Store file
-        - Python __pycache__ directory
-        - Java .class files
-        - Node.js node_modules directory
-        - Visual Studio Code .vscode directory
-        - JetBrains IntelliJ IDEA .idea directory
-        - Eclipse .metadata directory
-        - Docker .docker directory
-        - Git .git directory
-        - GitHub .github directory
-        - Travis CI .travis.yml file
-        - Jenkinsfile file
-        - CircleCI .circleci directory
-        - Dockerfile file
-    """
+Label the node that keeps the volume of every stateful service (one node can hold several):
 
-    def __init__(self):
-        self.gitignore_content = """
-# Windows Thumbs.db file
-Thumbs.db
+{labels}
 
-# macOS .DS_Store file
-.DS_Store
+With more than one website replica the website volume must be shared by the nodes (NFS or another volume driver).
 
-# Linux .DS_Store file
-.DS_Store
+Deploy the stack from a manager node:
 
-# Python __pycache__ directory
-__pycache__
+    docker stack deploy -c docker-stack.yml {self.stack_name}
+"""
 
-# Java .class files
-*.class
 
-# Node.js node_modules directory
-node_modules
+class RequestProfiler:
+    """
+    RequestProfiler class: This class is used to profile a single request on demand.
 
-# Visual Studio Code .vscode directory
-.vscode
+    A request is profiled when it carries the admin token in the X-Woopy-Admin-Token header
+    and the wanted profiler in the X-Woopy-Profile header:
+        - cprofile: deterministic profile of every function call (cProfile)
+        - sample: statistical profile, the request thread's stack is sampled every interval
 
-# JetBrains IntelliJ IDEA .idea directory
-.idea
+    The results are kept in memory and can be downloaded from /admin/profiles/<profile_id>
+    as collapsed stacks (flamegraph.pl, speedscope, inferno) or as a pstats dump.
+    """
 
-# Eclipse .metadata directory
-.metadata
+    def __init__(self, max_profiles: int = 20, interval: float = 0.005):
+        self.max_profiles = max_profiles
+        self.interval = interval
+        self.profiles = OrderedDict()
+        self.lock = threading.Lock()
+        self.active = False
 
-# Docker .docker directory
-.docker
+    def start(self, mode: str):
+        """
+        Starts profiling the current thread. Returns None if another profile is already running.
+        """
+        with self.lock:
+            if self.active:
+                return None
+            self.active = True
+
+        if mode == "cprofile":
+            profiler = cProfile.Profile()
+            profiler.enable()
+            return {"mode": mode, "profiler": profiler, "started": time.perf_counter()}
+
+        stacks = Counter()
+        stop = threading.Event()
+        sampler = threading.Thread(
+            target=self._sample,
+            args=(threading.get_ident(), stacks, stop),
+            daemon=True,
+        )
+        sampler.start()
+        return {"mode": mode, "stacks": stacks, "stop": stop, "sampler": sampler, "started": time.perf_counter()}
 
-# Git .git directory
-.git
+    def stop(self, session: dict, path: str) -> str:
+        """
+        Stops the profile session and stores the result. Returns the profile id.
+        """
+        duration = time.perf_counter() - session["started"]
+        if session["mode"] == "cprofile":
+            session["profiler"].disable()
+            stats = pstats.Stats(session["profiler"])
+            result = {"stats": stats, "stacks": self._collapse_stats(stats)}
+        else:
+            session["stop"].set()
+            session["sampler"].join()
+            result = {"stats": None, "stacks": session["stacks"]}
+
+        profile_id = secrets.token_hex(8)
+        result.update(
+            {
+                "id": profile_id,
+                "mode": session["mode"],
+                "path": path,
+                "duration": duration,
+                "created": datetime.now().isoformat(),
+            }
+        )
 
-# GitHub .github directory
-.github
+        with self.lock:
+            self.active = False
+            self.profiles[profile_id] = result
+            while len(self.profiles) > self.max_profiles:
+                self.profiles.popitem(last=False)
 
-# Travis CI .travis.yml file
-.travis.yml
+        return profile_id
 
-# Jenkinsfile file
-Jenkinsfile
+    def _sample(self, thread_id: int, stacks: Counter, stop: threading.Event):
+        """
+        Samples the stack of the profiled thread until the stop event is set.
+        """
+        while not stop.wait(self.interval):
+            frame = sys._current_frames().get(thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            stacks[";".join(reversed(stack))] += 1
+
+    @staticmethod
+    def _collapse_stats(stats: pstats.Stats) -> Counter:
+        """
+        Converts cProfile stats into collapsed stacks (microseconds of own time per stack).
+        cProfile only records caller -> callee edges, so each function is placed below its
+        most expensive caller, which is the usual approximation for call graph profiles.
+        """
 
-# CircleCI .circleci directory
-.circleci
+        def label(func):
+            filename, line, name = func
+            return f"{name} ({os.path.basename(filename)}:{line})"
+
+        stacks = Counter()
+        for func, (_, _, own_time, _, callers) in stats.stats.items():
+            microseconds = int(own_time * 1_000_000)
+            if microseconds <= 0:
+                continue
+            path = [label(func)]
+            seen = {func}
+            current = callers
+            while current:
+                caller = max(current, key=lambda c: current[c][3])
+                if caller in seen:
+                    break
+                seen.add(caller)
+                path.append(label(caller))
+                current = stats.stats.get(caller, (0, 0, 0, 0, {}))[4]
+            stacks[";".join(reversed(path))] += microseconds
+        return stacks
+
+    def get_profile(self, profile_id: str):
+        """
+        Returns the stored profile or None if it does not exist (anymore).
+        """
+        with self.lock:
+            return self.profiles.get(profile_id)
 
-# Dockerfile file
-Dockerfile
+    def list_profiles(self):
+        """
+        Returns a short description of every stored profile.
+        """
+        with self.lock:
+            return [
+                {
+                    "id": profile["id"],
+                    "mode": profile["mode"],
+                    "path": profile["path"],
+                    "duration": round(profile["duration"], 6),
+                    "created": profile["created"],
+                }
+                for profile in self.profiles.values()
+            ]
+
+
+class MemorySnapshots:
+    """
+    MemorySnapshots class: This class is used to report the top allocators with tracemalloc
+    and the difference since the previous snapshot.
+    """
 
-"""
+    def __init__(self, frames: int = 25):
+        self.frames = frames
+        self.previous = None
+        self.lock = threading.Lock()
 
-    def get_gitignore(self):
+    def take(self, limit: int = 25) -> dict:
         """
-        Returns the gitignore content.
+        Takes a snapshot and returns the top allocators and the diff since the last snapshot.
+        Tracing is started on the first call, so the first diff is empty.
         """
-        return self.gitignore_content
+        with self.lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(self.frames)
+            snapshot = tracemalloc.take_snapshot().filter_traces(
+                (tracemalloc.Filter(False, tracemalloc.__file__),)
+            )
+            previous, self.previous = self.previous, snapshot
+
+        current, peak = tracemalloc.get_traced_memory()
+        top = [
+            {"location": str(stat.traceback[0]), "size": stat.size, "count": stat.count}
+            for stat in snapshot.statistics("lineno")[:limit]
+        ]
+        diff = []
+        if previous is not None:
+            diff = [
+                {
+                    "location": str(stat.traceback[0]),
+                    "size_diff": stat.size_diff,
+                    "count_diff": stat.count_diff,
+                }
+                for stat in snapshot.compare_to(previous, "lineno")[:limit]
+            ]
+        return {
+            "traced_current": current,
+            "traced_peak": peak,
+            "top": top,
+            "diff": diff,
+            "snapshot": snapshot,
+        }
+
+    @staticmethod
+    def to_collapsed(snapshot) -> Counter:
+        """
+        Converts a snapshot into collapsed stacks weighted by allocated bytes.
+        """
+        stacks = Counter()
+        for stat in snapshot.statistics("traceback"):
+            frames = [
+                f"{os.path.basename(frame.filename)}:{frame.lineno}"
+                for frame in reversed(stat.traceback)
+            ]
+            stacks[";".join(frames)] += stat.size
+        return stacks
 
 
-class DockerIgnore:
+def to_collapsed_text(stacks: Counter) -> str:
     """
-    DockerIgnore class: This class is used to create a .dockerignore file for the project
-    Ignored files:
-        - Windows Thumbs.db file
-        - macOS .DS_Store file
-        - Linux .DS_Store file
-        - Common files
+    Formats collapsed stacks as "frame;frame;frame count" lines
     """
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
 
-    def __init__(self):
-        self.dockerignore_content = """
-# Windows Thumbs.db file
-Thumbs.db
 
-# macOS .DS_Store file
-.DS_Store
+profiler = RequestProfiler(
+    max_profiles=int(os.getenv("WOOPY_PROFILE_KEEP", "20")),
+    interval=float(os.getenv("WOOPY_PROFILE_INTERVAL", "0.005")),
+)
+memory_snapshots = MemorySnapshots()
 
-# Linux .DS_Store file
-.DS_Store
 
-# Common auto-generated files
-*.log
-/tmp
-*.tmp
-*.bak
-*.swp
+def is_admin_request() -> bool:
+    """
+    Checks the X-Woopy-Admin-Token header against the WOOPY_ADMIN_TOKEN environment variable.
+    Profiling is disabled when WOOPY_ADMIN_TOKEN is not set.
+    """
+    admin_token = os.getenv("WOOPY_ADMIN_TOKEN")
+    if not admin_token:
+        return False
+    return secrets.compare_digest(
+        request.headers.get("X-Woopy-Admin-Token", ""), admin_token
+    )
 
-"""
 
-    def get_dockerignore(self):
-        """
-        Returns the dockerignore content.
-        """
-        return self.dockerignore_content
+@app.before_request
+def start_request_profile():
+    mode = request.headers.get("X-Woopy-Profile")
+    if mode not in ("cprofile", "sample") or not is_admin_request():
+        return
+    g.profile_session = profiler.start(mode)
+    if g.profile_session is None:
+        logging.warning("Profile skipped for %s: another profile is running", request.path)
 
 
-class ProjectApi(Resource):
+@app.after_request
+def stop_request_profile(response):
+    session = g.pop("profile_session", None)
+    if session is not None:
+        profile_id = profiler.stop(session, request.path)
+        response.headers["X-Woopy-Profile-Id"] = profile_id
+        logging.info("Profile %s stored for %s", profile_id, request.path)
+    return response
+
+
+@app.teardown_request
+def discard_request_profile(exception=None):
+    # after_request is skipped when the request fails, store the profile anyway
+    session = g.pop("profile_session", None)
+    if session is not None:
+        profiler.stop(session, request.path)
+
+
+class ProfileListApi(Resource):
     """
-    Class to generate a docker-compose.yml file
+    Class to list the stored request profiles
     Args:
         Resource (_type_): _description_
     """
 
-    def post(self):
-        """
-        Get the docker-compose.yml file
-        ---
-        tags:
-          - Docker Compose
-        responses:
-            200:
-                description: docker-compose.yml file
-                content:
-                application/json:
-                    schema:
-                    type: object
-                    properties:
-                        status:
-                        type: string
-                        example: ok
-                        message:
-                        type: string
-                        example: docker-compose.yml file created
-                        version:
-                        type: string
-                        example: 1.0.0
-                        file:
-                        type: string
-                        example: docker-compose.yml file
-        """
-        # create a dictionary from the .env file
-        env = {}
-        env_data = request.data.decode().split("\n")
-        for line in env_data:
-            if line:
-                # if there are multipe = in the line, split only the first one
-                key, value = line.split("=", 1)
-                env[key] = value
-
-        site_title = env["SITE_TITLE"]
-        site_url = env["SITE_URL"]
-
-        database = Database(site_title=site_title, site_url=site_url)
-        mail = Mail(site_title=site_title, site_url=site_url)
-        cache = Cache(site_title=site_title, site_url=site_url)
-        website = Website(
-            site_title=site_title,
-            site_url=site_url,
-            database_props=database,
-            mail_props=mail,
-            cache_props=cache,
-        )
-        wpcli = WpCli(
-            site_title=site_title,
-            site_url=site_url,
-            site_host=website.site_host,
-            database_host=database.database_host,
-            database_password=database.database_password,
-            cache_host=cache.cache_host,
-        )
-        admin = Admin(site_title=site_title, site_url=site_url, database_props=database)
-        monitoring = Monitoring(site_title=site_title, site_url=site_url)
-        management = Management(site_title=site_title, site_url=site_url)
-        vault = Vault(site_title=site_title, site_url=site_url)
-        certbot = Certbot(site_title=site_title, site_url=site_url)
-        code = Code(site_title=site_title, site_url=site_url)
-        application = Application(site_title=site_title, site_url=site_url)
-        graphviz = GraphViz(site_title=site_title, site_url=site_url)
-
-        project = Project(
-            website=website,
-            wpcli=wpcli,
-            database=database,
-            cache=cache,
-            admin=admin,
-            monitoring=monitoring,
-            management=management,
-            vault=vault,
-            certbot=certbot,
-            code=code,
-            application=application,
-            mail=mail,
-            graphviz=graphviz,
-        )
-
-        readme = ReadMe(project_name=project.project_name)
-        prerequisites_setup = PreequisitesSetup()
+    def get(self):
+        if not is_admin_request():
+            return {"status": "error", "message": "admin token required"}, 403
+        return {"status": "ok", "profiles": profiler.list_profiles()}
 
-        gitignore = GitIgnore()
-        dockerignore = DockerIgnore()
 
-        woosh = WooSh()
-        certsh = CertSh()
+class ProfileApi(Resource):
+    """
+    Class to download a stored request profile
+    Query parameters:
+        format: collapsed (default, flamegraph compatible) or pstats (cProfile only)
+    """
 
-        project_license = ProjectLicense()
-        contributing = Contributing()
-        code_of_conduct = CodeOfConduct()
-        security_policy = SecurityPolicy()
-        roadmap = RoadMap()
-        change_log = Changelog()
+    def get(self, profile_id):
+        if not is_admin_request():
+            return {"status": "error", "message": "admin token required"}, 403
+        profile = profiler.get_profile(profile_id)
+        if profile is None:
+            return {"status": "error", "message": "profile not found"}, 404
 
         buffer = io.BytesIO()
-
-        with zipfile.ZipFile(buffer, "w") as zip_file:
-            zip_file.writestr("docker-compose.yml", project.get_docker_compose_data())
-            zip_file.writestr("README.md", readme.to_readme())
-            zip_file.writestr("prerequisites.sh", prerequisites_setup.get_script())
-            zip_file.writestr("LICENSE", project_license.get_license())
-            zip_file.writestr("CONTRIBUTING.md", contributing.get_contributing())
-            zip_file.writestr("CODE_OF_CONDUCT.md", code_of_conduct.get_code_of_conduct())
-            zip_file.writestr("SECURITY.md", security_policy.get_security_policy())
-            zip_file.writestr("ROADMAP.md", roadmap.get_roadmap())
-            zip_file.writestr(".gitignore", gitignore.get_gitignore())
-            zip_file.writestr(".dockerignore", dockerignore.get_dockerignore())
-            zip_file.writestr("woosh.sh", woosh.get_script())
-            zip_file.writestr("cert.sh", certsh.get_script())
-            zip_file.writestr("CHANGELOG.md", change_log.get_changelog())
-            
-
+        if request.args.get("format", "collapsed") == "pstats":
+            if profile["stats"] is None:
+                return {"status": "error", "message": "pstats is only available for cprofile"}, 400
+            buffer.write(marshal.dumps(profile["stats"].stats))
+            download_name = f"{profile_id}.prof"
+        else:
+            buffer.write(to_collapsed_text(profile["stacks"]).encode())
+            download_name = f"{profile_id}.folded"
         buffer.seek(0)
 
         return send_file(
             buffer,
             as_attachment=True,
-            download_name="project.zip",
-            mimetype="application/zip",
+            download_name=download_name,
+            mimetype="application/octet-stream",
         )
 
 
-api.add_resource(ProjectApi, "/")
-
+class MemorySnapshotApi(Resource):
+    """
+    Class to get the tracemalloc top allocators and the diff since the last snapshot
+    Query parameters:
+        limit: number of allocators to return (default 25, max 500)
+        format: json (default) or collapsed (flamegraph compatible, weighted by bytes)
+    """
 
-class DockerComposeYamlSource(Resource):
+    def get(self):
+        if not is_admin_request():
+            return {"status": "error", "message": "admin token required"}, 403
+        try:
+            limit = int(request.args.get("limit", "25"))
+        except ValueError:
+            limit = -1
+        if limit < 0:
+            return {"status": "error", "message": "limit must be a non-negative integer"}, 400
+        result = memory_snapshots.take(limit=min(limit, 500))
+        snapshot = result.pop("snapshot")
+
+        if request.args.get("format") == "collapsed":
+            buffer = io.BytesIO()
+            buffer.write(to_collapsed_text(MemorySnapshots.to_collapsed(snapshot)).encode())
+            buffer.seek(0)
+            return send_file(
+                buffer,
+                as_attachment=True,
+                download_name="memory.folded",
+                mimetype="application/octet-stream",
+            )
+
+        return {"status": "ok", **result}
+
+
+class ProjectPoolApi(Resource):
     """
-    Class to get the docker-compose.yml file
+    Class to get the configuration and hit/miss counters of the project pool
     Args:
         Resource (_type_): _description_
     """
 
-    def post(self):
-        """
-        Get the docker-compose.yml file
-        ---
-        tags:
-          - Docker Compose
-        responses:
-            200:
-                description: docker-compose.yml file
-                content:
-                application/json:
-                    schema:
-                    type: object
-                    properties:
-                        status:
-                        type: string
-                        example: ok
-                        message:
-                        type: string
-                        example: docker-compose.yml file created
-                        version:
-                        type: string
-                        example: 1.0.0
-                        file:
-                        type: string
-                        example: docker-compose.yml file
-        """
-        # create a dictionary from the .env file
-        env = {}
-        env_data = request.data.decode().split("\n")
-        for line in env_data:
-            if line:
-                # if there are multipe = in the line, split only the first one
-                key, value = line.split("=", 1)
-                env[key] = value
-
-        site_title = env["SITE_TITLE"]
-        site_url = env["SITE_URL"]
-
-        database = Database(site_title=site_title, site_url=site_url)
-        mail = Mail(site_title=site_title, site_url=site_url)
-        cache = Cache(site_title=site_title, site_url=site_url)
-        website = Website(
-            site_title=site_title,
-            site_url=site_url,
-            database_props=database,
-            mail_props=mail,
-            cache_props=cache,
-        )
-        wpcli = WpCli(
-            site_title=site_title,
-            site_url=site_url,
-            site_host=website.site_host,
-            database_host=database.database_host,
-            database_password=database.database_password,
-            cache_host=cache.cache_host,
-        )
-        admin = Admin(site_title=site_title, site_url=site_url, database_props=database)
-        monitoring = Monitoring(site_title=site_title, site_url=site_url)
-        management = Management(site_title=site_title, site_url=site_url)
-        vault = Vault(site_title=site_title, site_url=site_url)
-        certbot = Certbot(site_title=site_title, site_url=site_url)
-        code = Code(site_title=site_title, site_url=site_url)
-        application = Application(site_title=site_title, site_url=site_url)
-        graphviz = GraphViz(site_title=site_title, site_url=site_url)
+    def get(self):
+        if not is_admin_request():
+            return {"status": "error", "message": "admin token required"}, 403
+        return {"status": "ok", "pool": project_pool.get_stats()}
 
-        project = Project(
-            website=website,
-            wpcli=wpcli,
-            database=database,
-            cache=cache,
-            admin=admin,
-            monitoring=monitoring,
-            management=management,
-            vault=vault,
-            certbot=certbot,
-            code=code,
-            application=application,
-            mail=mail,
-            graphviz=graphviz,
-        )
 
-        buffer = io.BytesIO()
-        buffer.write(project.get_docker_compose_data().encode())
-        buffer.seek(0)
-        
-        return send_file(
-            buffer,
-            as_attachment=True,
-            download_name="docker-compose.yml",
-            mimetype="application/yaml",
-        )
+api.add_resource(ProfileListApi, "/admin/profiles")
+api.add_resource(ProfileApi, "/admin/profiles/<string:profile_id>")
+api.add_resource(MemorySnapshotApi, "/admin/memory")
+api.add_resource(ProjectPoolApi, "/admin/pool")
 
 
-api.add_resource(DockerComposeYamlSource, "/dc")
+class CacheStatsApi(Resource):
+    """
+    Class to get the metrics of the generator cache
+    Args:
+        Resource (_type_): _description_
+    """
+
+    def get(self):
+        if not is_admin_request():
+            return {"status": "error", "message": "admin token required"}, 403
+        return {"status": "ok", "cache": cache.get_stats()}
+
+
+api.add_resource(CacheStatsApi, "/admin/cache")
 
 
 
@@ -2915,10 +8445,39 @@ def swagger():
 }}
 """
 
+def patch_command(arguments):
+    """
+    Patches a docker-compose.yml on disk: woopy patch docker-compose.yml changes.json
+    """
+    with open(arguments.compose, encoding="utf-8") as compose_file:
+        patcher = ComposePatcher(compose_file.read())
+    with open(arguments.changes, encoding="utf-8") as changes_file:
+        patched = patcher.apply(json.load(changes_file))
+    sys.stdout.write(patcher.get_diff(patched))
+    if not arguments.dry_run:
+        with open(arguments.output or arguments.compose, "w", encoding="utf-8") as output_file:
+            output_file.write(patched)
+    logging.info("Changed services: %s", ", ".join(patcher.changed) or "none")
+
+
 def main():
     """
     Main function to run the application
     """
+    parser = argparse.ArgumentParser(prog="woopy")
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser("serve", help="run the web application (default)")
+    patch_parser = commands.add_parser("patch", help="patch an existing docker-compose.yml")
+    patch_parser.add_argument("compose", help="docker-compose.yml to patch")
+    patch_parser.add_argument("changes", help="JSON file with the list of changes")
+    patch_parser.add_argument("-o", "--output", help="write the result here instead of in place")
+    patch_parser.add_argument("--dry-run", action="store_true", help="only print the diff")
+    arguments = parser.parse_args()
+    if arguments.command == "patch":
+        patch_command(arguments)
+        return
+
+    project_pool.start()
     # Make it work on both localhost, docker local, and docker on a remote server
     app.run(
         host=os.getenv("FLASK_HOST", "localhost"),
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# the application is a single module in web/src
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
@@ -0,0 +1,108 @@
+import json
+import os
+import time
+
+import pytest
+from cryptography.fernet import Fernet
+
+import web
+from web import DiskCacheBackend, MemoryCacheBackend, RedisCacheBackend, app
+
+
+def memory_cache(tmp_path, **kwargs):
+    return MemoryCacheBackend(**kwargs)
+
+
+def disk_cache(tmp_path, **kwargs):
+    return DiskCacheBackend(str(tmp_path / "cache"), **kwargs)
+
+
+def redis_cache(tmp_path, **kwargs):
+    fakeredis = pytest.importorskip("fakeredis")
+    cache = RedisCacheBackend("redis://localhost:6379/0", **kwargs)
+    cache.client = fakeredis.FakeRedis()
+    return cache
+
+
+@pytest.fixture(params=[memory_cache, disk_cache, redis_cache])
+def create_cache(request, tmp_path):
+    return lambda **kwargs: request.param(tmp_path, **kwargs)
+
+
+def touch(cache, key, mtime):
+    # the disk backend keeps the LRU order in the modification time of the files
+    if isinstance(cache, DiskCacheBackend):
+        os.utime(cache._path(key), (mtime, mtime))
+
+
+def test_get_set(create_cache):
+    cache = create_cache(compress_min_size=16)
+    cache.set("small", b"value")
+    cache.set("large", b"x" * 1000)
+    assert cache.get("small") == b"value"
+    assert cache.get("large") == b"x" * 1000
+    assert cache.get("unknown") is None
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"], stats["sets"]) == (2, 1, 2)
+    assert stats["bytes_stored"] < stats["bytes_in"]
+
+
+def test_expiry(create_cache, monkeypatch):
+    cache = create_cache()
+    cache.set("key", b"value", ttl=10)
+    cache.set("forever", b"value", ttl=0)
+    now = time.time()
+    monkeypatch.setattr(web.time, "time", lambda: now + 11)
+    assert cache.get("key") is None
+    assert cache.get("forever") == b"value"
+    if not isinstance(cache, RedisCacheBackend):
+        # Redis expires the key itself
+        assert cache.get_stats()["expired"] == 1
+
+
+def test_lru_eviction(create_cache):
+    cache = create_cache(max_entries=2)
+    cache.set("a", b"1")
+    touch(cache, "a", 1000)
+    cache.set("b", b"2")
+    touch(cache, "b", 2000)
+    assert cache.get("a") == b"1"
+    touch(cache, "a", 3000)
+    cache.set("c", b"3")
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1"
+    assert cache.get("c") == b"3"
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_get_or_set(create_cache):
+    cache = create_cache()
+    renders = []
+    render = lambda: renders.append(1) or b"rendered"
+    assert cache.get_or_set("key", render) == b"rendered"
+    assert cache.get_or_set("key", render) == b"rendered"
+    assert len(renders) == 1
+
+
+def test_idempotency_result_encrypted(monkeypatch):
+    cache = MemoryCacheBackend()
+    monkeypatch.setattr(web, "cache", cache)
+    monkeypatch.setattr(web, "idempotency_fernet", Fernet(Fernet.generate_key()))
+    client = app.test_client()
+    body = "SITE_TITLE=Shop\nSITE_URL=shop.com\n"
+    headers = {"Idempotency-Key": "retry"}
+
+    first = client.post("/", data=body, headers=headers)
+    second = client.post("/", data=body, headers=headers)
+    assert first.status_code == second.status_code == 200
+    assert first.data == second.data
+
+    (stored,) = [key for key in cache.entries if key.startswith("idempotency:")]
+    result = json.loads(cache.get(stored))
+    assert web.idempotency_fernet.decrypt(result["bundle"].encode()) == first.data
+
+    # an instance with another key does not replay the result, it generates the project again
+    monkeypatch.setattr(web, "idempotency_fernet", Fernet(Fernet.generate_key()))
+    third = client.post("/", data=body, headers=headers)
+    assert third.status_code == 200
+    assert third.data != first.data
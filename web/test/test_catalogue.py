@@ -0,0 +1,90 @@
+import io
+import os
+import zipfile
+
+import pytest
+import yaml
+
+from web import ServiceCatalogue, app
+
+
+def write_definition(path, name, **keys):
+    definition = {"name": name, "image": f"{name}:latest", **keys}
+    (path / f"{name}.yml").write_text(yaml.safe_dump(definition))
+
+
+@pytest.fixture
+def catalogue(tmp_path):
+    return ServiceCatalogue(str(tmp_path), reload_interval=0)
+
+
+def test_compile(tmp_path, catalogue):
+    write_definition(
+        tmp_path,
+        "search",
+        environment={"PASSWORD": "{{password}}"},
+        volumes=["{{name}}-vol:/data"],
+        depends_on=["database"],
+        generate={"password": "password"},
+    )
+    service = catalogue.create_services(["search"], site_title="shop", site_url="shop.com")[0]
+    compose = yaml.safe_load(service.to_docker_compose())["search"]
+    assert compose["environment"]["PASSWORD"] == service.values["password"]
+    assert compose["networks"] == ["shop-network"]
+    assert compose["depends_on"] == {"database": {"condition": "service_healthy"}}
+    assert service.get_volumes() == ["search-vol"]
+    assert "search" in service.to_kubernetes()
+    assert "search" in service.to_vagrant()
+
+
+def test_reload(tmp_path, catalogue):
+    write_definition(tmp_path, "search")
+    assert list(catalogue.get_definitions()) == ["search"]
+    write_definition(tmp_path, "search", image="search:2")
+    os.utime(tmp_path / "search.yml", ns=(0, 10**18))
+    assert catalogue.get_definitions()["search"].definition["image"] == "search:2"
+
+
+def test_invalid_definition_keeps_previous(tmp_path, catalogue):
+    write_definition(tmp_path, "search")
+    catalogue.get_definitions()
+    write_definition(tmp_path, "search", generate={"password": "unknown"})
+    os.utime(tmp_path / "search.yml", ns=(0, 10**18))
+    assert catalogue.get_definitions()["search"].definition["image"] == "search:latest"
+
+
+def test_unknown_service(catalogue):
+    with pytest.raises(ValueError, match="unknown services"):
+        catalogue.create_services(["search"], site_title="shop", site_url="shop.com")
+
+
+def test_dependencies(tmp_path, catalogue):
+    write_definition(tmp_path, "search", generate={"password": "password"})
+    write_definition(tmp_path, "search-ui", depends_on=["search", "website"], command="ui {{search_password}}")
+    services = catalogue.create_services(["search-ui"], site_title="shop", site_url="shop.com")
+    assert [service.name for service in services] == ["search", "search-ui"]
+    compose = yaml.safe_load(services[1].to_docker_compose())["search-ui"]
+    assert compose["command"] == f"ui {services[0].values['password']}"
+
+
+def test_dependency_cycle(tmp_path, catalogue):
+    write_definition(tmp_path, "search", depends_on=["search-ui"])
+    write_definition(tmp_path, "search-ui", depends_on=["search"])
+    with pytest.raises(ValueError, match="dependency cycle"):
+        catalogue.create_services(["search-ui"], site_title="shop", site_url="shop.com")
+
+
+def test_kibana_pulls_in_elasticsearch():
+    response = app.test_client().post("/", data="SITE_TITLE=Shop\nSITE_URL=shop.com\nSERVICES=kibana\n")
+    assert response.status_code == 200
+    with zipfile.ZipFile(io.BytesIO(response.data)) as bundle:
+        services = yaml.safe_load(bundle.read("docker-compose.yml"))["services"]
+    password = services["elasticsearch"]["environment"]["ELASTIC_PASSWORD"]
+    assert f"elastic:{password}" in services["kibana"]["command"][-1]
+
+
+def test_services_in_template_mode():
+    response = app.test_client().post(
+        "/", data="SITE_TITLE=Shop\nSITE_URL=shop.com\nSERVICES=kibana\nCOMPOSE_MODE=template\n"
+    )
+    assert response.status_code == 400
@@ -0,0 +1,113 @@
+import io
+import zipfile
+
+import pytest
+import yaml
+from cryptography.fernet import Fernet
+
+import web
+from web import DensityMode, ProjectRegistry, app, parse_cpu_overcommit, parse_host
+
+COMPOSE = """name: shop
+networks:
+    shop-network: {}
+volumes:
+    database-vol: {}
+services:
+    website:
+        image: wordpress:latest
+        container_name: website
+        ports:
+            - "80:80"
+        labels:
+            traefik.enable: "true"
+        networks:
+            - shop-network
+    database:
+        image: mariadb:latest
+        container_name: database
+        volumes:
+            - database-vol:/var/lib/mysql
+        networks:
+            - shop-network
+    monitoring:
+        image: gcr.io/cadvisor/cadvisor:latest
+    proxy:
+        image: traefik:latest
+"""
+
+
+@pytest.fixture
+def client():
+    return app.test_client()
+
+
+def test_apply():
+    compose = yaml.safe_load(DensityMode(project_name="Shop", site_url="shop.com").apply(COMPOSE))
+    assert compose["name"] == "shop"
+    assert list(compose["services"]) == ["website", "database"]
+    website = compose["services"]["website"]
+    assert website["container_name"] == "shop-website"
+    assert "ports" not in website
+    assert DensityMode.ingress_network in website["networks"]
+    assert website["labels"]["traefik.http.routers.shop.rule"] == "Host(`shop.com`) || Host(`www.shop.com`)"
+    assert compose["networks"][DensityMode.ingress_network] == {"external": True}
+    assert list(compose["volumes"]) == ["database-vol"]
+
+
+def test_apply_template_mode():
+    compose = yaml.safe_load(DensityMode(project_name="Shop", site_url="shop.com").apply(COMPOSE, template_mode=True))
+    assert "name" not in compose
+    assert compose["services"]["database"]["container_name"] == "${COMPOSE_PROJECT_NAME}-database"
+
+
+def test_capacity():
+    host = {"cpus": 4, "memory": 8192, "disk": 160}
+    capacity = DensityMode.get_capacity(host, ["website", "database", "monitoring", "proxy"], cpu_overcommit=4)
+    # monitoring and the proxy run once per host, in the host reserve
+    assert capacity["per_project"] == {"cpus": 2.0, "memory": 1536, "disk": 25}
+    assert capacity["fits_by_resource"] == {"cpus": 7, "memory": 4, "disk": 6}
+    assert (capacity["projects"], capacity["limited_by"]) == (4, "memory")
+
+
+def test_density_api_matches_bundle(client):
+    projects = client.get("/density").json["projects"]
+    response = client.post("/", data="SITE_TITLE=Shop\nSITE_URL=shop.com\nDENSITY_MODE=true\n")
+    with zipfile.ZipFile(io.BytesIO(response.data)) as bundle:
+        report = bundle.read("DENSITY.md").decode()
+    assert f"Projects per host: {projects} " in report
+
+
+@pytest.mark.parametrize("host", ["abc", "0:0:0", "4:8192", "4:-1:160", "nan:8192:160"])
+def test_parse_host_invalid(host):
+    with pytest.raises(ValueError, match="DENSITY_HOST must be cpus:memory:disk"):
+        parse_host(host, "DENSITY_HOST")
+
+
+@pytest.mark.parametrize("value", ["x", "0", "-1", "inf"])
+def test_parse_cpu_overcommit_invalid(value):
+    with pytest.raises(ValueError, match="cpu_overcommit must be a positive number"):
+        parse_cpu_overcommit(value)
+
+
+@pytest.mark.parametrize("query", ["host=abc", "host=0:0:0", "cpu_overcommit=-1"])
+def test_density_api_invalid(client, query):
+    response = client.get(f"/density?{query}")
+    assert response.status_code == 400
+    assert "must be" in response.json["message"]
+
+
+@pytest.mark.parametrize("options", ["DENSITY_MODE=true\n", "COMPOSE_MODE=template\n", "DENSITY_MODE=true\nCOMPOSE_MODE=template\n"])
+def test_registry_compose_matches_bundle(client, monkeypatch, tmp_path, options):
+    monkeypatch.setenv("WOOPY_ADMIN_TOKEN", "token")
+    monkeypatch.setattr(web, "project_registry", ProjectRegistry(str(tmp_path / "registry.db"), Fernet.generate_key()))
+    headers = {"X-Woopy-Admin-Token": "token"}
+
+    response = client.post("/", data=f"SITE_TITLE=Shop\nSITE_URL=shop.com\n{options}")
+    project_id = response.headers["X-Woopy-Project-Id"]
+    with zipfile.ZipFile(io.BytesIO(response.data)) as bundle:
+        docker_compose_data = bundle.read("docker-compose.yml")
+
+    assert client.get(f"/projects/{project_id}/docker-compose.yml", headers=headers).data == docker_compose_data
+    patch = client.post("/dc/patch", json={"project_id": project_id, "changes": []}, headers=headers)
+    assert patch.data == docker_compose_data
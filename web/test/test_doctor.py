@@ -0,0 +1,48 @@
+import pytest
+
+from web import app
+
+COMPOSE = """services:
+    website:
+        image: wordpress:latest
+        environment:
+            WORDPRESS_DB_HOST: database
+"""
+
+
+@pytest.fixture
+def client():
+    return app.test_client()
+
+
+@pytest.mark.parametrize(
+    "compose",
+    [
+        "services: [",
+        "- website\n- database\n",
+        "services:\n    - website\n",
+        "services:\n    website: wordpress\n",
+        "services:\n    website:\n        deploy: 1\n",
+        "services:\n    website:\n        deploy:\n            resources: []\n",
+        "services:\n    website:\n        logging: json-file\n",
+        "services:\n    website:\n        depends_on: 1\n",
+    ],
+)
+def test_doctor_rejects_invalid_compose(client, compose):
+    response = client.post("/doctor", data=compose)
+    assert response.status_code == 400
+    assert response.json["status"] == "error"
+
+
+@pytest.mark.parametrize(
+    "compose",
+    [
+        COMPOSE,
+        "services:\n    website:\n        deploy:\n",
+        "services:\n    website:\n        depends_on: database\n    database:\n        image: mariadb\n",
+        "services:\n    website:\n        depends_on:\n            database:\n                condition: service_healthy\n"
+        "    database:\n        image: mariadb\n",
+    ],
+)
+def test_doctor_accepts_compose(client, compose):
+    assert client.post("/doctor", data=compose).status_code == 200
@@ -0,0 +1,82 @@
+import pytest
+
+from web import GraphViz, app
+
+COMPOSE = """volumes:
+    data: {}
+
+services:
+    website:
+        image: wordpress:latest
+        depends_on:
+            - database
+            - cache
+        networks:
+            - shop-network
+    database:
+        image: mariadb:latest
+        depends_on: cache
+        volumes:
+            - data:/var/lib/mysql
+        networks:
+            - shop-network
+    cache:
+        image: redis:latest
+        volumes:
+            - type: volume
+              source: data
+              target: /data
+        networks:
+            - shop-network
+"""
+
+
+@pytest.fixture
+def client():
+    return app.test_client()
+
+
+def test_graph_levels():
+    graph = GraphViz(site_title="shop", site_url="shop.com").get_graph(COMPOSE)
+    assert {name: service["level"] for name, service in graph["services"].items()} == {
+        "website": 2,
+        "database": 1,
+        "cache": 0,
+    }
+    assert ("database", "cache") in graph["dependencies"]
+    assert sorted(graph["volumes"]) == [("cache", "data", "/data"), ("database", "data", "/var/lib/mysql")]
+
+
+@pytest.mark.parametrize(
+    "output_format, mimetype, marker",
+    [("svg", "image/svg+xml", "<svg"), ("dot", "text/vnd.graphviz", "digraph"), ("mermaid", "text/plain", "flowchart")],
+)
+def test_graph_formats(client, output_format, mimetype, marker):
+    response = client.post(f"/graph?format={output_format}", data=COMPOSE)
+    assert response.status_code == 200
+    assert response.headers["Content-Type"].startswith(mimetype)
+    assert marker in response.data.decode()
+
+
+def test_graph_unknown_format(client):
+    assert client.post("/graph?format=png", data=COMPOSE).status_code == 400
+
+
+@pytest.mark.parametrize(
+    "compose",
+    [
+        "services: [",
+        "- website\n",
+        "services: 3\n",
+        "networks: 3\nservices: {}\n",
+        "volumes: [data]\nservices: {}\n",
+        "services:\n    website: wordpress\n",
+        "services:\n    website:\n        depends_on: 5\n",
+        "services:\n    website:\n        volumes: 5\n",
+        "services:\n    website:\n        networks: 3\n",
+    ],
+)
+def test_graph_rejects_invalid_compose(client, compose):
+    response = client.post("/graph?format=dot", data=compose)
+    assert response.status_code == 400
+    assert response.json["message"].startswith("invalid docker-compose.yml")
@@ -0,0 +1,67 @@
+import shutil
+import subprocess
+
+import pytest
+import yaml
+
+from web import BootSh, configure_project, create_project, parse_sizing
+
+LAYOUTS = [
+    {},
+    {"OBSERVABILITY": "true", "MAIL_RELAY": "true", "PAGE_CACHE": "true"},
+    {"OBSERVABILITY": "true", "WEBSITE_VARIANT": "nginx-fpm"},
+]
+
+
+@pytest.mark.parametrize("layout", LAYOUTS)
+def test_every_service_has_a_healthcheck(layout):
+    project = create_project(site_title="Shop", site_url="shop.com")
+    project.sizing = parse_sizing({})
+    configure_project(project, layout)
+    services = yaml.safe_load(project.get_docker_compose_data())["services"]
+    for name, service in services.items():
+        healthcheck = service.get("healthcheck")
+        assert healthcheck, name
+        assert healthcheck.get("disable") or healthcheck["test"], name
+
+
+def create(layout):
+    project = create_project(site_title="Shop", site_url="shop.com")
+    project.sizing = parse_sizing({})
+    configure_project(project, layout)
+    return project
+
+
+@pytest.mark.parametrize("layout", LAYOUTS)
+def test_dependencies_are_health_gated(layout):
+    services = yaml.safe_load(create(layout).get_docker_compose_data())["services"]
+    for name, service in services.items():
+        for dependency, options in (service.get("depends_on") or {}).items():
+            assert options == {"condition": "service_healthy"}, name
+            # a dependency without a healthcheck would never become healthy
+            assert not services[dependency]["healthcheck"].get("disable"), (name, dependency)
+
+
+@pytest.mark.parametrize("layout", LAYOUTS)
+def test_startup_groups(layout):
+    project = create(layout)
+    services = yaml.safe_load(project.get_docker_compose_data())["services"]
+    groups = project.get_startup_groups()
+
+    assert sorted(name for group in groups for name in group) == sorted(services)
+    assert all(not services[name].get("depends_on") for name in groups[0])
+    started = set()
+    for group in groups:
+        for name in group:
+            # every dependency started in an earlier group
+            assert set(services[name].get("depends_on") or {}) <= started, name
+        started.update(group)
+    for index, group in enumerate(groups, start=1):
+        assert f"{index}: {', '.join(group)}\n" in project.get_project_report()
+
+
+def test_boot_script():
+    script = BootSh().get_script()
+    assert "docker compose up -d --wait" in script
+    if shutil.which("bash"):
+        subprocess.run(["bash", "-n"], input=script, text=True, check=True)
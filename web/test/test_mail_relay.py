@@ -0,0 +1,64 @@
+import pytest
+import yaml
+
+from web import StorePerformance, configure_project, create_project, get_port, parse_sizing
+
+
+def create(layout):
+    project = create_project(site_title="Shop", site_url="shop.com")
+    project.sizing = parse_sizing({})
+    configure_project(project, layout)
+    return project, yaml.safe_load(project.get_docker_compose_data())["services"]
+
+
+def get_environment(service):
+    return dict(str(item).split("=", 1) for item in service["environment"])
+
+
+def test_disabled_by_default():
+    project, services = create({})
+    assert "mailrelay" not in services
+    for name in ("website", "wpcli"):
+        assert get_environment(services[name])["WORDPRESS_SMTP_HOST"] == "mail"
+    assert project.mail_relay.get_report().startswith("Mail Relay: disabled")
+
+
+@pytest.mark.parametrize("variant, wordpress", [("apache", "website"), ("nginx-fpm", "php")])
+def test_wordpress_sends_through_the_relay(variant, wordpress):
+    _, services = create({"MAIL_RELAY": "true", "WEBSITE_VARIANT": variant})
+    # the website and the worker, which sends the queued WooCommerce emails
+    for name in (wordpress, "wpcli"):
+        environment = get_environment(services[name])
+        assert environment["WORDPRESS_SMTP_HOST"] == "mailrelay"
+        assert environment["WORDPRESS_SMTP_PORT"] == "587"
+    assert get_port("Postfix") == 587
+
+
+def test_relay_delivers_to_the_mail_server():
+    _, services = create({"MAIL_RELAY": "true"})
+    relay = services["mailrelay"]
+    environment = get_environment(relay)
+    host, port = environment["RELAYHOST"].strip("[").split("]:")
+    assert host in services
+    assert any(str(published).endswith(f":{port}") for published in services[host]["ports"])
+    assert relay["depends_on"] == {host: {"condition": "service_healthy"}}
+    # the queue survives a restart
+    assert "mailrelay-vol:/var/spool/postfix" in relay["volumes"]
+    assert environment["POSTFIX_maximal_queue_lifetime"] == "2d"
+
+
+def test_report():
+    project, _ = create({"MAIL_RELAY": "true"})
+    report = project.get_project_report()
+    assert "Mail Relay Next Hop: [mail]:1025" in report
+    assert "Mail Relay Queue: docker compose exec mailrelay mailq" in report
+
+
+def test_queued_mails_are_private():
+    project, _ = create({"WEBSITE_VARIANT": "nginx-fpm"})
+    # nginx does not read .htaccess, the spool is denied in its configuration
+    assert "location ^~ /wp-content/woopy-mail/ {\n        deny all;" in project.website.to_nginx_conf()
+    mu_plugin = StorePerformance("small").to_mu_plugin()
+    assert 'file_put_contents("$spool/.htaccess", "Require all denied\\n");' in mu_plugin
+    # a queued mail is a PHP file that exits before its JSON
+    assert "'<?php exit; ?>' . wp_json_encode($mail)" in mu_plugin
@@ -0,0 +1,82 @@
+import io
+import re
+import zipfile
+
+import pytest
+import yaml
+
+from web import Website, app, get_resource_profile
+
+
+def create_bundle(options=""):
+    response = app.test_client().post("/", data=f"SITE_TITLE=Shop\nSITE_URL=shop.com\n{options}")
+    assert response.status_code == 200, response.json
+    with zipfile.ZipFile(io.BytesIO(response.data)) as bundle:
+        return {name: bundle.read(name).decode() for name in bundle.namelist()}
+
+
+def read_redis_conf(redis_conf):
+    settings = {}
+    for line in redis_conf.splitlines():
+        if line.strip() and not line.startswith("#"):
+            name, _, value = line.partition(" ")
+            settings[name] = value
+    return settings
+
+
+def get_constants(environment):
+    config_extra = dict(item.split("=", 1) for item in environment)["WORDPRESS_CONFIG_EXTRA"]
+    return dict(re.findall(r"define\('(\w+)', '?(.*?)'?\);", config_extra))
+
+
+def test_redis_conf():
+    files = create_bundle()
+    settings = read_redis_conf(files["redis/redis.conf"])
+    assert settings["maxmemory"] == f"{int(get_resource_profile('cache')['memory'] * 0.75)}mb"
+    assert settings["maxmemory-policy"] == "allkeys-lru"
+    assert settings["save"] == '""'
+    assert settings["appendonly"] == "no"
+    assert 1 <= int(settings["io-threads"]) <= 4
+    assert "requirepass" not in settings
+
+
+@pytest.mark.parametrize("variant, wordpress", [("apache", "website"), ("nginx-fpm", "php")])
+def test_wordpress_connects_to_the_cache(variant, wordpress):
+    files = create_bundle(f"WEBSITE_VARIANT={variant}\n")
+    services = yaml.safe_load(files["docker-compose.yml"])["services"]
+    cache = services["cache"]
+    password = cache["command"][cache["command"].index("--requirepass") + 1]
+    port = read_redis_conf(files["redis/redis.conf"])["port"]
+
+    assert "./redis/redis.conf:/usr/local/etc/redis/redis.conf:ro" in cache["volumes"]
+    assert cache["command"][:2] == ["redis-server", "/usr/local/etc/redis/redis.conf"]
+    assert cache["environment"]["REDISCLI_AUTH"] == password
+    # WordPress and the worker use the same object cache
+    for name in (wordpress, "wpcli"):
+        constants = get_constants(services[name]["environment"])
+        assert constants["WP_REDIS_HOST"] == "cache"
+        assert constants["WP_REDIS_PORT"] == port
+        assert constants["WP_REDIS_PASSWORD"] == password
+        assert constants["WP_REDIS_PREFIX"] == "Shop_"
+        assert constants["DISABLE_WP_CRON"] == "true"
+
+
+def test_drop_in_enabled_by_woosh():
+    woosh = create_bundle()["woosh.sh"]
+    assert "redis-cache" in re.search(r'^ACTIVATE="(.*)"$', woosh, re.MULTILINE).group(1).split()
+    assert woosh.index("wp plugin activate $ACTIVATE") < woosh.index("wp redis enable")
+
+
+@pytest.mark.parametrize(
+    "value, php",
+    [
+        (True, "true"),
+        (False, "false"),
+        (5, "5"),
+        ("cache", "'cache'"),
+        ("Bob's", "'Bob\\'s'"),
+        ("C:\\shop\\", "'C:\\\\shop\\\\'"),
+    ],
+)
+def test_php_value(value, php):
+    assert Website.get_php_value(value) == php
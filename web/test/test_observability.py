@@ -0,0 +1,97 @@
+import io
+import json
+import zipfile
+
+import pytest
+import yaml
+
+from web import app
+
+
+def create_bundle(options=""):
+    response = app.test_client().post("/", data=f"SITE_TITLE=Shop\nSITE_URL=shop.com\nOBSERVABILITY=true\n{options}")
+    assert response.status_code == 200, response.json
+    with zipfile.ZipFile(io.BytesIO(response.data)) as bundle:
+        return {name: bundle.read(name).decode() for name in bundle.namelist()}
+
+
+def scrape_targets(prometheus):
+    return {
+        scrape_config["job_name"]: [target for static in scrape_config["static_configs"] for target in static["targets"]]
+        for scrape_config in prometheus["scrape_configs"]
+    }
+
+
+def test_disabled_by_default():
+    response = app.test_client().post("/", data="SITE_TITLE=Shop\nSITE_URL=shop.com\n")
+    with zipfile.ZipFile(io.BytesIO(response.data)) as bundle:
+        assert not any(name.startswith(("prometheus/", "grafana/")) for name in bundle.namelist())
+
+
+@pytest.mark.parametrize(
+    "options, exporter, front_host",
+    [
+        ("", "apache", "website"),
+        ("WEBSITE_VARIANT=nginx-fpm\n", "php-fpm", "website"),
+        ("PAGE_CACHE=true\n", "apache", "pagecache"),
+        ("MAIL_RELAY=true\n", "apache", "website"),
+    ],
+)
+def test_scrape_targets_are_services(options, exporter, front_host):
+    files = create_bundle(options)
+    services = yaml.safe_load(files["docker-compose.yml"])["services"]
+    targets = scrape_targets(yaml.safe_load(files["prometheus/prometheus.yml"]))
+
+    assert exporter in targets
+    assert ("postfix" in targets) == ("MAIL_RELAY" in options)
+    assert targets["blackbox"][:2] == [f"http://{front_host}/", f"http://{front_host}/shop/"]
+    for job, job_targets in targets.items():
+        for target in job_targets:
+            host = target.removeprefix("http://").split("/")[0].split(":")[0]
+            assert host == "localhost" or host in services, (job, target)
+    # the proxy exports its metrics on the entrypoint Prometheus scrapes
+    assert "--metrics.prometheus.entrypoint=traefik" in services["proxy"]["command"]
+    assert f"--entrypoints.traefik.address=:{targets['traefik'][0].split(':')[1]}" in services["proxy"]["command"]
+
+
+def test_density_mode_skips_host_services():
+    targets = scrape_targets(yaml.safe_load(create_bundle("DENSITY_MODE=true\n")["prometheus/prometheus.yml"]))
+    assert "cadvisor" not in targets
+    assert "traefik" not in targets
+
+
+@pytest.mark.parametrize(
+    "options, metric",
+    [("", "apache_workers"), ("WEBSITE_VARIANT=nginx-fpm\n", "phpfpm_"), ("MAIL_RELAY=true\n", "postfix_showq")],
+)
+def test_alerts_and_dashboard_follow_the_exporters(options, metric):
+    files = create_bundle(options)
+    rules = yaml.safe_load(files["prometheus/alerts.yml"])["groups"][0]["rules"]
+    dashboard = json.loads(files["grafana/dashboards/woopy.json"])
+    expressions = [target["expr"] for panel in dashboard["panels"] for target in panel["targets"]]
+
+    assert any(metric in rule["expr"] for rule in rules)
+    assert any(metric in expression for expression in expressions)
+    assert len({panel["id"] for panel in dashboard["panels"]}) == len(dashboard["panels"])
+    assert all(rule["labels"]["severity"] in ("warning", "critical") for rule in rules)
+
+
+def test_alerts_are_mailed():
+    files = create_bundle()
+    services = yaml.safe_load(files["docker-compose.yml"])["services"]
+    alertmanager = yaml.safe_load(files["alertmanager/alertmanager.yml"])
+    host, port = alertmanager["global"]["smtp_smarthost"].split(":")
+    assert host in services
+    assert any(str(published).endswith(f":{port}") for published in services[host]["ports"])
+    assert alertmanager["route"]["receiver"] == alertmanager["receivers"][0]["name"]
+    assert alertmanager["receivers"][0]["email_configs"][0]["to"].endswith("@shop.com")
+
+
+def test_grafana_provisioning():
+    files = create_bundle()
+    datasource = yaml.safe_load(files["grafana/provisioning/datasources/prometheus.yml"])["datasources"][0]
+    dashboard = json.loads(files["grafana/dashboards/woopy.json"])
+    assert datasource["url"] == "http://prometheus:9090"
+    assert {panel["datasource"]["uid"] for panel in dashboard["panels"]} == {datasource["uid"]}
+    grafana = yaml.safe_load(files["docker-compose.yml"])["services"]["grafana"]
+    assert "./grafana/dashboards:/var/lib/grafana/dashboards:ro" in grafana["volumes"]
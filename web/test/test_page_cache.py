@@ -0,0 +1,82 @@
+import io
+import re
+import zipfile
+
+import pytest
+import yaml
+
+from web import PageCache, app
+
+
+def create_bundle(options=""):
+    response = app.test_client().post("/", data=f"SITE_TITLE=Shop\nSITE_URL=shop.com\n{options}")
+    assert response.status_code == 200
+    with zipfile.ZipFile(io.BytesIO(response.data)) as bundle:
+        return {name: bundle.read(name).decode() for name in bundle.namelist()}
+
+
+def normalize(vcl, url):
+    # the URL rewrites of vcl_recv, regsub replaces the first match and regsuball every match
+    for function, pattern, replacement in re.findall(r'set req\.url = (regsub|regsuball)\(req\.url, "(.*)", "(.*)"\);', vcl):
+        url = re.sub(pattern, replacement, url, count=1 if function == "regsub" else 0)
+    return url
+
+
+def test_disabled_by_default():
+    files = create_bundle()
+    assert "varnish/default.vcl" not in files
+    assert "pagecache" not in yaml.safe_load(files["docker-compose.yml"])["services"]
+    assert "VHP_VARNISH_IP" not in files["docker-compose.yml"]
+
+
+@pytest.mark.parametrize("variant", ["apache", "nginx-fpm"])
+def test_in_front_of_the_website(variant):
+    files = create_bundle(f"PAGE_CACHE=true\nWEBSITE_VARIANT={variant}\n")
+    services = yaml.safe_load(files["docker-compose.yml"])["services"]
+    vcl = files["varnish/default.vcl"]
+
+    assert '.host = "website";' in vcl
+    assert services["pagecache"]["depends_on"] == {"website": {"condition": "service_healthy"}}
+    assert "./varnish/default.vcl:/etc/varnish/default.vcl:ro" in services["pagecache"]["volumes"]
+    # the proxy routes the website through the page cache
+    assert "traefik.http.routers.website.rule" in services["pagecache"]["labels"]
+    assert "labels" not in services["website"]
+    # WordPress purges the page cache from these services, a host in parentheses may be missing
+    wordpress = "php" if variant == "nginx-fpm" else "website"
+    purge_hosts = re.findall(r'\("(\w+)"\);', vcl)
+    assert {wordpress, "wpcli"} <= set(purge_hosts) & set(services)
+    assert "define('VHP_VARNISH_IP', 'pagecache');" in str(services[wordpress]["environment"])
+
+
+def test_published_without_proxy():
+    files = create_bundle("PAGE_CACHE=true\nPROXY=false\n")
+    services = yaml.safe_load(files["docker-compose.yml"])["services"]
+    assert services["pagecache"]["ports"] == ["80:80"]
+    assert "80:80" not in services["website"].get("ports", [])
+
+
+def test_vcl():
+    vcl = PageCache("Shop", "shop.com").to_vcl()
+    assert vcl.startswith("vcl 4.1;\n")
+    assert vcl.count("{") == vcl.count("}")
+    for sub in ["vcl_recv", "vcl_backend_response", "vcl_deliver"]:
+        assert f"sub {sub} {{" in vcl
+    for path in ["cart", "checkout", "my-account", "wp-admin"]:
+        assert path in vcl.split("sub vcl_recv")[1].split("return (pass)")[2]
+    assert "set beresp.ttl = 10m;" in vcl
+    assert "set beresp.grace = 6h;" in vcl
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        ("/shop/", "/shop/"),
+        ("/shop/?color=red", "/shop/?color=red"),
+        ("/shop/?utm_source=mail", "/shop/"),
+        ("/shop/?color=red&utm_source=mail", "/shop/?color=red"),
+        ("/shop/?utm_source=mail&color=red", "/shop/?color=red"),
+        ("/shop/?gclid=1&utm_medium=cpc&color=red&fbclid=2&size=m", "/shop/?color=red&size=m"),
+    ],
+)
+def test_tracking_parameters(url, expected):
+    assert normalize(PageCache("Shop", "shop.com").to_vcl(), url) == expected
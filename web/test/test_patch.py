@@ -0,0 +1,205 @@
+import pytest
+import yaml
+
+from web import app
+
+COMPOSE = """services:
+    website:
+        image: wordpress:latest
+        environment:
+            WORDPRESS_DB_HOST: database
+"""
+
+
+@pytest.fixture
+def client():
+    return app.test_client()
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        [],
+        {},
+        {"compose": 1, "changes": []},
+        {"compose": COMPOSE, "changes": "set_image"},
+        {"compose": COMPOSE, "changes": ["set_image"]},
+        {"compose": COMPOSE, "changes": [{"op": "unknown"}]},
+        {"compose": COMPOSE, "changes": [{"op": "set_image", "service": "unknown", "image": "wordpress:6"}]},
+        {"compose": COMPOSE, "changes": [{"op": "set_image", "service": "website"}]},
+        {"compose": "- website\n", "changes": [{"op": "add_service", "name": "adminer"}]},
+        {"compose": "services: [", "changes": []},
+    ],
+)
+def test_patch_rejects_invalid_request(client, body):
+    response = client.post("/dc/patch", json=body)
+    assert response.status_code == 400
+    assert response.json["status"] == "error"
+
+
+def test_patch(client):
+    response = client.post(
+        "/dc/patch",
+        json={"compose": COMPOSE, "changes": [{"op": "set_image", "service": "website", "image": "wordpress:6"}]},
+    )
+    assert response.status_code == 200
+    assert response.data.decode() == COMPOSE.replace("wordpress:latest", "wordpress:6")
+    assert response.headers["X-Woopy-Changed-Services"] == "website"
+
+
+PROJECT = """services:
+    website:
+        image: wordpress:latest
+        environment:
+            WORDPRESS_DB_HOST: database
+            WORDPRESS_SITE_URL: shop.com
+        networks:
+            - shop-network
+
+    database:
+        image: mariadb:latest
+        environment:
+            - MYSQL_DATABASE=shop
+            - MYSQL_PASSWORD=secret
+        volumes:
+            - database-vol:/var/lib/mysql
+        networks:
+            - shop-network
+
+networks:
+    shop-network: {}
+
+volumes:
+    database-vol: {}
+"""
+
+
+def patch(client, *changes, compose=PROJECT, **options):
+    response = client.post("/dc/patch", json={"compose": compose, "changes": list(changes), **options})
+    assert response.status_code == 200, response.json
+    return yaml.safe_load(response.data), response
+
+
+def test_set_image(client):
+    compose, response = patch(client, {"op": "set_image", "service": "database", "image": "mariadb:11"})
+    assert compose["services"]["database"]["image"] == "mariadb:11"
+    assert response.data.decode() == PROJECT.replace("mariadb:latest", "mariadb:11")
+
+
+@pytest.mark.parametrize(
+    "service, expected",
+    [
+        ("website", {"WORDPRESS_DB_HOST": "database", "WORDPRESS_SITE_URL": "shop.com", "WP_DEBUG": "1"}),
+        ("database", ["MYSQL_DATABASE=shop", "MYSQL_PASSWORD=secret", "WP_DEBUG=1"]),
+    ],
+)
+def test_set_environment_keeps_syntax(client, service, expected):
+    compose, _ = patch(client, {"op": "set_environment", "service": service, "name": "WP_DEBUG", "value": "1"})
+    assert compose["services"][service]["environment"] == expected
+
+
+def test_set_environment_replaces_value(client):
+    compose, response = patch(
+        client,
+        {"op": "set_environment", "service": "website", "name": "WORDPRESS_DB_HOST", "value": "db"},
+        {"op": "set_environment", "service": "database", "name": "MYSQL_DATABASE", "value": "store"},
+    )
+    assert compose["services"]["website"]["environment"]["WORDPRESS_DB_HOST"] == "db"
+    assert compose["services"]["database"]["environment"][0] == "MYSQL_DATABASE=store"
+    assert response.headers["X-Woopy-Changed-Services"] == "website,database"
+
+
+def test_set_environment_without_environment(client):
+    compose, _ = patch(
+        client,
+        {"op": "set_environment", "service": "website", "name": "A", "value": "1"},
+        compose=COMPOSE.replace("        environment:\n            WORDPRESS_DB_HOST: database\n", ""),
+    )
+    assert compose["services"]["website"]["environment"] == {"A": "1"}
+
+
+def test_remove_environment(client):
+    compose, _ = patch(
+        client,
+        {"op": "remove_environment", "service": "website", "name": "WORDPRESS_SITE_URL"},
+        {"op": "remove_environment", "service": "database", "name": "MYSQL_PASSWORD"},
+        {"op": "remove_environment", "service": "database", "name": "UNKNOWN"},
+    )
+    assert compose["services"]["website"]["environment"] == {"WORDPRESS_DB_HOST": "database"}
+    assert compose["services"]["database"]["environment"] == ["MYSQL_DATABASE=shop"]
+
+
+def test_set(client):
+    compose, response = patch(
+        client,
+        {"op": "set", "service": "website", "key": "restart", "value": "always"},
+        {"op": "set", "service": "database", "key": "volumes", "value": ["data:/var/lib/mysql"]},
+    )
+    assert compose["services"]["website"]["restart"] == "always"
+    assert compose["services"]["database"]["volumes"] == ["data:/var/lib/mysql"]
+    # the other lines are kept as they were
+    assert "            - MYSQL_PASSWORD=secret\n" in response.data.decode()
+
+
+def test_remove_service_keeps_volumes(client):
+    compose, _ = patch(client, {"op": "remove_service", "service": "database"})
+    assert list(compose["services"]) == ["website"]
+    assert compose["volumes"] == {"database-vol": {}}
+
+
+def test_add_service_with_dependencies(client):
+    compose, response = patch(client, {"op": "add_service", "name": "kibana"})
+    assert list(compose["services"]) == ["website", "database", "elasticsearch", "kibana"]
+    assert compose["services"]["kibana"]["networks"] == ["shop-network"]
+    assert {"elasticsearch-vol", "database-vol"} <= set(compose["volumes"])
+    assert response.headers["X-Woopy-Changed-Services"] == "elasticsearch,kibana"
+    assert PROJECT.rstrip("\n").split("\nnetworks:")[0] in response.data.decode()
+
+
+def test_add_service_twice(client):
+    compose = patch(client, {"op": "add_service", "name": "elasticsearch"})[1].data.decode()
+    response = client.post("/dc/patch", json={"compose": compose, "changes": [{"op": "add_service", "name": "elasticsearch"}]})
+    assert response.status_code == 400
+    assert "already exists" in response.json["message"]
+    # the generated password of the elasticsearch service in the file is not known
+    response = client.post("/dc/patch", json={"compose": compose, "changes": [{"op": "add_service", "name": "kibana"}]})
+    assert response.status_code == 400
+    assert "depends on elasticsearch" in response.json["message"]
+
+
+def test_remove_and_add_service(client):
+    compose, _ = patch(
+        client,
+        {"op": "add_service", "name": "elasticsearch"},
+        {"op": "remove_service", "service": "elasticsearch"},
+        {"op": "add_service", "name": "kibana"},
+    )
+    assert list(compose["services"]) == ["website", "database", "elasticsearch", "kibana"]
+
+
+def test_change_added_service(client):
+    compose, _ = patch(
+        client,
+        {"op": "add_service", "name": "elasticsearch"},
+        {"op": "set_environment", "service": "elasticsearch", "name": "ES_JAVA_OPTS", "value": "-Xmx1g"},
+    )
+    assert compose["services"]["elasticsearch"]["environment"]["ES_JAVA_OPTS"] == "-Xmx1g"
+
+
+def test_diff_format(client):
+    response = client.post(
+        "/dc/patch",
+        json={
+            "compose": PROJECT,
+            "changes": [{"op": "set_image", "service": "website", "image": "wordpress:6"}],
+            "format": "diff",
+        },
+    )
+    assert response.status_code == 200
+    assert response.mimetype == "text/x-diff"
+    lines = response.data.decode().splitlines()
+    assert lines[:2] == ["--- docker-compose.yml", "+++ docker-compose.yml"]
+    assert [line for line in lines if line[:1] in "+-" and line[1:2] not in "+-"] == [
+        "-        image: wordpress:latest",
+        "+        image: wordpress:6",
+    ]
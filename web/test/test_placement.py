@@ -0,0 +1,51 @@
+import pytest
+
+from web import PlacementPlanner
+
+
+def host(name, cpus=4, memory=8192, disk=100):
+    return {"name": name, "cpus": cpus, "memory": memory, "disk": disk}
+
+
+def host_of(placement, service_name):
+    return next(host_name for host_name, names in placement.items() if service_name in names)
+
+
+def test_no_hosts():
+    with pytest.raises(ValueError):
+        PlacementPlanner([])
+
+
+def test_oversubscribed_host():
+    planner = PlacementPlanner([host("a", cpus=1, memory=512)])
+    with pytest.raises(ValueError, match="does not fit on any host"):
+        planner.plan(["database", "website", "cache"])
+
+
+def test_global_service_does_not_fit():
+    planner = PlacementPlanner([host("a"), host("b", cpus=0.1)])
+    with pytest.raises(ValueError, match="global service monitoring does not fit on host b"):
+        planner.plan(["monitoring", "website"])
+
+
+def test_global_service_on_every_host():
+    placement = PlacementPlanner([host("a"), host("b")]).plan(["monitoring", "website"])
+    assert all("monitoring" in names for names in placement.values())
+
+
+def test_stateful_services_are_spread():
+    placement = PlacementPlanner([host("a"), host("b"), host("c")]).plan(["database", "website", "cache"])
+    assert len({host_of(placement, name) for name in ("database", "website", "cache")}) == 3
+
+
+def test_proxy_and_page_cache_next_to_website():
+    placement = PlacementPlanner([host("a"), host("b")]).plan(["proxy", "pagecache", "database", "website", "cache"])
+    website_host = host_of(placement, "website")
+    assert host_of(placement, "proxy") == website_host
+    assert host_of(placement, "pagecache") == website_host
+
+
+def test_proxy_does_not_fit_next_to_website():
+    planner = PlacementPlanner([host("a", cpus=1.2, memory=640), host("b")])
+    with pytest.raises(ValueError, match="service proxy does not fit next to website"):
+        planner.plan(["website", "proxy", "database"])
@@ -0,0 +1,76 @@
+import io
+import zipfile
+
+import pytest
+
+import web
+from web import ProjectPool, app, create_project
+
+
+def pooled(size=1):
+    # a pool without its filler thread, filled by the test
+    pool = ProjectPool(size=size)
+    pool.filler = object()
+    for _ in range(size):
+        pool.projects.put(create_project(site_title=pool.placeholder_title, site_url=pool.placeholder_url))
+    return pool
+
+
+def read_bundle(response):
+    with zipfile.ZipFile(io.BytesIO(response.data)) as bundle:
+        return {name: bundle.read(name).decode() for name in bundle.namelist()}
+
+
+def test_hit_and_miss():
+    pool = pooled()
+    first = pool.get_project("Shop", "shop.com")
+    second = pool.get_project("Blog", "blog.com")
+    assert first.project_name == "Shop"
+    assert second.project_name == "Blog"
+    stats = pool.get_stats()
+    assert (stats["hits"], stats["misses"], stats["ready"], stats["hit_ratio"]) == (1, 1, 0, 0.5)
+
+
+def test_disabled_pool_does_not_start():
+    pool = ProjectPool(size=0)
+    pool.get_project("Shop", "shop.com")
+    assert pool.filler is None
+    assert pool.get_stats()["misses"] == 1
+
+
+def test_bind_replaces_placeholder():
+    pool = pooled()
+    project = pool.get_project("Shop", "shop.com")
+    assert project.database.database_name.startswith("Shop")
+    assert project.website.database_name == project.database.database_name
+    assert project.website.website_admin_email.endswith("@shop.com")
+    assert project.mail.mail_base_url == "mail.shop.com"
+    assert project.application.bundle == "com.shop"
+    for service in project.get_services():
+        assert service.site_title == "Shop"
+
+
+@pytest.mark.parametrize("options", ["", "COMPOSE_MODE=template\n", "DENSITY_MODE=true\n"])
+def test_pooled_bundle_matches_generated_bundle(monkeypatch, options):
+    env = f"SITE_TITLE=Shop\nSITE_URL=shop.com\n{options}"
+    client = app.test_client()
+
+    monkeypatch.setattr(web, "project_pool", ProjectPool(size=0))
+    generated = read_bundle(client.post("/", data=env))
+    monkeypatch.setattr(web, "project_pool", pooled())
+    bundle = read_bundle(client.post("/", data=env))
+
+    assert web.project_pool.get_stats()["hits"] == 1
+    assert sorted(bundle) == sorted(generated)
+    for name, content in bundle.items():
+        assert ProjectPool.placeholder_title not in content, name
+        assert ProjectPool.placeholder_url not in content, name
+
+
+def test_pool_api(monkeypatch):
+    monkeypatch.setenv("WOOPY_ADMIN_TOKEN", "token")
+    monkeypatch.setattr(web, "project_pool", pooled(size=2))
+    client = app.test_client()
+    assert client.get("/admin/pool").status_code == 403
+    response = client.get("/admin/pool", headers={"X-Woopy-Admin-Token": "token"})
+    assert response.json["pool"]["ready"] == 2
@@ -0,0 +1,105 @@
+import marshal
+import tracemalloc
+from collections import Counter
+
+import pytest
+
+import web
+from web import MemorySnapshots, RequestProfiler, app, to_collapsed_text
+
+HEADERS = {"X-Woopy-Admin-Token": "token"}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setenv("WOOPY_ADMIN_TOKEN", "token")
+    monkeypatch.setattr(web, "profiler", RequestProfiler(max_profiles=2, interval=0.001))
+    return app.test_client()
+
+
+def test_admin_token_required(client):
+    for path in ["/admin/profiles", "/admin/profiles/unknown", "/admin/memory"]:
+        assert client.get(path).status_code == 403
+        assert client.get(path, headers={"X-Woopy-Admin-Token": "wrong"}).status_code == 403
+
+
+def test_admin_disabled_without_token(client, monkeypatch):
+    monkeypatch.delenv("WOOPY_ADMIN_TOKEN")
+    assert client.get("/admin/profiles", headers=HEADERS).status_code == 403
+
+
+def test_request_not_profiled_without_token(client):
+    response = client.get("/density", headers={"X-Woopy-Profile": "cprofile"})
+    assert "X-Woopy-Profile-Id" not in response.headers
+    assert web.profiler.list_profiles() == []
+
+
+@pytest.mark.parametrize("mode", ["cprofile", "sample"])
+def test_profile_request(client, mode):
+    response = client.get("/density", headers={**HEADERS, "X-Woopy-Profile": mode})
+    profile_id = response.headers["X-Woopy-Profile-Id"]
+
+    profiles = client.get("/admin/profiles", headers=HEADERS).json["profiles"]
+    assert [(p["id"], p["mode"], p["path"]) for p in profiles] == [(profile_id, mode, "/density")]
+
+    collapsed = client.get(f"/admin/profiles/{profile_id}", headers=HEADERS)
+    assert collapsed.status_code == 200
+    for line in collapsed.data.decode().splitlines():
+        stack, count = line.rsplit(" ", 1)
+        assert stack and int(count) > 0
+
+    pstats = client.get(f"/admin/profiles/{profile_id}?format=pstats", headers=HEADERS)
+    if mode == "cprofile":
+        assert marshal.loads(pstats.data)
+    else:
+        assert pstats.status_code == 400
+
+
+def test_profiles_are_bounded(client):
+    ids = [
+        client.get("/density", headers={**HEADERS, "X-Woopy-Profile": "cprofile"}).headers["X-Woopy-Profile-Id"]
+        for _ in range(3)
+    ]
+    assert [p["id"] for p in web.profiler.list_profiles()] == ids[1:]
+    assert client.get(f"/admin/profiles/{ids[0]}", headers=HEADERS).status_code == 404
+
+
+def test_single_active_profile():
+    profiler = RequestProfiler()
+    session = profiler.start("cprofile")
+    assert profiler.start("cprofile") is None
+    profiler.stop(session, "/")
+    assert profiler.start("sample") is not None
+
+
+@pytest.fixture
+def memory_snapshots(monkeypatch):
+    monkeypatch.setattr(web, "memory_snapshots", MemorySnapshots())
+    yield
+    # tracing slows down every test that runs afterwards
+    tracemalloc.stop()
+
+
+def test_memory_snapshot(client, memory_snapshots):
+    first = client.get("/admin/memory?limit=5", headers=HEADERS).json
+    assert first["diff"] == []
+    assert len(first["top"]) <= 5
+
+    second = client.get("/admin/memory?limit=5", headers=HEADERS).json
+    assert second["diff"]
+    assert second["traced_peak"] >= second["traced_current"]
+
+    collapsed = client.get("/admin/memory?format=collapsed", headers=HEADERS)
+    assert collapsed.status_code == 200
+    assert collapsed.data.endswith(b"\n")
+
+
+@pytest.mark.parametrize("limit", ["-1", "abc"])
+def test_memory_snapshot_invalid_limit(client, memory_snapshots, limit):
+    response = client.get(f"/admin/memory?limit={limit}", headers=HEADERS)
+    assert response.status_code == 400
+
+
+def test_collapsed_text():
+    assert to_collapsed_text(Counter({"a;b": 1, "a;c": 3})) == "a;c 3\na;b 1\n"
+    assert to_collapsed_text(Counter()) == ""
@@ -0,0 +1,40 @@
+import io
+import zipfile
+
+import pytest
+import yaml
+
+from web import app
+
+
+@pytest.fixture
+def client():
+    return app.test_client()
+
+
+def post_project(client, body):
+    return client.post("/", data=body)
+
+
+@pytest.mark.parametrize("site_title", ["Shop: Best", "Shop #1", "- Shop", "*Shop", ""])
+def test_site_title_rejected(client, site_title):
+    response = post_project(client, f"SITE_TITLE={site_title}\nSITE_URL=shop.com\n")
+    assert response.status_code == 400
+    assert "SITE_TITLE" in response.json["message"]
+
+
+@pytest.mark.parametrize("site_title", ["Bob's Shop", "Shop:Best", "Shop#1", "Shop, Inc.", "Shop [EU]", "50% off"])
+def test_site_title_accepted(client, site_title):
+    response = post_project(client, f"SITE_TITLE={site_title}\nSITE_URL=shop.com\n")
+    assert response.status_code == 200
+    with zipfile.ZipFile(io.BytesIO(response.data)) as bundle:
+        compose = yaml.safe_load(bundle.read("docker-compose.yml"))
+    assert f"{site_title}-network" in compose["networks"]
+
+
+def test_site_title_quoted_in_wp_config(client):
+    response = post_project(client, "SITE_TITLE=Bob's Shop\nSITE_URL=shop.com\n")
+    with zipfile.ZipFile(io.BytesIO(response.data)) as bundle:
+        compose = yaml.safe_load(bundle.read("docker-compose.yml"))
+    environment = dict(item.split("=", 1) for item in compose["services"]["website"]["environment"])
+    assert "define('WP_REDIS_PREFIX', 'Bob\\'s Shop_');" in environment["WORDPRESS_CONFIG_EXTRA"]
@@ -0,0 +1,78 @@
+import io
+import zipfile
+
+import pytest
+import yaml
+
+from web import app
+
+
+def create_bundle(options=""):
+    response = app.test_client().post("/", data=f"SITE_TITLE=Shop\nSITE_URL=shop.com\n{options}")
+    assert response.status_code == 200, response.json
+    with zipfile.ZipFile(io.BytesIO(response.data)) as bundle:
+        return {name: bundle.read(name).decode() for name in bundle.namelist()}
+
+
+def published_ports(service):
+    return [str(port).split(":")[0] for port in service.get("ports", [])]
+
+
+@pytest.mark.parametrize("options", ["", "PAGE_CACHE=true\n", "WEBSITE_VARIANT=nginx-fpm\n"])
+def test_routes(options):
+    files = create_bundle(options)
+    services = yaml.safe_load(files["docker-compose.yml"])["services"]
+    dynamic = yaml.safe_load(files["traefik/dynamic.yml"])
+
+    routers = {}
+    for name, service in services.items():
+        for label, value in (service.get("labels") or {}).items():
+            if label.endswith(".rule"):
+                routers[label.split(".")[3]] = (name, value)
+            if label.endswith(".middlewares"):
+                for middleware in value.split(","):
+                    assert middleware.removesuffix("@file") in dynamic["http"]["middlewares"]
+            if label.endswith(".serverstransport"):
+                assert value.removesuffix("@file") in dynamic["http"]["serversTransports"]
+    assert routers["website"][1] == "Host(`shop.com`) || Host(`www.shop.com`)"
+    assert {router: rule for router, (_, rule) in routers.items() if router != "website"} == {
+        "admin": "Host(`admin.shop.com`)",
+        "mail": "Host(`mail.shop.com`)",
+        "code": "Host(`code.shop.com`)",
+    }
+
+    # the proxy is the only service that publishes the HTTP ports
+    for name, service in services.items():
+        if name != "proxy":
+            assert not {"80", "443"} & set(published_ports(service)), name
+    assert services["proxy"]["ports"] == ["80:80", "443:443", "443:443/udp"]
+    assert "./traefik/dynamic.yml:/etc/traefik/dynamic.yml:ro" in services["proxy"]["volumes"]
+
+
+def test_acme_email():
+    command = yaml.safe_load(create_bundle()["docker-compose.yml"])["services"]["proxy"]["command"]
+    assert "--certificatesresolvers.letsencrypt.acme.email=admin@shop.com" in command
+    command = yaml.safe_load(create_bundle("ACME_EMAIL=ops@shop.com\n")["docker-compose.yml"])["services"]["proxy"]["command"]
+    assert "--certificatesresolvers.letsencrypt.acme.email=ops@shop.com" in command
+
+
+def test_disabled():
+    files = create_bundle("PROXY=false\n")
+    services = yaml.safe_load(files["docker-compose.yml"])["services"]
+    assert "proxy" not in services
+    assert "traefik/dynamic.yml" not in files
+    assert all("labels" not in service for service in services.values())
+    assert "443" in published_ports(services["website"])
+
+
+def test_density_mode_uses_the_shared_ingress():
+    files = create_bundle("DENSITY_MODE=true\n")
+    assert "traefik/dynamic.yml" not in files
+    assert "proxy" not in yaml.safe_load(files["docker-compose.yml"])["services"]
+    assert "ingress/docker-compose.yml" in files
+
+
+def test_dynamic_conf():
+    dynamic = yaml.safe_load(create_bundle()["traefik/dynamic.yml"])
+    assert dynamic["tls"]["options"]["default"]["minVersion"] == "VersionTLS12"
+    assert dynamic["http"]["middlewares"]["buffering"]["buffering"]["maxRequestBodyBytes"] == 64 * 1024 * 1024
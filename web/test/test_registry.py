@@ -0,0 +1,44 @@
+import pytest
+from cryptography.fernet import Fernet
+
+from web import ProjectRegistry, configure_project, create_project, parse_sizing
+
+LAYOUTS = [
+    {},
+    {"PROXY": "false", "STORE_PRESET": "large", "HOST_MEMORY": "8192"},
+    {"WEBSITE_VARIANT": "nginx-fpm", "PAGE_CACHE": "true", "ACME_EMAIL": "ops@shop.com"},
+    {"OBSERVABILITY": "true", "MAIL_RELAY": "true", "WORKER_CONCURRENCY": "4"},
+]
+
+
+@pytest.fixture
+def registry(tmp_path):
+    return ProjectRegistry(str(tmp_path / "registry.db"), Fernet.generate_key())
+
+
+@pytest.mark.parametrize("layout", LAYOUTS)
+def test_round_trip(registry, layout):
+    env = {"SITE_TITLE": "Shop", "SITE_URL": "shop.com", **layout}
+    project = create_project(site_title=env["SITE_TITLE"], site_url=env["SITE_URL"])
+    project.sizing = parse_sizing(env)
+    configure_project(project, env)
+
+    loaded, loaded_env = registry.load(registry.save(project, env))
+
+    assert loaded_env == env
+    assert loaded.get_docker_compose_data() == project.get_docker_compose_data()
+    assert loaded.get_project_report() == project.get_project_report()
+
+
+def test_unknown_project(registry):
+    assert registry.load("unknown") is None
+
+
+def test_search(registry):
+    for site_title, site_url in (("Shop", "shop.com"), ("Store", "store.com")):
+        project = create_project(site_title=site_title, site_url=site_url)
+        project.sizing = parse_sizing({})
+        registry.save(project, {"SITE_TITLE": site_title, "SITE_URL": site_url})
+
+    assert [project["site_url"] for project in registry.search(query="sto")] == ["store.com"]
+    assert len(registry.search(limit=1)) == 1
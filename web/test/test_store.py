@@ -0,0 +1,85 @@
+import io
+import re
+import shutil
+import subprocess
+import zipfile
+
+import pytest
+import yaml
+
+from web import STORE_PRESETS, StorePerformance, app
+
+
+def create_bundle(options=""):
+    response = app.test_client().post("/", data=f"SITE_TITLE=Shop\nSITE_URL=shop.com\n{options}")
+    assert response.status_code == 200, response.json
+    with zipfile.ZipFile(io.BytesIO(response.data)) as bundle:
+        return {name: bundle.read(name).decode() for name in bundle.namelist()}
+
+
+def get_environment(files, service="website"):
+    compose = yaml.safe_load(files["docker-compose.yml"])
+    return dict(item.split("=", 1) for item in compose["services"][service]["environment"])
+
+
+@pytest.mark.parametrize("preset", list(STORE_PRESETS))
+def test_constants(preset):
+    settings = STORE_PRESETS[preset]
+    config_extra = get_environment(create_bundle(f"STORE_PRESET={preset}\n"))["WORDPRESS_CONFIG_EXTRA"]
+    assert f"define('WP_MEMORY_LIMIT', '{settings['memory_limit']}');" in config_extra
+    assert f"define('WP_MAX_MEMORY_LIMIT', '{settings['max_memory_limit']}');" in config_extra
+    assert f"define('WP_POST_REVISIONS', {settings['post_revisions']});" in config_extra
+    assert f"define('AUTOSAVE_INTERVAL', {settings['autosave_interval']});" in config_extra
+    assert f"define('EMPTY_TRASH_DAYS', {settings['empty_trash_days']});" in config_extra
+
+
+def test_options():
+    small = dict(option.split("=") for option in StorePerformance("small").get_options().split())
+    large = dict(option.split("=") for option in StorePerformance("large").get_options().split())
+    assert small["woocommerce_allow_tracking"] == large["woocommerce_allow_tracking"] == "no"
+    assert (small["woocommerce_analytics_enabled"], large["woocommerce_analytics_enabled"]) == ("yes", "no")
+    assert large["woocommerce_attribute_lookup_direct_updates"] == "no"
+    environment = get_environment(create_bundle("STORE_PRESET=large\n"))
+    assert environment["WOOPY_STORE_OPTIONS"] == StorePerformance("large").get_options()
+
+
+@pytest.mark.parametrize("preset", list(STORE_PRESETS))
+def test_mu_plugin(preset):
+    mu_plugin = StorePerformance(preset).to_mu_plugin()
+    assert mu_plugin.startswith("<?php\n")
+    assert mu_plugin.count("{") == mu_plugin.count("}")
+    assert mu_plugin.count("(") == mu_plugin.count(")")
+    assert ("'analytics'" in mu_plugin) == (not STORE_PRESETS[preset]["analytics"])
+    assert ("woocommerce_background_image_regeneration" in mu_plugin) == (
+        not STORE_PRESETS[preset]["background_image_regeneration"]
+    )
+    if shutil.which("php"):
+        subprocess.run(["php", "-l"], input=mu_plugin, text=True, check=True, capture_output=True)
+
+
+@pytest.mark.parametrize("variant, wordpress", [("apache", "website"), ("nginx-fpm", "php")])
+def test_mu_plugin_in_bundle(variant, wordpress):
+    files = create_bundle(f"STORE_PRESET=large\nWEBSITE_VARIANT={variant}\n")
+    assert files["wordpress/woopy-performance.php"] == StorePerformance("large").to_mu_plugin()
+    volumes = yaml.safe_load(files["docker-compose.yml"])["services"][wordpress]["volumes"]
+    assert "./wordpress/woopy-performance.php:/var/www/html/wp-content/mu-plugins/woopy-performance.php:ro" in volumes
+
+
+def test_woosh_applies_the_options():
+    woosh = create_bundle()["woosh.sh"]
+    assert re.search(r"for option in \$\{WOOPY_STORE_OPTIONS\}; do\n\s+wp option update", woosh)
+    # the sync is enabled for the migration and disabled afterwards
+    enable = woosh.index("woocommerce_custom_orders_table_data_sync_enabled yes")
+    assert enable < woosh.index("wp wc hpos enable") < woosh.index("woocommerce_custom_orders_table_data_sync_enabled no")
+
+
+def test_report_suggests_the_large_preset():
+    assert "the large preset (STORE_PRESET=large) suits this catalogue" in create_bundle("PRODUCTS=50000\n")["report.txt"]
+    assert "STORE_PRESET=large" not in create_bundle("PRODUCTS=500\n")["report.txt"]
+    assert "Store Performance: preset large" in create_bundle("PRODUCTS=50000\nSTORE_PRESET=large\n")["report.txt"]
+
+
+def test_invalid_preset():
+    response = app.test_client().post("/", data="SITE_TITLE=Shop\nSITE_URL=shop.com\nSTORE_PRESET=huge\n")
+    assert response.status_code == 400
+    assert response.json["message"] == "STORE_PRESET must be one of small, large"
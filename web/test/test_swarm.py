@@ -0,0 +1,78 @@
+import io
+import zipfile
+
+import pytest
+import yaml
+
+from web import SwarmStack, app, configure_project, create_project, parse_sizing
+
+
+@pytest.fixture
+def stack():
+    project = create_project(site_title="Shop", site_url="shop.com")
+    project.sizing = parse_sizing({})
+    configure_project(project, {})
+    docker_compose_data = project.get_docker_compose_data()
+    return yaml.safe_load(SwarmStack("Shop", website_replicas=3).render(docker_compose_data))
+
+
+def test_website(stack):
+    deploy = stack["services"]["website"]["deploy"]
+    assert deploy["replicas"] == 3
+    assert deploy["update_config"]["order"] == "start-first"
+    assert deploy["placement"] == {"preferences": [{"spread": "node.id"}]}
+
+
+def test_stateful_service_pinned(stack):
+    deploy = stack["services"]["database"]["deploy"]
+    assert deploy["replicas"] == 1
+    assert deploy["placement"] == {"constraints": ["node.labels.woopy.shop.database == true"]}
+    assert deploy["resources"]["limits"]["memory"].endswith("M")
+
+
+def test_global_service(stack):
+    assert stack["services"]["monitoring"]["deploy"]["mode"] == "global"
+
+
+def test_proxy_on_manager(stack):
+    proxy = stack["services"]["proxy"]
+    assert proxy["deploy"]["replicas"] == 1
+    assert proxy["deploy"]["placement"] == {"constraints": ["node.role == manager"]}
+    assert any(argument.startswith("--providers.swarm") for argument in proxy["command"])
+
+
+def test_unsupported_options_removed(stack):
+    for service in stack["services"].values():
+        assert not set(service) & set(SwarmStack.unsupported)
+
+
+def test_overlay_network(stack):
+    assert stack["networks"] == {"Shop-network": {"driver": "overlay", "attachable": True}}
+
+
+def test_invalid_replicas():
+    with pytest.raises(ValueError):
+        SwarmStack("Shop", website_replicas=0)
+
+
+@pytest.mark.parametrize("replicas", ["abc", "0", "-1"])
+def test_swarm_replicas_rejected(replicas):
+    response = app.test_client().post(
+        "/", data=f"SITE_TITLE=Shop\nSITE_URL=shop.com\nDEPLOYMENT=swarm\nSWARM_REPLICAS={replicas}\n"
+    )
+    assert response.status_code == 400
+    assert response.json["message"] == "SWARM_REPLICAS must be a positive number"
+
+
+def test_swarm_bundle():
+    response = app.test_client().post("/", data="SITE_TITLE=Shop\nSITE_URL=shop.com\nDEPLOYMENT=swarm\n")
+    with zipfile.ZipFile(io.BytesIO(response.data)) as bundle:
+        assert {"docker-stack.yml", "SWARM.md", "docker-compose.yml"} <= set(bundle.namelist())
+        assert "docker stack deploy -c docker-stack.yml shop" in bundle.read("SWARM.md").decode()
+
+
+def test_no_start_interval(stack):
+    assert stack["version"] == "3.8"
+    for service in stack["services"].values():
+        assert "start_interval" not in (service.get("healthcheck") or {})
+    assert "interval" in stack["services"]["database"]["healthcheck"]
@@ -0,0 +1,60 @@
+import re
+
+import pytest
+
+from web import app, configure_project, create_project, get_env_data, parse_sizing, render_docker_compose_template
+
+LAYOUTS = [
+    {},
+    {"PROXY": "false"},
+    {"WEBSITE_VARIANT": "nginx-fpm", "PAGE_CACHE": "true"},
+    {"OBSERVABILITY": "true", "MAIL_RELAY": "true", "MONITORING_PRESET": "low-overhead"},
+]
+
+# every layout together, so every .env variable has a service that reads it
+FULL_LAYOUT = {"WEBSITE_VARIANT": "nginx-fpm", "PAGE_CACHE": "true", "OBSERVABILITY": "true", "MAIL_RELAY": "true"}
+
+
+def get_env_variables(layout):
+    project = create_project(site_title="Shop", site_url="shop.com")
+    project.sizing = parse_sizing(layout)
+    configure_project(project, layout)
+    return {line.split("=", 1)[0] for line in get_env_data(project).splitlines()}
+
+
+@pytest.mark.parametrize("layout", LAYOUTS)
+def test_template_variables_are_in_env(layout):
+    template = render_docker_compose_template(layout)
+    assert set(re.findall(r"\$\{(\w+)\}", template)) <= get_env_variables(layout)
+
+
+def test_env_variables_are_in_template():
+    template = render_docker_compose_template(FULL_LAYOUT)
+    # COMPOSE_PROJECT_NAME is read by docker compose itself
+    assert get_env_variables(FULL_LAYOUT) - {"COMPOSE_PROJECT_NAME"} <= set(re.findall(r"\$\{(\w+)\}", template))
+
+
+def test_template_has_no_secrets():
+    project = create_project(site_title="Shop", site_url="shop.com")
+    project.sizing = parse_sizing({})
+    configure_project(project, FULL_LAYOUT)
+    template = render_docker_compose_template(FULL_LAYOUT)
+    for line in get_env_data(project).splitlines():
+        name, value = line.split("=", 1)
+        if "PASSWORD" in name:
+            assert value not in template
+
+
+def test_env_source_acme_email():
+    client = app.test_client()
+    response = client.post("/dc/env", data="SITE_TITLE=Shop\nSITE_URL=shop.com\nACME_EMAIL=ops@shop.com\n")
+    assert response.status_code == 200
+    assert "ACME_EMAIL=ops@shop.com\n" in response.data.decode()
+    response = client.post("/dc/env", data="SITE_TITLE=Shop\nSITE_URL=shop.com\n")
+    assert "ACME_EMAIL=admin@shop.com\n" in response.data.decode()
+
+
+def test_env_source_invalid_acme_email():
+    response = app.test_client().post("/dc/env", data="SITE_TITLE=Shop\nSITE_URL=shop.com\nACME_EMAIL=not-an-email\n")
+    assert response.status_code == 400
+    assert response.json["message"] == "ACME_EMAIL must be an email address"
@@ -0,0 +1,264 @@
+import configparser
+import io
+import zipfile
+
+import pytest
+import yaml
+
+from web import DEFAULT_SIZING, MONITORING_PRESETS, ApacheTuning, MariaDbTuning, MonitoringTuning, PhpFpmTuning, app
+
+
+def sizing(**values):
+    return {**DEFAULT_SIZING, **values}
+
+
+def read_bundle(data):
+    with zipfile.ZipFile(io.BytesIO(data)) as bundle:
+        return {name: bundle.read(name).decode() for name in bundle.namelist()}
+
+
+def megabytes(value):
+    return int(value.rstrip("M"))
+
+
+@pytest.fixture
+def client():
+    return app.test_client()
+
+
+def test_mariadb_defaults():
+    tuning = MariaDbTuning(sizing())
+    assert tuning.memory == 1024
+    assert tuning.settings["max_connections"] == 60
+    assert tuning.settings["thread_pool_size"] == 2
+    # 550 MB of data do not fit next to 60 connections in 1 GB
+    assert tuning.settings["innodb_buffer_pool_size"] == "640M"
+    assert "limited by the memory left" in tuning.get_report()
+
+
+def test_mariadb_data_set_fits():
+    tuning = MariaDbTuning(sizing(host_memory=32768, host_cpus=8))
+    assert tuning.memory == 8192
+    assert tuning.settings["thread_pool_size"] == 8
+    assert tuning.settings["innodb_buffer_pool_size"] == "640M"
+    assert "the whole data set" in tuning.get_report()
+    assert tuning.settings["tmp_table_size"] == "64M"
+
+
+def test_mariadb_minimum_memory():
+    tuning = MariaDbTuning(sizing(host_memory=1024, concurrency=5))
+    assert tuning.memory == 512
+    assert tuning.settings["tmp_table_size"] == "32M"
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        {},
+        {"host_memory": 2048, "concurrency": 10},
+        {"host_memory": 16384, "products": 100000, "orders": 1000000, "concurrency": 100},
+        {"host_memory": 65536, "products": 50, "orders": 10},
+    ],
+)
+def test_mariadb_fits_in_memory(values):
+    tuning = MariaDbTuning(sizing(**values))
+    settings = tuning.settings
+    buffer_pool = megabytes(settings["innodb_buffer_pool_size"])
+    assert buffer_pool % 128 == 0
+    assert buffer_pool + settings["max_connections"] * MariaDbTuning.connection_memory <= tuning.memory
+    assert megabytes(settings["innodb_log_file_size"]) <= max(64, buffer_pool // 4)
+
+
+def test_mariadb_grows_with_the_data():
+    small = MariaDbTuning(sizing(host_memory=65536, orders=1000))
+    large = MariaDbTuning(sizing(host_memory=65536, orders=1000000))
+    assert megabytes(small.settings["innodb_buffer_pool_size"]) < megabytes(large.settings["innodb_buffer_pool_size"])
+    assert large.settings["innodb_log_buffer_size"] == "32M"
+
+
+def test_my_cnf():
+    tuning = MariaDbTuning(sizing())
+    parser = configparser.ConfigParser()
+    parser.read_string(tuning.to_my_cnf())
+    assert dict(parser["mariadbd"]) == {name: str(value) for name, value in tuning.settings.items()}
+    for reason in tuning.reasons:
+        assert f"# {reason}\n" in tuning.to_my_cnf()
+
+
+def test_my_cnf_in_bundle(client):
+    response = client.post("/", data="SITE_TITLE=Shop\nSITE_URL=shop.com\nHOST_MEMORY=16384\nORDERS=200000\n")
+    files = read_bundle(response.data)
+    expected = MariaDbTuning(sizing(host_memory=16384, orders=200000))
+    assert files["mariadb/my.cnf"] == expected.to_my_cnf()
+    assert "mariadb/my.cnf" in files["docker-compose.yml"]
+
+
+def test_php_fpm_defaults():
+    tuning = PhpFpmTuning(sizing())
+    # (35% of 4096 MB - 160 MB) / 64 MB
+    assert tuning.settings["pm.max_children"] == 19
+    assert tuning.settings["php_admin_value[memory_limit]"] == "128M"
+    assert "20 concurrent shoppers share 19 workers" in tuning.get_report()
+
+
+def test_php_fpm_limited_by_database_connections():
+    tuning = PhpFpmTuning(sizing(host_memory=32768))
+    assert tuning.settings["pm.max_children"] == 40
+    assert "limited to the database connections" in tuning.get_report()
+
+
+def test_php_fpm_minimum_workers():
+    tuning = PhpFpmTuning(sizing(host_memory=512, php_worker_memory=256))
+    assert tuning.settings["pm.max_children"] == 2
+    assert tuning.settings["php_admin_value[memory_limit]"] == "512M"
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        {},
+        {"host_memory": 512, "php_worker_memory": 256},
+        {"host_memory": 8192, "concurrency": 50},
+        {"host_memory": 65536, "concurrency": 500, "php_worker_memory": 128},
+    ],
+)
+def test_php_fpm_pool(values):
+    tuning = PhpFpmTuning(sizing(**values))
+    settings = tuning.settings
+    max_children = settings["pm.max_children"]
+    assert 1 <= settings["pm.min_spare_servers"] <= settings["pm.start_servers"] <= settings["pm.max_spare_servers"] <= max_children
+    # the workers fit in the memory of the website tier and in the database connections
+    memory = max(256, int(tuning.sizing["host_memory"] * 0.35))
+    assert max_children == 2 or max_children * tuning.sizing["php_worker_memory"] <= memory - PhpFpmTuning.reserved_memory
+    assert max_children <= tuning.sizing["concurrency"] * 2
+
+
+def test_pool_conf():
+    tuning = PhpFpmTuning(sizing())
+    parser = configparser.ConfigParser(comment_prefixes=(";",), interpolation=None)
+    parser.optionxform = str
+    parser.read_string(tuning.to_pool_conf())
+    assert dict(parser["www"]) == {name: str(value) for name, value in tuning.settings.items()}
+
+
+def test_pool_conf_in_bundle(client):
+    response = client.post("/", data="SITE_TITLE=Shop\nSITE_URL=shop.com\nWEBSITE_VARIANT=nginx-fpm\nHOST_MEMORY=8192\n")
+    files = read_bundle(response.data)
+    assert files["php-fpm/zz-woopy.conf"] == PhpFpmTuning(sizing(host_memory=8192)).to_pool_conf()
+    assert "./php-fpm/zz-woopy.conf:/usr/local/etc/php-fpm.d/zz-woopy.conf:ro" in files["docker-compose.yml"]
+    assert "nginx/default.conf" in files
+    assert "apache/zz-woopy.conf" not in files
+
+
+def test_apache_defaults():
+    tuning = ApacheTuning(sizing())
+    # (35% of 4096 MB - 128 MB) / (64 MB + 16 MB of Apache)
+    assert tuning.settings["MaxRequestWorkers"] == tuning.settings["ServerLimit"] == 16
+    assert "MaxRequestWorkers = 16" in tuning.get_report()
+    assert tuning.get_report().startswith("Apache Tuning (apache/zz-woopy.conf):")
+
+
+def test_apache_processes_are_larger_than_fpm_workers():
+    for values in [{}, {"host_memory": 8192}, {"host_memory": 2048, "php_worker_memory": 128}]:
+        fpm = PhpFpmTuning(sizing(**values)).settings["pm.max_children"]
+        assert ApacheTuning(sizing(**values)).settings["MaxRequestWorkers"] <= fpm
+
+
+def test_apache_limited_by_database_connections():
+    tuning = ApacheTuning(sizing(host_memory=32768))
+    assert tuning.settings["MaxRequestWorkers"] == 40
+
+
+def test_apache_conf():
+    tuning = ApacheTuning(sizing())
+    conf = tuning.to_apache_conf()
+    prefork = conf.split("<IfModule mpm_prefork_module>\n")[1].split("</IfModule>")[0]
+    assert dict(line.split() for line in prefork.splitlines()) == {
+        name: str(value) for name, value in tuning.settings.items()
+    }
+    assert conf.count("<IfModule") == conf.count("</IfModule>")
+    assert conf.count("<Location") == conf.count("</Location>")
+    assert "KeepAliveTimeout 2\n" in conf
+    assert "Require expr -z %{HTTP:X-Forwarded-For}" in conf
+
+
+def test_apache_conf_in_bundle(client):
+    response = client.post("/", data="SITE_TITLE=Shop\nSITE_URL=shop.com\nHOST_MEMORY=8192\n")
+    files = read_bundle(response.data)
+    assert files["apache/zz-woopy.conf"] == ApacheTuning(sizing(host_memory=8192)).to_apache_conf()
+    assert "./apache/zz-woopy.conf:/etc/apache2/conf-enabled/zz-woopy.conf:ro" in files["docker-compose.yml"]
+    assert "php-fpm/zz-woopy.conf" not in files
+
+
+def test_invalid_website_variant(client):
+    response = client.post("/", data="SITE_TITLE=Shop\nSITE_URL=shop.com\nWEBSITE_VARIANT=litespeed\n")
+    assert response.status_code == 400
+    assert response.json["message"] == "WEBSITE_VARIANT must be one of apache, nginx-fpm"
+
+
+@pytest.mark.parametrize("preset", list(MONITORING_PRESETS))
+@pytest.mark.parametrize("cpu_budget", [None, 0.5, 2.0, 10.0])
+@pytest.mark.parametrize("containers", [5, 25, 100])
+def test_monitoring_shortest_interval_within_budget(preset, cpu_budget, containers):
+    tuning = MonitoringTuning(preset, cpu_budget, containers)
+    interval = int(tuning.settings["housekeeping_interval"].rstrip("s"))
+    cgroups = containers if MONITORING_PRESETS[preset]["docker_only"] else containers + MonitoringTuning.system_cgroups
+    budget = cpu_budget or MONITORING_PRESETS[preset]["cpu_budget"]
+
+    assert interval in MonitoringTuning.housekeeping_intervals
+    assert tuning.cpu == round(tuning._estimate_cpu(cgroups, interval), 2)
+    if interval != MonitoringTuning.housekeeping_intervals[-1]:
+        assert tuning.cpu <= budget
+    shorter = MonitoringTuning.housekeeping_intervals[: MonitoringTuning.housekeeping_intervals.index(interval)]
+    assert all(tuning._estimate_cpu(cgroups, candidate) > budget for candidate in shorter)
+    assert tuning.settings["max_housekeeping_interval"] == f"{interval * 2}s"
+
+
+def test_monitoring_presets():
+    standard = MonitoringTuning("standard")
+    low_overhead = MonitoringTuning("low-overhead")
+    assert standard.settings["housekeeping_interval"] == "10s"
+    assert standard.settings["docker_only"] == "false"
+    assert low_overhead.settings["docker_only"] == "true"
+    assert set(low_overhead.enabled_metrics) < set(standard.enabled_metrics)
+    assert low_overhead.cpu <= 1.0 < standard.cpu
+    assert low_overhead.memory < standard.memory
+    for tuning in (standard, low_overhead):
+        assert set(tuning.enabled_metrics).isdisjoint(tuning.settings["disable_metrics"].split(","))
+
+
+def test_monitoring_budget_out_of_reach():
+    tuning = MonitoringTuning("standard", cpu_budget=0.1, containers=200)
+    assert tuning.settings["housekeeping_interval"] == "60s"
+    assert tuning.cpu > 0.1
+
+
+def test_monitoring_in_compose(client):
+    response = client.post("/", data="SITE_TITLE=Shop\nSITE_URL=shop.com\nMONITORING_PRESET=low-overhead\nMONITORING_CPU_BUDGET=0.5\n")
+    services = yaml.safe_load(read_bundle(response.data)["docker-compose.yml"])["services"]
+    assert services["monitoring"]["command"] == MonitoringTuning("low-overhead", 0.5).get_arguments()
+    assert "--docker_only=true" in services["monitoring"]["command"]
+
+
+@pytest.mark.parametrize(
+    "options, message",
+    [
+        ("MONITORING_PRESET=minimal", "MONITORING_PRESET must be one of standard, low-overhead"),
+        ("MONITORING_CPU_BUDGET=0", "MONITORING_CPU_BUDGET must be a positive number"),
+        ("MONITORING_CPU_BUDGET=abc", "MONITORING_CPU_BUDGET must be a positive number"),
+        ("MONITORING_CPU_BUDGET=nan", "MONITORING_CPU_BUDGET must be a positive number"),
+        ("MONITORING_CPU_BUDGET=inf", "MONITORING_CPU_BUDGET must be a positive number"),
+    ],
+)
+def test_invalid_monitoring(client, options, message):
+    response = client.post("/", data=f"SITE_TITLE=Shop\nSITE_URL=shop.com\n{options}\n")
+    assert response.status_code == 400
+    assert response.json["message"] == message
+
+
+@pytest.mark.parametrize("variable", ["HOST_MEMORY", "HOST_CPUS", "PRODUCTS", "ORDERS", "CONCURRENCY", "PHP_WORKER_MEMORY"])
+@pytest.mark.parametrize("value", ["0", "-1", "1.5", "abc"])
+def test_invalid_sizing(client, variable, value):
+    response = client.post("/", data=f"SITE_TITLE=Shop\nSITE_URL=shop.com\n{variable}={value}\n")
+    assert response.status_code == 400
+    assert response.json["message"] == f"{variable} must be a positive number"
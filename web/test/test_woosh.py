@@ -0,0 +1,106 @@
+import os
+import re
+import shutil
+import subprocess
+
+import pytest
+import yaml
+
+from web import WooSh, configure_project, create_project, parse_sizing
+
+# WP-CLI stand-in: records the commands, the plugins in INSTALLED are installed, the ones in INTACT
+# pass the checksums and FAILING can not be downloaded
+FAKE_WP = """#!/bin/bash
+echo "$*" >> "$WP_LOG"
+case "$1 $2" in
+    "plugin list") printf '%s\\n' hello-dolly woocommerce ;;
+    "plugin is-installed"|"theme is-installed") [[ " $INSTALLED " == *" $3 "* ]] ;;
+    "plugin verify-checksums") [[ " $INTACT " == *" $3 "* ]] ;;
+    "plugin install"|"theme install") [[ "$3" != "$FAILING" ]] ;;
+esac
+"""
+
+pytestmark = pytest.mark.skipif(not shutil.which("bash") or not shutil.which("xargs"), reason="bash and xargs are required")
+
+
+def get_plugins(script, variable):
+    return re.search(rf'^{variable}="(.*)"$', script, re.MULTILINE).group(1).split()
+
+
+@pytest.fixture
+def run_woosh(tmp_path):
+    (tmp_path / "bin").mkdir()
+    (tmp_path / "bin" / "wp").write_text(FAKE_WP)
+    (tmp_path / "bin" / "wp").chmod(0o755)
+    script = WooSh().get_script().replace("/var/www/html", str(tmp_path))
+
+    def run(**environment):
+        log = tmp_path / "wp.log"
+        log.unlink(missing_ok=True)
+        result = subprocess.run(
+            ["bash", "-c", script],
+            env={
+                **os.environ,
+                "PATH": f"{tmp_path / 'bin'}:{os.environ['PATH']}",
+                "WP_LOG": str(log),
+                "WP_CLI_CACHE_DIR": str(tmp_path / "cache"),
+                **environment,
+            },
+            capture_output=True,
+            text=True,
+            timeout=60,
+        )
+        assert result.returncode == 0, result.stderr
+        return result.stdout, log.read_text().splitlines()
+
+    return run
+
+
+def test_syntax():
+    subprocess.run(["bash", "-n"], input=WooSh().get_script(), text=True, check=True)
+
+
+def test_installs_every_plugin_once(run_woosh):
+    script = WooSh().get_script()
+    plugins = get_plugins(script, "ACTIVATE") + get_plugins(script, "INSTALL")
+    output, commands = run_woosh(WOOSH_JOBS="3")
+
+    installs = [command.split()[2] for command in commands if command.startswith("plugin install")]
+    assert sorted(installs) == sorted(plugins)
+    assert "theme install storefront --force --allow-root" in commands
+    # plugins that are not part of the shop are removed, the shop plugins are kept
+    assert "plugin uninstall hello-dolly --deactivate --allow-root" in commands
+    assert not any(command.startswith("plugin uninstall woocommerce ") for command in commands)
+    # the activation runs once, after every install
+    activations = [index for index, command in enumerate(commands) if command.startswith("plugin activate")]
+    assert len(activations) == 1
+    assert activations[0] > max(index for index, command in enumerate(commands) if " install " in f" {command} ")
+    assert "Woo.sh completed" in output
+    assert "failed to install" not in output
+
+
+def test_intact_plugins_are_skipped(run_woosh):
+    output, commands = run_woosh(INSTALLED="woocommerce mailpoet", INTACT="woocommerce")
+    installs = [command.split()[2] for command in commands if command.startswith("plugin install")]
+    assert "woocommerce" not in installs
+    # installed but modified: downloaded again
+    assert "mailpoet" in installs
+    assert re.search(r"^plugin\s+woocommerce\s+skipped\s", output, re.MULTILINE)
+
+
+def test_failed_install_is_reported(run_woosh):
+    output, _ = run_woosh(FAILING="vimeo")
+    assert re.search(r"^plugin\s+vimeo\s+failed\s", output, re.MULTILINE)
+    assert "Some packages failed to install, run woosh.sh again to retry them" in output
+
+
+@pytest.mark.parametrize("variant, wordpress", [("apache", "website"), ("nginx-fpm", "php")])
+def test_download_cache_is_shared(variant, wordpress):
+    project = create_project(site_title="Shop", site_url="shop.com")
+    project.sizing = parse_sizing({})
+    configure_project(project, {"WEBSITE_VARIANT": variant})
+    compose = yaml.safe_load(project.get_docker_compose_data())
+    # one volume for every project of the host, not prefixed by the project name
+    assert compose["volumes"]["wp-cli-cache"]["name"] == "woopy-wp-cli-cache"
+    # woosh.sh runs where WordPress runs
+    assert "wp-cli-cache:/var/cache/wp-cli" in compose["services"][wordpress]["volumes"]
@@ -0,0 +1,97 @@
+import os
+import shutil
+import subprocess
+
+import pytest
+import yaml
+
+from web import WorkerSh, app, configure_project, create_project, parse_sizing
+
+# WP-CLI stand-in: records the commands, WordPress is installed when INSTALLED is set
+FAKE_WP = """#!/bin/sh
+echo "$*" >> "$WP_LOG"
+case "$1 $2" in
+    "core is-installed") [ -n "$INSTALLED" ] ;;
+esac
+"""
+
+# the first sleep ends the worker loop
+FAKE_SLEEP = """#!/bin/sh
+echo "sleep $1" >> "$WP_LOG"
+kill "$PPID"
+"""
+
+
+@pytest.fixture
+def run_worker(tmp_path):
+    if not shutil.which("sh"):
+        pytest.skip("sh is required")
+    (tmp_path / "bin").mkdir()
+    for name, script in (("wp", FAKE_WP), ("sleep", FAKE_SLEEP)):
+        (tmp_path / "bin" / name).write_text(script)
+        (tmp_path / "bin" / name).chmod(0o755)
+    heartbeat = tmp_path / "heartbeat"
+    script = WorkerSh().get_script().replace("/var/www/html", str(tmp_path)).replace("/tmp/woopy-worker", str(heartbeat))
+
+    def run(**environment):
+        log = tmp_path / "wp.log"
+        subprocess.run(
+            ["sh", "-c", script],
+            env={**os.environ, "PATH": f"{tmp_path / 'bin'}:{os.environ['PATH']}", "WP_LOG": str(log), **environment},
+            capture_output=True,
+            timeout=30,
+        )
+        return log.read_text().splitlines(), heartbeat.exists()
+
+    return run
+
+
+def test_waits_for_wordpress(run_worker):
+    commands, heartbeat = run_worker(WORKER_INTERVAL="7")
+    assert commands == ["core is-installed", "sleep 7"]
+    # the worker is healthy while it waits
+    assert heartbeat
+
+
+def test_runs_cron_and_action_scheduler(run_worker):
+    commands, heartbeat = run_worker(INSTALLED="1", WORKER_CONCURRENCY="3", WORKER_BATCH_SIZE="10", WORKER_INTERVAL="3600")
+    assert commands[1] == "cron event run --due-now --exclude=action_scheduler_run_queue --quiet"
+    assert commands[2] == "plugin is-active woocommerce"
+    assert commands[3:6] == ["action-scheduler run --batch-size=10 --quiet"] * 3
+    assert commands[6].startswith("sleep ")
+    assert 3500 < int(commands[6].split()[1]) <= 3600
+    assert heartbeat
+
+
+def create_compose(layout):
+    project = create_project(site_title="Shop", site_url="shop.com")
+    project.sizing = parse_sizing({})
+    configure_project(project, layout)
+    return yaml.safe_load(project.get_docker_compose_data())["services"]
+
+
+@pytest.mark.parametrize(
+    "layout, stale_minutes",
+    [({}, 5), ({"WORKER_INTERVAL": "300", "WORKER_CONCURRENCY": "4"}, 16)],
+)
+def test_worker_service(layout, stale_minutes):
+    services = create_compose(layout)
+    worker = services["wpcli"]
+    environment = dict(item.split("=", 1) for item in worker["environment"])
+    assert environment["WORKER_INTERVAL"] == layout.get("WORKER_INTERVAL", "60")
+    assert environment["WORKER_CONCURRENCY"] == layout.get("WORKER_CONCURRENCY", "2")
+    assert "define('DISABLE_WP_CRON', true);" in environment["WORDPRESS_CONFIG_EXTRA"]
+    assert worker["command"] == ["sh", "/usr/local/bin/woopy-worker"]
+    assert "./worker.sh:/usr/local/bin/woopy-worker:ro" in worker["volumes"]
+    assert f"-mmin -{stale_minutes} " in worker["healthcheck"]["test"][1]
+    # the worker runs with the wp-config.php of the website
+    website = dict(item.split("=", 1) for item in services["website"]["environment"])
+    assert environment["WORDPRESS_DB_PASSWORD"] == website["WORDPRESS_DB_PASSWORD"]
+
+
+@pytest.mark.parametrize("variable", ["WORKER_CONCURRENCY", "WORKER_INTERVAL"])
+@pytest.mark.parametrize("value", ["0", "-1", "abc"])
+def test_invalid_worker_settings(variable, value):
+    response = app.test_client().post("/", data=f"SITE_TITLE=Shop\nSITE_URL=shop.com\n{variable}={value}\n")
+    assert response.status_code == 400
+    assert response.json["message"] == f"{variable} must be a positive number"